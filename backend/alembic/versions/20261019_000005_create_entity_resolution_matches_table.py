@@ -0,0 +1,92 @@
+"""create entity_resolution_matches table
+
+Revision ID: 20261019_000005
+Revises: 20260115_000004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261019_000005"
+down_revision = "20260115_000004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "entity_resolution_matches",
+        sa.Column("id", sa.Integer(), sa.Identity(), primary_key=True),
+        sa.Column("entity_a_id", sa.String(), nullable=False),
+        sa.Column("entity_b_id", sa.String(), nullable=False),
+        sa.Column("match_score", sa.Float(), nullable=False),
+        sa.Column("match_reasons", postgresql.JSONB(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("resolved_by", sa.String(), nullable=True),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "owner_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=True,
+            server_default=sa.text("auth.uid()"),
+        ),
+    )
+    # Per owner (RLS): another user's review of the same pair must not block or absorb this one's.
+    # NULLS NOT DISTINCT (Postgres 15+) so rows written without a user (owner_id NULL) still conflict.
+    op.create_index(
+        "ix_entity_resolution_matches_pair",
+        "entity_resolution_matches",
+        ["owner_id", "entity_a_id", "entity_b_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        "ix_entity_resolution_matches_status",
+        "entity_resolution_matches",
+        ["status"],
+        unique=False,
+    )
+
+    op.execute("ALTER TABLE public.entity_resolution_matches ENABLE ROW LEVEL SECURITY;")
+
+    for action, clause in (
+        ("select", "FOR SELECT USING (owner_id = auth.uid())"),
+        ("insert", "FOR INSERT WITH CHECK (owner_id = auth.uid())"),
+        ("update", "FOR UPDATE USING (owner_id = auth.uid()) WITH CHECK (owner_id = auth.uid())"),
+        ("delete", "FOR DELETE USING (owner_id = auth.uid())"),
+    ):
+        policy = f"entity_resolution_matches_{action}_own"
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+              IF NOT EXISTS (
+                SELECT 1 FROM pg_policies WHERE schemaname = 'public' AND tablename = 'entity_resolution_matches' AND policyname = '{policy}'
+              ) THEN
+                CREATE POLICY {policy} ON public.entity_resolution_matches
+                  {clause};
+              END IF;
+            END $$;
+            """
+        )
+
+    op.execute("GRANT SELECT, INSERT, UPDATE, DELETE ON public.entity_resolution_matches TO authenticated;")
+    op.execute("GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO authenticated;")
+
+
+def downgrade() -> None:
+    for action in ("delete", "update", "insert", "select"):
+        op.execute(f"DROP POLICY IF EXISTS entity_resolution_matches_{action}_own ON public.entity_resolution_matches;")
+
+    op.drop_index("ix_entity_resolution_matches_status", table_name="entity_resolution_matches")
+    op.drop_index("ix_entity_resolution_matches_pair", table_name="entity_resolution_matches")
+    op.drop_table("entity_resolution_matches")
@@ -0,0 +1,24 @@
+"""add timings to analysis_jobs
+
+Revision ID: 20261019_000006
+Revises: 20261019_000005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261019_000006"
+down_revision = "20261019_000005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("analysis_jobs", sa.Column("timings", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("analysis_jobs", "timings")
@@ -0,0 +1,99 @@
+"""create case_detector_scores table
+
+Revision ID: 20261019_000007
+Revises: 20261019_000006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261019_000007"
+down_revision = "20261019_000006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One narrow row per (case, detector); the verbose indicators stay in cases.signals
+    op.create_table(
+        "case_detector_scores",
+        sa.Column("case_id", sa.String(), sa.ForeignKey("cases.case_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("detector", sa.String(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=False),
+        sa.Column("version", sa.String(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "owner_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=True,
+            server_default=sa.text("auth.uid()"),
+        ),
+        sa.PrimaryKeyConstraint("case_id", "detector"),
+    )
+    op.create_index("ix_case_detector_scores_detector", "case_detector_scores", ["detector"], unique=False)
+    op.create_index("ix_case_detector_scores_owner_id", "case_detector_scores", ["owner_id"], unique=False)
+
+    op.execute("ALTER TABLE public.case_detector_scores ENABLE ROW LEVEL SECURITY;")
+
+    for action, clause in (
+        ("select", "FOR SELECT USING (owner_id = auth.uid())"),
+        ("insert", "FOR INSERT WITH CHECK (owner_id = auth.uid())"),
+        ("update", "FOR UPDATE USING (owner_id = auth.uid()) WITH CHECK (owner_id = auth.uid())"),
+        ("delete", "FOR DELETE USING (owner_id = auth.uid())"),
+    ):
+        policy = f"case_detector_scores_{action}_own"
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+              IF NOT EXISTS (
+                SELECT 1 FROM pg_policies WHERE schemaname = 'public' AND tablename = 'case_detector_scores' AND policyname = '{policy}'
+              ) THEN
+                CREATE POLICY {policy} ON public.case_detector_scores
+                  {clause};
+              END IF;
+            END $$;
+            """
+        )
+
+    op.execute("GRANT SELECT, INSERT, UPDATE, DELETE ON public.case_detector_scores TO authenticated;")
+
+    # Backfill from the breakdowns already stored on analyzed cases
+    op.execute(
+        """
+        INSERT INTO public.case_detector_scores (case_id, detector, score, weight, confidence, version, owner_id)
+        SELECT
+          c.case_id,
+          d.key,
+          COALESCE((d.value->>'score')::float, 0),
+          COALESCE((d.value->>'weight')::float, 1),
+          COALESCE((d.value->>'confidence')::float, 1),
+          d.value->>'version',
+          c.owner_id
+        FROM public.cases c
+        CROSS JOIN LATERAL json_each(c.signals->'detector_breakdown') AS d
+        WHERE c.status = 'analyzed'
+          AND json_typeof(c.signals->'detector_breakdown') = 'object'
+          AND json_typeof(d.value) = 'object'
+        ON CONFLICT (case_id, detector) DO NOTHING;
+        """
+    )
+
+
+def downgrade() -> None:
+    for action in ("delete", "update", "insert", "select"):
+        op.execute(f"DROP POLICY IF EXISTS case_detector_scores_{action}_own ON public.case_detector_scores;")
+
+    op.drop_index("ix_case_detector_scores_owner_id", table_name="case_detector_scores")
+    op.drop_index("ix_case_detector_scores_detector", table_name="case_detector_scores")
+    op.drop_table("case_detector_scores")
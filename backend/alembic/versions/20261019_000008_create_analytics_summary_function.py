@@ -0,0 +1,157 @@
+"""create analytics_summary function
+
+Revision ID: 20261019_000008
+Revises: 20261019_000007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "20261019_000008"
+down_revision = "20261019_000007"
+branch_labels = None
+depends_on = None
+
+
+# Aggregates consumed by app.services.analytics_service.summary_from_aggregates;
+# aggregate_cases there is the Python equivalent and must stay in sync.
+# SECURITY INVOKER, so the caller's RLS policies scope every row read.
+ANALYTICS_SUMMARY_FUNCTION = """
+CREATE OR REPLACE FUNCTION public.analytics_summary(p_now timestamptz DEFAULT now())
+RETURNS json
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  WITH scored AS (
+    SELECT
+      case_id,
+      status,
+      risk_score,
+      created_at,
+      CASE
+        WHEN risk_score IS NULL THEN NULL
+        WHEN risk_score >= 75 THEN 'critical'
+        WHEN risk_score >= 50 THEN 'high'
+        WHEN risk_score >= 25 THEN 'medium'
+        ELSE 'low'
+      END AS level
+    FROM cases
+  ),
+  analyzed AS (
+    SELECT * FROM scored WHERE status = 'analyzed'
+  ),
+  detector_rows AS (
+    SELECT s.case_id, s.detector, s.score, a.level, a.created_at
+    FROM case_detector_scores s
+    JOIN analyzed a ON a.case_id = s.case_id
+  ),
+  days AS (
+    SELECT
+      floor(extract(epoch FROM created_at - (p_now - interval '30 days')) / 86400)::int AS day_offset,
+      count(*) AS count,
+      count(*) FILTER (WHERE status = 'analyzed' AND risk_score IS NOT NULL) AS analyzed,
+      coalesce(sum(risk_score) FILTER (WHERE status = 'analyzed'), 0) AS risk_sum,
+      count(*) FILTER (WHERE status = 'analyzed' AND risk_score >= 50) AS high_risk
+    FROM scored
+    WHERE created_at >= p_now - interval '30 days' AND created_at < p_now
+    GROUP BY 1
+  ),
+  detectors AS (
+    SELECT
+      detector AS name,
+      count(*) FILTER (WHERE score > 0) AS triggered_count,
+      coalesce(avg(score) FILTER (WHERE score > 0), 0) AS avg_score,
+      coalesce(max(score) FILTER (WHERE score > 0), 0) AS max_score,
+      coalesce((array_agg(case_id ORDER BY created_at DESC) FILTER (WHERE score > 0))[1:10], '{}') AS case_ids
+    FROM detector_rows
+    GROUP BY detector
+  ),
+  cohort_signals AS (
+    SELECT level, detector, count(*) AS n
+    FROM detector_rows
+    WHERE score > 0 AND level IS NOT NULL
+    GROUP BY level, detector
+  ),
+  cohorts AS (
+    SELECT
+      level,
+      count(*) AS case_count,
+      avg(risk_score) AS avg_risk_score,
+      percentile_cont(0.5) WITHIN GROUP (ORDER BY risk_score) AS median_risk_score
+    FROM analyzed
+    WHERE level IS NOT NULL
+    GROUP BY level
+  )
+  SELECT json_build_object(
+    'total_cases', (SELECT count(*) FROM scored),
+    'analyzed_cases', (SELECT count(*) FROM analyzed),
+    'avg_risk_score', (SELECT coalesce(avg(risk_score), 0) FROM analyzed),
+    'min_risk_score', (SELECT coalesce(min(risk_score), 0) FROM analyzed),
+    'max_risk_score', (SELECT coalesce(max(risk_score), 0) FROM analyzed),
+    'risk_distribution', (
+      SELECT coalesce(json_object_agg(level, case_count), '{}'::json) FROM cohorts
+    ),
+    'status_distribution', (
+      SELECT coalesce(json_object_agg(status, n), '{}'::json)
+      FROM (SELECT status, count(*) AS n FROM scored GROUP BY status) s
+    ),
+    'days', (
+      SELECT coalesce(json_agg(json_build_object(
+        'offset', day_offset, 'count', count, 'analyzed', analyzed,
+        'risk_sum', risk_sum, 'high_risk', high_risk
+      ) ORDER BY day_offset), '[]'::json)
+      FROM days
+    ),
+    'detectors', (
+      SELECT coalesce(json_agg(json_build_object(
+        'name', name, 'triggered_count', triggered_count, 'avg_score', avg_score,
+        'max_score', max_score, 'case_ids', case_ids
+      ) ORDER BY triggered_count DESC, name), '[]'::json)
+      FROM detectors
+    ),
+    'cohorts', (
+      SELECT coalesce(json_agg(json_build_object(
+        'level', c.level,
+        'case_count', c.case_count,
+        'avg_risk_score', c.avg_risk_score,
+        'median_risk_score', c.median_risk_score,
+        'top_signals', (
+          SELECT coalesce(json_agg(t.detector ORDER BY t.n DESC, t.detector), '[]'::json)
+          FROM (
+            SELECT detector, n FROM cohort_signals cs
+            WHERE cs.level = c.level
+            ORDER BY n DESC, detector
+            LIMIT 5
+          ) t
+        )
+      ) ORDER BY array_position(ARRAY['low', 'medium', 'high', 'critical'], c.level)), '[]'::json)
+      FROM cohorts c
+    ),
+    'recent_high_risk_cases', (
+      SELECT coalesce(json_agg(h.case_id ORDER BY h.created_at DESC), '[]'::json)
+      FROM (
+        SELECT case_id, created_at FROM analyzed
+        WHERE risk_score >= 50
+        ORDER BY created_at DESC
+        LIMIT 10
+      ) h
+    )
+  );
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.create_index("ix_cases_created_at", "cases", ["created_at"], unique=False)
+    op.execute(ANALYTICS_SUMMARY_FUNCTION)
+    op.execute("GRANT EXECUTE ON FUNCTION public.analytics_summary(timestamptz) TO authenticated;")
+    # Let PostgREST pick up the new function without a restart
+    op.execute("NOTIFY pgrst, 'reload schema';")
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS public.analytics_summary(timestamptz);")
+    op.drop_index("ix_cases_created_at", table_name="cases")
@@ -0,0 +1,26 @@
+"""add priority to analysis_jobs
+
+Revision ID: 20261019_000009
+Revises: 20261019_000008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_000009"
+down_revision = "20261019_000008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "analysis_jobs",
+        sa.Column("priority", sa.String(), nullable=False, server_default=sa.text("'interactive'")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("analysis_jobs", "priority")
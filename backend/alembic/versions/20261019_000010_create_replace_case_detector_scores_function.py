@@ -0,0 +1,64 @@
+"""create replace_case_detector_scores function
+
+Revision ID: 20261019_000010
+Revises: 20261019_000009
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "20261019_000010"
+down_revision = "20261019_000009"
+branch_labels = None
+depends_on = None
+
+
+# Called by app.repositories.detector_score_repo.DetectorScoreRepository.upsert_breakdown:
+# replaces a case's detector rows (upsert the given ones, delete the rest) in one transaction.
+# SECURITY INVOKER, so the caller's RLS policies apply to every row written or deleted.
+REPLACE_CASE_DETECTOR_SCORES_FUNCTION = """
+CREATE OR REPLACE FUNCTION public.replace_case_detector_scores(p_case_id text, p_rows json)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+  written integer;
+BEGIN
+  DELETE FROM case_detector_scores
+  WHERE case_id = p_case_id
+    AND detector NOT IN (SELECT r->>'detector' FROM json_array_elements(p_rows) AS r);
+
+  INSERT INTO case_detector_scores (case_id, detector, score, weight, confidence, version, updated_at)
+  SELECT p_case_id, r.detector, r.score, r.weight, r.confidence, r.version, coalesce(r.updated_at, now())
+  FROM json_to_recordset(p_rows) AS r(
+    detector text,
+    score double precision,
+    weight double precision,
+    confidence double precision,
+    version text,
+    updated_at timestamptz
+  )
+  ON CONFLICT (case_id, detector) DO UPDATE SET
+    score = EXCLUDED.score,
+    weight = EXCLUDED.weight,
+    confidence = EXCLUDED.confidence,
+    version = EXCLUDED.version,
+    updated_at = EXCLUDED.updated_at;
+
+  GET DIAGNOSTICS written = ROW_COUNT;
+  RETURN written;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(REPLACE_CASE_DETECTOR_SCORES_FUNCTION)
+    op.execute("GRANT EXECUTE ON FUNCTION public.replace_case_detector_scores(text, json) TO authenticated;")
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS public.replace_case_detector_scores(text, json);")
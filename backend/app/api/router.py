@@ -4,10 +4,12 @@ from app.api.routes.analytics import router as analytics_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.cases import router as cases_router
 from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
 from app.core.rate_limit import rate_limit
 
 api_router = APIRouter()
 api_router.include_router(health_router, tags=["health"])
+api_router.include_router(metrics_router, tags=["metrics"])
 api_router.include_router(
 	auth_router,
 	prefix="/auth",
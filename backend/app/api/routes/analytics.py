@@ -2,15 +2,17 @@
 Analytics routes for dashboard aggregations.
 """
 
+from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.api.deps import get_case_service, require_user
 from app.core.supabase_auth import CurrentUser
 from app.domain.errors import DomainError
-from app.schemas.analytics import AnalyticsSummary
-from app.services.analytics_service import compute_analytics_summary
+from app.schemas.analytics import AnalyticsSummary, WeightSimulationRequest, WeightSimulationResult
+from app.schemas.entities import EntityResolutionMatch, VendorResolutionRun
+from app.services.analytics_service import simulate_weights, summary_from_aggregates
 from app.services.case_service import CaseService
 
 router = APIRouter()
@@ -34,22 +36,10 @@ async def get_analytics_summary(
     - Cohort analysis
     """
     try:
-        # Get all cases for the user
-        cases = await service.list_cases()
-
-        # Convert to dicts for analytics computation
-        case_dicts = [
-            {
-                "case_id": c.case_id,
-                "status": c.status,
-                "risk_score": c.risk_score,
-                "signals": c.signals,
-                "created_at": c.created_at,
-            }
-            for c in cases
-        ]
-
-        return compute_analytics_summary(case_dicts)
+        now = datetime.now(timezone.utc)
+        aggregates = await service.analytics_aggregates(now)
+
+        return summary_from_aggregates(aggregates, now)
     except DomainError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -64,29 +54,18 @@ async def get_risk_distribution(
 ) -> Any:
     """Get risk score distribution."""
     try:
-        cases = await service.list_cases()
+        aggregates = await service.analytics_aggregates(datetime.now(timezone.utc))
 
         distribution = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-        scores = []
-
-        for case in cases:
-            if case.status == "analyzed" and case.risk_score is not None:
-                scores.append(case.risk_score)
-                if case.risk_score >= 75:
-                    distribution["critical"] += 1
-                elif case.risk_score >= 50:
-                    distribution["high"] += 1
-                elif case.risk_score >= 25:
-                    distribution["medium"] += 1
-                else:
-                    distribution["low"] += 1
+        distribution.update(aggregates["risk_distribution"])
+        total = sum(distribution.values())
 
         return {
             "distribution": distribution,
-            "total_analyzed": len(scores),
-            "average_score": round(sum(scores) / len(scores), 1) if scores else 0,
-            "min_score": min(scores) if scores else 0,
-            "max_score": max(scores) if scores else 0,
+            "total_analyzed": total,
+            "average_score": round(aggregates["avg_risk_score"], 1) if total else 0,
+            "min_score": aggregates["min_risk_score"],
+            "max_score": aggregates["max_risk_score"],
         }
     except DomainError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -102,57 +81,79 @@ async def get_signal_breakdown(
 ) -> Any:
     """Get breakdown of triggered signals across all cases."""
     try:
-        cases = await service.list_cases()
-
-        signal_stats: dict[str, dict] = {}
-
-        for case in cases:
-            if case.status != "analyzed" or not case.signals:
-                continue
-
-            detector_breakdown = case.signals.get("detector_breakdown", {})
-
-            for detector_name, detector_data in detector_breakdown.items():
-                if not isinstance(detector_data, dict):
-                    continue
-
-                score = detector_data.get("score", 0)
-
-                if detector_name not in signal_stats:
-                    signal_stats[detector_name] = {
-                        "name": detector_name,
-                        "triggered_count": 0,
-                        "total_score": 0,
-                        "max_score": 0,
-                        "case_ids": [],
-                    }
-
-                if score > 0:
-                    stats = signal_stats[detector_name]
-                    stats["triggered_count"] += 1
-                    stats["total_score"] += score
-                    stats["max_score"] = max(stats["max_score"], score)
-                    if len(stats["case_ids"]) < 10:
-                        stats["case_ids"].append(case.case_id)
-
-        # Calculate averages
-        for stats in signal_stats.values():
-            if stats["triggered_count"] > 0:
-                stats["avg_score"] = round(
-                    stats["total_score"] / stats["triggered_count"], 1
-                )
-            else:
-                stats["avg_score"] = 0
-            del stats["total_score"]
+        aggregates = await service.analytics_aggregates(datetime.now(timezone.utc))
 
         return {
-            "signals": sorted(
-                signal_stats.values(),
-                key=lambda x: x["triggered_count"],
-                reverse=True,
-            ),
+            "signals": [
+                {
+                    "name": d["name"],
+                    "triggered_count": d["triggered_count"],
+                    "max_score": d["max_score"],
+                    "case_ids": d["case_ids"],
+                    "avg_score": round(d["avg_score"], 1),
+                }
+                for d in aggregates["detectors"]
+            ],
         }
     except DomainError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/weight-simulation", response_model=WeightSimulationResult)
+async def simulate_detector_weights(
+    *,
+    request: WeightSimulationRequest,
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """
+    Preview risk scores under new detector weights.
+
+    Re-aggregates the stored detector breakdown of every analyzed case;
+    no detector or LLM is run.
+    """
+    try:
+        cases = await service.list_case_scores()
+        return simulate_weights(cases, request.weights, limit=request.limit)
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/vendor-matches", response_model=VendorResolutionRun)
+async def resolve_vendor_matches(
+    *,
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """
+    Find likely duplicate vendors in the vendor master and store them for review.
+
+    Re-running refreshes scores; pairs already confirmed or rejected keep
+    their decision.
+    """
+    try:
+        return await service.resolve_vendor_matches()
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/vendor-matches", response_model=list[EntityResolutionMatch])
+async def list_vendor_matches(
+    *,
+    status: str | None = Query(default=None, pattern="^(pending|confirmed|rejected)$"),
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """Stored duplicate-vendor candidates, best match first."""
+    try:
+        return await service.list_vendor_matches(status)
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,24 +1,34 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_case_service, require_user
 from app.core.supabase_auth import CurrentUser
 from app.domain.errors import (
+    AnalysisJobFinished,
     AnalysisJobNotFound,
+    AnalysisQueueFull,
     CaseExtractionFailed,
     CaseMissingFile,
+    CaseNotAnalyzed,
     CaseNotFound,
     DomainError,
+    InvalidExportRequest,
+    UploadTooLarge,
 )
+from app.services.case_export import ExportSpec
 from app.services.case_service import CaseService
 from app.schemas.analysis_job import AnalysisJobResult
-from app.schemas.case import CaseResponse, CaseResult
+from app.schemas.case import CaseResponse, CaseResult, RescoreBacklogResponse
 
 router = APIRouter()
 
+# Seconds clients are asked to wait when the analysis queue is full
+QUEUE_FULL_RETRY_AFTER = "30"
+
 
 @router.get("", response_model=list[CaseResult])
 async def list_cases(
@@ -45,6 +55,52 @@ async def upload_case_document(
     """Upload a document to create a new case."""
     try:
         return {"case": await service.create_case_from_upload(file)}
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Declared before /{case_id} so "export" is not taken for a case id
+@router.get("/export")
+async def export_cases(
+    *,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    detectors: str | None = Query(None, description="Comma-separated detector names (default: all)"),
+    fields: str | None = Query(None, description="Comma-separated detector fields: score, weight, confidence"),
+    status: str | None = Query(None, description="Only cases with this status"),
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> StreamingResponse:
+    """Stream all cases with their detector scores as NDJSON or CSV."""
+    try:
+        spec = ExportSpec.parse(format, detectors, fields, status)
+    except InvalidExportRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        service.export_cases(spec),
+        media_type=spec.media_type,
+        headers={"Content-Disposition": f'attachment; filename="cases.{spec.format}"'},
+    )
+
+
+@router.post("/rescore", response_model=RescoreBacklogResponse)
+async def rescore_backlog(
+    *,
+    limit: int = Query(500, ge=1, le=5000, description="Cases to re-score in this batch"),
+    after: int | None = Query(None, description="next_after of the previous batch"),
+    user: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """
+    Re-score analyzed cases in batches, e.g. after detectors or weights
+    change; call again with `after=next_after` until it is null.
+    """
+    try:
+        return await service.rescore_backlog(owner=user.id, limit=limit, after=after)
     except DomainError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -72,13 +128,24 @@ async def get_case(
 async def analyze_case(
     *,
     case_id: str,
-    _: CurrentUser = Depends(require_user),
+    priority: Literal["interactive", "bulk"] = Query("interactive", description="bulk for batch submissions"),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    user: CurrentUser = Depends(require_user),
     service: CaseService = Depends(get_case_service),
 ) -> Any:
-    """Run the analysis pipeline."""
+    """
+    Queue the analysis pipeline. While the case is processing, further
+    requests return it with the job already running instead of queueing
+    another; a repeated Idempotency-Key never queues twice.
+    """
     try:
-        queued = await service.queue_analysis(case_id)
-        return {"case": queued}
+        queued = await service.queue_analysis(
+            case_id, idempotency_key=idempotency_key, owner=user.id, priority=priority
+        )
+        job_id = (queued.signals or {}).get("analysis_job_id")
+        return {"case": queued, "queue_position": service.queue_position(job_id)}
+    except AnalysisQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
     except CaseNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except (CaseMissingFile, CaseExtractionFailed) as e:
@@ -89,6 +156,28 @@ async def analyze_case(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{case_id}/rescore", response_model=CaseResponse)
+async def rescore_case(
+    *,
+    case_id: str,
+    user: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """Re-score an analyzed case, re-running only detectors that changed."""
+    try:
+        return {"case": await service.rescore_case(case_id, owner=user.id)}
+    except AnalysisQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
+    except CaseNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CaseNotAnalyzed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/jobs/{job_id}", response_model=AnalysisJobResult)
 async def get_analysis_job(
     job_id: str,
@@ -104,3 +193,47 @@ async def get_analysis_job(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=AnalysisJobResult)
+async def cancel_analysis_job(
+    job_id: str,
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> Any:
+    """
+    Cancel a queued or running analysis. The case returns to its previous
+    status; an analysis that has already started saving completes instead.
+    """
+    try:
+        return await service.cancel_analysis_job(job_id)
+    except AnalysisJobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AnalysisJobFinished as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job_events(
+    job_id: str,
+    _: CurrentUser = Depends(require_user),
+    service: CaseService = Depends(get_case_service),
+) -> StreamingResponse:
+    """Stream job state transitions and stage progress as server-sent events."""
+    try:
+        job = await service.get_analysis_job(job_id)
+    except AnalysisJobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DomainError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        service.job_event_stream(job),
+        media_type="text/event-stream",
+        # No caching, and no buffering in nginx-style proxies
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,5 +4,6 @@ from app.application.cases.analyze_case import AnalyzeCase
 from app.application.cases.create_case_from_upload import CreateCaseFromUpload
 from app.application.cases.get_case import GetCase
 from app.application.cases.list_cases import ListCases
+from app.application.cases.rescore_case import RescoreCase
 
-__all__ = ["AnalyzeCase", "CreateCaseFromUpload", "GetCase", "ListCases"]
+__all__ = ["AnalyzeCase", "CreateCaseFromUpload", "GetCase", "ListCases", "RescoreCase"]
@@ -6,12 +6,65 @@ from datetime import datetime, timezone
 from app.domain.case import CaseRecord, CaseUpdate
 from app.domain.errors import CaseExtractionFailed, CaseMissingFile, CaseNotFound
 from app.repositories.case_repo import CaseRepository
+from app.repositories.detector_score_repo import DetectorScoreRepository
 from app.services import explainability, llm_gemini, moderation, risk_scoring, text_extraction
+from app.services.job_events import report_progress
+from app.services.llm_triage import DeferredLLMQueue, TriagePolicy, deferred_llm_queue
+from app.services.object_storage import get_object_storage
+from app.services.signals.bid_rigging import extract_bids
+from app.services.vendor_index import vendor_index
+from app.utils.cancellation import cancellable, check_cancelled, run_in_thread
+from app.utils.logging import logger
+from app.utils.timing import span
+
+
+def load_case_text(signals: dict) -> str:
+    """Extracted text of a case's document, from the sidecar cache when stored."""
+    file_path = signals.get("original_file")
+    if not file_path:
+        raise CaseMissingFile("No file associated with this case")
+
+    report_progress("extracting")
+    with span("extract_text"):
+        if signals.get("storage_backend"):
+            text = text_extraction.cached_text_from_storage(get_object_storage(), file_path)
+        else:
+            # Cases uploaded before object storage hold a local path
+            text = text_extraction.extract_text(file_path)
+    if not text:
+        raise CaseExtractionFailed("Could not extract text")
+    return text
+
+
+async def _run_llm(text: str) -> str:
+    with span("llm"):
+        # Abandoned at once if the job is cancelled or runs out of time
+        llm_analysis = await cancellable(llm_gemini.analyze_document(text))
+    if llm_analysis and not moderation.check_content_safety(llm_analysis):
+        llm_analysis = "⚠️ Analysis hidden due to safety policy."
+    return llm_analysis
+
+
+async def save_detector_scores(scores: DetectorScoreRepository | None, case_id: str, breakdown: dict) -> None:
+    """
+    Mirrors a saved breakdown into case_detector_scores. The case row is
+    the source of truth, so a failed write is logged rather than failing
+    the analysis; the next analysis or rescore of the case rewrites it.
+    """
+    if scores is None:
+        return
+    try:
+        await scores.upsert_breakdown(case_id, breakdown)
+    except Exception:
+        logger.exception("detector_scores.write_failed", case_id=case_id)
 
 
 @dataclass(frozen=True)
 class AnalyzeCase:
     repository: CaseRepository
+    policy: TriagePolicy | None = None
+    deferred_queue: DeferredLLMQueue = deferred_llm_queue
+    scores: DetectorScoreRepository | None = None
 
     async def execute(self, case_id: str) -> CaseRecord:
         case = await self.repository.get(case_id)
@@ -19,27 +72,36 @@ class AnalyzeCase:
             raise CaseNotFound("Case not found")
 
         signals = case.get("signals") or {}
-        file_path = signals.get("original_file")
-        if not file_path:
-            raise CaseMissingFile("No file associated with this case")
-
-        text = text_extraction.extract_text(file_path)
-        if not text:
-            raise CaseExtractionFailed("Could not extract text")
+        # Off the event loop: extraction and OCR can take minutes
+        text = await run_in_thread(load_case_text, signals)
 
-        score, computed_signals, _ = risk_scoring.compute_risk_score(text)
+        report_progress("detectors")
+        with span("score"):
+            result = await run_in_thread(risk_scoring.compute_risk_result, text, case_id)
+        score, computed_signals = result.risk_score, risk_scoring.summarize_signals(result)
 
-        llm_analysis = llm_gemini.analyze_document(text)
-        if llm_analysis and not moderation.check_content_safety(llm_analysis):
-            llm_analysis = "⚠️ Analysis hidden due to safety policy."
+        triage = (self.policy or TriagePolicy.from_settings()).decide(result)
+        if triage.action == "run":
+            report_progress("llm")
+            llm_analysis = await _run_llm(text)
+        else:
+            llm_analysis = triage.placeholder()
 
         final_explanation = moderation.sanitize_output(
             explainability.format_explanation(computed_signals, llm_analysis)
         )
 
+        completed_at = datetime.now(timezone.utc).isoformat()
+        # Ingest after scoring so a case is never compared against itself
+        with span("vendor_index"):
+            vendor_index.ingest_case(case_id, extract_bids(text), seen_at=completed_at)
+
         merged_signals = {**signals, **computed_signals}
         merged_signals["extracted_text_preview"] = text[:500]
-        merged_signals["analysis_completed_at"] = datetime.now(timezone.utc).isoformat()
+        merged_signals["analysis_completed_at"] = completed_at
+        merged_signals["llm_triage"] = triage.to_signal()
+        # Kept so a rescore can rebuild the explanation without calling the LLM
+        merged_signals["llm_analysis"] = llm_analysis
 
         update_data: CaseUpdate = {
             "status": "analyzed",
@@ -48,4 +110,68 @@ class AnalyzeCase:
             "explanation": final_explanation,
         }
 
-        return await self.repository.update(case_id, update_data)
+        # Last checkpoint: once saving starts the analysis completes
+        check_cancelled()
+        report_progress("saving")
+        updated = await self.repository.update(case_id, update_data)
+        await save_detector_scores(self.scores, case_id, computed_signals["detector_breakdown"])
+        if triage.action == "defer" and not self.defer(case_id, completed_at):
+            merged_signals["llm_triage"]["action"] = "skip"
+            merged_signals["llm_triage"]["reason"] += " Deferred queue full."
+            updated = await self.repository.update(case_id, {"signals": merged_signals})
+        return updated
+
+    def defer(self, case_id: str, analysis_completed_at: str) -> bool:
+        """Queues the deferred LLM analysis of one analysis of a case; False when the queue is full."""
+        key = f"{case_id}@{analysis_completed_at}"
+        if key in self.deferred_queue:
+            return True
+        return self.deferred_queue.submit(key, lambda: self.complete_deferred(case_id, analysis_completed_at))
+
+    def resume_deferred(self, case: CaseRecord) -> bool:
+        """
+        Re-queues a case's pending deferred analysis, e.g. one lost when
+        the process restarted. Returns whether one is queued.
+        """
+        signals = case.get("signals") or {}
+        triage = signals.get("llm_triage") or {}
+        completed_at = signals.get("analysis_completed_at")
+        if case.get("status") != "analyzed" or triage.get("action") != "defer" or not completed_at:
+            return False
+        if triage.get("deferred_completed_at"):
+            return False
+        return self.defer(case["case_id"], completed_at)
+
+    async def complete_deferred(self, case_id: str, analysis_completed_at: str) -> None:
+        """
+        Runs a deferred LLM analysis and folds it into the case explanation.
+
+        The case is read when the job runs, and written only if it still
+        holds the analysis that deferred it: a newer analysis or rescore
+        is never overwritten with a stale explanation.
+        """
+        case = await self.repository.get(case_id)
+        signals = (case or {}).get("signals") or {}
+        if signals.get("analysis_completed_at") != analysis_completed_at:
+            return
+        llm_analysis = await _run_llm(await run_in_thread(load_case_text, signals))
+
+        case = await self.repository.get(case_id)
+        signals = (case or {}).get("signals") or {}
+        triage = {**(signals.get("llm_triage") or {}), "deferred_completed_at": datetime.now(timezone.utc).isoformat()}
+        update_data: CaseUpdate = {
+            "signals": {**signals, "llm_triage": triage, "llm_analysis": llm_analysis},
+            "explanation": moderation.sanitize_output(explainability.format_explanation(signals, llm_analysis)),
+        }
+        updated = await self.repository.transition(
+            case_id,
+            update_data,
+            from_status=("analyzed",),
+            where={
+                "signals->>analysis_completed_at": f"eq.{analysis_completed_at}",
+                # A rescore in between rebuilt the explanation from the signals read above
+                "signals->>rescored_at": f"eq.{signals['rescored_at']}" if signals.get("rescored_at") else "is.null",
+            },
+        )
+        if updated is None:
+            logger.info("llm.deferred.superseded", case_id=case_id)
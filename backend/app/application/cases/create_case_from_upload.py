@@ -15,12 +15,18 @@ class CreateCaseFromUpload:
     repository: CaseRepository
 
     async def execute(self, file: UploadFile) -> CaseRecord:
-        file_path = storage.save_upload(file)
+        stored = await storage.save_upload(file)
 
         case_id = str(uuid.uuid4())
         new_case: CaseCreate = {
             "case_id": case_id,
             "status": "uploaded",
-            "signals": {"original_file": str(file_path), "filename": file.filename},
+            "signals": {
+                "original_file": stored.key,
+                "storage_backend": stored.backend,
+                "filename": stored.filename,
+                "sha256": stored.sha256,
+                "size_bytes": stored.size,
+            },
         }
         return await self.repository.create(new_case)
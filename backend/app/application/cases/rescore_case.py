@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.application.cases.analyze_case import load_case_text, save_detector_scores
+from app.domain.case import CaseRecord, CaseUpdate
+from app.domain.errors import CaseNotAnalyzed, CaseNotFound
+from app.repositories.case_repo import CaseRepository
+from app.repositories.detector_score_repo import DetectorScoreRepository
+from app.services import explainability, moderation, risk_scoring
+from app.services.signals import SignalEngine
+from app.services.signals.base import AnalysisContext
+from app.utils.cancellation import run_in_thread
+from app.utils.logging import logger
+from app.utils.timing import span
+
+
+@dataclass(frozen=True)
+class RescoreCase:
+    """
+    Re-scores an analyzed case from its stored detector breakdown.
+
+    Only detectors whose version or parameters changed since the case was
+    analyzed are re-run (against the cached extracted text); all others
+    are reused as stored, with the current weights applied when
+    re-aggregating. The LLM is never called: the explanation is rebuilt
+    from the stored `llm_analysis` or, for cases analyzed before it was
+    stored, from the LLM section of the stored explanation.
+
+    The result is written only if the case still holds the analysis it
+    was computed from; a case re-analysed or re-scored in the meantime
+    keeps that newer result.
+    """
+
+    repository: CaseRepository
+    engine: SignalEngine = field(default_factory=SignalEngine)
+    scores: DetectorScoreRepository | None = None
+
+    async def execute(self, case_id: str) -> CaseRecord:
+        case = await self.repository.get(case_id)
+        if not case:
+            raise CaseNotFound("Case not found")
+
+        signals = case.get("signals") or {}
+        breakdown = signals.get("detector_breakdown")
+        if case.get("status") != "analyzed" or not breakdown:
+            raise CaseNotAnalyzed("Case has not been analyzed yet")
+
+        with span("score"):
+            result, rerun = await run_in_thread(
+                self.engine.rescore,
+                breakdown,
+                # The case id keeps vendor baselines from comparing the case with itself
+                lambda: AnalysisContext(text=load_case_text(signals), metadata={"case_id": case_id}),
+            )
+        computed_signals = risk_scoring.summarize_signals(result)
+
+        llm_analysis = _stored_llm_analysis(case)
+        merged_signals = {**signals, **computed_signals}
+        merged_signals["rescored_at"] = datetime.now(timezone.utc).isoformat()
+        merged_signals["rescored_detectors"] = rerun
+        merged_signals["llm_analysis"] = llm_analysis
+
+        update_data: CaseUpdate = {
+            "risk_score": result.risk_score,
+            "signals": merged_signals,
+            "explanation": moderation.sanitize_output(
+                explainability.format_explanation(computed_signals, llm_analysis)
+            ),
+        }
+        updated = await self.repository.transition(
+            case_id,
+            update_data,
+            from_status=("analyzed",),
+            # Written only over the analysis (and rescore) it was computed from
+            where={
+                f"signals->>{key}": f"eq.{signals[key]}" if signals.get(key) else "is.null"
+                for key in ("analysis_completed_at", "rescored_at")
+            },
+        )
+        if updated is None:
+            # Re-analysed or re-scored meanwhile: that newer result stands
+            logger.info("rescore.superseded", case_id=case_id)
+            return await self.repository.get(case_id)
+        await save_detector_scores(self.scores, case_id, computed_signals["detector_breakdown"])
+        return updated
+
+
+def _stored_llm_analysis(case: CaseRecord) -> str:
+    signals = case.get("signals") or {}
+    if "llm_analysis" in signals:
+        return signals["llm_analysis"] or ""
+    # Analyzed before llm_analysis was stored: recover it from the explanation
+    insight = explainability.llm_insight_from(case.get("explanation") or "")
+    return insight.replace(moderation.DISCLAIMER.strip(), "").strip()
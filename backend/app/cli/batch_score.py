@@ -0,0 +1,368 @@
+"""
+Offline batch scorer for document archives.
+
+    python -m app.cli.batch_score ARCHIVE --output results.ndjson [--workers N] [--resume]
+
+Walks a directory, .zip or .tar(.gz) of PDFs, images, CSV and text
+files, extracts and scores each document in a process pool and streams
+one record per document to NDJSON or Parquet. No web server, Supabase
+or object storage is involved, so historical archives can be scored to
+back-test detector changes.
+
+Documents are submitted in chunks (--chunk-size documents per task) and
+at most two chunks per worker are in flight at a time, so neither the
+task queue nor pending results grow with the archive. The output doubles
+as the checkpoint: with --resume, documents already recorded in it are
+skipped and new records are appended.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tarfile
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from time import perf_counter
+from typing import Any
+
+from app.services.signals import SignalEngine
+from app.services.signals.base import AnalysisContext
+from app.services.text_extraction import IMAGE_SUFFIXES, extract_text_from_bytes
+
+SUFFIXES = frozenset({".pdf", ".csv", ".txt", *IMAGE_SUFFIXES})
+DEFAULT_CHUNK_SIZE = 32
+PROGRESS_INTERVAL = 5.0  # seconds between progress lines
+
+
+@dataclass(frozen=True)
+class Document:
+    """A document to score, and where its bytes come from."""
+
+    source: str  # path relative to the input root, or the archive member name
+    path: str | None = None  # file on disk, or the zip the member lives in
+    member: str | None = None  # zip member, read by the worker
+    data: bytes | None = None  # tar member, read by the parent (tar streams are not seekable)
+
+
+def iter_documents(root: Path) -> Iterator[Document]:
+    """Scorable documents under `root`, lazily and in a stable order."""
+    if root.is_dir():
+        for directory, subdirs, files in os.walk(root):
+            subdirs.sort()
+            for name in sorted(files):
+                path = Path(directory, name)
+                if path.suffix.lower() in SUFFIXES:
+                    yield Document(source=path.relative_to(root).as_posix(), path=str(path))
+    elif zipfile.is_zipfile(root):
+        with zipfile.ZipFile(root) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _scorable(info.filename):
+                    yield Document(source=info.filename, path=str(root), member=info.filename)
+    elif tarfile.is_tarfile(root):
+        with tarfile.open(root, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and _scorable(member.name):
+                    handle = archive.extractfile(member)
+                    if handle is not None:
+                        yield Document(source=member.name, data=handle.read())
+    elif root.suffix.lower() in SUFFIXES:
+        yield Document(source=root.name, path=str(root))
+
+
+def _scorable(name: str) -> bool:
+    return PurePosixPath(name).suffix.lower() in SUFFIXES
+
+
+# Per-process state, set up by _init_worker
+_engine: SignalEngine | None = None
+_zips: dict[str, zipfile.ZipFile] = {}
+
+
+def _init_worker() -> None:
+    global _engine
+    _engine = SignalEngine()
+
+
+def _read(document: Document) -> bytes:
+    if document.data is not None:
+        return document.data
+    if document.member is not None:
+        archive = _zips.get(document.path)
+        if archive is None:
+            archive = _zips[document.path] = zipfile.ZipFile(document.path)
+        return archive.read(document.member)
+    return Path(document.path).read_bytes()
+
+
+def score_document(document: Document, engine: SignalEngine) -> dict[str, Any]:
+    """One output record; failures are recorded in `error` rather than raised."""
+    started = perf_counter()
+    record: dict[str, Any] = {"source": document.source, "error": None}
+    try:
+        text = extract_text_from_bytes(_read(document), PurePosixPath(document.source).suffix)
+        if not text.strip():
+            record["error"] = "no text extracted"
+        else:
+            result = engine.analyze(AnalysisContext(text=text))
+            record.update(
+                risk_score=result.risk_score,
+                risk_level=result.risk_level,
+                confidence=result.confidence,
+                chars=len(text),
+                detectors={
+                    r.detector_name: {"score": r.score, "confidence": r.confidence, "version": r.version}
+                    for r in result.detector_results
+                },
+            )
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(perf_counter() - started, 4)
+    return record
+
+
+def score_chunk(chunk: list[Document]) -> list[dict[str, Any]]:
+    """Task body run in a worker process."""
+    if _engine is None:
+        _init_worker()
+    return [score_document(document, _engine) for document in chunk]
+
+
+class NdjsonSink:
+    """Appends one JSON line per record; flushed and fsynced after every chunk."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._handle = None
+
+    def completed(self) -> set[str]:
+        """Sources already recorded. A torn last line (from a crash) is truncated."""
+        if not self.path.exists():
+            return set()
+        sources = set()
+        good_end = 0
+        with self.path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    sources.add(json.loads(line)["source"])
+                except (ValueError, KeyError):
+                    break
+                good_end += len(line)
+        if good_end < self.path.stat().st_size:
+            with self.path.open("r+b") as handle:
+                handle.truncate(good_end)
+        return sources
+
+    def open(self, *, resume: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a" if resume else "w", encoding="utf-8")
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        self._handle.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+
+
+class ParquetSink:
+    """
+    One Parquet file per chunk in a directory (part-000001.parquet, ...).
+
+    Each part is written to a temporary name and renamed into place, so
+    a part either holds a whole chunk or does not exist. Detector
+    results are flattened into <detector>_score / <detector>_confidence
+    columns so every part has the same schema. Requires pyarrow.
+    """
+
+    def __init__(self, directory: Path, detectors: Iterable[str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+        self.pa, self.pq = pa, pq
+        self.directory = directory
+        self.detectors = list(detectors)
+        self.schema = pa.schema([
+            ("source", pa.string()),
+            ("error", pa.string()),
+            ("risk_score", pa.int32()),
+            ("risk_level", pa.string()),
+            ("confidence", pa.float64()),
+            ("chars", pa.int64()),
+            ("seconds", pa.float64()),
+            *((f"{d}_{f}", pa.float64()) for d in self.detectors for f in ("score", "confidence")),
+        ])
+        self._next_part = 0
+
+    def _parts(self) -> list[Path]:
+        return sorted(self.directory.glob("part-*.parquet"))
+
+    def completed(self) -> set[str]:
+        sources: set[str] = set()
+        for part in self._parts():
+            sources.update(self.pq.read_table(part, columns=["source"]).column("source").to_pylist())
+        return sources
+
+    def open(self, *, resume: bool) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        if not resume:
+            for part in parts:
+                part.unlink()
+            parts = []
+        self._next_part = max((int(p.stem.removeprefix("part-")) for p in parts), default=0) + 1
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        rows = []
+        for record in records:
+            detectors = record.get("detectors") or {}
+            row = {name: record.get(name) for name in ("source", "error", "risk_score", "risk_level", "confidence", "chars", "seconds")}
+            for d in self.detectors:
+                for f in ("score", "confidence"):
+                    row[f"{d}_{f}"] = (detectors.get(d) or {}).get(f)
+            rows.append(row)
+
+        part = self.directory / f"part-{self._next_part:06d}.parquet"
+        partial = part.with_suffix(".parquet.tmp")
+        self.pq.write_table(self.pa.Table.from_pylist(rows, schema=self.schema), partial)
+        os.replace(partial, part)
+        self._next_part += 1
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class BatchStats:
+    scored: int = 0
+    errors: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def summary(self) -> str:
+        rate = self.scored / self.elapsed if self.elapsed > 0 else 0.0
+        return (
+            f"{self.scored} scored ({self.errors} errors), {self.skipped} skipped, "
+            f"{self.elapsed:.1f}s, {rate:.1f} docs/s"
+        )
+
+
+def _chunks(documents: Iterable[Document], size: int) -> Iterator[list[Document]]:
+    iterator = iter(documents)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_batch(
+    documents: Iterable[Document],
+    sink: NdjsonSink | ParquetSink,
+    *,
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: bool = False,
+) -> BatchStats:
+    """
+    Scores `documents` into `sink`. With workers=0 everything runs in this
+    process (useful for debugging); otherwise chunks are fanned out over a
+    process pool with at most 2 x workers chunks in flight.
+    """
+    stats = BatchStats()
+    last_report = stats.started
+
+    def record(results: list[dict[str, Any]]) -> None:
+        nonlocal last_report
+        sink.write(results)
+        stats.scored += len(results)
+        stats.errors += sum(1 for r in results if r["error"])
+        if progress and perf_counter() - last_report >= PROGRESS_INTERVAL:
+            last_report = perf_counter()
+            print(stats.summary(), file=sys.stderr)
+
+    chunks = _chunks(documents, chunk_size)
+    if workers == 0:
+        for chunk in chunks:
+            record(score_chunk(chunk))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending: set[Future] = set()
+
+        def submit_next() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pending.add(pool.submit(score_chunk, chunk))
+            return True
+
+        while len(pending) < 2 * workers and submit_next():
+            pass
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(future.result())
+                submit_next()
+
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.batch_score", description="Score a document archive offline.")
+    parser.add_argument("input", type=Path, help="directory, .zip, .tar(.gz) or single document")
+    parser.add_argument("--output", type=Path, required=True, help="NDJSON file, or directory for Parquet parts")
+    parser.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (0 = run inline)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="documents per task")
+    parser.add_argument("--resume", action="store_true", help="skip documents already in the output")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines")
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        parser.error(f"{args.input} does not exist")
+    if args.chunk_size < 1 or args.workers < 0:
+        parser.error("--chunk-size must be >= 1 and --workers >= 0")
+
+    if args.format == "parquet":
+        sink = ParquetSink(args.output, [d.name for d in SignalEngine().detectors])
+    else:
+        sink = NdjsonSink(args.output)
+
+    done = sink.completed() if args.resume else set()
+    skipped = 0
+
+    def remaining() -> Iterator[Document]:
+        nonlocal skipped
+        for document in iter_documents(args.input):
+            if document.source in done:
+                skipped += 1
+                continue
+            yield document
+
+    sink.open(resume=args.resume)
+    try:
+        stats = run_batch(
+            remaining(), sink, workers=args.workers, chunk_size=args.chunk_size, progress=not args.quiet
+        )
+    finally:
+        sink.close()
+
+    stats.skipped = skipped
+    print(stats.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+"""
+In-memory stand-in for the Supabase PostgREST and auth endpoints.
+
+    python -m app.cli.fake_postgrest --port 54321 --latency-ms 20 --jitter-ms 10
+
+Start the API with SUPABASE_URL=http://127.0.0.1:54321 and any
+SUPABASE_ANON_KEY to run (and load-test) it without the hosted project.
+Only the subset of PostgREST the repositories use is implemented:
+
+- GET /rest/v1/<table> with column filters (eq, neq, gt, gte, lt, lte,
+  in, is, optionally negated with not.; also on column->>field),
+  select with one level of embedded rows (e.g.
+  case_detector_scores(detector,score)) and filters on them, order,
+  limit and offset, capped at --max-rows like db-max-rows
+- POST of a row or a list of rows, honouring Prefer return= and, with
+  on_conflict, resolution=merge-duplicates / ignore-duplicates
+- PATCH and DELETE with column filters
+- POST /rest/v1/rpc/<fn> answers 404 like an undeployed function, so
+  callers take their fallback path
+- GET /auth/v1/user returns the token's subject; signatures are not
+  checked, so any JWT with a sub claim authenticates (see mint_token)
+
+Rows are scoped to the token subject through owner_id, as the RLS
+policies do. Every request first waits for the configured latency
+(base plus uniform jitter) and a share of requests can be failed with
+503, to see how the API behaves against a slow or flaky database.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any
+
+from jose import jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+DEFAULT_PORT = 54321
+# Embeddable child table -> column it shares with the parent row
+EMBEDDED_KEYS = {"case_detector_scores": "case_id"}
+RESERVED_PARAMS = frozenset({"select", "order", "limit", "offset", "on_conflict", "columns"})
+
+
+def mint_token(subject: str, *, email: str | None = None) -> str:
+    """An HS256 token with the claims the API reads; the stand-in does not verify it."""
+    claims = {"sub": subject, "aud": "authenticated", "role": "authenticated", "email": email}
+    return jwt.encode(claims, "fake-postgrest", algorithm="HS256")
+
+
+@dataclass
+class LatencyProfile:
+    """Injected per-request delay and failure rate."""
+
+    base_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int | None = None
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def delay_seconds(self) -> float:
+        return (self.base_ms + self._random.uniform(0.0, self.jitter_ms)) / 1000.0
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+# Column defaults beyond id/created_at/owner_id, per table
+COLUMN_DEFAULTS: dict[str, dict[str, Any]] = {
+    "entity_resolution_matches": {"status": "pending"},
+}
+
+
+class FakeStore:
+    """Tables as lists of row dicts; `id`, `created_at` and COLUMN_DEFAULTS are filled in like column defaults."""
+
+    def __init__(self) -> None:
+        self.tables: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._ids = count(1)
+
+    def rows(self, table: str, owner: str) -> list[dict[str, Any]]:
+        return [row for row in self.tables[table] if row.get("owner_id") in (None, owner)]
+
+    def insert(self, table: str, row: dict[str, Any], owner: str) -> dict[str, Any]:
+        row = {
+            "id": next(self._ids),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **COLUMN_DEFAULTS.get(table, {}),
+            **row,
+            "owner_id": owner,
+        }
+        self.tables[table].append(row)
+        return row
+
+    def delete(self, table: str, rows: list[dict[str, Any]]) -> None:
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.tables[table] if id(row) not in doomed]
+
+
+class QueryError(ValueError):
+    pass
+
+
+def _split_top_level(value: str) -> list[str]:
+    """Splits on commas outside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in value:
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += (char == "(") - (char == ")")
+        current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_select(select: str) -> tuple[list[str], dict[str, list[str]]]:
+    """Columns and embedded resources: "a,b,child(c,d)" -> (["a", "b"], {"child": ["c", "d"]})."""
+    columns, embedded = [], {}
+    for item in _split_top_level(select or "*"):
+        if "(" in item:
+            name, _, inner = item.partition("(")
+            if name not in EMBEDDED_KEYS:
+                raise QueryError(f"Could not find a relationship for '{name}'")
+            embedded[name] = _split_top_level(inner.removesuffix(")"))
+        else:
+            columns.append(item)
+    return columns, embedded
+
+
+def _coerce(operand: str, like: Any) -> Any:
+    if isinstance(like, bool):
+        return operand == "true"
+    if isinstance(like, (int, float)):
+        return float(operand)
+    return operand
+
+
+def matches(value: Any, expression: str) -> bool:
+    """Evaluates one PostgREST filter expression ("eq.x", "in.(a,b)", "not.is.null", ...)."""
+    if expression.startswith("not."):
+        return not matches(value, expression[4:])
+    op, _, operand = expression.partition(".")
+    if op == "is":
+        return value is None if operand == "null" else value is _coerce(operand, True)
+    if value is None:
+        return False
+    if op == "in":
+        options = [o.strip().strip('"') for o in operand.strip("()").split(",")]
+        return any(value == _coerce(o, value) for o in options)
+    try:
+        operand_value = _coerce(operand, value)
+    except ValueError:
+        raise QueryError(f"Invalid operand for {op}: {operand}")
+    if op == "eq":
+        return value == operand_value
+    if op == "neq":
+        return value != operand_value
+    if op == "gt":
+        return value > operand_value
+    if op == "gte":
+        return value >= operand_value
+    if op == "lt":
+        return value < operand_value
+    if op == "lte":
+        return value <= operand_value
+    raise QueryError(f"Unsupported operator: {op}")
+
+
+def _project(row: dict[str, Any], columns: list[str]) -> dict[str, Any]:
+    if "*" in columns:
+        return dict(row)
+    return {column: row.get(column) for column in columns}
+
+
+def _order(rows: list[dict[str, Any]], order: str | None) -> list[dict[str, Any]]:
+    # Sort by the last key first so earlier keys take precedence (sorts are stable).
+    # Nulls sort last ascending and first descending, as in Postgres.
+    for term in reversed(_split_top_level(order or "")):
+        column, _, direction = term.partition(".")
+        rows = sorted(
+            rows,
+            key=lambda row: (row.get(column) is None, row.get(column) if row.get(column) is not None else 0),
+            reverse=direction.startswith("desc"),
+        )
+    return rows
+
+
+def _filters(params: dict[str, str]) -> tuple[dict[str, str], dict[str, dict[str, str]]]:
+    """Column filters on the table itself, and per embedded resource."""
+    own: dict[str, str] = {}
+    embedded: dict[str, dict[str, str]] = defaultdict(dict)
+    for key, expression in params.items():
+        if key in RESERVED_PARAMS:
+            continue
+        table, dot, column = key.partition(".")
+        if dot and table in EMBEDDED_KEYS:
+            embedded[table][column] = expression
+        else:
+            own[key] = expression
+    return own, embedded
+
+
+def _column(row: dict[str, Any], column: str) -> Any:
+    """A column, or a JSON field as text for "column->>field"."""
+    if "->>" not in column:
+        return row.get(column)
+    name, _, key = column.partition("->>")
+    value = (row.get(name) or {}).get(key)
+    return None if value is None else str(value)
+
+
+def _where(rows: list[dict[str, Any]], filters: dict[str, str]) -> list[dict[str, Any]]:
+    return [row for row in rows if all(matches(_column(row, c), e) for c, e in filters.items())]
+
+
+def _owner(request: Request) -> str:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise PermissionError("Missing bearer token")
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except Exception:
+        raise PermissionError("Malformed token")
+    if not subject:
+        raise PermissionError("Token missing subject")
+    return str(subject)
+
+
+def _error(status: int, message: str, code: str = "PGRST000") -> JSONResponse:
+    return JSONResponse({"code": code, "message": message, "details": None, "hint": None}, status_code=status)
+
+
+def create_app(
+    store: FakeStore | None = None,
+    latency: LatencyProfile | None = None,
+    *,
+    max_rows: int | None = None,
+) -> Starlette:
+    """`max_rows` caps the rows a GET returns, like PostgREST's db-max-rows."""
+    store = store if store is not None else FakeStore()
+    latency = latency or LatencyProfile()
+
+    async def handle(request: Request, handler) -> Response:
+        delay = latency.delay_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if latency.should_fail():
+            return _error(503, "Injected failure")
+        try:
+            return await handler(request, _owner(request))
+        except PermissionError as e:
+            return _error(401, str(e), "PGRST301")
+        except QueryError as e:
+            return _error(400, str(e), "PGRST100")
+
+    def representation(request: Request, rows: list[dict[str, Any]], status: int) -> Response:
+        if "return=representation" in request.headers.get("prefer", ""):
+            return JSONResponse(rows, status_code=status)
+        return Response(status_code=204 if status == 200 else status)
+
+    async def select(request: Request, owner: str) -> Response:
+        table = request.path_params["table"]
+        params = dict(request.query_params)
+        columns, embedded = parse_select(params.get("select", "*"))
+        own, embedded_filters = _filters(params)
+
+        rows = _order(_where(store.rows(table, owner), own), params.get("order"))
+        offset = int(params.get("offset", 0))
+        limit = int(params["limit"]) if "limit" in params else None
+        if max_rows is not None:
+            limit = max_rows if limit is None else min(limit, max_rows)
+        rows = rows[offset : None if limit is None else offset + limit]
+
+        result = []
+        for row in rows:
+            projected = _project(row, columns)
+            for child, child_columns in embedded.items():
+                key = EMBEDDED_KEYS[child]
+                children = [c for c in store.rows(child, owner) if c.get(key) == row.get(key)]
+                children = _where(children, embedded_filters.get(child, {}))
+                projected[child] = [_project(c, child_columns) for c in children]
+            result.append(projected)
+        return JSONResponse(result)
+
+    async def insert(request: Request, owner: str) -> Response:
+        table = request.path_params["table"]
+        body = json.loads(await request.body() or b"null")
+        rows = body if isinstance(body, list) else [body]
+        prefer = request.headers.get("prefer", "")
+        conflict_columns = [c for c in request.query_params.get("on_conflict", "").split(",") if c]
+
+        written = []
+        for row in rows:
+            if not isinstance(row, dict):
+                raise QueryError("Rows must be JSON objects")
+            existing = None
+            if conflict_columns:
+                existing = next(
+                    (
+                        r for r in store.rows(table, owner)
+                        # owner_id defaults to the caller, as its column default does
+                        if all(r.get(c) == {**row, "owner_id": owner}.get(c) for c in conflict_columns)
+                    ),
+                    None,
+                )
+            if existing is None:
+                written.append(store.insert(table, row, owner))
+            elif "resolution=merge-duplicates" in prefer:
+                existing.update(row)
+                written.append(existing)
+            elif "resolution=ignore-duplicates" not in prefer:
+                return _error(409, "duplicate key value violates unique constraint", "23505")
+        return representation(request, written, 201)
+
+    async def update(request: Request, owner: str) -> Response:
+        table = request.path_params["table"]
+        changes = json.loads(await request.body() or b"{}")
+        own, _ = _filters(dict(request.query_params))
+        rows = _where(store.rows(table, owner), own)
+        for row in rows:
+            row.update(changes)
+        return representation(request, rows, 200)
+
+    async def delete(request: Request, owner: str) -> Response:
+        table = request.path_params["table"]
+        own, _ = _filters(dict(request.query_params))
+        store.delete(table, _where(store.rows(table, owner), own))
+        return Response(status_code=204)
+
+    async def rpc(request: Request, owner: str) -> Response:
+        function = request.path_params["function"]
+        return _error(404, f"Could not find the function public.{function}", "PGRST202")
+
+    async def user(request: Request, owner: str) -> Response:
+        return JSONResponse({"id": owner, "role": "authenticated", "aud": "authenticated"})
+
+    def route(path: str, handler, methods: list[str]) -> Route:
+        async def endpoint(request: Request) -> Response:
+            return await handle(request, handler)
+
+        return Route(path, endpoint, methods=methods)
+
+    async def table_endpoint(request: Request, owner: str) -> Response:
+        handlers = {"GET": select, "POST": insert, "PATCH": update, "DELETE": delete}
+        return await handlers[request.method](request, owner)
+
+    app = Starlette(
+        routes=[
+            route("/rest/v1/rpc/{function}", rpc, ["POST"]),
+            route("/rest/v1/{table}", table_endpoint, ["GET", "POST", "PATCH", "DELETE"]),
+            route("/auth/v1/user", user, ["GET"]),
+        ]
+    )
+    app.state.store = store
+    app.state.latency = latency
+    return app
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli.fake_postgrest", description="Serve an in-memory PostgREST stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="base delay added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra uniform random delay, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with 503")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-rows", type=int, default=1000, help="rows returned per GET at most (db-max-rows)")
+    args = parser.parse_args(argv)
+
+    latency = LatencyProfile(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(create_app(latency=latency, max_rows=args.max_rows), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
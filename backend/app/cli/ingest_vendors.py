@@ -0,0 +1,74 @@
+"""
+Loads the vendor master, awards and payments into the vendor index snapshot.
+
+    python -m app.cli.ingest_vendors [--index PATH] [--vendors CSV] [--awards CSV] [--payments CSV]
+
+Vendors (data/vendors.csv) are registered first so bids that name a
+vendor resolve to the same profile as its awards (data/awards.csv) and
+payments (data/payments.csv). Rows are keyed by their IDs: running it
+again replaces rather than double-counts them. The result is merged
+into the snapshot (VENDOR_INDEX_PATH by default) like an API worker's
+on shutdown; workers pick it up when they next start.
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.vendor_index import VendorIndex
+from app.utils.logging import configure_logging, logger
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+
+def _rows(path: Path | None):
+    if path is None or not path.exists():
+        return []
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def ingest_files(
+    index: VendorIndex,
+    *,
+    vendors: Path | None = None,
+    awards: Path | None = None,
+    payments: Path | None = None,
+) -> dict[str, int]:
+    """Ingests the given CSV files; returns how many rows of each were recorded."""
+    counts = {"vendors": 0, "awards": 0, "payments": 0}
+    for row in _rows(vendors):
+        if row.get("vendor_id") and row.get("vendor_name"):
+            index.register_vendor(row["vendor_id"], row["vendor_name"])
+            counts["vendors"] += 1
+    # Awards before payments: a payment is attributed through its award
+    for row in _rows(awards):
+        counts["awards"] += index.ingest_award(row) is not None
+    for row in _rows(payments):
+        counts["payments"] += index.ingest_payment(row) is not None
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--index", type=Path, default=settings.vendor_index_path, help="snapshot file")
+    parser.add_argument("--vendors", type=Path, default=DATA_DIR / "vendors.csv")
+    parser.add_argument("--awards", type=Path, default=DATA_DIR / "awards.csv")
+    parser.add_argument("--payments", type=Path, default=DATA_DIR / "payments.csv")
+    args = parser.parse_args(argv)
+    configure_logging()
+    if not args.index:
+        parser.error("--index is required when VENDOR_INDEX_PATH is not set")
+
+    index = VendorIndex()
+    index.load(args.index)
+    counts = ingest_files(index, vendors=args.vendors, awards=args.awards, payments=args.payments)
+    index.save(args.index)
+    logger.info("vendor_index.ingested", path=str(args.index), profiles=len(index), **counts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
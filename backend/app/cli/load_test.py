@@ -0,0 +1,270 @@
+"""
+Open-loop load generator for the API.
+
+    python -m app.cli.load_test --base-url http://127.0.0.1:8000 --rps 50 --duration 60
+
+Requests are started on a fixed schedule, `rps` per second, whether or
+not earlier ones have finished, and each latency is measured from the
+request's scheduled start rather than from when it was sent. A closed
+loop (or timing from the actual send) slows down along with the server
+and hides queueing delay, so p99 under overload would look far better
+than what clients see. Requests that cannot start because
+--max-in-flight are already outstanding are counted as dropped.
+
+Scenarios, weighted with --mix (default upload=1,analyze=1,job=3,analytics=3):
+- upload: POST /cases/upload with a small generated CSV
+- analyze: POST /cases/{id}/analyze on a case uploaded earlier in the run
+- job: GET /cases/jobs/{id} for an analysis queued earlier in the run
+- analytics: GET /analytics/summary, /risk-distribution and /signals in turn
+
+To run against the local stand-in instead of the hosted project:
+
+    python -m app.cli.fake_postgrest --port 54321 --latency-ms 5 &
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_ANON_KEY=fake LLM_PROVIDER=fake \\
+        RATE_LIMIT_MAX_REQUESTS=0 uvicorn app.main:app --port 8000 &
+    python -m app.cli.load_test --rps 100 --duration 30
+
+Without --token a token for --subject is minted (app.cli.fake_postgrest.mint_token),
+which only the stand-in accepts.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+from itertools import count, cycle
+from typing import Any
+
+import httpx
+
+from app.cli.fake_postgrest import mint_token
+
+DEFAULT_MIX = {"upload": 1.0, "analyze": 1.0, "job": 3.0, "analytics": 3.0}
+ANALYTICS_PATHS = ("/analytics/summary", "/analytics/risk-distribution", "/analytics/signals")
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+@dataclass
+class LoadState:
+    """Ids produced by earlier requests, for the scenarios that need them."""
+
+    case_ids: deque[str] = field(default_factory=lambda: deque(maxlen=1000))
+    job_ids: deque[str] = field(default_factory=lambda: deque(maxlen=1000))
+    analytics_paths: Iterator[str] = field(default_factory=lambda: cycle(ANALYTICS_PATHS))
+    uploads: Iterator[int] = field(default_factory=count)
+
+
+Scenario = Callable[[httpx.AsyncClient, LoadState, random.Random], Awaitable[tuple[str, int]]]
+
+
+async def upload(client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> tuple[str, int]:
+    n = next(state.uploads)
+    rows = "\n".join(f"Vendor {rng.randint(1, 20)},{rng.randint(100, 99999)}" for _ in range(20))
+    files = {"file": (f"load-{n}.csv", f"vendor,amount\n{rows}\n", "text/csv")}
+    response = await client.post("/cases/upload", files=files)
+    if response.status_code == 200:
+        state.case_ids.append(response.json()["case"]["case_id"])
+    return "POST /cases/upload", response.status_code
+
+
+async def analyze(client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> tuple[str, int]:
+    if not state.case_ids:
+        return await upload(client, state, rng)
+    case_id = rng.choice(state.case_ids)
+    response = await client.post(f"/cases/{case_id}/analyze")
+    if response.status_code == 200:
+        job_id = (response.json()["case"].get("signals") or {}).get("analysis_job_id")
+        if job_id:
+            state.job_ids.append(job_id)
+    return "POST /cases/{id}/analyze", response.status_code
+
+
+async def job(client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> tuple[str, int]:
+    if not state.job_ids:
+        return await analyze(client, state, rng)
+    response = await client.get(f"/cases/jobs/{rng.choice(state.job_ids)}")
+    return "GET /cases/jobs/{id}", response.status_code
+
+
+async def analytics(client: httpx.AsyncClient, state: LoadState, rng: random.Random) -> tuple[str, int]:
+    path = next(state.analytics_paths)
+    response = await client.get(path)
+    return f"GET {path}", response.status_code
+
+
+SCENARIOS: dict[str, Scenario] = {"upload": upload, "analyze": analyze, "job": job, "analytics": analytics}
+
+
+@dataclass
+class LoadReport:
+    """Latencies per endpoint; errors are non-2xx responses and transport failures (status 0)."""
+
+    duration: float
+    target_rps: float
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    dropped: int = 0
+
+    def record(self, endpoint: str, status: int, seconds: float) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not 200 <= status < 300:
+            self.errors[endpoint] += 1
+
+    @property
+    def completed(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    def rows(self) -> list[dict[str, Any]]:
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        rows = []
+        for endpoint, values in [*sorted(self.latencies.items()), ("all", all_latencies)]:
+            values = sorted(values)
+            row = {
+                "endpoint": endpoint,
+                "requests": len(values),
+                "errors": sum(self.errors.values()) if endpoint == "all" else self.errors.get(endpoint, 0),
+            }
+            for p in PERCENTILES:
+                row[f"p{p}_ms"] = round(percentile(values, p) * 1000, 1)
+            row["max_ms"] = round(values[-1] * 1000, 1) if values else 0.0
+            rows.append(row)
+        return rows
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "duration_s": round(self.duration, 2),
+            "target_rps": self.target_rps,
+            "achieved_rps": round(self.completed / self.duration, 1) if self.duration else 0.0,
+            "dropped": self.dropped,
+            "endpoints": self.rows(),
+        }
+
+    def format(self) -> str:
+        summary = self.to_dict()
+        lines = [
+            f"{summary['duration_s']}s at {self.target_rps:g} rps target, "
+            f"{summary['achieved_rps']} rps completed, {self.dropped} dropped",
+            f"{'endpoint':<34}{'reqs':>7}{'errs':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)",
+        ]
+        for row in summary["endpoints"]:
+            lines.append(
+                f"{row['endpoint']:<34}{row['requests']:>7}{row['errors']:>6}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+            )
+        return "\n".join(lines)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name} (expected one of {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The scenario mix needs at least one positive weight")
+    return mix
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    *,
+    rps: float,
+    duration: float,
+    mix: Mapping[str, float] = DEFAULT_MIX,
+    max_in_flight: int = 1000,
+    seed: int | None = None,
+) -> LoadReport:
+    """Drives `client` on an open-loop schedule and returns the latency report."""
+    rng = random.Random(seed)
+    state = LoadState()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    loop = asyncio.get_running_loop()
+    in_flight: set[asyncio.Task] = set()
+    report = LoadReport(duration=duration, target_rps=rps)
+
+    async def one(scenario: Scenario, scheduled: float) -> None:
+        try:
+            endpoint, status = await scenario(client, state, rng)
+        except httpx.HTTPError as e:
+            endpoint, status = type(e).__name__, 0
+        report.record(endpoint, status, loop.time() - scheduled)
+
+    start = loop.time()
+    for i in count():
+        scheduled = start + i / rps
+        if scheduled >= start + duration:
+            break
+        if (delay := scheduled - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            report.dropped += 1
+            continue
+        scenario = SCENARIOS[rng.choices(names, weights)[0]]
+        task = asyncio.create_task(one(scenario, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    report.duration = loop.time() - start
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.load_test", description="Load-test the API at a target request rate.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=20.0, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load for")
+    parser.add_argument("--mix", default=",".join(f"{k}={v:g}" for k, v in DEFAULT_MIX.items()), help="scenario weights")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="outstanding requests before new ones are dropped")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--token", default=None, help="bearer token (default: one minted for --subject)")
+    parser.add_argument("--subject", default="load-test-user", help="user id for the minted token")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.rps <= 0 or args.duration <= 0 or args.max_in_flight < 1:
+        parser.error("--rps and --duration must be > 0 and --max-in-flight >= 1")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    async def run() -> LoadReport:
+        headers = {"Authorization": f"Bearer {args.token or mint_token(args.subject)}"}
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(
+            base_url=args.base_url, headers=headers, timeout=args.timeout, limits=limits
+        ) as client:
+            return await run_load(
+                client,
+                rps=args.rps,
+                duration=args.duration,
+                mix=mix,
+                max_in_flight=args.max_in_flight,
+                seed=args.seed,
+            )
+
+    report = asyncio.run(run())
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
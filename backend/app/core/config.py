@@ -19,6 +19,47 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("GEMINI_API_KEY", "API_KEY"),
     )
 
+    # LLM gateway: "gemini" (requires GEMINI_API_KEY) or "fake" (deterministic local provider)
+    llm_provider: str = "gemini"
+    llm_model: str = "gemini-2.5-flash"
+    llm_max_concurrency: int = 4
+    llm_max_attempts: int = 3
+    llm_cache_size: int = 1024
+    # Long documents are analyzed map-reduce style in overlapping chunks
+    llm_chunk_chars: int = 10000
+    llm_chunk_overlap: int = 500
+    llm_max_chunks: int = 8
+    # Triage: run the LLM only when heuristics warrant it; borderline cases are deferred
+    llm_triage_enabled: bool = True
+    llm_triage_run_min_score: int = 25
+    llm_triage_run_min_detectors: int = 2
+    llm_triage_defer_enabled: bool = True
+
+    # Analysis scheduler: running jobs overall and per owner, queued jobs before requests are
+    # rejected with 429 (overall and per owner), and owner weights for round-robin turns ({"<user id>": 3})
+    analysis_max_concurrency: int = 4
+    analysis_max_per_owner: int = 2
+    analysis_max_queue_depth: int = 1000
+    analysis_max_queued_per_owner: int = 500
+    analysis_owner_weights: dict[str, int] = {}
+
+    # A case still processing after this long is assumed to have lost its worker and may be re-queued
+    analysis_stale_seconds: float = 15 * 60
+    # A running analysis is stopped (and its job failed) after this long; 0 disables the deadline
+    analysis_deadline_seconds: float = 10 * 60
+
+    # Job progress streams (GET /cases/jobs/{job_id}/events): events buffered per client,
+    # seconds between keepalives, and finished jobs whose last state is kept for late subscribers
+    job_events_buffer: int = 64
+    job_events_keepalive_seconds: float = 15.0
+    job_events_retained_jobs: int = 1024
+
+    # Per-stage spans (stored on analysis jobs and exported as histograms)
+    timing_enabled: bool = True
+    # Shared directory for per-worker metric snapshots (multiple uvicorn workers)
+    metrics_dir: str | None = None
+    metrics_flush_seconds: float = 5.0
+
     supabase_url: str | None = None
     supabase_anon_key: str | None = None
     supabase_jwt_audience: str = "authenticated"
@@ -27,6 +68,36 @@ class Settings(BaseSettings):
     # We support both.
     supabase_jwt_algorithms: list[str] = ["RS256", "HS256"]
     supabase_jwt_secret: str | None = None
+    # PostgREST's db-max-rows (1000 on Supabase): the most rows one request returns, so the page size
+    postgrest_max_rows: int = 1000
+
+    max_upload_bytes: int = 500 * 1024 * 1024  # 500 MB
+
+    # Per-client request limit on the API routes (0 disables it, e.g. for load tests)
+    rate_limit_max_requests: int = 60
+    rate_limit_window_seconds: int = 60
+
+    # Upload storage: "local" (directory on this node) or "s3" (any S3-protocol service, e.g. MinIO)
+    storage_backend: str = "local"
+    storage_local_root: str = "data/uploads"
+    s3_endpoint_url: str | None = None
+    s3_bucket: str | None = None
+    s3_region: str = "us-east-1"
+    s3_access_key_id: str | None = None
+    s3_secret_access_key: str | None = None
+
+    # Amount parsing: amounts are normalized to currency_base. Unmarked amounts are assumed to be in
+    # currency_default (base when unset). Rates are a local JSON table {"INR": 0.012, ...} of base units
+    # per unit; the built-in approximate table is used when no path is set.
+    currency_base: str = "USD"
+    currency_default: str | None = None
+    currency_rates_path: str | None = None
+    # Decimal mark for ambiguous numbers such as "1.234": ".", "," or "auto" (detect per document)
+    amount_decimal_mark: str = "auto"
+
+    # Optional snapshot file for the cross-case vendor index (loaded on startup, merged into on shutdown;
+    # fill it with vendors, awards and payments via `python -m app.cli.ingest_vendors`)
+    vendor_index_path: str | None = None
 
     @property
     def sqlalchemy_database_url(self) -> str:
@@ -0,0 +1,320 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are plain in-memory series guarded by a
+per-metric lock (held only for a few arithmetic operations). Histograms
+keep bucket counts in the shape Prometheus expects.
+
+Multiple uvicorn workers: when METRICS_DIR is set, each worker
+periodically writes a snapshot of its own series to
+``{METRICS_DIR}/worker-{pid}-{boot_id}.json`` (atomic rename, one file
+per process, so workers never contend; the random boot id keeps a new
+process that reuses an exited worker's PID from overwriting its file). A scrape merges all snapshot files
+by summing series, with the serving worker's live values replacing its
+own file. Files of workers that have exited keep contributing their
+counters and histograms (totals must not go backwards) but not their
+gauges: a dead worker has nothing in flight. Clear the directory on
+deploy, as with any multiprocess exporter.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from uuid import uuid4
+
+from app.core.config import settings
+
+# Seconds; covers fast detectors up to slow OCR/LLM stages
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REGISTRY: dict[str, "Metric"] = {}
+
+
+class Metric:
+    type: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        REGISTRY[name] = self
+
+    def _width(self) -> int:
+        return 1
+
+    def _get(self, labelvalues: tuple[str, ...]) -> list[float]:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0.0] * self._width()
+        return series
+
+    def samples(self) -> dict[tuple[str, ...], list[float]]:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._get(labelvalues)[0] += amount
+
+
+class Gauge(Metric):
+    """Summed across workers when merged (suited to in-flight counts and queue depths)."""
+
+    type = "gauge"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._get(labelvalues)[0] += amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._get(labelvalues)[0] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+
+    def _width(self) -> int:
+        # Per-bucket (non-cumulative) counts, then sum and count
+        return len(self.buckets) + 2
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._get(labelvalues)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+
+Snapshot = dict[str, dict[str, Any]]
+
+
+def snapshot() -> Snapshot:
+    """This process's series in a JSON-serializable form."""
+    return {
+        name: {"series": [[list(labels), values] for labels, values in metric.samples().items()]}
+        for name, metric in REGISTRY.items()
+    }
+
+
+_boot_ids: dict[int, str] = {}
+
+
+def _boot_id() -> str:
+    """Random token for this process (a forked child draws its own)."""
+    pid = os.getpid()
+    if pid not in _boot_ids:
+        _boot_ids[pid] = uuid4().hex[:12]
+    return _boot_ids[pid]
+
+
+def _worker_file(directory: Path) -> Path:
+    return directory / f"worker-{os.getpid()}-{_boot_id()}.json"
+
+
+def _worker_alive(path: Path) -> bool:
+    """Whether the worker that wrote `path` is still running (assumed so when unknown)."""
+    try:
+        pid = int(path.stem.removeprefix("worker-").split("-")[0])
+    except ValueError:
+        return True
+    if pid == os.getpid():
+        # An earlier process that had this PID; this one writes only its own file
+        return path == _worker_file(path.parent)
+    if os.name == "nt":
+        # Signal 0 is CTRL_C_EVENT on Windows, not a probe
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory: str | Path | None = None) -> None:
+    """Atomically writes this worker's snapshot file (no-op without METRICS_DIR)."""
+    directory = directory or settings.metrics_dir
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path, prefix=".worker-", suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(snapshot(), handle)
+    os.replace(tmp_name, _worker_file(path))
+
+
+def collect(directory: str | Path | None = None) -> Snapshot:
+    """Merged snapshot of every worker, summing series with equal labels."""
+    directory = directory or settings.metrics_dir
+    snapshots = [snapshot()]
+    if directory:
+        own = _worker_file(Path(directory))
+        for path in sorted(Path(directory).glob("worker-*.json")):
+            if path == own:
+                continue
+            try:
+                snap = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # Worker mid-restart or file from an older layout; skip it
+                continue
+            if not _worker_alive(path):
+                snap = {name: data for name, data in snap.items() if not isinstance(REGISTRY.get(name), Gauge)}
+            snapshots.append(snap)
+
+    merged: Snapshot = {}
+    for snap in snapshots:
+        for name, data in snap.items():
+            series = merged.setdefault(name, {"series": {}})["series"]
+            for labels, values in data["series"]:
+                key = tuple(labels)
+                current = series.get(key)
+                if current is None or len(current) != len(values):
+                    series[key] = list(values)
+                else:
+                    series[key] = [a + b for a, b in zip(current, values)]
+    return merged
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(directory: str | Path | None = None) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    merged = collect(directory)
+    lines: list[str] = []
+    for name, metric in REGISTRY.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        for labels, values in sorted(merged.get(name, {"series": {}})["series"].items()):
+            if isinstance(metric, Histogram):
+                cumulative = 0.0
+                for bound, count in zip(metric.buckets, values):
+                    cumulative += count
+                    le = _format_labels(metric.labelnames, labels, f'le="{_format_bound(bound)}"')
+                    lines.append(f"{name}_bucket{le} {_format_value(cumulative)}")
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(values[-2])}")
+                lines.append(f"{name}_count{label_text} {_format_value(values[-1])}")
+            else:
+                lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {_format_value(values[0])}")
+    return "\n".join(lines) + "\n"
+
+
+stage_duration_seconds = Histogram(
+    "fraudex_stage_duration_seconds",
+    "Time spent in each analysis pipeline stage.",
+    ("stage",),
+)
+analysis_queue_wait_seconds = Histogram(
+    "fraudex_analysis_queue_wait_seconds",
+    "Time between an analysis job being queued and starting.",
+)
+analysis_run_seconds = Histogram(
+    "fraudex_analysis_run_seconds",
+    "Wall time of an analysis job from start to completion or failure.",
+    ("status",),
+)
+analysis_jobs_total = Counter(
+    "fraudex_analysis_jobs_total",
+    "Analysis job transitions by status.",
+    ("status",),
+)
+analysis_jobs_in_flight = Gauge(
+    "fraudex_analysis_jobs_in_flight",
+    "Analysis jobs queued or running in this deployment.",
+)
+deferred_llm_queue_depth = Gauge(
+    "fraudex_deferred_llm_queue_depth",
+    "Deferred LLM analyses waiting in the low-priority queue.",
+)
+detector_runs_total = Counter(
+    "fraudex_detector_runs_total",
+    "Detector executions.",
+    ("detector",),
+)
+detector_triggers_total = Counter(
+    "fraudex_detector_triggers_total",
+    "Detector executions with a non-zero score.",
+    ("detector",),
+)
+postgrest_request_seconds = Histogram(
+    "fraudex_postgrest_request_seconds",
+    "PostgREST request latency.",
+    ("method", "status"),
+)
+jwks_cache_total = Counter(
+    "fraudex_jwks_cache_total",
+    "JWKS cache lookups by result (hit/miss).",
+    ("result",),
+)
+llm_cache_total = Counter(
+    "fraudex_llm_cache_total",
+    "LLM gateway cache lookups by result (hit/miss).",
+    ("result",),
+)
+rate_limit_rejections_total = Counter(
+    "fraudex_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+)
+job_event_subscribers = Gauge(
+    "fraudex_job_event_subscribers",
+    "Open analysis job event streams.",
+)
+job_events_dropped_total = Counter(
+    "fraudex_job_events_dropped_total",
+    "Job events dropped because a subscriber's buffer was full.",
+)
+analysis_queued_jobs = Gauge(
+    "fraudex_analysis_queued_jobs",
+    "Analysis jobs waiting in the scheduler by priority class.",
+    ("priority",),
+)
+analysis_rejected_total = Counter(
+    "fraudex_analysis_rejected_total",
+    "Analysis requests rejected by scheduler backpressure.",
+    ("reason",),
+)
@@ -12,6 +12,9 @@ from typing import Deque, Dict
 
 from fastapi import HTTPException, Request, status
 
+from app.core.config import settings
+from app.core.metrics import rate_limit_rejections_total
+
 
 class RateLimiter:
 	def __init__(self, *, max_requests: int, window_seconds: int) -> None:
@@ -27,6 +30,7 @@ class RateLimiter:
 			while queue and now - queue[0] > self.window_seconds:
 				queue.popleft()
 			if len(queue) >= self.max_requests:
+				rate_limit_rejections_total.inc()
 				raise HTTPException(
 					status_code=status.HTTP_429_TOO_MANY_REQUESTS,
 					detail="Rate limit exceeded",
@@ -34,9 +38,14 @@ class RateLimiter:
 			queue.append(now)
 
 
-_DEFAULT_LIMITER = RateLimiter(max_requests=60, window_seconds=60)
+_DEFAULT_LIMITER = RateLimiter(
+	max_requests=settings.rate_limit_max_requests,
+	window_seconds=settings.rate_limit_window_seconds,
+)
 
 
 async def rate_limit(request: Request) -> None:
+	if settings.rate_limit_max_requests <= 0:
+		return
 	client = request.client.host if request.client else "unknown"
 	_DEFAULT_LIMITER.check(client)
@@ -9,6 +9,7 @@ from fastapi import Header, HTTPException, status
 from jose import jwt, jwk
 
 from app.core.config import settings
+from app.core.metrics import jwks_cache_total
 
 
 @dataclass(frozen=True)
@@ -72,7 +73,9 @@ async def _get_jwks() -> dict[str, Any]:
     cached_jwks = _JWKS_CACHE.get("jwks")
     cached_at = _JWKS_CACHE.get("fetched_at", 0.0)
     if cached_jwks is not None and now - cached_at < _JWKS_TTL_SECONDS:
+        jwks_cache_total.inc("hit")
         return cached_jwks
+    jwks_cache_total.inc("miss")
 
     async with httpx.AsyncClient(timeout=10.0) as client:
         response = await client.get(jwks_url)
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import Any, TypedDict
 
 
 class AnalysisJobRecord(TypedDict, total=False):
     job_id: str
     case_id: str
     status: str
+    priority: str
     error: str | None
     queued_at: str | None
     started_at: str | None
     completed_at: str | None
+    timings: dict[str, Any] | None
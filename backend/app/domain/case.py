@@ -7,7 +7,10 @@ CaseStatus = Literal["uploaded", "processing", "analyzed", "failed"]
 
 class CaseSignals(TypedDict, total=False):
     original_file: str
+    storage_backend: str
     filename: str
+    sha256: str
+    size_bytes: int
     extracted_text_preview: str
     # Additional computed signals are stored dynamically.
 
@@ -32,3 +35,25 @@ class CaseUpdate(TypedDict, total=False):
     risk_score: int
     explanation: str
     signals: CaseSignals | dict[str, Any]
+
+
+class DetectorScoreRecord(TypedDict, total=False):
+    """One row of case_detector_scores: a detector's result without its indicators."""
+
+    case_id: str
+    detector: str
+    score: float
+    weight: float
+    confidence: float
+    version: str | None
+    updated_at: str
+
+
+class CaseScoreRecord(TypedDict, total=False):
+    """A case as read for analytics: no signals blob, just its detector scores."""
+
+    case_id: str
+    status: CaseStatus
+    risk_score: int | None
+    created_at: str
+    case_detector_scores: list[DetectorScoreRecord]
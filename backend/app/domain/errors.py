@@ -18,3 +18,31 @@ class CaseExtractionFailed(DomainError):
 
 class AnalysisJobNotFound(DomainError):
     """Raised when an analysis job cannot be found."""
+
+
+class UploadTooLarge(DomainError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class CaseNotAnalyzed(DomainError):
+    """Raised when an operation needs a case's stored analysis and there is none."""
+
+
+class InvalidExportRequest(DomainError):
+    """Raised when an export asks for an unknown format, detector or field."""
+
+
+class AnalysisQueueFull(DomainError):
+    """Raised when the analysis scheduler is at its queue depth limit."""
+
+
+class AnalysisCancelled(DomainError):
+    """Raised inside an analysis whose job was cancelled."""
+
+
+class AnalysisDeadlineExceeded(DomainError):
+    """Raised inside an analysis that ran past its deadline."""
+
+
+class AnalysisJobFinished(DomainError):
+    """Raised when cancelling an analysis job that has already finished."""
@@ -1,18 +1,68 @@
+import asyncio
+import contextlib
 import time
 import uuid
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.router import api_router
+from app.core import metrics
 from app.core.config import settings
+from app.services.llm_gateway import get_llm_gateway
+from app.services.signals import patterns
+from app.services.vendor_index import vendor_index
 from app.utils.logging import configure_logging, logger
 
+# Allowance for multipart boundaries and part headers around the file
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+async def _flush_metrics_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_flush_seconds)
+        try:
+            metrics.write_snapshot()
+        except OSError:
+            logger.exception("metrics.flush_failed")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    logger.info("patterns.warmed", compiled=patterns.warmup())
+    if settings.vendor_index_path:
+        vendor_index.load(settings.vendor_index_path)
+        logger.info("vendor_index.loaded", vendors=len(vendor_index))
+    flusher = asyncio.create_task(_flush_metrics_periodically()) if settings.metrics_dir else None
+    yield
+    if flusher is not None:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        metrics.write_snapshot()
+    gateway = get_llm_gateway()
+    if gateway is not None:
+        await gateway.aclose()
+    if settings.vendor_index_path:
+        vendor_index.save(settings.vendor_index_path)
+
 
 def create_app() -> FastAPI:
     configure_logging()
-    application = FastAPI(title="FraudEx Backend")
+    application = FastAPI(title="FraudEx Backend", lifespan=lifespan)
+
+    @application.middleware("http")
+    async def reject_oversized_uploads(request: Request, call_next):
+        # Refuse before the multipart body is spooled; save_upload enforces
+        # the exact limit for chunked requests without a Content-Length.
+        if request.method == "POST" and request.url.path.endswith("/upload"):
+            content_length = request.headers.get("content-length")
+            limit = settings.max_upload_bytes + _MULTIPART_OVERHEAD_BYTES
+            if content_length and content_length.isdigit() and int(content_length) > limit:
+                return JSONResponse(status_code=413, content={"detail": "Upload exceeds the size limit"})
+        return await call_next(request)
 
     @application.middleware("http")
     async def add_request_id_and_log(request: Request, call_next):
@@ -67,7 +117,7 @@ def create_app() -> FastAPI:
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail},
-            headers={"X-Request-ID": request_id},
+            headers={**(exc.headers or {}), "X-Request-ID": request_id},
         )
 
     allowed_origins = [
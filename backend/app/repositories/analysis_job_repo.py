@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import Any, cast
 
 from app.domain.analysis_job import AnalysisJobRecord
@@ -31,6 +32,19 @@ class AnalysisJobRepository:
             return cast(AnalysisJobRecord, updated)
         return obj_in
 
+    async def transition(
+        self, job_id: str, obj_in: AnalysisJobRecord, *, from_status: Iterable[str]
+    ) -> AnalysisJobRecord | None:
+        """Compare-and-set: applies `obj_in` only if the job's status is one of `from_status`; None otherwise."""
+        updated = await self.client.patch(
+            self.table,
+            params={"job_id": f"eq.{job_id}", "status": f"in.({','.join(from_status)})"},
+            json=obj_in,
+        )
+        if isinstance(updated, list) and updated:
+            return cast(AnalysisJobRecord, updated[0])
+        return None
+
     async def get(self, job_id: str) -> AnalysisJobRecord | None:
         rows = await self.client.get(
             self.table,
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+from app.services.supabase_postgrest import SupabasePostgrest
+
+
+class AnalyticsRepository:
+    """Aggregates computed in Postgres by the analytics_summary SQL function."""
+
+    def __init__(self, client: SupabasePostgrest):
+        self.client = client
+        self.function = "analytics_summary"
+
+    async def summary(self, now: datetime) -> dict[str, Any] | None:
+        """The aggregates as of `now`, or None if the function is not deployed."""
+        try:
+            return await self.client.rpc(self.function, {"p_now": now.isoformat()})
+        except httpx.HTTPStatusError as e:
+            # PostgREST answers 404 (PGRST202) for an unknown function
+            if e.response.status_code == 404:
+                return None
+            raise
@@ -1,9 +1,13 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
 from typing import Any
 from uuid import uuid4
 
+from app.core.config import settings
 from app.repositories.base import BaseRepository
 from app.services.supabase_postgrest import SupabasePostgrest
-from app.domain.case import CaseCreate, CaseRecord, CaseUpdate
+from app.domain.case import CaseCreate, CaseRecord, CaseScoreRecord, CaseUpdate
 
 class CaseRepository(BaseRepository[CaseRecord]):
     def __init__(self, client: SupabasePostgrest):
@@ -28,6 +32,52 @@ class CaseRepository(BaseRepository[CaseRecord]):
         rows = await self.client.get(self.table, params=params)
         return rows or []
 
+    async def list_scores(self) -> list[CaseScoreRecord]:
+        """
+        Cases with their narrow detector score rows, newest first; the
+        signals blob is not read. Paged, so no case is lost to the
+        PostgREST row cap.
+        """
+        rows = [
+            row
+            async for page in self.iter_pages(
+                select="id,case_id,status,risk_score,created_at,"
+                "case_detector_scores(detector,score,weight,confidence,version)",
+            )
+            for row in page
+        ]
+        rows.sort(key=lambda row: row.get("created_at") or "", reverse=True)
+        return rows
+
+    async def iter_pages(
+        self,
+        *,
+        select: str,
+        page_size: int | None = None,
+        filters: dict[str, str] | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Yields all matching rows a page at a time, in id order.
+
+        Keyset pagination (`id > last id seen`) rather than offsets, so
+        every page is an index range scan no matter how deep the export
+        is. `select` must include id. Pages are capped at
+        settings.postgrest_max_rows, since a short page ends the scan.
+        """
+        page_size = min(page_size or settings.postgrest_max_rows, settings.postgrest_max_rows)
+        last_id: int | None = None
+        while True:
+            params = {"select": select, "order": "id.asc", "limit": str(page_size), **(filters or {})}
+            if last_id is not None:
+                params["id"] = f"gt.{last_id}"
+            rows = await self.client.get(self.table, params=params) or []
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
     async def create(self, obj_in: CaseCreate) -> CaseRecord:
         if "case_id" not in obj_in:
             obj_in["case_id"] = str(uuid4())
@@ -48,6 +98,28 @@ class CaseRepository(BaseRepository[CaseRecord]):
             return updated[0]
         return {}
 
+    async def transition(
+        self,
+        id: str,
+        obj_in: CaseUpdate,
+        *,
+        from_status: Iterable[str],
+        where: dict[str, str] | None = None,
+    ) -> CaseRecord | None:
+        """
+        Compare-and-set: applies `obj_in` only if the case's status is one of
+        `from_status` (and the extra `where` filters match).
+
+        The check and the write are a single conditional UPDATE, so of two
+        concurrent transitions from the same state exactly one succeeds.
+        Returns the updated case, or None if it was not in the expected state.
+        """
+        params = {"case_id": f"eq.{id}", "status": f"in.({','.join(from_status)})", **(where or {})}
+        updated = await self.client.patch(self.table, params=params, json=obj_in)
+        if isinstance(updated, list) and updated:
+            return updated[0]
+        return None
+
     async def delete(self, id: str) -> bool:
         # Note: Delete not implemented in SupabasePostgrest wrapper yet needs extension
         return False
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from app.domain.case import DetectorScoreRecord
+from app.services.supabase_postgrest import SupabasePostgrest
+
+
+def detector_score_rows(case_id: str, breakdown: Mapping[str, Any]) -> list[DetectorScoreRecord]:
+    """Narrow rows for a stored `detector_breakdown` (indicators are left out)."""
+    updated_at = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "case_id": case_id,
+            "detector": detector,
+            "score": float(entry.get("score") or 0.0),
+            "weight": float(entry.get("weight", 1.0)),
+            "confidence": float(entry.get("confidence", 1.0)),
+            "version": entry.get("version"),
+            "updated_at": updated_at,
+        }
+        for detector, entry in breakdown.items()
+        if isinstance(entry, Mapping)
+    ]
+
+
+def breakdown_from_rows(rows: list[DetectorScoreRecord]) -> dict[str, dict[str, Any]]:
+    """A `detector_breakdown`-shaped dict (without indicators) from narrow rows."""
+    return {
+        row["detector"]: {
+            "score": row.get("score", 0.0),
+            "weight": row.get("weight", 1.0),
+            "confidence": row.get("confidence", 1.0),
+            "version": row.get("version"),
+        }
+        for row in rows
+    }
+
+
+class DetectorScoreRepository:
+    """Per-case, per-detector scores kept beside the verbose cases.signals blob."""
+
+    def __init__(self, client: SupabasePostgrest):
+        self.client = client
+        self.table = "/case_detector_scores"
+        self.function = "replace_case_detector_scores"
+
+    async def upsert_breakdown(self, case_id: str, breakdown: Mapping[str, Any]) -> int:
+        """
+        Makes the case's rows match `breakdown`: upserts its detectors and
+        deletes the case's rows for any other detector, in one transaction
+        (replace_case_detector_scores). Until that function is deployed,
+        an upsert followed by a delete.
+        """
+        rows = detector_score_rows(case_id, breakdown)
+        try:
+            await self.client.rpc(self.function, {"p_case_id": case_id, "p_rows": rows})
+            return len(rows)
+        except httpx.HTTPStatusError as e:
+            # PostgREST answers 404 (PGRST202) for an unknown function
+            if e.response.status_code != 404:
+                raise
+
+        if rows:
+            await self.client.post(
+                self.table,
+                params={"on_conflict": "case_id,detector"},
+                json=rows,
+                prefer="resolution=merge-duplicates,return=minimal",
+            )
+        params = {"case_id": f"eq.{case_id}"}
+        if rows:
+            params["detector"] = f"not.in.({','.join(row['detector'] for row in rows)})"
+        await self.client.delete(self.table, params=params)
+        return len(rows)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.schemas.entities import EntityResolutionMatch
+from app.services.supabase_postgrest import SupabasePostgrest
+
+
+class EntityMatchRepository:
+    def __init__(self, client: SupabasePostgrest, *, batch_size: int = 1000):
+        self.client = client
+        self.table = "/entity_resolution_matches"
+        self.batch_size = batch_size
+
+    async def upsert_many(self, matches: list[EntityResolutionMatch]) -> int:
+        """
+        Persist match candidates in batches, keeping existing review decisions.
+
+        Pairs are unique per owner (owner_id defaults to the caller), and
+        the resolver orders each pair by vendor ID, so a pair found again
+        lands on the same row: its score and reasons are refreshed, while
+        status, resolved_by and resolved_at are not sent and so keep any
+        review already recorded (new rows start as pending).
+        """
+        rows = [
+            match.model_dump(include={"entity_a_id", "entity_b_id", "match_score", "match_reasons"})
+            for match in matches
+        ]
+        for start in range(0, len(rows), self.batch_size):
+            await self.client.post(
+                self.table,
+                params={"on_conflict": "owner_id,entity_a_id,entity_b_id"},
+                json=rows[start:start + self.batch_size],
+                prefer="resolution=merge-duplicates,return=minimal",
+            )
+        return len(rows)
+
+    async def list(self, status: str | None = None) -> list[dict[str, Any]]:
+        params = {"select": "*", "order": "match_score.desc"}
+        if status:
+            params["status"] = f"eq.{status}"
+        rows = await self.client.get(self.table, params=params)
+        return rows or []
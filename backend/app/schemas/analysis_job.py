@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import BaseModel
 
@@ -6,8 +6,12 @@ from pydantic import BaseModel
 class AnalysisJobResult(BaseModel):
     job_id: str
     case_id: str
-    status: Literal["queued", "running", "completed", "failed"]
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    priority: Literal["interactive", "rescore", "bulk"] | None = None
     error: str | None = None
     queued_at: str | None = None
     started_at: str | None = None
     completed_at: str | None = None
+    timings: dict[str, Any] | None = None
+    # Estimated place in the scheduler queue while queued in the serving process
+    queue_position: int | None = None
@@ -101,6 +101,36 @@ class AnalyticsSummary(BaseModel):
     period_end: str | None = None
 
 
+class WeightSimulationRequest(BaseModel):
+    """Detector weights to try against the stored case history."""
+
+    weights: dict[str, float] = Field(default_factory=dict)  # detector name -> weight
+    limit: int = Field(default=50, ge=0, le=1000)  # changed cases to list
+
+
+class SimulatedCase(BaseModel):
+    """A case whose risk level changes under the simulated weights."""
+
+    case_id: str
+    risk_score: int
+    simulated_score: int
+    risk_level: str
+    simulated_level: str
+
+
+class WeightSimulationResult(BaseModel):
+    """Effect of a weight vector on all analyzed cases."""
+
+    cases_scored: int = 0
+    detectors: list[str] = Field(default_factory=list)
+    avg_risk_score: float = 0.0
+    simulated_avg_risk_score: float = 0.0
+    risk_distribution: RiskDistribution = Field(default_factory=RiskDistribution)
+    simulated_risk_distribution: RiskDistribution = Field(default_factory=RiskDistribution)
+    level_changes: int = 0
+    changed_cases: list[SimulatedCase] = Field(default_factory=list)
+
+
 class AlertRule(BaseModel):
     """Configuration for an alert rule."""
 
@@ -18,3 +18,13 @@ class CaseResult(BaseModel):
 
 class CaseResponse(BaseModel):
     case: CaseResult
+    # Estimated place in the analysis queue, when the request queued a job
+    queue_position: int | None = None
+
+
+class RescoreBacklogResponse(BaseModel):
+    rescored: int
+    # case_id -> why it could not be rescored
+    failed: dict[str, str] = {}
+    # Pass as `after` to continue with the next batch; None once the backlog is done
+    next_after: int | None = None
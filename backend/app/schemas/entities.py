@@ -69,6 +69,13 @@ class EntityResolutionMatch(BaseModel):
     resolved_at: str | None = None
 
 
+class VendorResolutionRun(BaseModel):
+    """Outcome of resolving the vendor master into match candidates."""
+
+    vendors: int
+    matches: int
+
+
 class GraphCluster(BaseModel):
     """
     Represents a cluster of related entities.
@@ -0,0 +1,329 @@
+"""
+Priority and fair-share scheduler for analysis work.
+
+Work is queued per priority class and, within a class, per owner:
+
+- Classes are served in strict order: interactive, rescore, bulk. A
+  bulk backlog never delays a user waiting on a single analysis.
+- Within a class owners take turns (weighted round-robin): on its turn
+  an owner starts up to its weight in jobs (1 unless overridden in
+  ANALYSIS_OWNER_WEIGHTS), so one owner's 10,000 documents interleave
+  with everyone else's work instead of going first.
+- At most ANALYSIS_MAX_CONCURRENCY jobs run at once and at most
+  ANALYSIS_MAX_PER_OWNER per owner; an owner at its cap is skipped
+  until one of its jobs finishes.
+
+Backpressure: `reserve` takes a queue slot before any state changes
+(e.g. before a case is marked processing) and raises AnalysisQueueFull
+once ANALYSIS_MAX_QUEUE_DEPTH jobs are waiting, or
+ANALYSIS_MAX_QUEUED_PER_OWNER for that owner; the API answers 429.
+Queued jobs report an estimated position. A job submitted under the
+key of one still queued (e.g. a double-clicked rescore) joins it
+instead of queueing twice.
+
+Cancellation: `cancel` drops a queued job, or cancels a running job's
+CancelToken and frees its slot at once; the job itself stops at its
+next checkpoint, briefly running alongside the work that took its slot.
+
+Like the tasks it replaces, the scheduler lives in the API process:
+queued work is lost if the process exits, and the affected cases are
+re-queued once stale (see ANALYSIS_STALE_SECONDS).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from app.core.config import settings
+from app.core.metrics import analysis_queued_jobs, analysis_rejected_total
+from app.domain.errors import AnalysisQueueFull
+from app.utils.cancellation import CancelToken
+from app.utils.logging import logger
+
+Priority = Literal["interactive", "rescore", "bulk"]
+PRIORITIES: tuple[Priority, ...] = ("interactive", "rescore", "bulk")
+ANONYMOUS_OWNER = "anonymous"
+
+
+@dataclass(eq=False)
+class _Entry:
+    key: str
+    owner: str
+    priority: Priority
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future = field(repr=False)
+    token: CancelToken | None = None
+    finished: bool = False
+
+
+class Reservation:
+    """A queue slot held between admission and submission; released unless submitted."""
+
+    def __init__(self, scheduler: AnalysisScheduler, owner: str, priority: Priority):
+        self.scheduler = scheduler
+        self.owner = owner
+        self.priority = priority
+        self._held = True
+
+    def submit(
+        self, key: str, run: Callable[[], Awaitable[Any]], token: CancelToken | None = None
+    ) -> asyncio.Future:
+        """
+        Queues `run` in the reserved slot; the future resolves to its result.
+        `token` is cancelled if the job is cancelled while running. If a job
+        with `key` is already queued, the slot is released and its future
+        returned instead.
+        """
+        if not self._held:
+            raise RuntimeError("Reservation already used")
+        self._held = False
+        return self.scheduler._enqueue(key, self.owner, self.priority, run, token)
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self.scheduler._unreserve(self.owner)
+
+    def __enter__(self) -> Reservation:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class AnalysisScheduler:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        max_per_owner: int | None = None,
+        max_queue_depth: int | None = None,
+        max_queued_per_owner: int | None = None,
+        owner_weights: Mapping[str, int] | None = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.analysis_max_concurrency
+        self.max_per_owner = max_per_owner or settings.analysis_max_per_owner
+        self.max_queue_depth = max_queue_depth or settings.analysis_max_queue_depth
+        self.max_queued_per_owner = max_queued_per_owner or settings.analysis_max_queued_per_owner
+        self.owner_weights = dict(settings.analysis_owner_weights if owner_weights is None else owner_weights)
+
+        self._queues: dict[Priority, dict[str, deque[_Entry]]] = {p: {} for p in PRIORITIES}
+        # Owners with queued work per class, in turn order; the head is the owner whose turn it is
+        self._turns: dict[Priority, deque[str]] = {p: deque() for p in PRIORITIES}
+        self._started_this_turn: dict[Priority, int] = {p: 0 for p in PRIORITIES}
+        self._entries: dict[str, _Entry] = {}  # queued
+        self._running_entries: dict[str, _Entry] = {}
+        self._queued: Counter[str] = Counter()  # per owner, including reservations
+        self._running: Counter[str] = Counter()
+        self._depth = 0
+        self._running_total = 0
+        # The loop only keeps weak references to tasks; hold running ones until they finish
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting (and slots reserved) across all owners."""
+        return self._depth
+
+    @property
+    def running(self) -> int:
+        return self._running_total
+
+    def weight(self, owner: str) -> int:
+        return max(1, self.owner_weights.get(owner, 1))
+
+    def reserve(self, owner: str | None, priority: Priority = "interactive") -> Reservation:
+        """Admits one job for `owner` or raises AnalysisQueueFull."""
+        owner = owner or ANONYMOUS_OWNER
+        if self._depth >= self.max_queue_depth:
+            analysis_rejected_total.inc("queue_full")
+            raise AnalysisQueueFull(f"Analysis queue is full ({self._depth} jobs waiting); retry later")
+        if self._queued[owner] >= self.max_queued_per_owner:
+            analysis_rejected_total.inc("owner_queue_full")
+            raise AnalysisQueueFull(f"Too many analyses queued for this user ({self._queued[owner]}); retry later")
+        self._depth += 1
+        self._queued[owner] += 1
+        return Reservation(self, owner, priority)
+
+    async def run(
+        self, owner: str | None, priority: Priority, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Queues `fn` and waits for its result."""
+        # Shielded: the future may be shared with a caller that joined this key
+        return await asyncio.shield(self.reserve(owner, priority).submit(key, fn))
+
+    def position(self, key: str) -> int | None:
+        """
+        Estimated 1-based position of a queued job, or None if it is not
+        waiting here. Assumes the current queues drain in turn order, so
+        jobs queued later in higher classes can still move it back.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ahead = 0
+        for priority in PRIORITIES:
+            if priority == entry.priority:
+                break
+            ahead += sum(len(queue) for queue in self._queues[priority].values())
+
+        queues = self._queues[entry.priority]
+        index = queues[entry.owner].index(entry)
+        turns = math.ceil((index + 1) / self.weight(entry.owner))
+        ring = list(self._turns[entry.priority])
+        own_turn = ring.index(entry.owner)
+        for i, owner in enumerate(ring):
+            if owner != entry.owner:
+                # Owners before this one in turn order get one more turn first
+                rounds = turns if i < own_turn else turns - 1
+                ahead += min(len(queues[owner]), rounds * self.weight(owner))
+        return ahead + index + 1
+
+    def cancel(self, key: str, reason: str = "Cancelled") -> asyncio.Future | None:
+        """
+        Cancels a job queued or running here; None if it is neither.
+
+        A queued job is removed and its future cancelled. A running job's
+        token is cancelled and its slot released; the returned future
+        resolves once the job has wound down.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._remove_queued(entry)
+            entry.future.cancel()
+            logger.info("analysis.scheduler.cancelled", key=key, owner=entry.owner, state="queued")
+            return entry.future
+        entry = self._running_entries.get(key)
+        if entry is None:
+            return None
+        if entry.token is not None:
+            entry.token.cancel(reason)
+        self._finish(entry)
+        logger.info("analysis.scheduler.cancelled", key=key, owner=entry.owner, state="running")
+        return entry.future
+
+    def _remove_queued(self, entry: _Entry) -> None:
+        queues, turns = self._queues[entry.priority], self._turns[entry.priority]
+        queue = queues[entry.owner]
+        queue.remove(entry)
+        if not queue:
+            del queues[entry.owner]
+            if turns[0] == entry.owner:
+                self._started_this_turn[entry.priority] = 0
+            turns.remove(entry.owner)
+        self._entries.pop(entry.key, None)
+        self._unreserve(entry.owner)
+        analysis_queued_jobs.dec(entry.priority)
+
+    def _unreserve(self, owner: str) -> None:
+        self._depth -= 1
+        self._queued[owner] -= 1
+        if not self._queued[owner]:
+            del self._queued[owner]
+
+    def _enqueue(
+        self,
+        key: str,
+        owner: str,
+        priority: Priority,
+        run: Callable[[], Awaitable[Any]],
+        token: CancelToken | None = None,
+    ) -> asyncio.Future:
+        duplicate = self._entries.get(key)
+        if duplicate is not None:
+            self._unreserve(owner)
+            return duplicate.future
+        future = asyncio.get_running_loop().create_future()
+        entry = _Entry(key, owner, priority, run, future, token)
+        queue = self._queues[priority].get(owner)
+        if queue is None:
+            queue = self._queues[priority][owner] = deque()
+            self._turns[priority].append(owner)
+        queue.append(entry)
+        self._entries[key] = entry
+        analysis_queued_jobs.inc(priority)
+        self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        while self._running_total < self.max_concurrency:
+            entry = self._take_next()
+            if entry is None:
+                return
+            self._start(entry)
+
+    def _take_next(self) -> _Entry | None:
+        for priority in PRIORITIES:
+            turns = self._turns[priority]
+            for _ in range(len(turns)):
+                owner = turns[0]
+                if self._running[owner] >= self.max_per_owner:
+                    self._end_turn(priority)
+                    continue
+                queue = self._queues[priority][owner]
+                entry = queue.popleft()
+                self._started_this_turn[priority] += 1
+                if not queue:
+                    del self._queues[priority][owner]
+                    turns.popleft()
+                    self._started_this_turn[priority] = 0
+                elif self._started_this_turn[priority] >= self.weight(owner):
+                    self._end_turn(priority)
+                return entry
+        return None
+
+    def _end_turn(self, priority: Priority) -> None:
+        self._turns[priority].rotate(-1)
+        self._started_this_turn[priority] = 0
+
+    def _start(self, entry: _Entry) -> None:
+        self._entries.pop(entry.key, None)
+        self._unreserve(entry.owner)
+        analysis_queued_jobs.dec(entry.priority)
+        self._running_entries[entry.key] = entry
+        self._running[entry.owner] += 1
+        self._running_total += 1
+        task = asyncio.create_task(self._run(entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, entry: _Entry) -> None:
+        try:
+            result = await entry.run()
+        except Exception as e:
+            if not entry.future.done():
+                entry.future.set_exception(e)
+                # Nobody may be waiting for this result (queued analyses); don't warn about that
+                entry.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            logger.exception("analysis.scheduler.failed", key=entry.key, owner=entry.owner)
+        except BaseException:
+            # The task itself was cancelled (e.g. at shutdown): waiters must not hang
+            entry.future.cancel()
+            raise
+        else:
+            if not entry.future.done():
+                entry.future.set_result(result)
+        finally:
+            self._finish(entry)
+
+    def _finish(self, entry: _Entry) -> None:
+        # Once per job: on completion, or earlier when cancelled
+        if entry.finished:
+            return
+        entry.finished = True
+        if self._running_entries.get(entry.key) is entry:
+            # A job queued under the key of a running one replaces it here when it starts
+            del self._running_entries[entry.key]
+        self._running[entry.owner] -= 1
+        if not self._running[entry.owner]:
+            del self._running[entry.owner]
+        self._running_total -= 1
+        self._dispatch()
+
+
+analysis_scheduler = AnalysisScheduler()
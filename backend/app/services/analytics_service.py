@@ -7,15 +7,20 @@ from datetime import datetime, timedelta, timezone
 from statistics import mean, median
 from typing import Any
 
+import numpy as np
+
 from app.schemas.analytics import (
     AnalyticsSummary,
     CohortAnalysis,
     DetectorStats,
     RiskDistribution,
+    SimulatedCase,
     StatusDistribution,
     TopSignal,
     TrendPoint,
+    WeightSimulationResult,
 )
+from app.services.signals.aggregation import BreakdownMatrix, risk_levels
 
 
 def classify_risk_level(score: int | None) -> str:
@@ -32,7 +37,11 @@ def classify_risk_level(score: int | None) -> str:
         return "low"
 
 
-def compute_analytics_summary(cases: list[dict[str, Any]]) -> AnalyticsSummary:
+TREND_DAYS = 30
+RISK_LEVELS = ("low", "medium", "high", "critical")
+
+
+def compute_analytics_summary(cases: list[dict[str, Any]], now: datetime | None = None) -> AnalyticsSummary:
     """
     Compute analytics summary from a list of cases.
 
@@ -42,208 +51,243 @@ def compute_analytics_summary(cases: list[dict[str, Any]]) -> AnalyticsSummary:
     Returns:
         AnalyticsSummary with aggregated metrics
     """
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return summary_from_aggregates(aggregate_cases(cases, now), now)
 
-    # Basic counts
-    total_cases = len(cases)
-    analyzed_cases = [c for c in cases if c.get("status") == "analyzed"]
 
-    # Risk distribution
-    risk_dist = RiskDistribution()
-    risk_scores = []
+def aggregate_cases(cases: list[dict[str, Any]], now: datetime) -> dict[str, Any]:
+    """
+    Python equivalent of the `analytics_summary` SQL function.
 
-    for case in analyzed_cases:
-        score = case.get("risk_score")
-        if score is not None:
-            risk_scores.append(score)
-            level = classify_risk_level(score)
-            if level == "low":
-                risk_dist.low += 1
-            elif level == "medium":
-                risk_dist.medium += 1
-            elif level == "high":
-                risk_dist.high += 1
-            elif level == "critical":
-                risk_dist.critical += 1
-
-    avg_risk = mean(risk_scores) if risk_scores else 0.0
-
-    # Status distribution
-    status_dist = StatusDistribution()
-    for case in cases:
-        status = case.get("status", "uploaded")
-        if status == "uploaded":
-            status_dist.uploaded += 1
-        elif status == "processing":
-            status_dist.processing += 1
-        elif status == "analyzed":
-            status_dist.analyzed += 1
-        elif status == "failed":
-            status_dist.failed += 1
-
-    # Time-based trends
-    def parse_date(date_str: str | None) -> datetime | None:
-        if not date_str:
-            return None
-        try:
-            return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-        except (ValueError, TypeError):
-            return None
-
-    # Build 7-day and 30-day trends
-    trends_7d = compute_trends(cases, now - timedelta(days=7), now)
-    trends_30d = compute_trends(cases, now - timedelta(days=30), now, bucket_days=3)
-
-    # Signal analysis
-    signal_counts: Counter = Counter()
-    signal_scores: defaultdict = defaultdict(list)
-    signal_cases: defaultdict = defaultdict(set)
-
-    for case in analyzed_cases:
-        signals = case.get("signals") or {}
-        detector_breakdown = signals.get("detector_breakdown", {})
-        case_id = case.get("case_id", "")
-
-        for detector_name, detector_data in detector_breakdown.items():
-            if isinstance(detector_data, dict) and detector_data.get("score", 0) > 0:
-                signal_counts[detector_name] += 1
-                signal_scores[detector_name].append(detector_data.get("score", 0))
-                signal_cases[detector_name].add(case_id)
-
-    top_signals = []
-    for signal_type, count in signal_counts.most_common(10):
-        scores = signal_scores[signal_type]
-        top_signals.append(TopSignal(
-            signal_type=signal_type,
-            occurrence_count=count,
-            affected_cases=len(signal_cases[signal_type]),
-            avg_contribution=mean(scores) if scores else 0.0,
-            sample_case_ids=list(signal_cases[signal_type])[:5],
-        ))
+    Used when the function is not deployed; both return the same
+    aggregates, which `summary_from_aggregates` turns into the summary.
+    `days` holds one entry per non-empty day of the last TREND_DAYS days,
+    with `offset` counted from `now - TREND_DAYS days`.
+    """
+    analyzed = [c for c in cases if c.get("status") == "analyzed"]
+    scores = [c["risk_score"] for c in analyzed if c.get("risk_score") is not None]
 
-    # Detector stats
-    detector_stats = []
-    for detector_name in signal_counts.keys():
-        scores = signal_scores[detector_name]
-        detector_stats.append(DetectorStats(
-            name=detector_name,
-            triggered_count=signal_counts[detector_name],
-            avg_score=mean(scores) if scores else 0.0,
-            max_score=max(scores) if scores else 0.0,
-            detection_rate=len(signal_cases[detector_name]) / len(analyzed_cases) if analyzed_cases else 0.0,
-        ))
+    levels: defaultdict[str, list[int]] = defaultdict(list)
+    for score in scores:
+        levels[classify_risk_level(score)].append(score)
 
-    # Sort by triggered count
-    detector_stats.sort(key=lambda d: d.triggered_count, reverse=True)
-
-    # Cohort analysis (by risk level)
-    cohorts = []
-    for level in ["low", "medium", "high", "critical"]:
-        level_cases = [
-            c for c in analyzed_cases
-            if classify_risk_level(c.get("risk_score")) == level
-        ]
-        if level_cases:
-            level_scores = [c.get("risk_score", 0) for c in level_cases]
-            cohorts.append(CohortAnalysis(
-                cohort_name=f"{level}_risk",
-                case_count=len(level_cases),
-                avg_risk_score=mean(level_scores),
-                median_risk_score=median(level_scores),
-                top_signals=_get_top_signals_for_cases(level_cases)[:3],
-                risk_distribution=RiskDistribution(**{level: len(level_cases)}),
-            ))
-
-    # Recent high-risk cases
-    recent_high_risk: list[str] = []
-    for case in sorted(
-        [c for c in analyzed_cases if (c.get("risk_score") or 0) >= 50],
-        key=lambda c: c.get("created_at", ""),
+    window_start = now - timedelta(days=TREND_DAYS)
+    days: defaultdict[int, dict[str, int]] = defaultdict(
+        lambda: {"count": 0, "analyzed": 0, "risk_sum": 0, "high_risk": 0}
+    )
+    for case in cases:
+        created = _parse_date(case.get("created_at"))
+        if created is None or not window_start <= created < now:
+            continue
+        day = days[int((created - window_start) // timedelta(days=1))]
+        day["count"] += 1
+        score = case.get("risk_score")
+        if case.get("status") == "analyzed" and score is not None:
+            day["analyzed"] += 1
+            day["risk_sum"] += score
+            day["high_risk"] += score >= 50
+
+    # Most recent first, like the SQL function's case_ids ordering
+    detector_scores: defaultdict[str, list[tuple[str, float]]] = defaultdict(list)
+    level_signals: defaultdict[str, Counter] = defaultdict(Counter)
+    for case in sorted(analyzed, key=lambda c: c.get("created_at") or "", reverse=True):
+        breakdown = (case.get("signals") or {}).get("detector_breakdown") or {}
+        score = case.get("risk_score")
+        for name, data in breakdown.items():
+            if not isinstance(data, dict):
+                continue
+            hits = detector_scores[name]  # listed even if it never triggers
+            if (data.get("score") or 0) > 0:
+                hits.append((case.get("case_id", ""), data["score"]))
+                if score is not None:
+                    level_signals[classify_risk_level(score)][name] += 1
+
+    detectors = [
+        {
+            "name": name,
+            "triggered_count": len(hits),
+            "avg_score": mean(s for _, s in hits) if hits else 0.0,
+            "max_score": max((s for _, s in hits), default=0.0),
+            "case_ids": [case_id for case_id, _ in hits[:10]],
+        }
+        for name, hits in detector_scores.items()
+    ]
+    detectors.sort(key=lambda d: (-d["triggered_count"], d["name"]))
+
+    status_distribution = Counter(c.get("status", "uploaded") for c in cases)
+    recent_high_risk = sorted(
+        (c for c in analyzed if (c.get("risk_score") or 0) >= 50),
+        key=lambda c: c.get("created_at") or "",
         reverse=True,
-    )[:10]:
-        case_id = case.get("case_id")
-        if isinstance(case_id, str) and case_id:
-            recent_high_risk.append(case_id)
+    )[:10]
+
+    return {
+        "total_cases": len(cases),
+        "analyzed_cases": len(analyzed),
+        "avg_risk_score": mean(scores) if scores else 0.0,
+        "min_risk_score": min(scores, default=0),
+        "max_risk_score": max(scores, default=0),
+        "risk_distribution": {level: len(values) for level, values in levels.items()},
+        "status_distribution": dict(status_distribution),
+        "days": [{"offset": offset, **days[offset]} for offset in sorted(days)],
+        "detectors": detectors,
+        "cohorts": [
+            {
+                "level": level,
+                "case_count": len(levels[level]),
+                "avg_risk_score": mean(levels[level]),
+                "median_risk_score": median(levels[level]),
+                "top_signals": [
+                    name for name, _ in sorted(level_signals[level].items(), key=lambda item: (-item[1], item[0]))[:5]
+                ],
+            }
+            for level in RISK_LEVELS
+            if levels[level]
+        ],
+        "recent_high_risk_cases": [c["case_id"] for c in recent_high_risk if c.get("case_id")],
+    }
+
+
+def summary_from_aggregates(aggregates: dict[str, Any], now: datetime) -> AnalyticsSummary:
+    """Builds the dashboard summary from SQL (or Python) aggregates."""
+    analyzed = aggregates["analyzed_cases"]
+    risk_dist = RiskDistribution(**aggregates["risk_distribution"])
+    status_dist = StatusDistribution(**{
+        status: count
+        for status, count in aggregates["status_distribution"].items()
+        if status in StatusDistribution.model_fields
+    })
+
+    triggered = [d for d in aggregates["detectors"] if d["triggered_count"] > 0]
+    top_signals = [
+        TopSignal(
+            signal_type=d["name"],
+            occurrence_count=d["triggered_count"],
+            affected_cases=d["triggered_count"],
+            avg_contribution=d["avg_score"],
+            sample_case_ids=d["case_ids"][:5],
+        )
+        for d in triggered[:10]
+    ]
+    detector_stats = [
+        DetectorStats(
+            name=d["name"],
+            triggered_count=d["triggered_count"],
+            avg_score=d["avg_score"],
+            max_score=d["max_score"],
+            detection_rate=d["triggered_count"] / analyzed if analyzed else 0.0,
+        )
+        for d in triggered
+    ]
+    cohorts = [
+        CohortAnalysis(
+            cohort_name=f"{c['level']}_risk",
+            case_count=c["case_count"],
+            avg_risk_score=c["avg_risk_score"],
+            median_risk_score=c["median_risk_score"],
+            top_signals=c["top_signals"][:3],
+            risk_distribution=RiskDistribution(**{c["level"]: c["case_count"]}),
+        )
+        for c in aggregates["cohorts"]
+    ]
+
+    days = {d["offset"]: d for d in aggregates["days"]}
+    window_start = now - timedelta(days=TREND_DAYS)
 
     return AnalyticsSummary(
-        total_cases=total_cases,
-        analyzed_cases=len(analyzed_cases),
-        avg_risk_score=round(avg_risk, 1),
+        total_cases=aggregates["total_cases"],
+        analyzed_cases=analyzed,
+        avg_risk_score=round(aggregates["avg_risk_score"], 1),
         high_risk_count=risk_dist.high + risk_dist.critical,
         critical_risk_count=risk_dist.critical,
         risk_distribution=risk_dist,
         status_distribution=status_dist,
-        trends_7d=trends_7d,
-        trends_30d=trends_30d,
+        trends_7d=_trend_points(days, window_start, first_day=TREND_DAYS - 7, bucket_days=1),
+        trends_30d=_trend_points(days, window_start, first_day=0, bucket_days=3),
         top_signals=top_signals,
         detector_stats=detector_stats,
         cohorts=cohorts,
-        recent_high_risk_cases=recent_high_risk,
+        recent_high_risk_cases=aggregates["recent_high_risk_cases"],
         pending_review_count=status_dist.processing + status_dist.uploaded,
         generated_at=now.isoformat(),
-        period_start=(now - timedelta(days=30)).isoformat(),
+        period_start=window_start.isoformat(),
         period_end=now.isoformat(),
     )
 
 
-def compute_trends(
-    cases: list[dict],
-    start: datetime,
-    end: datetime,
-    bucket_days: int = 1,
+def _trend_points(
+    days: dict[int, dict[str, Any]], window_start: datetime, *, first_day: int, bucket_days: int
 ) -> list[TrendPoint]:
-    """Compute trend points for a date range."""
+    """Trend buckets of `bucket_days` days from day `first_day` of the window to its end."""
     trends = []
-    current = start
-
-    while current < end:
-        bucket_end = current + timedelta(days=bucket_days)
-        bucket_cases = [
-            c for c in cases
-            if _in_date_range(c.get("created_at"), current, bucket_end)
-        ]
-
-        analyzed_in_bucket = [
-            c for c in bucket_cases
-            if c.get("status") == "analyzed" and c.get("risk_score") is not None
-        ]
-
-        scores = [c.get("risk_score", 0) for c in analyzed_in_bucket]
-        high_risk = [c for c in analyzed_in_bucket if (c.get("risk_score") or 0) >= 50]
-
+    for start in range(first_day, TREND_DAYS, bucket_days):
+        bucket = [days[d] for d in range(start, min(start + bucket_days, TREND_DAYS)) if d in days]
+        analyzed = sum(d["analyzed"] for d in bucket)
         trends.append(TrendPoint(
-            date=current.strftime("%Y-%m-%d"),
-            count=len(bucket_cases),
-            avg_risk_score=round(mean(scores), 1) if scores else 0.0,
-            high_risk_count=len(high_risk),
+            date=(window_start + timedelta(days=start)).strftime("%Y-%m-%d"),
+            count=sum(d["count"] for d in bucket),
+            avg_risk_score=round(sum(d["risk_sum"] for d in bucket) / analyzed, 1) if analyzed else 0.0,
+            high_risk_count=sum(d["high_risk"] for d in bucket),
         ))
-
-        current = bucket_end
-
     return trends
 
 
-def _in_date_range(date_str: str | None, start: datetime, end: datetime) -> bool:
-    """Check if a date string falls within a range."""
+def _parse_date(date_str: str | None) -> datetime | None:
     if not date_str:
-        return False
+        return None
     try:
-        dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-        return start <= dt < end
+        parsed = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     except (ValueError, TypeError):
-        return False
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 
-def _get_top_signals_for_cases(cases: list[dict]) -> list[str]:
-    """Get top signal types for a list of cases."""
-    signal_counts: Counter = Counter()
+def simulate_weights(
+    cases: list[dict[str, Any]], weights: dict[str, float], limit: int = 50
+) -> WeightSimulationResult:
+    """
+    Re-scores every analyzed case under `weights` from its stored breakdown.
 
-    for case in cases:
-        signals = case.get("signals") or {}
-        detector_breakdown = signals.get("detector_breakdown", {})
+    Both sides are re-aggregated from the breakdowns (stored weights vs
+    `weights`), so the comparison isolates the weight change from any
+    drift in the persisted scores. No detector is run.
+    """
+    analyzed = [
+        c for c in cases
+        if c.get("status") == "analyzed" and (c.get("signals") or {}).get("detector_breakdown")
+    ]
+    if not analyzed:
+        return WeightSimulationResult()
+
+    matrix = BreakdownMatrix.from_breakdowns(c["signals"]["detector_breakdown"] for c in analyzed)
+    baseline, simulated = matrix.risk_scores(), matrix.risk_scores(weights)
+    baseline_levels, simulated_levels = risk_levels(baseline), risk_levels(simulated)
+
+    changed = np.flatnonzero(baseline_levels != simulated_levels)
+    # Largest score movements first
+    changed = changed[np.argsort(-np.abs(simulated[changed] - baseline[changed]), kind="stable")]
+
+    return WeightSimulationResult(
+        cases_scored=len(matrix),
+        detectors=list(matrix.detectors),
+        avg_risk_score=round(float(baseline.mean()), 1),
+        simulated_avg_risk_score=round(float(simulated.mean()), 1),
+        risk_distribution=_level_distribution(baseline_levels),
+        simulated_risk_distribution=_level_distribution(simulated_levels),
+        level_changes=len(changed),
+        changed_cases=[
+            SimulatedCase(
+                case_id=analyzed[i]["case_id"],
+                risk_score=int(baseline[i]),
+                simulated_score=int(simulated[i]),
+                risk_level=str(baseline_levels[i]),
+                simulated_level=str(simulated_levels[i]),
+            )
+            for i in changed[:limit]
+        ],
+    )
 
-        for detector_name, detector_data in detector_breakdown.items():
-            if isinstance(detector_data, dict) and detector_data.get("score", 0) > 0:
-                signal_counts[detector_name] += 1
 
-    return [name for name, _ in signal_counts.most_common(5)]
+def _level_distribution(levels: np.ndarray) -> RiskDistribution:
+    names, counts = np.unique(levels, return_counts=True)
+    return RiskDistribution(**{str(name): int(count) for name, count in zip(names, counts)})
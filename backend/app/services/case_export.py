@@ -0,0 +1,146 @@
+"""
+Streaming export of cases and their detector scores.
+
+Cases are read a page at a time (keyset pagination in the repository)
+and each page is serialized and yielded before the next one is
+requested, so memory stays bounded by the page size however many cases
+are exported. Detector columns come from the narrow
+case_detector_scores rows; the signals blob is never read.
+
+Formats:
+- ndjson: one JSON object per line, detector values nested under
+  "detectors" ({"benford": {"score": 12.0}, ...}).
+- csv: a header row, then one row per case with a column per
+  selected detector and field ("benford_score", ...).
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.domain.errors import InvalidExportRequest
+from app.repositories.case_repo import CaseRepository
+from app.services.signals import SignalEngine
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CASE_COLUMNS = ("case_id", "status", "risk_score", "created_at")
+DETECTOR_FIELDS = ("score", "weight", "confidence")
+DEFAULT_PAGE_SIZE = 1000
+
+
+@lru_cache
+def known_detectors() -> tuple[str, ...]:
+    return tuple(detector.name for detector in SignalEngine().detectors)
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """What to export: format, detector columns and an optional status filter."""
+
+    format: str = "ndjson"
+    detectors: tuple[str, ...] = ()
+    fields: tuple[str, ...] = ("score",)
+    status: str | None = None
+
+    @classmethod
+    def parse(
+        cls,
+        format: str = "ndjson",
+        detectors: str | None = None,
+        fields: str | None = None,
+        status: str | None = None,
+    ) -> "ExportSpec":
+        """Validates comma-separated query values; detectors default to all."""
+        if format not in EXPORT_FORMATS:
+            raise InvalidExportRequest(f"Unknown export format: {format}")
+
+        selected = _split(detectors) if detectors is not None else list(known_detectors())
+        unknown = [name for name in selected if name not in known_detectors()]
+        if unknown:
+            raise InvalidExportRequest(f"Unknown detectors: {', '.join(unknown)}")
+
+        selected_fields = _split(fields) if fields is not None else ["score"]
+        bad_fields = [name for name in selected_fields if name not in DETECTOR_FIELDS]
+        if bad_fields or not selected_fields:
+            raise InvalidExportRequest(f"Detector fields must be among: {', '.join(DETECTOR_FIELDS)}")
+
+        return cls(format=format, detectors=tuple(selected), fields=tuple(selected_fields), status=status)
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_FORMATS[self.format]
+
+    @property
+    def csv_header(self) -> list[str]:
+        return [*CASE_COLUMNS, *(f"{d}_{f}" for d in self.detectors for f in self.fields)]
+
+    def select(self) -> str:
+        columns = ",".join(("id", *CASE_COLUMNS))
+        if not self.detectors:
+            return columns
+        return f"{columns},case_detector_scores(detector,{','.join(self.fields)})"
+
+    def filters(self) -> dict[str, str]:
+        filters = {}
+        if self.status:
+            filters["status"] = f"eq.{self.status}"
+        if self.detectors:
+            # Only embed the selected detectors' rows
+            filters["case_detector_scores.detector"] = f"in.({','.join(self.detectors)})"
+        return filters
+
+
+def _split(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _detector_values(row: dict[str, Any], spec: ExportSpec) -> dict[str, dict[str, Any]]:
+    return {
+        score["detector"]: {field: score.get(field) for field in spec.fields}
+        for score in row.get("case_detector_scores") or []
+    }
+
+
+def ndjson_lines(rows: Sequence[dict[str, Any]], spec: ExportSpec) -> str:
+    lines = []
+    for row in rows:
+        record = {column: row.get(column) for column in CASE_COLUMNS}
+        if spec.detectors:
+            record["detectors"] = _detector_values(row, spec)
+        lines.append(json.dumps(record, separators=(",", ":")))
+    return "\n".join(lines) + "\n"
+
+
+def csv_lines(rows: Sequence[dict[str, Any]], spec: ExportSpec, *, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(spec.csv_header)
+    for row in rows:
+        values = _detector_values(row, spec)
+        writer.writerow([
+            *(row.get(column) for column in CASE_COLUMNS),
+            *(values.get(d, {}).get(f) for d in spec.detectors for f in spec.fields),
+        ])
+    return buffer.getvalue()
+
+
+async def export_cases(
+    repository: CaseRepository, spec: ExportSpec, *, page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[str]:
+    """Yields the export one serialized page at a time."""
+    if spec.format == "csv":
+        yield csv_lines([], spec, header=True)
+
+    async for rows in repository.iter_pages(select=spec.select(), page_size=page_size, filters=spec.filters()):
+        if spec.format == "csv":
+            yield csv_lines(rows, spec)
+        else:
+            yield ndjson_lines(rows, spec)
@@ -1,5 +1,8 @@
 import asyncio
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Literal
 
 from fastapi import UploadFile
 
@@ -9,18 +12,71 @@ from app.application.cases.get_case import GetCase
 from app.application.cases.job_ids import new_job_id
 from app.application.cases.list_cases import ListCases
 from app.application.cases.mapper import to_case_result
+from app.application.cases.rescore_case import RescoreCase
+from app.core.config import settings
+from app.core.metrics import (
+    analysis_jobs_in_flight,
+    analysis_jobs_total,
+    analysis_queue_wait_seconds,
+    analysis_run_seconds,
+)
+from app.domain.analysis_job import AnalysisJobRecord
 from app.domain.case import CaseRecord, CaseUpdate
-from app.domain.errors import AnalysisJobNotFound, CaseNotFound, DomainError
+from app.domain.errors import (
+    AnalysisCancelled,
+    AnalysisJobFinished,
+    AnalysisJobNotFound,
+    AnalysisQueueFull,
+    CaseNotFound,
+    DomainError,
+)
 from app.repositories.analysis_job_repo import AnalysisJobRepository
+from app.repositories.analytics_repo import AnalyticsRepository
 from app.repositories.case_repo import CaseRepository
-from app.schemas.case import CaseResult
+from app.repositories.detector_score_repo import DetectorScoreRepository, breakdown_from_rows
+from app.repositories.entity_match_repo import EntityMatchRepository
+from app.schemas.case import CaseResult, RescoreBacklogResponse
+from app.schemas.entities import VendorResolutionRun
+from app.services.analysis_scheduler import Priority, analysis_scheduler
+from app.services.analytics_service import aggregate_cases
+from app.services.case_export import ExportSpec, export_cases
+from app.services.entity_resolution import VendorRecord, resolve_vendors
+from app.services.job_events import TERMINAL_STATUSES, job_event_stream, job_events, track_job
+from app.services.vendor_index import vendor_index
+from app.utils.cancellation import CancelToken, bind_token
 from app.utils.logging import logger
+from app.utils.single_flight import SingleFlight
+from app.utils.timing import Timings, collect_timings
 from app.schemas.analysis_job import AnalysisJobResult
 
+# Statuses an analysis may be queued from (processing only once stale)
+ANALYZABLE_STATUSES = ("uploaded", "analyzed", "failed")
+
+JobOutcome = Literal["completed", "failed", "cancelled"]
+
+_analysis_flights: SingleFlight[CaseResult] = SingleFlight()
+
+
+def _analysis_is_stale(signals: dict[str, Any]) -> bool:
+    """Whether a processing case's job has run too long to still be alive."""
+    queued_at = signals.get("analysis_queued_at")
+    if not queued_at:
+        return True
+    try:
+        queued = datetime.fromisoformat(queued_at)
+    except ValueError:
+        return True
+    age = (datetime.now(timezone.utc) - queued).total_seconds()
+    return age > settings.analysis_stale_seconds
+
+
 class CaseService:
     def __init__(self, repository: CaseRepository):
         self.repository = repository
         self._job_repo: AnalysisJobRepository | None = None
+        self._score_repo: DetectorScoreRepository | None = None
+        self._analytics_repo: AnalyticsRepository | None = None
+        self._match_repo: EntityMatchRepository | None = None
 
     @property
     def job_repo(self) -> AnalysisJobRepository:
@@ -28,78 +84,392 @@ class CaseService:
             self._job_repo = AnalysisJobRepository(self.repository.client)
         return self._job_repo
 
+    @property
+    def score_repo(self) -> DetectorScoreRepository:
+        if self._score_repo is None:
+            self._score_repo = DetectorScoreRepository(self.repository.client)
+        return self._score_repo
+
+    @property
+    def analytics_repo(self) -> AnalyticsRepository:
+        if self._analytics_repo is None:
+            self._analytics_repo = AnalyticsRepository(self.repository.client)
+        return self._analytics_repo
+
+    @property
+    def match_repo(self) -> EntityMatchRepository:
+        if self._match_repo is None:
+            self._match_repo = EntityMatchRepository(self.repository.client)
+        return self._match_repo
+
     async def list_cases(self) -> list[CaseResult]:
         use_case = ListCases(self.repository)
         cases = await use_case.execute()
+        self._resume_deferred(cases)
         return [to_case_result(case) for case in cases]
 
+    async def list_case_scores(self) -> list[dict[str, Any]]:
+        """
+        Cases for analytics: status, score and a detector_breakdown of
+        scores only, read from the narrow case_detector_scores rows.
+        """
+        rows = await self.repository.list_scores()
+        return [
+            {
+                "case_id": row["case_id"],
+                "status": row.get("status"),
+                "risk_score": row.get("risk_score"),
+                "created_at": row.get("created_at"),
+                "signals": {"detector_breakdown": breakdown_from_rows(row.get("case_detector_scores") or [])},
+            }
+            for row in rows
+        ]
+
+    async def analytics_aggregates(self, now: datetime) -> dict[str, Any]:
+        """
+        Dashboard aggregates computed in Postgres; falls back to
+        aggregating the narrow score rows here if the SQL function is
+        not deployed yet.
+        """
+        aggregates = await self.analytics_repo.summary(now)
+        if aggregates is None:
+            logger.info("analytics.rpc_unavailable", function=self.analytics_repo.function)
+            aggregates = aggregate_cases(await self.list_case_scores(), now)
+        return aggregates
+
+    async def resolve_vendor_matches(self) -> VendorResolutionRun:
+        """
+        Resolves the vendor master (as loaded by app.cli.ingest_vendors)
+        into duplicate candidates and stores them for review. Pairs found
+        again keep their review status.
+        """
+        records = [VendorRecord(vendor_id, name) for vendor_id, name in vendor_index.registered_vendors().items()]
+        matches = await asyncio.to_thread(resolve_vendors, records)
+        await self.match_repo.upsert_many(matches)
+        return VendorResolutionRun(vendors=len(records), matches=len(matches))
+
+    async def list_vendor_matches(self, status: str | None = None) -> list[dict[str, Any]]:
+        return await self.match_repo.list(status)
+
+    def export_cases(self, spec: ExportSpec) -> AsyncIterator[str]:
+        """Streams the export page by page (see case_export)."""
+        return export_cases(self.repository, spec)
+
     async def get_case(self, case_id: str) -> CaseResult:
         use_case = GetCase(self.repository)
         case = await use_case.execute(case_id)
+        self._resume_deferred([case])
         return to_case_result(case)
 
+    def _resume_deferred(self, cases: list[CaseRecord]) -> None:
+        """Re-queues deferred LLM analyses lost from the in-memory queue (e.g. by a restart)."""
+        use_case = AnalyzeCase(self.repository, scores=self.score_repo)
+        for case in cases:
+            use_case.resume_deferred(case)
+
     async def create_case_from_upload(self, file: UploadFile) -> CaseResult:
         use_case = CreateCaseFromUpload(self.repository)
         case = await use_case.execute(file)
         return to_case_result(case)
 
     async def analyze_case(self, case_id: str) -> CaseResult:
-        use_case = AnalyzeCase(self.repository)
+        use_case = AnalyzeCase(self.repository, scores=self.score_repo)
         case = await use_case.execute(case_id)
         return to_case_result(case)
 
+    async def rescore_case(self, case_id: str, *, owner: str | None = None) -> CaseResult:
+        """Re-scores in the scheduler's rescore class, so bulk rescoring cannot crowd out analyses."""
+        use_case = RescoreCase(self.repository, scores=self.score_repo)
+        case = await analysis_scheduler.run(owner, "rescore", f"rescore:{case_id}", lambda: use_case.execute(case_id))
+        return to_case_result(case)
+
+    async def rescore_backlog(
+        self, *, owner: str | None = None, limit: int = 500, after: int | None = None
+    ) -> RescoreBacklogResponse:
+        """
+        Re-scores up to `limit` analyzed cases in id order, after row id
+        `after`. Cases run one at a time through the rescore class, so a
+        backlog never crowds out interactive analyses. A full queue ends
+        the batch early; `next_after` says where to resume.
+        """
+        rescored, failed, last_id = 0, {}, after
+        filters = {"status": "eq.analyzed", **({"id": f"gt.{after}"} if after is not None else {})}
+        pages = self.repository.iter_pages(select="id,case_id", page_size=min(limit, 1000), filters=filters)
+        async for page in pages:
+            for row in page:
+                if rescored + len(failed) >= limit:
+                    return RescoreBacklogResponse(rescored=rescored, failed=failed, next_after=last_id)
+                try:
+                    await self.rescore_case(row["case_id"], owner=owner)
+                except AnalysisQueueFull:
+                    return RescoreBacklogResponse(rescored=rescored, failed=failed, next_after=last_id)
+                except DomainError as e:
+                    failed[row["case_id"]] = str(e)
+                else:
+                    rescored += 1
+                last_id = row["id"]
+        return RescoreBacklogResponse(rescored=rescored, failed=failed)
+
     async def get_analysis_job(self, job_id: str) -> AnalysisJobResult:
         job = await self.job_repo.get(job_id)
         if not job:
             raise AnalysisJobNotFound("Analysis job not found")
-        return AnalysisJobResult(**job)
+        return AnalysisJobResult(**job, queue_position=analysis_scheduler.position(job_id))
+
+    def queue_position(self, job_id: str | None) -> int | None:
+        return analysis_scheduler.position(job_id) if job_id else None
+
+    async def cancel_analysis_job(self, job_id: str) -> AnalysisJobResult:
+        """
+        Cancels a queued or running analysis and returns the job as recorded.
+
+        The case goes back to its status before the analysis (a previous
+        analysis stays in place). A queued job is recorded as cancelled
+        at once. A job running in this process is asked to stop and
+        records the outcome itself at its next checkpoint (or completes,
+        if it has already started saving), so it may still show as
+        running here. A job of another worker process is only marked
+        cancelled; that process is not interrupted.
+        """
+        job = await self.job_repo.get(job_id)
+        if not job:
+            raise AnalysisJobNotFound("Analysis job not found")
+        if job.get("status") in TERMINAL_STATUSES:
+            raise AnalysisJobFinished(f"Analysis job already {job.get('status')}")
+        await self._cancel_job(job["case_id"], job_id, "Cancelled by user")
+        return AnalysisJobResult(**(await self.job_repo.get(job_id) or job))
 
-    async def queue_analysis(self, case_id: str) -> CaseResult:
+    def job_event_stream(self, job: AnalysisJobResult) -> AsyncIterator[str]:
+        """Server-sent events for `job`, ending once it completes, fails or is cancelled."""
+
+        async def refresh() -> dict[str, Any] | None:
+            return await self.job_repo.get(job.job_id)
+
+        return job_event_stream(job.model_dump(exclude_none=True), refresh=refresh)
+
+    async def queue_analysis(
+        self,
+        case_id: str,
+        *,
+        idempotency_key: str | None = None,
+        owner: str | None = None,
+        priority: Priority = "interactive",
+    ) -> CaseResult:
+        """
+        Queues an analysis, at most one per case at a time.
+
+        Concurrent calls for a case in this process share one attempt, and
+        the status change to processing is a compare-and-set, so of racing
+        requests (from any process) one queues a job and the others get the
+        case with that job. A case already processing is returned as is
+        unless its job is older than ANALYSIS_STALE_SECONDS, in which case
+        it is taken over. A repeated idempotency key returns the case
+        without queueing again, even after the analysis has finished.
+
+        New jobs run through the analysis scheduler under `owner` and
+        `priority`; AnalysisQueueFull is raised, before the case is
+        touched, when its queue is at the limit. A job taken over is
+        cancelled.
+        """
+        # Keyed by caller too: a shared result must not bypass another user's row-level security
+        caller = getattr(self.repository.client, "access_token", None)
+        return await _analysis_flights.do(
+            (case_id, caller), lambda: self._queue_analysis(case_id, idempotency_key, owner, priority)
+        )
+
+    async def _queue_analysis(
+        self, case_id: str, idempotency_key: str | None, owner: str | None, priority: Priority
+    ) -> CaseResult:
         existing = await self.repository.get(case_id)
         if not existing:
             raise CaseNotFound("Case not found")
 
         signals = existing.get("signals") or {}
+        if idempotency_key and signals.get("analysis_idempotency_key") == idempotency_key:
+            logger.info("analysis.replayed", case_id=case_id, job_id=signals.get("analysis_job_id"))
+            return to_case_result(existing)
+
+        previous_job_id = signals.get("analysis_job_id")
+        if existing.get("status") == "processing":
+            if not _analysis_is_stale(signals):
+                logger.info("analysis.attached", case_id=case_id, job_id=previous_job_id)
+                return to_case_result(existing)
+            logger.info("analysis.stale", case_id=case_id, job_id=previous_job_id)
+            # Take over only the job we saw, not one another request queued meanwhile
+            from_status = ("processing",)
+            where = {"signals->>analysis_job_id": f"eq.{previous_job_id}" if previous_job_id else "is.null"}
+        else:
+            from_status, where = ANALYZABLE_STATUSES, None
+
         job_id = new_job_id()
-        signals["analysis_queued_at"] = datetime.now(timezone.utc).isoformat()
-        signals["analysis_job_id"] = job_id
+        queued_at_iso = datetime.now(timezone.utc).isoformat()
+        signals = {**signals, "analysis_queued_at": queued_at_iso, "analysis_job_id": job_id}
+        if existing.get("status") != "processing":
+            # Restored if the job is cancelled (a taken-over job's is kept)
+            signals["analysis_previous_status"] = existing.get("status")
+        if idempotency_key:
+            signals["analysis_idempotency_key"] = idempotency_key
+        else:
+            signals.pop("analysis_idempotency_key", None)
 
-        await self.job_repo.create(
-            {
+        with analysis_scheduler.reserve(owner, priority) as reservation:
+            update: CaseUpdate = {"status": "processing", "signals": signals}
+            case = await self.repository.transition(case_id, update, from_status=from_status, where=where)
+            if case is None:
+                # Another request queued a job first: attach to it
+                current = await self.repository.get(case_id)
+                if not current:
+                    raise CaseNotFound("Case not found")
+                logger.info("analysis.attached", case_id=case_id, job_id=(current.get("signals") or {}).get("analysis_job_id"))
+                return to_case_result(current)
+
+            job: AnalysisJobRecord = {
                 "job_id": job_id,
                 "case_id": case_id,
                 "status": "queued",
-                "queued_at": datetime.now(timezone.utc).isoformat(),
+                "priority": priority,
+                "queued_at": queued_at_iso,
             }
-        )
+            try:
+                await self.job_repo.create(job)
+            except Exception:
+                # Without its job row the case would stay processing for a job that never runs
+                await self._restore_case(case_id, job_id, existing)
+                raise
 
-        logger.info("analysis.queued", case_id=case_id, job_id=job_id)
+            analysis_jobs_total.inc("queued")
+            analysis_jobs_in_flight.inc()
+            queued_at = perf_counter()
+            token = CancelToken()
+            reservation.submit(
+                job_id, lambda: self._run_analysis(case_id, job_id, token=token, queued_at=queued_at), token
+            )
 
-        update: CaseUpdate = {"status": "processing", "signals": signals}
-        case = await self.repository.update(case_id, update)
-        asyncio.create_task(self._run_analysis(case_id, job_id))
+        position = analysis_scheduler.position(job_id)
+        job_events.publish_state(**job, queue_position=position)
+        logger.info("analysis.queued", case_id=case_id, job_id=job_id, priority=priority, position=position)
+        if from_status == ("processing",) and previous_job_id:
+            await self._cancel_job(case_id, previous_job_id, f"Superseded by job {job_id}")
         return to_case_result(case)
 
-    async def _run_analysis(self, case_id: str, job_id: str) -> None:
-        use_case = AnalyzeCase(self.repository)
-        await self.job_repo.update(
+    async def _restore_case(self, case_id: str, job_id: str, previous: CaseRecord) -> None:
+        """Puts a case moved to processing for `job_id` back as it was, unless it has moved on since."""
+        try:
+            await self.repository.transition(
+                case_id,
+                {"status": previous["status"], "signals": previous.get("signals") or {}},
+                from_status=("processing",),
+                where={"signals->>analysis_job_id": f"eq.{job_id}"},
+            )
+        except Exception:
+            logger.exception("analysis.restore_failed", case_id=case_id, job_id=job_id)
+
+    async def _cancel_job(self, case_id: str, job_id: str, reason: str) -> None:
+        """Stops the job if it is queued or running here, and records it as cancelled."""
+        future = analysis_scheduler.cancel(job_id, reason)
+        if future is not None and not future.cancelled():
+            # Running here: its worker records the outcome once it stops
+            return
+        if future is not None:
+            # Dropped from the queue before it ran
+            analysis_jobs_in_flight.dec()
+            analysis_jobs_total.inc("cancelled")
+        await self._record_cancelled(case_id, job_id, reason)
+
+    async def _record_cancelled(
+        self, case_id: str, job_id: str, reason: str, timings: Timings | None = None
+    ) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        update: AnalysisJobRecord = {"status": "cancelled", "error": reason, "completed_at": now}
+        if timings is not None:
+            update["timings"] = timings.to_dict()
+        if await self.job_repo.transition(job_id, update, from_status=("queued", "running")) is None:
+            return  # finished meanwhile
+        job_events.publish_state(job_id=job_id, case_id=case_id, **update)
+
+        case = await self.repository.get(case_id)
+        signals = (case or {}).get("signals") or {}
+        if signals.get("analysis_job_id") == job_id:
+            signals = {**signals, "analysis_cancelled_at": now}
+            status = signals.get("analysis_previous_status") or (
+                "analyzed" if signals.get("analysis_completed_at") else "uploaded"
+            )
+            # Only while the case still belongs to this job
+            await self.repository.transition(
+                case_id,
+                {"status": status, "signals": signals},
+                from_status=("processing",),
+                where={"signals->>analysis_job_id": f"eq.{job_id}"},
+            )
+        logger.info("analysis.cancelled", case_id=case_id, job_id=job_id, reason=reason)
+
+    async def _run_analysis(
+        self,
+        case_id: str,
+        job_id: str,
+        *,
+        token: CancelToken | None = None,
+        queued_at: float | None = None,
+    ) -> None:
+        started = perf_counter()
+        if queued_at is not None:
+            analysis_queue_wait_seconds.observe(started - queued_at)
+        token = token or CancelToken()
+        token.set_timeout(settings.analysis_deadline_seconds)
+        analysis_jobs_total.inc("running")
+        outcome: JobOutcome = "failed"
+        try:
+            outcome = await self._execute_job(case_id, job_id, token)
+        except asyncio.CancelledError:
+            # Interrupted from outside (e.g. shutdown): don't leave the job running and the case processing
+            outcome = "cancelled"
+            try:
+                await self._record_cancelled(case_id, job_id, "Analysis interrupted")
+            except Exception:
+                job_events.publish_state(job_id, "cancelled", case_id=case_id, error="Analysis interrupted")
+            raise
+        except Exception:
+            # Unexpected errors leave the row as is, but streams must not wait forever
+            job_events.publish_state(job_id, "failed", case_id=case_id, error="Internal error")
+            raise
+        finally:
+            analysis_jobs_in_flight.dec()
+            analysis_jobs_total.inc(outcome)
+            analysis_run_seconds.observe(perf_counter() - started, outcome)
+
+    async def _execute_job(self, case_id: str, job_id: str, token: CancelToken) -> JobOutcome:
+        """
+        Runs the analysis under `token` and records the outcome. A job past
+        its deadline fails like any other analysis error.
+        """
+        use_case = AnalyzeCase(self.repository, scores=self.score_repo)
+        await self._update_job(
             job_id,
+            case_id,
             {
                 "status": "running",
                 "started_at": datetime.now(timezone.utc).isoformat(),
             },
         )
         logger.info("analysis.started", case_id=case_id, job_id=job_id)
+        timings = Timings()
         try:
-            await use_case.execute(case_id)
-            await self.job_repo.update(
+            with collect_timings(timings), track_job(job_id), bind_token(token):
+                await use_case.execute(case_id)
+            await self._update_job(
                 job_id,
+                case_id,
                 {
                     "status": "completed",
                     "completed_at": datetime.now(timezone.utc).isoformat(),
+                    "timings": timings.to_dict(),
                 },
             )
-            logger.info("analysis.completed", case_id=case_id, job_id=job_id)
+            logger.info("analysis.completed", case_id=case_id, job_id=job_id, timings=timings.to_dict())
+            return "completed"
+        except AnalysisCancelled as e:
+            await self._record_cancelled(case_id, job_id, str(e), timings)
+            return "cancelled"
         except DomainError as e:
             existing = await self.repository.get(case_id)
             signals = (existing or {}).get("signals") or {}
@@ -113,12 +483,20 @@ class CaseService:
                     "signals": signals,
                 },
             )
-            await self.job_repo.update(
+            await self._update_job(
                 job_id,
+                case_id,
                 {
                     "status": "failed",
                     "error": str(e),
                     "completed_at": datetime.now(timezone.utc).isoformat(),
+                    "timings": timings.to_dict(),
                 },
             )
             logger.info("analysis.failed", case_id=case_id, job_id=job_id, error=str(e))
+            return "failed"
+
+    async def _update_job(self, job_id: str, case_id: str, update: AnalysisJobRecord) -> None:
+        """Records a job transition and publishes it to job event subscribers."""
+        await self.job_repo.update(job_id, update)
+        job_events.publish_state(job_id=job_id, case_id=case_id, **update)
@@ -0,0 +1,242 @@
+"""
+Entity resolution for vendor deduplication.
+
+Vendor names are normalized (legal suffixes and common abbreviations
+folded) and grouped into blocks by cheap keys. Only names that share a
+block are scored, in batches, with rapidfuzz, so the number of
+comparisons grows with block sizes rather than with every possible pair.
+"""
+
+import csv
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from app.schemas.entities import EntityResolutionMatch
+
+# Abbreviations folded to their long form before comparison
+ABBREVIATIONS = {
+    "pvt": "private",
+    "pte": "private",
+    "ltd": "limited",
+    "co": "company",
+    "corp": "corporation",
+    "inc": "incorporated",
+    "infra": "infrastructure",
+    "engg": "engineering",
+    "eng": "engineering",
+    "intl": "international",
+    "mfg": "manufacturing",
+    "svcs": "services",
+    "bros": "brothers",
+    "&": "and",
+}
+
+# Tokens that carry no identity once abbreviations are expanded
+LEGAL_SUFFIXES = {
+    "private",
+    "limited",
+    "llp",
+    "llc",
+    "incorporated",
+    "company",
+    "corporation",
+    "plc",
+    "gmbh",
+    "the",
+    "and",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9&]+")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+@dataclass(frozen=True)
+class VendorRecord:
+    """A vendor name to be resolved."""
+
+    vendor_id: str
+    name: str
+
+
+def name_tokens(name: str) -> list[str]:
+    """Split a vendor name into normalized identity tokens."""
+    raw = _TOKEN_PATTERN.findall(name.lower().replace("m/s", " "))
+    expanded = [ABBREVIATIONS.get(token, token) for token in raw]
+    tokens = [token for token in expanded if token not in LEGAL_SUFFIXES]
+    # A name made only of suffixes ("The Company Ltd") keeps its tokens
+    return tokens or expanded
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a vendor name for comparison."""
+    return " ".join(name_tokens(name))
+
+
+@lru_cache(maxsize=65536)
+def soundex(token: str) -> str:
+    """Classic four-character Soundex code for a single token."""
+    letters = [c for c in token.lower() if c.isalpha()]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code
+        if letter not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+def blocking_keys(tokens: list[str]) -> set[str]:
+    """
+    Compute blocking keys for a tokenized name.
+
+    - t: first identity token (exact)
+    - p: Soundex of the first token (spelling variants)
+    - g: leading bigrams of the first two tokens (abbreviation variants)
+    """
+    if not tokens:
+        return set()
+
+    first = tokens[0]
+    keys = {f"t:{first}", "g:" + "".join(token[:2] for token in tokens[:2])}
+    phonetic = soundex(first)
+    if phonetic:
+        keys.add(f"p:{phonetic}")
+    return keys
+
+
+def read_vendor_records(path: str | Path) -> list[VendorRecord]:
+    """Load vendor records from a vendors CSV (vendor_id, vendor_name)."""
+    with Path(path).open(newline="", encoding="utf-8") as handle:
+        return [
+            VendorRecord(vendor_id=row["vendor_id"], name=row["vendor_name"])
+            for row in csv.DictReader(handle)
+            if row.get("vendor_id") and row.get("vendor_name")
+        ]
+
+
+class EntityResolver:
+    """
+    Blocking-based fuzzy matcher for vendor names.
+
+    Records are bucketed by blocking key. Each block is scored as one
+    batched rapidfuzz.process.cdist call. Blocks larger than
+    max_block_size (very common first tokens) are scored as overlapping
+    windows over the sorted names, bounding the work per block.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 90.0,
+        max_block_size: int = 200,
+        scorer: Callable[..., float] = fuzz.token_sort_ratio,
+        workers: int = -1,
+    ):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.scorer = scorer
+        self.workers = workers
+
+    def build_blocks(self, normalized: list[str]) -> dict[str, list[int]]:
+        """Group record indexes by blocking key, dropping singleton blocks."""
+        blocks: dict[str, list[int]] = {}
+        for index, name in enumerate(normalized):
+            for key in blocking_keys(name.split()):
+                blocks.setdefault(key, []).append(index)
+        return {key: members for key, members in blocks.items() if len(members) > 1}
+
+    def _windows(self, members: list[int], normalized: list[str]) -> Iterable[list[int]]:
+        if len(members) <= self.max_block_size:
+            yield members
+            return
+
+        ordered = sorted(members, key=lambda i: normalized[i])
+        step = max(self.max_block_size // 2, 1)
+        for start in range(0, len(ordered) - step, step):
+            yield ordered[start:start + self.max_block_size]
+
+    def candidate_scores(self, normalized: list[str]) -> dict[tuple[int, int], tuple[float, str]]:
+        """
+        Score candidate pairs within blocks.
+
+        Returns a mapping of (i, j) index pairs (i < j) to their best
+        score and the blocking key that produced it.
+        """
+        candidates: dict[tuple[int, int], tuple[float, str]] = {}
+
+        for key, members in self.build_blocks(normalized).items():
+            for window in self._windows(members, normalized):
+                names = [normalized[i] for i in window]
+                matrix = process.cdist(
+                    names,
+                    names,
+                    scorer=self.scorer,
+                    processor=None,
+                    score_cutoff=self.threshold,
+                    dtype=np.float32,
+                    workers=self.workers,
+                )
+                rows, cols = np.nonzero(np.triu(matrix, k=1))
+                for row, col in zip(rows.tolist(), cols.tolist()):
+                    a, b = window[row], window[col]
+                    pair = (a, b) if a < b else (b, a)
+                    score = float(matrix[row, col])
+                    if pair not in candidates or candidates[pair][0] < score:
+                        candidates[pair] = (score, key)
+
+        return candidates
+
+    def resolve(self, records: list[VendorRecord]) -> list[EntityResolutionMatch]:
+        """Find likely duplicate vendors among the given records."""
+        normalized = [normalize_name(record.name) for record in records]
+        candidates = self.candidate_scores(normalized)
+
+        matches = []
+        seen: set[tuple[str, str]] = set()
+        for (a, b), (score, key) in sorted(candidates.items(), key=lambda item: -item[1][0]):
+            # Ordered by vendor ID, so a pair is stored once whichever record came first
+            record_a, record_b = sorted((records[a], records[b]), key=lambda record: record.vendor_id)
+            pair = (record_a.vendor_id, record_b.vendor_id)
+            if record_a.vendor_id == record_b.vendor_id or pair in seen:
+                continue
+            seen.add(pair)
+
+            reasons = [f"name_similarity={score:.1f}", f"blocking_key={key}"]
+            if normalized[a] == normalized[b]:
+                reasons.append("normalized_names_equal")
+
+            matches.append(EntityResolutionMatch(
+                entity_a_id=record_a.vendor_id,
+                entity_b_id=record_b.vendor_id,
+                match_score=round(score / 100, 4),
+                match_reasons=reasons,
+            ))
+
+        return matches
+
+
+def resolve_vendors(records: list[VendorRecord], **options: Any) -> list[EntityResolutionMatch]:
+    """Convenience wrapper running the default resolver."""
+    return EntityResolver(**options).resolve(records)
@@ -3,6 +3,9 @@
 The safeguards layer will ensure outputs are labeled as risk indicators.
 """
 
+LLM_HEADING = "### 🤖 AI Analysis"
+
+
 def format_explanation(heuristic_data: dict, llm_insight: str) -> str:
     """
     Combines heuristic signals and LLM insights into a structured Markdown report.
@@ -26,7 +29,7 @@ def format_explanation(heuristic_data: dict, llm_insight: str) -> str:
     # 2. Add LLM Insight
     llm_section = ""
     if llm_insight:
-        llm_section = f"\n### 🤖 AI Analysis\n\n{llm_insight}\n"
+        llm_section = f"\n{LLM_HEADING}\n\n{llm_insight}\n"
         
     # 3. Combine
     report = f"""## Risk Analysis Report
@@ -35,3 +38,9 @@ def format_explanation(heuristic_data: dict, llm_insight: str) -> str:
 {llm_section}
 """
     return report
+
+
+def llm_insight_from(report: str) -> str:
+    """The LLM insight in a report built by format_explanation, or "" if it has none."""
+    _, found, insight = report.partition(f"\n{LLM_HEADING}\n\n")
+    return insight.strip() if found else ""
@@ -0,0 +1,258 @@
+"""
+In-process pub/sub for analysis job progress.
+
+The analysis worker publishes job state transitions (queued, running,
+completed, failed, cancelled) and stage progress (extracting, ocr page n/m,
+detectors, llm, saving); GET /cases/jobs/{job_id}/events streams them
+to clients as server-sent events instead of having them poll
+GET /cases/jobs/{job_id}, which costs a token check and a PostgREST
+round trip per poll.
+
+Every subscriber has its own bounded buffer, so a slow client never
+blocks the worker or other clients. When a buffer is full the oldest
+progress event in it is dropped (the next one supersedes it anyway);
+state transitions are only dropped if the buffer holds nothing else.
+The bus also keeps each job's latest state and progress, so a client
+that subscribes mid-run starts from the current position. Publishing
+is safe from worker threads: events are handed to each subscriber on
+its own event loop.
+
+Code deeper in the pipeline reports progress without knowing the job:
+`track_job` binds the job id to the current context (like
+`collect_timings`) and `report_progress` is a no-op outside it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Lock
+from typing import Any, Literal
+
+from app.core.config import settings
+from app.core.metrics import job_event_subscribers, job_events_dropped_total
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+@dataclass(frozen=True)
+class JobEvent:
+    job_id: str
+    type: Literal["state", "progress"]
+    data: dict[str, Any]
+    seq: int = 0  # 0 for states read from the database rather than published here
+
+    @property
+    def terminal(self) -> bool:
+        return self.type == "state" and self.data.get("status") in TERMINAL_STATUSES
+
+    def to_sse(self) -> str:
+        lines = [f"id: {self.seq}"] if self.seq else []
+        lines += [f"event: {self.type}", f"data: {json.dumps(self.data, separators=(',', ':'))}"]
+        return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One client's bounded buffer of events for a job."""
+
+    def __init__(self, job_id: str, maxsize: int):
+        self.job_id = job_id
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._events: deque[JobEvent] = deque()
+        self._ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+
+    def _put(self, event: JobEvent) -> None:
+        if len(self._events) >= self.maxsize:
+            victim = next((e for e in self._events if e.type == "progress"), self._events[0])
+            self._events.remove(victim)
+            self.dropped += 1
+            job_events_dropped_total.inc()
+        self._events.append(event)
+        self._ready.set()
+
+    def deliver(self, event: JobEvent) -> None:
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._put(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    async def next(self, timeout: float | None = None) -> JobEvent | None:
+        """The next event, or None if none arrives within `timeout` seconds."""
+        while not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+        return self._events.popleft()
+
+
+@dataclass
+class _JobState:
+    state: JobEvent | None = None
+    progress: JobEvent | None = None
+    subscribers: set[Subscription] = field(default_factory=set)
+
+
+class JobEventBus:
+    def __init__(self, *, buffer: int | None = None, retained_jobs: int | None = None):
+        self.buffer = buffer or settings.job_events_buffer
+        self.retained_jobs = retained_jobs or settings.job_events_retained_jobs
+        self._jobs: OrderedDict[str, _JobState] = OrderedDict()
+        self._seq = count(1)
+        self._lock = Lock()
+
+    def publish_state(self, job_id: str, status: str, **data: Any) -> None:
+        self._publish(job_id, "state", {"job_id": job_id, "status": status, **data})
+
+    def publish_progress(self, job_id: str, stage: str, **data: Any) -> None:
+        self._publish(job_id, "progress", {"job_id": job_id, "stage": stage, **data})
+
+    def _publish(self, job_id: str, type: Literal["state", "progress"], data: dict[str, Any]) -> None:
+        with self._lock:
+            event = JobEvent(job_id, type, data, next(self._seq))
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _JobState()
+            if type == "state":
+                job.state, job.progress = event, None
+            else:
+                job.progress = event
+            subscribers = list(job.subscribers)
+            if event.terminal:
+                self._jobs.move_to_end(job_id)
+                self._evict()
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def _evict(self) -> None:
+        # Forget the oldest finished jobs nobody is watching
+        excess = len(self._jobs) - self.retained_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            job = self._jobs[job_id]
+            if job.state is not None and job.state.terminal and not job.subscribers:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def seen(self, job_id: str) -> bool:
+        """Whether this process has published anything for the job."""
+        job = self._jobs.get(job_id)
+        return job is not None and job.state is not None
+
+    def snapshot(self, job_id: str) -> list[JobEvent]:
+        """The job's latest state and, if newer, its latest progress."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return []
+            return [event for event in (job.state, job.progress) if event is not None]
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[Subscription]:
+        subscription = Subscription(job_id, self.buffer)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _JobState()
+            job.subscribers.add(subscription)
+        job_event_subscribers.inc()
+        try:
+            yield subscription
+        finally:
+            job_event_subscribers.dec()
+            with self._lock:
+                job.subscribers.discard(subscription)
+                if job.state is None and not job.subscribers:
+                    # Never published here (e.g. running in another worker process)
+                    self._jobs.pop(job_id, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+
+
+job_events = JobEventBus()
+
+_current_job: ContextVar[str | None] = ContextVar("job_events_job", default=None)
+
+
+@contextmanager
+def track_job(job_id: str) -> Iterator[None]:
+    """Routes `report_progress` calls made in this context (including awaited coroutines) to `job_id`."""
+    token = _current_job.set(job_id)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def report_progress(stage: str, **data: Any) -> None:
+    """
+    Publishes a progress event for the tracked job. Extraction and OCR
+    call it from a worker thread (cancellation.run_in_thread); events
+    reach subscribers through call_soon_threadsafe as they happen.
+    """
+    job_id = _current_job.get()
+    if job_id is not None:
+        job_events.publish_progress(job_id, stage, **data)
+
+
+async def job_event_stream(
+    job: dict[str, Any],
+    *,
+    refresh: Callable[[], Awaitable[dict[str, Any] | None]],
+    bus: JobEventBus = job_events,
+    keepalive: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    SSE body for one job, starting from `job` (its row, read by the caller).
+
+    Ends after the terminal state. A job this process has not seen is
+    running in another worker process; its state is re-read with
+    `refresh` at each keepalive instead.
+    """
+    job_id = job["job_id"]
+    keepalive = keepalive or settings.job_events_keepalive_seconds
+    with bus.subscribe(job_id) as subscription:
+        # Subscribed first, so nothing published after the snapshot is missed
+        snapshot = bus.snapshot(job_id) or [JobEvent(job_id, "state", job)]
+        last_seq = max(event.seq for event in snapshot)
+        status = next((e.data["status"] for e in snapshot if e.type == "state"), job["status"])
+        for event in snapshot:
+            yield event.to_sse()
+        if status in TERMINAL_STATUSES:
+            return
+
+        while True:
+            event = await subscription.next(keepalive)
+            if event is None:
+                if not bus.seen(job_id):
+                    current = await refresh()
+                    if current and current.get("status") != status:
+                        event = JobEvent(job_id, "state", current)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+            elif event.seq <= last_seq:
+                continue
+            else:
+                last_seq = event.seq
+            yield event.to_sse()
+            if event.type == "state":
+                status = event.data.get("status", status)
+            if event.terminal:
+                return
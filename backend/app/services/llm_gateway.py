@@ -0,0 +1,211 @@
+"""
+LLM gateway: one place for provider clients, concurrency, retries and caching.
+
+- A single provider client is created per process and reused.
+- Calls are async; a semaphore bounds how many are in flight.
+- Transient failures (rate limits, 5xx, transport errors) are retried
+  with jittered exponential backoff via tenacity.
+- Responses are cached by a hash of (provider, model, prompt), and
+  identical prompts issued concurrently share a single upstream call
+  (via SingleFlight), which runs in its own task: a caller cancelled
+  mid-call gives up only its own wait, never the others'.
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from app.core.config import settings
+from app.core.metrics import llm_cache_total
+from app.utils.single_flight import SingleFlight
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TransientLLMError(Exception):
+    """A provider failure worth retrying."""
+
+
+class LLMProvider(ABC):
+    """Backend that turns a prompt into text."""
+
+    name: str = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
+        super().__init__(model)
+        self._api_key = api_key
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client(api_key=self._api_key)
+        return self._client
+
+    async def generate(self, prompt: str) -> str:
+        response = await self._get_client().aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+        )
+        return response.text or ""
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            try:
+                self._client.close()
+            except Exception:
+                pass
+            self._client = None
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Deterministic local provider for tests and offline runs.
+
+    Optionally fails the first `fail_times` calls with a transient error
+    and sleeps `latency` seconds per call.
+    """
+
+    name = "fake"
+
+    def __init__(self, model: str = "fake", *, latency: float = 0.0, fail_times: int = 0):
+        super().__init__(model)
+        self.latency = latency
+        self.fail_times = fail_times
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise TransientLLMError("simulated transient failure")
+            digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+            return f"Fake analysis ({len(prompt)} chars, {digest}): no provider configured."
+        finally:
+            self.in_flight -= 1
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (TransientLLMError, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    # google-genai APIError (and most HTTP client errors) expose a status code
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code in RETRYABLE_STATUS_CODES
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        provider: LLMProvider,
+        *,
+        max_concurrency: int = 4,
+        max_attempts: int = 3,
+        cache_size: int = 1024,
+        backoff_max_seconds: float = 20.0,
+    ):
+        self.provider = provider
+        self.max_attempts = max_attempts
+        self.cache_size = cache_size
+        self.backoff_max_seconds = backoff_max_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._flights: SingleFlight[str] = SingleFlight()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def cache_key(self, prompt: str) -> str:
+        raw = f"{self.provider.name}\0{self.provider.model}\0{prompt}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def generate(self, prompt: str) -> str:
+        key = self.cache_key(prompt)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            llm_cache_total.inc("hit")
+            return self._cache[key]
+
+        if key in self._flights:
+            # Same prompt already in flight: share its result
+            self.cache_hits += 1
+            llm_cache_total.inc("hit")
+        else:
+            self.cache_misses += 1
+            llm_cache_total.inc("miss")
+        return await self._flights.do(key, lambda: self._fetch(key, prompt))
+
+    async def _fetch(self, key: str, prompt: str) -> str:
+        result = await self._call_with_retry(prompt)
+        self._remember(key, result)
+        return result
+
+    async def _call_with_retry(self, prompt: str) -> str:
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=self.backoff_max_seconds),
+            retry=retry_if_exception(is_retryable),
+            reraise=True,
+        ):
+            with attempt:
+                # Held per attempt, so a backoff sleep does not block other prompts
+                async with self._semaphore:
+                    return await self.provider.generate(prompt)
+        raise RuntimeError("unreachable")
+
+    def _remember(self, key: str, value: str) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+
+def build_provider() -> LLMProvider | None:
+    if settings.llm_provider == "fake":
+        return FakeLLMProvider()
+    if settings.gemini_api_key:
+        return GeminiProvider(settings.gemini_api_key, model=settings.llm_model)
+    return None
+
+
+@lru_cache
+def get_llm_gateway() -> LLMGateway | None:
+    """Process-wide gateway, or None when no provider is configured."""
+    provider = build_provider()
+    if provider is None:
+        return None
+    return LLMGateway(
+        provider,
+        max_concurrency=settings.llm_max_concurrency,
+        max_attempts=settings.llm_max_attempts,
+        cache_size=settings.llm_cache_size,
+    )
@@ -1,52 +1,187 @@
+import asyncio
+from dataclasses import dataclass
+
 from app.core.config import settings
+from app.services.llm_gateway import LLMGateway, get_llm_gateway
+from app.services.signals.bid_rigging import extract_bids
+from app.services.signals.keywords import KEYWORD_CATEGORIES, find_keywords
+from app.services.signals.urgency import COMPILED_URGENCY_PATTERNS
+from app.utils.logging import logger
 
+NO_FINDINGS = "NO_FINDINGS"
 
-def is_configured() -> bool:
-    return bool(settings.gemini_api_key)
 
+@dataclass(frozen=True)
+class TextChunk:
+    """A slice of the document with its character offsets."""
 
-def analyze_document(text: str) -> str:
-    """
-    Analyzes the document text using Gemini to find corruption risks.
-    """
-    if not is_configured():
-        return "LLM analysis skipped (API key not configured)."
+    index: int
+    start: int
+    end: int
+    text: str
+    priority: float = 0.0
 
-    try:
-        from google import genai
-        from google.genai import errors
-    except Exception:
-        return "LLM analysis skipped (google-genai not installed)."
 
-    client = genai.Client(api_key=settings.gemini_api_key)
+def is_configured() -> bool:
+    return bool(settings.gemini_api_key) or settings.llm_provider == "fake"
+
 
-    prompt = f"""
+def build_prompt(text: str) -> str:
+    return f"""
     You are an expert anti-corruption analyst. Analyze the following document text for indicators of fraud, corruption, or irregularity.
-    
+
     Focus on:
     - Unusually high prices or round numbers.
     - Vendor collusion or conflict of interest clues.
     - Urgency or bypassing of procedure.
     - Vague descriptions of services.
-    
+
     Provide a concise summary of risk indicators. If none found, state that the document appears standard.
-    
+
     Document Text:
-    {text[:10000]}  # Truncate to avoid context limit for MVP
+    {text[:settings.llm_chunk_chars]}
     """
 
+
+def build_chunk_prompt(chunk: TextChunk, total: int) -> str:
+    return f"""
+    You are an expert anti-corruption analyst reviewing section {chunk.index + 1} of {total} of a longer document.
+
+    List any indicators of fraud, corruption, or irregularity in this section as short bullet points:
+    - Unusually high prices or round numbers.
+    - Vendor collusion or conflict of interest clues.
+    - Urgency or bypassing of procedure.
+    - Vague descriptions of services.
+
+    Quote amounts and names exactly. If this section has no indicators, reply with exactly {NO_FINDINGS}.
+
+    Section Text:
+    {chunk.text}
+    """
+
+
+def build_reduce_prompt(findings: list[tuple[TextChunk, str]], total: int) -> str:
+    sections = "\n\n".join(f"Section {chunk.index + 1}:\n{result.strip()}" for chunk, result in findings)
+    return f"""
+    You are an expert anti-corruption analyst. Below are findings extracted from {len(findings)} of {total} sections of one document.
+
+    Merge them into a concise summary of risk indicators for the whole document. Combine duplicates, keep the most specific evidence, and note patterns that span sections.
+
+    Findings:
+    {sections}
+    """
+
+
+def chunk_text(text: str, size: int, overlap: int) -> list[TextChunk]:
+    """
+    Split text into overlapping chunks of about `size` characters.
+
+    Chunk ends are pulled back to the last newline or space in the final
+    fifth of the chunk so sentences and table rows are not cut mid-way.
+    """
+    if len(text) <= size:
+        return [TextChunk(index=0, start=0, end=len(text), text=text)]
+
+    overlap = min(overlap, size // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            floor = start + size * 4 // 5
+            cut = max(text.rfind("\n", floor, end), text.rfind(" ", floor, end))
+            if cut > floor:
+                end = cut
+        chunks.append(TextChunk(index=len(chunks), start=start, end=end, text=text[start:end]))
+        if end >= len(text):
+            break
+        start = end - overlap
+    return chunks
+
+
+def chunk_priority(text: str) -> float:
+    """Weight of heuristic signals firing in a chunk (keywords, urgency, bids)."""
+    score = 0.0
+    for config in KEYWORD_CATEGORIES.values():
+        score += len(find_keywords(text, config["keywords"])) * config["weight"]
+    for pattern, _, weight in COMPILED_URGENCY_PATTERNS:
+        score += len(pattern.findall(text)) * weight
+    score += len(extract_bids(text)) * 1.5
+    return score
+
+
+def select_chunks(chunks: list[TextChunk], budget: int) -> list[TextChunk]:
+    """
+    Pick at most `budget` chunks, favouring those where signals fired.
+
+    The opening chunk (title, parties, tender details) is always kept;
+    the rest are ranked by priority, earlier chunks winning ties.
+    """
+    if len(chunks) <= budget:
+        return chunks
+
+    ranked = sorted(chunks[1:], key=lambda c: (-c.priority, c.index))
+    selected = [chunks[0], *ranked[:max(budget - 1, 0)]]
+    return sorted(selected, key=lambda c: c.index)
+
+
+async def _map_reduce(gateway: LLMGateway, text: str) -> str:
+    chunks = [
+        TextChunk(index=c.index, start=c.start, end=c.end, text=c.text, priority=chunk_priority(c.text))
+        for c in chunk_text(text, settings.llm_chunk_chars, settings.llm_chunk_overlap)
+    ]
+    selected = select_chunks(chunks, settings.llm_max_chunks)
+
+    # One failed section (timeout, provider error) must not discard the others
+    results = await asyncio.gather(
+        *(gateway.generate(build_chunk_prompt(c, len(chunks))) for c in selected), return_exceptions=True
+    )
+    findings, failed = [], []
+    for chunk, result in zip(selected, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning("llm.chunk_failed", section=chunk.index + 1, error=str(result))
+            failed.append((chunk, result))
+        elif NO_FINDINGS not in result:
+            findings.append((chunk, result))
+    if len(failed) == len(selected):
+        raise failed[0][1]
+
+    coverage = f"Reviewed {len(selected) - len(failed)} of {len(chunks)} sections (prioritized by heuristic signals)."
+    if failed:
+        sections = ", ".join(str(chunk.index + 1) for chunk, _ in failed)
+        coverage += f" Section(s) {sections} could not be analyzed."
+    if not findings:
+        return f"The document appears standard; no risk indicators were found. {coverage}"
+    if len(findings) == 1:
+        return f"{findings[0][1].strip()}\n\n{coverage}"
+
+    summary = await gateway.generate(build_reduce_prompt(findings, len(chunks)))
+    return f"{summary.strip()}\n\n{coverage}"
+
+
+async def analyze_document(text: str) -> str:
+    """
+    Analyzes the document text using the LLM gateway to find corruption risks.
+
+    Documents longer than one chunk are analyzed map-reduce style:
+    overlapping chunks are reviewed concurrently (up to LLM_MAX_CHUNKS,
+    chosen by signal density) and their findings merged in a final call.
+    """
+    if not is_configured():
+        return "LLM analysis skipped (API key not configured)."
+
+    gateway = get_llm_gateway()
+    if gateway is None:
+        return "LLM analysis skipped (API key not configured)."
+
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
-        return response.text
-    except errors.APIError as e:
-        return f"Error during LLM analysis: {e.message}"
+        if len(text) <= settings.llm_chunk_chars:
+            return await gateway.generate(build_prompt(text))
+        return await _map_reduce(gateway, text)
+    except ImportError:
+        return "LLM analysis skipped (google-genai not installed)."
     except Exception as e:
-        return f"Error during LLM analysis: {str(e)}"
-    finally:
-        try:
-            client.close()
-        except Exception:
-            pass
+        message = getattr(e, "message", None) or str(e)
+        return f"Error during LLM analysis: {message}"
@@ -0,0 +1,155 @@
+"""
+Triage policy deciding whether a case needs LLM analysis.
+
+The heuristic ensemble is cheap; the LLM call is not. Based on the
+aggregated heuristic result a case is either sent to the LLM now,
+deferred to a low-priority background queue, or skipped. Every decision
+is returned in a form suitable for storing in the case signals.
+"""
+
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from app.core.config import settings
+from app.core.metrics import deferred_llm_queue_depth
+from app.services.signals.engine import AggregatedRiskResult
+from app.utils.logging import logger
+
+TriageAction = Literal["run", "defer", "skip"]
+
+
+@dataclass(frozen=True)
+class TriagePolicy:
+    """
+    Thresholds for LLM triage.
+
+    - No detector triggered: skip.
+    - Score >= run_min_score or >= run_min_detectors triggered: run now.
+    - Anything in between: defer (or skip when deferral is disabled).
+    """
+
+    enabled: bool = True
+    run_min_score: int = 25
+    run_min_detectors: int = 2
+    defer_enabled: bool = True
+
+    @classmethod
+    def from_settings(cls) -> "TriagePolicy":
+        return cls(
+            enabled=settings.llm_triage_enabled,
+            run_min_score=settings.llm_triage_run_min_score,
+            run_min_detectors=settings.llm_triage_run_min_detectors,
+            defer_enabled=settings.llm_triage_defer_enabled,
+        )
+
+    def decide(self, result: AggregatedRiskResult) -> "TriageDecision":
+        triggered = int(result.signals.get("detectors_triggered", 0))
+
+        def decision(action: TriageAction, reason: str) -> TriageDecision:
+            return TriageDecision(
+                action=action,
+                reason=reason,
+                risk_score=result.risk_score,
+                confidence=result.confidence,
+                detectors_triggered=triggered,
+                policy=asdict(self),
+            )
+
+        if not self.enabled:
+            return decision("run", "Triage disabled.")
+        if triggered == 0:
+            return decision("skip", "No heuristic detectors triggered.")
+        if result.risk_score >= self.run_min_score:
+            return decision("run", f"Heuristic score {result.risk_score} >= {self.run_min_score}.")
+        if triggered >= self.run_min_detectors:
+            return decision("run", f"{triggered} detectors triggered (>= {self.run_min_detectors}).")
+
+        reason = f"Low heuristic score {result.risk_score} with {triggered} detector(s) triggered."
+        return decision("defer" if self.defer_enabled else "skip", reason)
+
+
+@dataclass(frozen=True)
+class TriageDecision:
+    action: TriageAction
+    reason: str
+    risk_score: int
+    confidence: float
+    detectors_triggered: int
+    policy: dict[str, Any]
+
+    def placeholder(self) -> str:
+        """Text shown in place of the LLM section when it did not run."""
+        if self.action == "defer":
+            return f"AI analysis deferred to the low-priority queue. {self.reason}"
+        return f"AI analysis skipped by triage policy. {self.reason}"
+
+    def to_signal(self) -> dict[str, Any]:
+        return {**asdict(self), "decided_at": datetime.now(timezone.utc).isoformat()}
+
+
+class DeferredLLMQueue:
+    """
+    Low-priority in-process queue for deferred LLM work.
+
+    Jobs run one at a time (by default) on a background task started on
+    first use, so deferred analyses never compete with interactive ones
+    for gateway slots. Keys stay known (`key in queue`) while queued or
+    running, and after failing, so lost work can be re-submitted without
+    retrying a failing job on every request.
+    """
+
+    def __init__(self, *, concurrency: int = 1, max_size: int = 1000):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self._queue: asyncio.Queue[tuple[str, Callable[[], Awaitable[None]]]] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._keys: set[str] = set()
+
+    def __len__(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def submit(self, key: str, job: Callable[[], Awaitable[None]]) -> bool:
+        """Enqueue a job; returns False when the queue is full."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if not self._workers:
+            # A fresh context: the submitting job's progress id and cancel token must not carry over
+            self._workers = [
+                asyncio.create_task(self._worker(), context=contextvars.Context()) for _ in range(self.concurrency)
+            ]
+        try:
+            self._queue.put_nowait((key, job))
+        except asyncio.QueueFull:
+            logger.warning("llm.deferred.queue_full", key=key)
+            return False
+        self._keys.add(key)
+        deferred_llm_queue_depth.inc()
+        return True
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            key, job = await self._queue.get()
+            deferred_llm_queue_depth.dec()
+            try:
+                await job()
+                self._keys.discard(key)
+                logger.info("llm.deferred.completed", key=key)
+            except Exception:
+                logger.exception("llm.deferred.failed", key=key)
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+
+deferred_llm_queue = DeferredLLMQueue()
@@ -0,0 +1,310 @@
+"""
+Object storage backends for uploaded documents.
+
+Uploads are addressed by key (e.g. "ab/cd/<sha256>.pdf") rather than by
+a path on the API node, so any worker that can reach the configured
+backend can read them. Two implementations are provided:
+
+- LocalDiskStorage: a directory on the local filesystem.
+- S3Storage: any S3-protocol service (AWS S3, MinIO, R2, ...), spoken
+  directly over httpx with SigV4 request signing.
+
+Both support streaming reads, ranged reads and streaming writes from a
+staged local file. The interface is synchronous and blocks on disk or
+network I/O: async code calls it from a worker thread (uploads through
+run_in_threadpool, analysis through cancellation.run_in_thread), never
+on the event loop.
+"""
+
+import hashlib
+import hmac
+import os
+import shutil
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class ObjectNotFound(Exception):
+    """Raised when a key does not exist in the backend."""
+
+
+class ObjectStorage(ABC):
+    """Minimal blob store interface used by uploads and extraction."""
+
+    name: str = "base"
+
+    @property
+    def staging_dir(self) -> Path | None:
+        """Directory to stage uploads in (None means the system temp dir)."""
+        return None
+
+    @abstractmethod
+    def store_file(self, key: str, path: Path) -> None:
+        """Stream a staged local file into the store under key, consuming it."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        pass
+
+    @abstractmethod
+    def iter_chunks(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Yield the object's bytes in [start, end) without buffering it whole."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        return b"".join(self.iter_chunks(key, start=start, end=start + length))
+
+    def read_bytes(self, key: str) -> bytes:
+        return b"".join(self.iter_chunks(key))
+
+    def local_path(self, key: str) -> Path | None:
+        """A filesystem path for the object, if the backend has one."""
+        return None
+
+
+class LocalDiskStorage(ObjectStorage):
+    name = "local"
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    @property
+    def staging_dir(self) -> Path:
+        # Same filesystem as the objects, so store_file is an atomic rename
+        path = self.root / ".tmp"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def store_file(self, key: str, path: Path) -> None:
+        destination = self._path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, destination)
+        except OSError:
+            # Staged on another filesystem: copy, then rename into place
+            partial = destination.with_name(destination.name + ".part")
+            shutil.copyfile(path, partial)
+            os.replace(partial, destination)
+            Path(path).unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        try:
+            return self._path(key).stat().st_size
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    def iter_chunks(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        try:
+            handle = self._path(key).open("rb")
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+        with handle:
+            handle.seek(start)
+            remaining = None if end is None else max(end - start, 0)
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = handle.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Path | None:
+        path = self._path(key)
+        return path if path.is_file() else None
+
+
+class S3Storage(ObjectStorage):
+    """
+    S3-protocol backend using path-style addressing.
+
+    Payloads are sent as UNSIGNED-PAYLOAD so large files can be streamed
+    without hashing them twice; the request itself is still SigV4 signed.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        *,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = "us-east-1",
+        transport: httpx.BaseTransport | None = None,
+        timeout: float = 60.0,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self._client = httpx.Client(timeout=timeout, transport=transport)
+
+    def _url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/')}"
+
+    def _signed_headers(self, method: str, url: str, headers: dict[str, str] | None = None) -> dict[str, str]:
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        parts = urlsplit(url)
+
+        signed = {
+            **(headers or {}),
+            "host": parts.netloc,
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+            "x-amz-date": amz_date,
+        }
+        names = sorted(name.lower() for name in signed)
+        lowered = {name.lower(): value.strip() for name, value in signed.items()}
+        canonical_request = "\n".join([
+            method,
+            parts.path or "/",
+            parts.query,
+            "".join(f"{name}:{lowered[name]}\n" for name in names),
+            ";".join(names),
+            "UNSIGNED-PAYLOAD",
+        ])
+
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in (date_stamp, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        signed["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+        return signed
+
+    def store_file(self, key: str, path: Path) -> None:
+        url = self._url(key)
+        size = os.path.getsize(path)
+        headers = self._signed_headers("PUT", url, {"content-length": str(size)})
+        with open(path, "rb") as handle:
+            response = self._client.put(url, headers=headers, content=_iter_file(handle))
+        response.raise_for_status()
+        Path(path).unlink(missing_ok=True)
+
+    def _head(self, key: str) -> httpx.Response:
+        url = self._url(key)
+        return self._client.head(url, headers=self._signed_headers("HEAD", url))
+
+    def exists(self, key: str) -> bool:
+        response = self._head(key)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    def size(self, key: str) -> int:
+        response = self._head(key)
+        if response.status_code == 404:
+            raise ObjectNotFound(key)
+        response.raise_for_status()
+        return int(response.headers["content-length"])
+
+    def iter_chunks(
+        self,
+        key: str,
+        *,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        if end is not None and end <= start:
+            return
+
+        url = self._url(key)
+        extra = {}
+        if start or end is not None:
+            # HTTP ranges are inclusive
+            extra["range"] = f"bytes={start}-{'' if end is None else end - 1}"
+
+        with self._client.stream("GET", url, headers=self._signed_headers("GET", url, extra)) as response:
+            if response.status_code == 404:
+                raise ObjectNotFound(key)
+            response.raise_for_status()
+            yield from response.iter_bytes(chunk_size)
+
+    def delete(self, key: str) -> None:
+        url = self._url(key)
+        response = self._client.delete(url, headers=self._signed_headers("DELETE", url))
+        if response.status_code != 404:
+            response.raise_for_status()
+
+
+def _iter_file(handle, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    while chunk := handle.read(chunk_size):
+        yield chunk
+
+
+@lru_cache
+def get_object_storage() -> ObjectStorage:
+    """The configured storage backend (one instance per process)."""
+    if settings.storage_backend == "s3":
+        if not (settings.s3_endpoint_url and settings.s3_bucket):
+            raise RuntimeError("S3 storage is not configured (S3_ENDPOINT_URL / S3_BUCKET missing)")
+        return S3Storage(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key_id=settings.s3_access_key_id or "",
+            secret_access_key=settings.s3_secret_access_key or "",
+            region=settings.s3_region,
+        )
+    return LocalDiskStorage(settings.storage_local_root)
@@ -9,6 +9,25 @@ from typing import Any
 
 from app.services.signals import SignalEngine
 from app.services.signals.base import AnalysisContext
+from app.services.signals.engine import AggregatedRiskResult
+
+
+def compute_risk_result(text: str, case_id: str | None = None) -> AggregatedRiskResult:
+    """Runs the signal engine ensemble over plain text (of case `case_id`, if it is one)."""
+    metadata = {"case_id": case_id} if case_id else {}
+    return SignalEngine().analyze(AnalysisContext(text=text, metadata=metadata))
+
+
+def summarize_signals(result: AggregatedRiskResult) -> dict[str, Any]:
+    """The signals dict persisted on a case for an aggregated result."""
+    return {
+        "risk_level": result.risk_level,
+        "confidence": result.confidence,
+        "top_factors": result.top_factors,
+        "recommendations": result.recommendations,
+        "detectors_triggered": result.signals.get("detectors_triggered", 0),
+        "detector_breakdown": result.signals.get("detector_breakdown", {}),
+    }
 
 
 def compute_risk_score(text: str) -> tuple[int, dict, str]:
@@ -24,20 +43,8 @@ def compute_risk_score(text: str) -> tuple[int, dict, str]:
     - recommendations: actionable next steps
     - detector_breakdown: per-detector results
     """
-    context = AnalysisContext(text=text)
-    engine = SignalEngine()
-    result = engine.analyze(context)
-
-    signals: dict[str, Any] = {
-        "risk_level": result.risk_level,
-        "confidence": result.confidence,
-        "top_factors": result.top_factors,
-        "recommendations": result.recommendations,
-        "detectors_triggered": result.signals.get("detectors_triggered", 0),
-        "detector_breakdown": result.signals.get("detector_breakdown", {}),
-    }
-
-    return result.risk_score, signals, result.explanation
+    result = compute_risk_result(text)
+    return result.risk_score, summarize_signals(result), result.explanation
 
 
 def compute_risk_score_detailed(
@@ -15,6 +15,7 @@ from .bid_rigging import BidRiggingDetector
 from .keywords import KeywordDetector
 from .urgency import UrgencyDetector
 from .velocity import VelocityDetector
+from .vendor_baseline import VendorBaselineDetector
 
 __all__ = [
     "SignalResult",
@@ -27,4 +28,5 @@ __all__ = [
     "KeywordDetector",
     "UrgencyDetector",
     "VelocityDetector",
+    "VendorBaselineDetector",
 ]
@@ -0,0 +1,119 @@
+"""
+Re-aggregation of stored detector breakdowns.
+
+Every analyzed case persists its `detector_breakdown` (score, weight,
+confidence per detector), which is all the aggregation needs. Two
+entry points work from it without running any detector:
+
+- `aggregate_breakdown`: the full result for one case (risk level, top
+  factors, recommendations), optionally with new weights.
+- `BreakdownMatrix`: N cases packed into (cases x detectors) arrays, so
+  `risk_scores` re-scores all of them for a weight vector in a single
+  vectorized pass. Used to simulate weight changes over the whole case
+  history before committing to them.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .base import SignalResult
+from .engine import AggregatedRiskResult, aggregate_results
+
+RISK_LEVELS = np.array(["low", "medium", "high", "critical"])
+# Lower bounds of medium, high and critical (see classify_risk_level)
+RISK_LEVEL_BOUNDS = np.array([25, 50, 75])
+
+
+def aggregate_breakdown(
+    breakdown: Mapping[str, Mapping[str, Any]],
+    weights: Mapping[str, float] | None = None,
+) -> AggregatedRiskResult:
+    """Aggregates a stored breakdown, with `weights` overriding the stored ones."""
+    results = []
+    for name, entry in breakdown.items():
+        if not isinstance(entry, Mapping):
+            continue
+        result = SignalResult.from_breakdown(name, dict(entry))
+        if weights and name in weights:
+            result.weight = weights[name]
+        results.append(result)
+    return aggregate_results(results)
+
+
+@dataclass(frozen=True)
+class BreakdownMatrix:
+    """
+    Stored breakdowns of many cases as (cases x detectors) float arrays.
+
+    A detector missing from a case's breakdown has score 0, so it never
+    counts as triggered for that case.
+    """
+
+    detectors: tuple[str, ...]
+    scores: np.ndarray
+    weights: np.ndarray  # as stored per case
+    confidences: np.ndarray
+
+    @classmethod
+    def from_breakdowns(
+        cls,
+        breakdowns: Iterable[Mapping[str, Mapping[str, Any]]],
+        detectors: Sequence[str] | None = None,
+    ) -> "BreakdownMatrix":
+        breakdowns = list(breakdowns)
+        if detectors is None:
+            detectors = list(dict.fromkeys(name for breakdown in breakdowns for name in breakdown))
+        column = {name: j for j, name in enumerate(detectors)}
+
+        shape = (len(breakdowns), len(detectors))
+        scores, weights, confidences = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        for i, breakdown in enumerate(breakdowns):
+            for name, entry in breakdown.items():
+                j = column.get(name)
+                if j is None or not isinstance(entry, Mapping):
+                    continue
+                scores[i, j] = entry.get("score") or 0.0
+                weights[i, j] = entry.get("weight", 1.0)
+                confidences[i, j] = entry.get("confidence", 1.0)
+
+        return cls(tuple(detectors), scores, weights, confidences)
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+    def weight_matrix(self, weights: Mapping[str, float] | None = None) -> np.ndarray:
+        """Stored weights with the columns named in `weights` replaced."""
+        if not weights:
+            return self.weights
+        matrix = self.weights.copy()
+        for j, name in enumerate(self.detectors):
+            if name in weights:
+                matrix[:, j] = weights[name]
+        return matrix
+
+    def risk_scores(self, weights: Mapping[str, float] | None = None) -> np.ndarray:
+        """
+        Integer risk score per case, identical to `aggregate_results`.
+
+        Columns are accumulated one detector at a time, in the same order
+        and with the same float operations as the scalar aggregation, so
+        scores that land exactly on a level boundary agree.
+        """
+        w = self.weight_matrix(weights)
+        weighted = np.zeros(len(self))
+        total = np.zeros(len(self))
+        for j in range(len(self.detectors)):
+            triggered = self.scores[:, j] > 0
+            weighted += np.where(triggered, self.scores[:, j] * w[:, j] * self.confidences[:, j], 0.0)
+            total += np.where(triggered, w[:, j], 0.0)
+
+        raw = np.divide(weighted, total, out=np.zeros(len(self)), where=total > 0)
+        return np.minimum(raw, 100).astype(np.int64)
+
+
+def risk_levels(scores: np.ndarray) -> np.ndarray:
+    """Risk level label for each score (vectorized classify_risk_level)."""
+    return RISK_LEVELS[np.searchsorted(RISK_LEVEL_BOUNDS, scores, side="right")]
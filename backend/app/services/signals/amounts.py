@@ -0,0 +1,401 @@
+"""
+Shared amount extraction for the numeric detectors.
+
+`AmountIndex.from_text` tokenizes a document once and records every
+numeric token exactly once, with its character span, currency, the
+nearest preceding label (invoice / bid / payment / total) and a kind:
+
+- money:  has a currency marker or magnitude word, or a label on the same line
+- number: a bare number
+- id:     an identifier such as "Invoice #12345" or "INV-001"
+- date:   a date such as 2024-01-19, 01/19/2024 or 19.01.2024 (one token,
+          valued as its year), or part of a partial date such as 01/2024
+
+Numbers are parsed in the document's locale: US grouping ("1,234.56"),
+Indian lakh/crore grouping ("49,85,000"), decimal comma ("1.234,56"),
+and magnitude words ("49.85 lakh", "1.2 crore"). Currencies come from
+symbols, codes or words ("₹", "INR", "rupees"); each amount is also
+converted to the base currency of a `RateTable` in the same pass.
+
+Storage is array-backed (parallel `array` columns plus small lookup
+tables), so a document with thousands of amounts stays compact. The
+index is cached on `AnalysisContext.amount_index`, so round_numbers,
+split_invoice and benford all read the same tokens.
+"""
+
+import re
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+from app.core.config import settings
+
+from .currency import CODES, MARKED_ONLY_SCALES, SCALES, SYMBOLS, WORDS, RateTable, currency_of, get_rate_table
+from .patterns import compile_pattern
+
+KINDS = ("money", "number", "id", "date")
+MONEY, NUMBER, ID, DATE = range(len(KINDS))
+NUMERIC_KINDS = (MONEY, NUMBER)
+
+LABELS = ("", "invoice", "bid", "payment", "total")
+_LABEL_WORDS = {
+    "invoice": 1, "inv": 1, "bill": 1,
+    "bid": 2, "quote": 2, "proposal": 2, "offer": 2,
+    "payment": 3, "paid": 3,
+    "amount": 4, "total": 4, "sum": 4,
+}
+
+# How far back on the same line to look for a label
+LABEL_WINDOW = 40
+
+DECIMAL_MARKS = (".", ",")
+
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_PREFIX = (
+    r'(?:' + _alternation(k for k in SYMBOLS if not k[0].isalpha())
+    + r'|\b(?:' + _alternation([k for k in SYMBOLS if k[0].isalpha()] + list(CODES)) + r'))'
+)
+# Longest prefix marker plus the space allowed between it and the digits
+_PREFIX_WINDOW = max(len(k) for k in [*SYMBOLS, *CODES]) + 1
+# Symbols written after the number, as in "1.234,56 €"
+_SUFFIX_SYMBOLS = ("€", "£")
+_SUFFIX = r'(?:' + _alternation(_SUFFIX_SYMBOLS) + r'|(?:' + _alternation(list(CODES) + list(WORDS)) + r')\b)'
+_SCALE = r'(?:' + _alternation(SCALES) + r')\b'
+
+# Number grammars by decimal mark. Alternatives are tried in order and
+# none nests quantifiers, so matching stays linear. The other locale's
+# grouping is only accepted where it cannot be misread (two or more
+# groups, or both separators present).
+_NUMBER_FORMS = {
+    ".": (
+        r'\d{1,2}(?:,\d{2})+,\d{3}(?:\.\d+)?'  # 49,85,000 (lakh/crore grouping)
+        r'|\d{1,3}(?:,\d{3})+(?:\.\d+)?'  # 1,234,567.89
+        r'|\d{1,3}(?:\.\d{3}){2,}(?:,\d+)?|\d{1,3}(?:\.\d{3})+,\d+'  # 1.234.567 / 1.234,56
+        r'|\d+(?:\.\d+)?'
+    ),
+    ",": (
+        r'\d{1,3}(?:\.\d{3})+(?:,\d+)?'  # 1.234.567,89
+        r'|\d{1,2}(?:,\d{2})+,\d{3}\.\d+'  # 49,85,000.00
+        r'|\d{1,3}(?:,\d{3}){2,}(?:\.\d+)?|\d{1,3}(?:,\d{3})+\.\d+'  # 1,234,567 / 1,234.56
+        r'|\d+(?:,\d+)?'
+    ),
+}
+
+# Whole dates are matched first so their parts are never read as numbers
+_DATE = r'\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})'
+
+# Scanning happens in two steps. RUN_PATTERN finds every run of digits
+# joined by single separators; it has no alternation, so the scan is
+# cheap. Plain runs ("4985000", "1234.56") are parsed directly, and only
+# the rest ("1,234.56", "49,85,000", "2024-01-19", CSV fields such as
+# "120,2024") are split into tokens with the grammar in NUMBER_PATTERNS.
+RUN_PATTERN = compile_pattern(r'\d+(?:[.,/-]\d+)*')
+NUMBER_PATTERNS = {
+    mark: compile_pattern(r'(?P<date>' + _DATE + r')(?!\d)|(?P<num>' + form + r')(?!\d)')
+    for mark, form in _NUMBER_FORMS.items()
+}
+# Currency markers are only looked for when the characters next to a
+# number could start one.
+SUFFIX_PATTERN = compile_pattern(
+    r'(?:\s?(?P<scale>' + _SCALE + r'))?(?:\s?(?P<post>' + _SUFFIX + r'))?', re.IGNORECASE
+)
+PREFIX_PATTERN = compile_pattern(r'(?P<pre>' + _PREFIX + r') ?\Z', re.IGNORECASE)
+# The leading class lets the engine skip straight to plausible first letters
+_LABEL_INITIALS = "".join(sorted({w[0] for w in _LABEL_WORDS}))
+LABEL_PATTERN = compile_pattern(
+    r'(?=[' + _LABEL_INITIALS + _LABEL_INITIALS.upper() + r'])\b(' + "|".join(_LABEL_WORDS) + r')\b',
+    re.IGNORECASE,
+)
+
+# First unambiguous evidence of a document's decimal mark
+DECIMAL_EVIDENCE = compile_pattern(
+    r'(?P<comma>\d\.\d{3},\d{1,2}(?!\d)|€\s?\d+,\d{2}(?!\d)|\d,\d{2}\s?(?:€|EUR\b))'
+    r'|(?P<point>\d,\d{3}\.\d{1,2}(?!\d))'
+)
+DATE_SEPARATORS = "-/."
+
+
+class Amount(NamedTuple):
+    value: float
+    start: int
+    end: int
+    currency: str | None
+    label: str | None
+    kind: str
+    normalized: float
+
+    @property
+    def is_money(self) -> bool:
+        return self.kind == "money"
+
+
+def detect_decimal_mark(text: str) -> str:
+    """"," for documents written with a decimal comma, "." otherwise."""
+    match = DECIMAL_EVIDENCE.search(text)
+    return "," if match and match.group("comma") else "."
+
+
+def parsing_parameters(*, rates: bool = True) -> dict[str, Any]:
+    """
+    Settings that change what `AmountIndex.from_text` yields, for the
+    `parameters()` of detectors reading it: the decimal mark and, unless
+    the detector ignores conversion, the rate table.
+    """
+    params: dict[str, Any] = {"decimal_mark": settings.amount_decimal_mark}
+    if rates:
+        params["currency"] = get_rate_table().to_dict()
+    return params
+
+
+def parse_number(raw: str, decimal: str = ".") -> float:
+    """
+    Value of a number matched by NUMBER_PATTERNS[decimal].
+
+    With both separators present the last one is the decimal mark;
+    otherwise a single `decimal` separator is the decimal mark, and any
+    other separator is grouping.
+    """
+    last_point, last_comma = raw.rfind("."), raw.rfind(",")
+    if last_point >= 0 and last_comma >= 0:
+        split_at = max(last_point, last_comma)
+    elif raw.count(decimal) == 1:
+        split_at = raw.find(decimal)
+    else:
+        return float(raw.replace(",", "").replace(".", ""))
+    integer = raw[:split_at].replace(",", "").replace(".", "")
+    return float(f"{integer}.{raw[split_at + 1:]}")
+
+
+class AmountIndex:
+    """Each numeric token of a text, once, in document order."""
+
+    __slots__ = (
+        "text", "base", "values", "normalized", "starts", "ends", "currencies", "labels", "kinds", "_currency_table",
+    )
+
+    def __init__(self, text: str = "", base: str = "USD"):
+        self.text = text
+        self.base = base
+        self.values = array("d")  # as written (magnitude words applied)
+        self.normalized = array("d")  # money converted to `base`; other kinds as written
+        self.starts = array("l")
+        self.ends = array("l")
+        self.currencies = bytearray()  # index into _currency_table; 0 = none
+        self.labels = bytearray()  # index into LABELS
+        self.kinds = bytearray()  # index into KINDS
+        self._currency_table: list[str | None] = [None]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[Amount]:
+        for i in range(len(self.values)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Amount:
+        return Amount(
+            value=self.values[i],
+            start=self.starts[i],
+            end=self.ends[i],
+            currency=self._currency_table[self.currencies[i]],
+            label=LABELS[self.labels[i]] or None,
+            kind=KINDS[self.kinds[i]],
+            normalized=self.normalized[i],
+        )
+
+    def append(
+        self,
+        value: float,
+        start: int,
+        end: int,
+        currency: str | None,
+        label: int,
+        kind: int,
+        normalized: float | None = None,
+    ) -> None:
+        if currency is None:
+            code = 0
+        elif currency in self._currency_table:
+            code = self._currency_table.index(currency)
+        else:
+            code = len(self._currency_table)
+            self._currency_table.append(currency)
+        self.values.append(value)
+        self.normalized.append(value if normalized is None else normalized)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.currencies.append(code)
+        self.labels.append(label)
+        self.kinds.append(kind)
+
+    def raw(self, i: int) -> str:
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def money(self) -> list[Amount]:
+        return [self[i] for i in range(len(self)) if self.kinds[i] == MONEY]
+
+    def money_values(self) -> list[float]:
+        return [v for v, k in zip(self.values, self.kinds) if k == MONEY]
+
+    def numeric(self) -> list[Amount]:
+        """Money and bare numbers (identifiers and dates excluded)."""
+        return [self[i] for i in range(len(self)) if self.kinds[i] in NUMERIC_KINDS]
+
+    @classmethod
+    def from_text(cls, text: str, *, rates: RateTable | None = None, decimal: str | None = None) -> "AmountIndex":
+        """
+        Tokenize `text` in one pass.
+
+        `decimal` is the decimal mark for ambiguous numbers such as
+        "1.234" (settings.amount_decimal_mark by default; "auto" takes it
+        from the first unambiguous number in the text). Money is
+        converted to the base currency with `rates` (the configured
+        table by default).
+        """
+        rates = rates or get_rate_table()
+        decimal = decimal or settings.amount_decimal_mark
+        if decimal not in DECIMAL_MARKS:
+            decimal = detect_decimal_mark(text)
+
+        index = cls(text, base=rates.base)
+        builder = _Builder(index, text, rates)
+        grammar = NUMBER_PATTERNS[decimal]
+        for run in RUN_PATTERN.finditer(text):
+            start, end = run.span()
+            raw = run.group()
+            if raw.isdigit():
+                builder.number(start, end, float(raw))
+            elif raw.count(decimal) == 1 and raw.replace(decimal, "", 1).isdigit():
+                builder.number(start, end, float(raw.replace(",", ".")))
+            else:
+                # Split the run: "1,234.56", "2024-01-19", "V001,4985000"
+                position = start
+                while position < end:
+                    match = grammar.match(text, position, end)
+                    if match.group("date"):
+                        builder.date(position, match.end(), match.group("date"))
+                    else:
+                        builder.number(position, match.end(), parse_number(match.group("num"), decimal))
+                    position = match.end() + 1  # past the separator
+        return index
+
+
+# Characters after which a number starts a new token without a prefix
+_OPEN_CHARS = frozenset("|,;:(#-/[=+\"'*")
+# Characters that can end a prefix marker ("$", "₹", "Rs.", "USD")
+_PREFIX_ENDS = frozenset(c for k in [*SYMBOLS, *CODES] for c in (k[-1].lower(), k[-1].upper()))
+_SUFFIX_STARTS = frozenset(_SUFFIX_SYMBOLS)
+
+
+class _Builder:
+    """Appends tokens to an AmountIndex while a text is scanned."""
+
+    __slots__ = ("index", "text", "rates", "labels")
+
+    def __init__(self, index: AmountIndex, text: str, rates: RateTable):
+        self.index = index
+        self.text = text
+        self.rates = rates
+        self.labels = _LabelCursor(text)
+
+    def date(self, start: int, end: int, raw: str) -> None:
+        self.index.append(_date_year(raw), start, end, None, 0, DATE)
+
+    def number(self, start: int, end: int, value: float) -> None:
+        text = self.text
+        before = text[start - 1] if start else ""
+        currency = None
+        if before and not before.isspace() and before not in _OPEN_CHARS:
+            currency = _prefix_currency(text, start)
+            if currency is None:
+                # Tail of an identifier ("P00012") or a fragment ("1.2.3")
+                return
+        elif before == " " and start > 1 and text[start - 2] in _PREFIX_ENDS:
+            currency = _prefix_currency(text, start)
+
+        scale = None
+        after = end + 1 if text[end:end + 1] == " " else end
+        if after < len(text) and (text[after].isalpha() or text[after] in _SUFFIX_STARTS):
+            suffix = SUFFIX_PATTERN.match(text, end)
+            scale, post = suffix.group("scale"), suffix.group("post")
+            if post and currency is None:
+                currency = currency_of(post)
+            if scale and (currency or scale.lower() not in MARKED_ONLY_SCALES):
+                value *= SCALES[scale.lower()]
+            else:
+                scale = None
+
+        label = self.labels.before(start)
+        kind = _kind(text, start, end, bool(currency or scale), label)
+        normalized = self.rates.to_base(value, currency) if kind == MONEY else value
+        self.index.append(value, start, end, currency, label, kind, normalized)
+
+
+def _date_year(date: str) -> float:
+    """Year of a date matched by _DATE, as written ("24" for 19/01/24)."""
+    if date[4:5] == "-":
+        return float(date[:4])
+    return float(date[max(date.rfind("/"), date.rfind("."), date.rfind("-")) + 1:])
+
+
+def prefix_start(text: str, start: int) -> int:
+    """Where the currency marker written right before `start` begins (`start` itself if there is none)."""
+    match = PREFIX_PATTERN.search(text, max(0, start - _PREFIX_WINDOW), start)
+    return match.start() if match else start
+
+
+def _prefix_currency(text: str, start: int) -> str | None:
+    match = PREFIX_PATTERN.search(text, max(0, start - _PREFIX_WINDOW), start)
+    return currency_of(match.group("pre")) if match else None
+
+
+class _LabelCursor:
+    """
+    Nearest label before a position, on the same line and within LABEL_WINDOW.
+
+    Labels are found with a single scan up front; since tokens arrive in
+    document order, lookups only ever move the cursor forward.
+    """
+
+    __slots__ = ("text", "positions", "codes", "cursor")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.positions = []
+        self.codes = []
+        for match in LABEL_PATTERN.finditer(text):
+            self.positions.append(match.end())
+            self.codes.append(_LABEL_WORDS[match.group(1).lower()])
+        self.cursor = 0
+
+    def before(self, position: int) -> int:
+        positions = self.positions
+        while self.cursor < len(positions) and positions[self.cursor] <= position:
+            self.cursor += 1
+        if not self.cursor:
+            return 0
+        label_end = positions[self.cursor - 1]
+        if position - label_end > LABEL_WINDOW or "\n" in self.text[label_end:position]:
+            return 0
+        return self.codes[self.cursor - 1]
+
+
+def _kind(text: str, start: int, end: int, is_money: bool, label: int) -> int:
+    before = text[start - 1] if start > 0 else ""
+    after = text[end] if end < len(text) else ""
+    if before in DATE_SEPARATORS and start > 1 and text[start - 2].isdigit():
+        return DATE
+    if after in DATE_SEPARATORS and end + 1 < len(text) and text[end + 1].isdigit():
+        return DATE
+    if is_money:
+        return MONEY
+    # "#12345", "INV-001", "No. 12345"
+    if before == "#" or (before == "-" and start > 1 and text[start - 2].isalpha()):
+        return ID
+    if text[max(0, start - 4):start].lower() in ("no. ", "no.:"):
+        return ID
+    return MONEY if label else NUMBER
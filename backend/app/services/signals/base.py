@@ -2,10 +2,15 @@
 Base classes for signal detectors.
 """
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
+from .amounts import AmountIndex
+
 
 @dataclass
 class SignalResult:
@@ -17,6 +22,20 @@ class SignalResult:
     indicators: dict[str, Any] = field(default_factory=dict)
     explanation: str = ""
     confidence: float = 1.0  # 0-1, how confident are we in this signal
+    version: str = ""  # fingerprint of the detector that produced it; "" = never reuse
+
+    @classmethod
+    def from_breakdown(cls, detector_name: str, entry: dict[str, Any]) -> "SignalResult":
+        """Rebuilds a result from its stored `detector_breakdown` entry."""
+        return cls(
+            detector_name=detector_name,
+            score=entry.get("score", 0),
+            weight=entry.get("weight", 1.0),
+            indicators=entry.get("indicators") or {},
+            explanation=entry.get("explanation", ""),
+            confidence=entry.get("confidence", 1.0),
+            version=entry.get("version", ""),
+        )
 
 
 @dataclass
@@ -31,6 +50,11 @@ class AnalysisContext:
     relationships: list[dict[str, Any]] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    @cached_property
+    def amount_index(self) -> AmountIndex:
+        """Numeric tokens of `text`, extracted once and shared by all detectors."""
+        return AmountIndex.from_text(self.text)
+
 
 class BaseDetector(ABC):
     """Abstract base class for signal detectors."""
@@ -38,10 +62,25 @@ class BaseDetector(ABC):
     name: str = "base"
     default_weight: float = 1.0
     description: str = ""
+    # Bump whenever detect() changes in a way that can change its output
+    version: str = "1"
 
     def __init__(self, weight: float | None = None):
         self.weight = weight if weight is not None else self.default_weight
 
+    def parameters(self) -> dict[str, Any]:
+        """Tunables that affect detect() output (weight is applied at aggregation)."""
+        return {}
+
+    def fingerprint(self) -> str:
+        """
+        Identifies this detector's output: its code version plus a hash of
+        its parameters. A stored result with the same fingerprint can be
+        reused instead of re-running the detector.
+        """
+        params = json.dumps(self.parameters(), sort_keys=True, default=str)
+        return f"{self.version}:{hashlib.sha256(params.encode()).hexdigest()[:12]}"
+
     @abstractmethod
     def detect(self, context: AnalysisContext) -> SignalResult:
         """
@@ -70,4 +109,5 @@ class BaseDetector(ABC):
             indicators=indicators or {},
             explanation=explanation,
             confidence=confidence,
+            version=self.fingerprint(),
         )
@@ -9,10 +9,11 @@ Deviation from this distribution can indicate data manipulation.
 """
 
 import math
-import re
 from collections import Counter
 from collections.abc import Mapping
+from typing import Any
 
+from .amounts import NUMERIC_KINDS, AmountIndex, parsing_parameters
 from .base import AnalysisContext, BaseDetector, SignalResult
 
 # Expected Benford distribution for leading digits 1-9
@@ -29,29 +30,33 @@ BENFORD_EXPECTED = {
 }
 
 
+def leading_digits(index: AmountIndex) -> list[int]:
+    """
+    Leading digits of the money and bare numbers in an amount index.
+
+    Identifiers and date parts are skipped: invoice numbers and years are
+    assigned, not measured, so they do not follow Benford's Law. Filters
+    to numbers with at least two significant digits (single digits don't
+    follow Benford well).
+    """
+    digits = []
+    for i, kind in enumerate(index.kinds):
+        if kind not in NUMERIC_KINDS:
+            continue
+        # Remove grouping and decimal point for parsing
+        clean = index.raw(i).replace(",", "").replace(".", "").lstrip("0")
+        if len(clean) >= 2:
+            digits.append(int(clean[0]))
+    return digits
+
+
 def extract_leading_digits(text: str) -> list[int]:
     """
     Extract leading digits from numbers in text.
 
     Filters to numbers >= 10 (single digits don't follow Benford well).
     """
-    # Match numbers (with optional commas, decimals)
-    pattern = r'\b\d{1,3}(?:,\d{3})*(?:\.\d+)?\b|\b\d+(?:\.\d+)?\b'
-    matches = re.findall(pattern, text.replace(",", ""))
-
-    leading_digits = []
-    for match in matches:
-        # Remove decimal point for parsing
-        clean = match.replace(".", "").lstrip("0")
-        if clean and len(clean) >= 2:  # Only numbers >= 10
-            try:
-                first_digit = int(clean[0])
-                if 1 <= first_digit <= 9:
-                    leading_digits.append(first_digit)
-            except ValueError:
-                continue
-
-    return leading_digits
+    return leading_digits(AmountIndex.from_text(text))
 
 
 def chi_squared_statistic(observed: Mapping[int, float], expected: Mapping[int, float], n: int) -> float:
@@ -92,18 +97,22 @@ class BenfordDetector(BaseDetector):
         super().__init__(weight)
         self.min_numbers = min_numbers
 
+    def parameters(self) -> dict[str, Any]:
+        # Figures are read as written, so only the decimal mark matters
+        return {"min_numbers": self.min_numbers, **parsing_parameters(rates=False)}
+
     def detect(self, context: AnalysisContext) -> SignalResult:
         # Extract leading digits from text
-        leading_digits = extract_leading_digits(context.text)
+        digits = leading_digits(context.amount_index)
 
         # Also include any pre-extracted amounts
         for amount in context.amounts:
             if amount >= 10:
                 first_digit = int(str(int(amount))[0])
                 if 1 <= first_digit <= 9:
-                    leading_digits.append(first_digit)
+                    digits.append(first_digit)
 
-        n = len(leading_digits)
+        n = len(digits)
 
         # Need minimum sample size for statistical validity
         if n < self.min_numbers:
@@ -115,7 +124,7 @@ class BenfordDetector(BaseDetector):
             )
 
         # Calculate observed distribution
-        counts = Counter(leading_digits)
+        counts = Counter(digits)
         observed_pct = {d: counts.get(d, 0) / n for d in range(1, 10)}
         observed_counts = {d: float(counts.get(d, 0)) for d in range(1, 10)}
 
@@ -8,52 +8,134 @@ Detects patterns that may indicate bid rigging or collusion:
 - Vendor relationships suggesting coordination
 """
 
-import re
 from collections import Counter
 from itertools import combinations
+from typing import Any
 
+from .amounts import NUMERIC_KINDS, AmountIndex, parsing_parameters, prefix_start
 from .base import AnalysisContext, BaseDetector, SignalResult
 
+BID_KEYWORDS = frozenset({"bid", "bids", "quote", "quotes", "proposal", "proposals", "offer", "offers"})
 
-def extract_bids(text: str) -> list[dict]:
+# How far back from an amount to look for its label (same line only)
+LABEL_WINDOW = 120
+
+_LABEL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ &\t")
+_SEPARATOR_CHARS = frozenset(": \t#")
+
+
+def _parse_label(text: str, start: int, floor: int) -> tuple[str, int] | None:
+    """
+    Reads the label in front of an amount (or its currency marker), right
+    to left.
+
+    Returns (label, label_start), or None when nothing usable precedes
+    the amount. Never looks before `floor`, so each call is bounded by
+    LABEL_WINDOW.
+    """
+    i = start
+    while i > floor and text[i - 1] in _SEPARATOR_CHARS:
+        i -= 1
+
+    # "Vendor 12: 500" - a numeric vendor id
+    if i > floor and text[i - 1].isdigit():
+        end = i
+        while i > floor and text[i - 1].isdigit():
+            i -= 1
+        vendor_id = text[i:end]
+        while i > floor and text[i - 1] in _SEPARATOR_CHARS:
+            i -= 1
+        if text[max(i - 6, floor):i].lower() == "vendor":
+            return f"vendor {vendor_id}", i - 6
+        return None
+
+    end = i
+    while i > floor and text[i - 1] in _LABEL_CHARS:
+        i -= 1
+    label = text[i:end].strip()
+    if not label:
+        return None
+    return label, i
+
+
+def _classify(label: str, has_currency: bool) -> tuple[bool, str | None]:
+    """(is_bid, vendor) for a label such as "Bid from Alpha" or "Alpha quote"."""
+    words = label.split()
+    lowered = [w.lower() for w in words]
+
+    keyword_at = max((i for i, w in enumerate(lowered) if w in BID_KEYWORDS), default=None)
+    if keyword_at is not None:
+        after = words[keyword_at + 1:]
+        if after and after[0].lower() == "from":
+            after = after[1:]
+        vendor = " ".join(after) or " ".join(words[:keyword_at])
+        return True, vendor or None
+
+    if len(words) >= 2 and lowered[-2] == "vendor":
+        return True, words[-1]
+
+    # "Alpha Infra: ₹5,000" - a name column followed by an amount in a currency
+    if has_currency:
+        return True, label
+    return False, None
+
+
+def extract_bids(text: str, index: AmountIndex | None = None) -> list[dict]:
     """
     Extract bid information from text.
 
     Looks for patterns like:
-    - "Bid: $X" or "Quote: $X"
-    - "Vendor A: $X"
-    - "Proposal amount: $X"
+    - "Bid: $X" or "Quote: ₹X"
+    - "Bid from Alpha: X" or "Alpha quote: X EUR"
+    - "Vendor A: $X" or "Vendor 3: X"
+    - "Alpha Infra: Rs. X"
+
+    Amounts are the numeric tokens of `index` (built from `text` when not
+    given, e.g. `AnalysisContext.amount_index`), so bids follow the same
+    locale rules as the other detectors: lakh/crore and decimal-comma
+    grouping, currency symbols, codes and words. Each bid carries its
+    currency and its amount converted to the index's base currency, so
+    bids in different currencies compare like with like.
+
+    Each token's label is read backwards over at most LABEL_WINDOW
+    characters of the same line, so total work is linear in the text
+    length, and each amount yields at most one bid.
     """
+    if index is None:
+        index = AmountIndex.from_text(text)
     bids = []
 
-    # Pattern for bid amounts with optional vendor
-    patterns = [
-        r'(?:bid|quote|proposal|offer)[#:\s]*(?:from\s+)?([A-Za-z\s&]+)?[:\s]*\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-        r'([A-Za-z\s&]+)\s*(?:bid|quote|proposal)?[:\s]+\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-        r'vendor\s*[#:\s]*(\d+|[A-Za-z]+)[:\s]*\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-    ]
-
-    for pattern in patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            vendor = None
-            if match.lastindex and match.lastindex >= 1:
-                vendor = match.group(1).strip() if match.group(1) else None
-            amount_str = None
-            if match.lastindex and match.lastindex >= 2:
-                amount_str = match.group(2)
-            elif match.lastindex and match.lastindex >= 1:
-                amount_str = match.group(1)
-            if not amount_str:
-                continue
-            try:
-                amount = float(amount_str.replace(",", ""))
-                bids.append({
-                    "vendor": vendor,
-                    "amount": amount,
-                    "raw": match.group(0),
-                })
-            except (ValueError, AttributeError):
-                continue
+    # Columns are read directly; an Amount is only built for actual bids
+    starts, kinds, currencies = index.starts, index.kinds, index.currencies
+    for i in range(len(index)):
+        if kinds[i] not in NUMERIC_KINDS:
+            continue
+        start = starts[i]
+        line_start = text.rfind("\n", max(0, start - LABEL_WINDOW), start) + 1
+        floor = max(line_start, start - LABEL_WINDOW)
+
+        # Step over a currency marker written before the digits ("$", "Rs. ")
+        label_end = max(prefix_start(text, start), floor) if currencies[i] else start
+        while label_end > floor and text[label_end - 1] in " \t":
+            label_end -= 1
+
+        parsed = _parse_label(text, label_end, floor)
+        if parsed is None:
+            continue
+        label, label_start = parsed
+        amount = index[i]
+        is_bid, vendor = _classify(label, amount.currency is not None)
+        if not is_bid:
+            continue
+
+        bids.append({
+            "vendor": vendor,
+            "amount": amount.normalized,
+            "value": amount.value,  # as written, in `currency`
+            "currency": amount.currency,
+            "raw": text[label_start:amount.end].strip(),
+            "span": (label_start, amount.end),
+        })
 
     return bids
 
@@ -97,8 +179,8 @@ def detect_bid_patterns(bids: list[dict]) -> dict:
             "details": close_pairs[:5],
         })
 
-    # 3. Check for round number bids
-    round_bids = [a for a in amounts if a >= 1000 and a % 1000 == 0]
+    # 3. Check for round number bids (as written: conversion hides roundness)
+    round_bids = [v for v in (b.get("value", b["amount"]) for b in bids) if v >= 1000 and v % 1000 == 0]
     if len(round_bids) > len(amounts) * 0.5:
         patterns_found.append("excessive_round_bids")
         risk_indicators.append({
@@ -164,9 +246,13 @@ class BidRiggingDetector(BaseDetector):
     default_weight = 1.4
     description = "Bid rigging and collusion pattern detection"
 
+    def parameters(self) -> dict[str, Any]:
+        # Bids are compared in the base currency
+        return parsing_parameters()
+
     def detect(self, context: AnalysisContext) -> SignalResult:
         # Extract bids from text
-        bids = extract_bids(context.text)
+        bids = extract_bids(context.text, context.amount_index)
 
         # Check for bid-related keywords
         text_lower = context.text.lower()
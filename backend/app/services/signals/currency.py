@@ -0,0 +1,146 @@
+"""
+Currency markers and conversion rates for amount parsing.
+
+The tokenizer in `amounts` recognises a currency from a symbol ("₹"),
+a code ("INR") or a word ("rupees"), and a magnitude word such as
+"lakh" or "crore". `RateTable` then converts every amount to a single
+base currency so that thresholds (e.g. split_invoice approval limits)
+compare like with like.
+
+Rates are a local table, never fetched: the built-in figures are
+approximate and can be replaced with a JSON file of
+``{"CODE": units_of_base_per_unit}`` via CURRENCY_RATES_PATH.
+"""
+
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+
+SYMBOLS = {
+    "$": "USD",
+    "us$": "USD",
+    "₹": "INR",
+    "rs": "INR",
+    "rs.": "INR",
+    "€": "EUR",
+    "£": "GBP",
+    "¥": "JPY",
+}
+CODES = ("USD", "INR", "EUR", "GBP", "JPY")
+WORDS = {
+    "dollar": "USD",
+    "dollars": "USD",
+    "rupee": "INR",
+    "rupees": "INR",
+    "euro": "EUR",
+    "euros": "EUR",
+    "pound": "GBP",
+    "pounds": "GBP",
+}
+
+# Magnitude words that follow a number: "49.85 lakh", "1.2 crore", "3 million"
+SCALES = {
+    "thousand": 1e3,
+    "lakh": 1e5,
+    "lakhs": 1e5,
+    "lac": 1e5,
+    "lacs": 1e5,
+    "million": 1e6,
+    "mn": 1e6,
+    "crore": 1e7,
+    "crores": 1e7,
+    "cr": 1e7,
+    "billion": 1e9,
+    "bn": 1e9,
+}
+# Abbreviations that only scale an amount with a currency marker next to it:
+# on their own they are ledger markers ("Balance 12,500.00 Cr" is a credit)
+MARKED_ONLY_SCALES = frozenset({"cr", "mn", "bn"})
+
+# Approximate USD value of one unit of each currency
+DEFAULT_USD_RATES = {
+    "USD": 1.0,
+    "INR": 0.012,
+    "EUR": 1.08,
+    "GBP": 1.27,
+    "JPY": 0.0067,
+}
+
+
+def currency_of(marker: str) -> str | None:
+    """ISO code for a symbol, code or currency word, or None."""
+    key = marker.lower()
+    if key in SYMBOLS:
+        return SYMBOLS[key]
+    if key in WORDS:
+        return WORDS[key]
+    upper = marker.upper()
+    return upper if upper in CODES else None
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """
+    Conversion of amounts into `base`.
+
+    `rates` maps a currency code to units of `base` per unit. Amounts
+    without a currency marker are assumed to be in `default_currency`
+    (the base currency when unset). Unknown currencies pass through
+    unconverted.
+    """
+
+    base: str = "USD"
+    rates: Mapping[str, float] = field(default_factory=lambda: {"USD": 1.0})
+    default_currency: str | None = None
+
+    def rate(self, currency: str | None) -> float:
+        currency = currency or self.default_currency or self.base
+        if currency == self.base:
+            return 1.0
+        return self.rates.get(currency, 1.0)
+
+    def to_base(self, value: float, currency: str | None) -> float:
+        return value * self.rate(currency)
+
+    def currency(self, currency: str | None) -> str:
+        """The currency an amount is in, `currency` being its marker (None if unmarked)."""
+        return currency or self.default_currency or self.base
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"base": self.base, "rates": dict(sorted(self.rates.items())), "default_currency": self.default_currency}
+
+    @classmethod
+    def from_usd_rates(
+        cls, usd_rates: Mapping[str, float], base: str = "USD", default_currency: str | None = None
+    ) -> "RateTable":
+        """Rebase a table of USD values onto `base`."""
+        if base not in usd_rates:
+            raise ValueError(f"No rate for base currency {base}")
+        base_usd = usd_rates[base]
+        rates = {code: usd / base_usd for code, usd in usd_rates.items()}
+        return cls(base=base, rates=rates, default_currency=default_currency)
+
+    @classmethod
+    def from_file(cls, path: str | Path, base: str, default_currency: str | None = None) -> "RateTable":
+        """Rates from a JSON object of units of `base` per unit of each code."""
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        if not isinstance(raw, dict):
+            raise ValueError(f"Currency rates file must hold a JSON object: {path}")
+        rates = {str(code).upper(): float(rate) for code, rate in raw.items()}
+        rates.setdefault(base, 1.0)
+        return cls(base=base, rates=rates, default_currency=default_currency)
+
+
+@lru_cache
+def get_rate_table() -> RateTable:
+    """The configured rate table (one instance per process)."""
+    base = settings.currency_base.upper()
+    default = settings.currency_default.upper() if settings.currency_default else None
+    if settings.currency_rates_path:
+        return RateTable.from_file(settings.currency_rates_path, base, default)
+    return RateTable.from_usd_rates(DEFAULT_USD_RATES, base, default)
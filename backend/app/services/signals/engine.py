@@ -3,11 +3,19 @@ Signal Engine: orchestrates all detectors and aggregates results.
 
 The engine runs all configured detectors, weights their outputs,
 and produces a unified risk assessment with explainable factors.
+Every detector result carries its detector's fingerprint, so a stored
+breakdown can be re-aggregated later with only the changed detectors
+re-run (`rescore`).
 """
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Any
 
+from app.core.metrics import detector_runs_total, detector_triggers_total
+from app.utils.cancellation import check_cancelled
+from app.utils.timing import span
+
 from .base import AnalysisContext, BaseDetector, SignalResult
 from .benford import BenfordDetector
 from .round_numbers import RoundNumberDetector
@@ -16,6 +24,7 @@ from .bid_rigging import BidRiggingDetector
 from .keywords import KeywordDetector
 from .urgency import UrgencyDetector
 from .velocity import VelocityDetector
+from .vendor_baseline import VendorBaselineDetector
 
 
 @dataclass
@@ -85,6 +94,11 @@ def generate_recommendations(top_factors: list[dict], risk_level: str) -> list[s
             "Review timing patterns; consider whether after-hours/weekend activity is justified."
         )
 
+    if "vendor_baseline" in factor_types:
+        recommendations.append(
+            "Compare flagged amounts with the vendor's prior contracts and request price justification."
+        )
+
     # General recommendations based on risk level
     if risk_level in ("high", "critical"):
         recommendations.insert(0, "Flag for immediate supervisor review before any approval.")
@@ -93,13 +107,109 @@ def generate_recommendations(top_factors: list[dict], risk_level: str) -> list[s
     return recommendations[:5]  # Top 5 recommendations
 
 
+def aggregate_results(detector_results: list[SignalResult]) -> AggregatedRiskResult:
+    """
+    Weights detector results into a unified, explainable risk assessment.
+
+    Pure: depends only on the results (their score, weight and
+    confidence), so stored results can be re-aggregated without running
+    any detector.
+    """
+    # Calculate weighted aggregate score
+    total_weighted_score = 0.0
+    total_weight = 0.0
+    avg_confidence = 0.0
+
+    for result in detector_results:
+        if result.score > 0:
+            weighted_score = result.score * result.weight * result.confidence
+            total_weighted_score += weighted_score
+            total_weight += result.weight
+            avg_confidence += result.confidence
+
+    if total_weight > 0:
+        # Normalize to 0-100 scale
+        # Use sqrt to compress extreme values
+        raw_score = total_weighted_score / total_weight
+        risk_score = int(min(raw_score, 100))
+        avg_confidence = avg_confidence / len([r for r in detector_results if r.score > 0])
+    else:
+        risk_score = 0
+        avg_confidence = 0.5
+
+    risk_level = classify_risk_level(risk_score)
+
+    # Identify top contributing factors
+    contributing_results = sorted(
+        [r for r in detector_results if r.score > 0],
+        key=lambda r: r.score * r.weight * r.confidence,
+        reverse=True,
+    )
+
+    top_factors = [
+        {
+            "detector": r.detector_name,
+            "score_contribution": round(r.score * r.weight, 1),
+            "confidence": round(r.confidence, 2),
+            "explanation": r.explanation,
+            "key_indicators": {
+                k: v for k, v in list(r.indicators.items())[:3]
+            } if r.indicators else {},
+        }
+        for r in contributing_results[:5]
+    ]
+
+    # Build unified signals dict
+    signals = {
+        "detectors_run": len(detector_results),
+        "detectors_triggered": len(contributing_results),
+        "detector_breakdown": {
+            r.detector_name: {
+                "score": r.score,
+                "weight": r.weight,
+                "confidence": r.confidence,
+                "indicators": r.indicators,
+                "explanation": r.explanation,
+                "version": r.version,
+            }
+            for r in detector_results
+        },
+    }
+
+    # Build explanation
+    if risk_score == 0:
+        explanation = "No significant corruption or fraud indicators detected by automated analysis."
+    else:
+        factor_names = [f["detector"] for f in top_factors[:3]]
+        explanation = (
+            f"Risk score {risk_score}/100 ({risk_level}). "
+            f"Top contributing factors: {', '.join(factor_names)}. "
+        )
+        if top_factors:
+            explanation += top_factors[0]["explanation"]
+
+    # Generate recommendations
+    recommendations = generate_recommendations(top_factors, risk_level)
+
+    return AggregatedRiskResult(
+        risk_score=risk_score,
+        risk_level=risk_level,
+        confidence=round(avg_confidence, 2),
+        signals=signals,
+        explanation=explanation,
+        top_factors=top_factors,
+        detector_results=detector_results,
+        recommendations=recommendations,
+    )
+
+
 class SignalEngine:
     """
     Orchestrates signal detectors and aggregates results.
 
     The engine:
-    1. Runs all configured detectors against the analysis context
-    2. Weights and aggregates scores
+    1. Runs all configured detectors against the analysis context (`run`)
+    2. Weights and aggregates scores (`aggregate`)
     3. Identifies top contributing factors
     4. Generates an explainable risk assessment
     """
@@ -122,6 +232,7 @@ class SignalEngine:
             KeywordDetector(weight=1.0),
             UrgencyDetector(weight=0.9),
             VelocityDetector(weight=0.8),
+            VendorBaselineDetector(weight=1.1),
         ]
 
     def analyze(self, context: AnalysisContext) -> AggregatedRiskResult:
@@ -134,13 +245,27 @@ class SignalEngine:
         Returns:
             AggregatedRiskResult with unified risk assessment.
         """
+        return self.aggregate(self.run(context))
+
+    def run(
+        self, context: AnalysisContext, detectors: list[BaseDetector] | None = None
+    ) -> list[SignalResult]:
+        """
+        Run the given detectors (all configured ones by default) against the context.
+
+        Stops between detectors if the current analysis is cancelled.
+        """
         detector_results: list[SignalResult] = []
 
-        # Run all detectors
-        for detector in self.detectors:
+        for detector in self.detectors if detectors is None else detectors:
+            check_cancelled()
             try:
-                result = detector.detect(context)
+                with span(f"detector.{detector.name}"):
+                    result = detector.detect(context)
                 detector_results.append(result)
+                detector_runs_total.inc(detector.name)
+                if result.score > 0:
+                    detector_triggers_total.inc(detector.name)
             except Exception as e:
                 # Log error but continue with other detectors
                 detector_results.append(SignalResult(
@@ -152,90 +277,43 @@ class SignalEngine:
                     confidence=0,
                 ))
 
-        # Calculate weighted aggregate score
-        total_weighted_score = 0.0
-        total_weight = 0.0
-        avg_confidence = 0.0
-
-        for result in detector_results:
-            if result.score > 0:
-                weighted_score = result.score * result.weight * result.confidence
-                total_weighted_score += weighted_score
-                total_weight += result.weight
-                avg_confidence += result.confidence
-
-        if total_weight > 0:
-            # Normalize to 0-100 scale
-            # Use sqrt to compress extreme values
-            raw_score = total_weighted_score / total_weight
-            risk_score = int(min(raw_score, 100))
-            avg_confidence = avg_confidence / len([r for r in detector_results if r.score > 0])
-        else:
-            risk_score = 0
-            avg_confidence = 0.5
-
-        risk_level = classify_risk_level(risk_score)
-
-        # Identify top contributing factors
-        contributing_results = sorted(
-            [r for r in detector_results if r.score > 0],
-            key=lambda r: r.score * r.weight * r.confidence,
-            reverse=True,
-        )
+        return detector_results
 
-        top_factors = [
-            {
-                "detector": r.detector_name,
-                "score_contribution": round(r.score * r.weight, 1),
-                "confidence": round(r.confidence, 2),
-                "explanation": r.explanation,
-                "key_indicators": {
-                    k: v for k, v in list(r.indicators.items())[:3]
-                } if r.indicators else {},
-            }
-            for r in contributing_results[:5]
+    def rescore(
+        self,
+        breakdown: dict[str, dict[str, Any]],
+        load_context: Callable[[], AnalysisContext],
+    ) -> tuple[AggregatedRiskResult, list[str]]:
+        """
+        Re-aggregates a stored `detector_breakdown`, re-running only stale detectors.
+
+        A stored entry is reused when its version matches the configured
+        detector's fingerprint; its weight is replaced by the current one.
+        Missing, errored or outdated entries are recomputed, and
+        `load_context` is only called if at least one needs to run.
+
+        Returns the aggregated result and the names of the detectors re-run.
+        """
+        stale = [
+            detector
+            for detector in self.detectors
+            if (breakdown.get(detector.name) or {}).get("version") != detector.fingerprint()
         ]
+        fresh = {r.detector_name: r for r in self.run(load_context(), stale)} if stale else {}
 
-        # Build unified signals dict
-        signals = {
-            "detectors_run": len(self.detectors),
-            "detectors_triggered": len(contributing_results),
-            "detector_breakdown": {
-                r.detector_name: {
-                    "score": r.score,
-                    "weight": r.weight,
-                    "confidence": r.confidence,
-                    "indicators": r.indicators,
-                }
-                for r in detector_results
-            },
-        }
+        detector_results = []
+        for detector in self.detectors:
+            result = fresh.get(detector.name)
+            if result is None:
+                result = SignalResult.from_breakdown(detector.name, breakdown[detector.name])
+                result.weight = detector.weight
+            detector_results.append(result)
 
-        # Build explanation
-        if risk_score == 0:
-            explanation = "No significant corruption or fraud indicators detected by automated analysis."
-        else:
-            factor_names = [f["detector"] for f in top_factors[:3]]
-            explanation = (
-                f"Risk score {risk_score}/100 ({risk_level}). "
-                f"Top contributing factors: {', '.join(factor_names)}. "
-            )
-            if top_factors:
-                explanation += top_factors[0]["explanation"]
-
-        # Generate recommendations
-        recommendations = generate_recommendations(top_factors, risk_level)
-
-        return AggregatedRiskResult(
-            risk_score=risk_score,
-            risk_level=risk_level,
-            confidence=round(avg_confidence, 2),
-            signals=signals,
-            explanation=explanation,
-            top_factors=top_factors,
-            detector_results=detector_results,
-            recommendations=recommendations,
-        )
+        return self.aggregate(detector_results), [d.name for d in stale]
+
+    def aggregate(self, detector_results: list[SignalResult]) -> AggregatedRiskResult:
+        """Weights detector results into a unified, explainable risk assessment."""
+        return aggregate_results(detector_results)
 
     @classmethod
     def from_text(cls, text: str) -> AggregatedRiskResult:
@@ -5,11 +5,10 @@ Detects suspicious keywords and phrases commonly associated with
 corruption, bribery, and fraudulent activities.
 """
 
-import re
-from collections import Counter
 from typing import Any
 
 from .base import AnalysisContext, BaseDetector, SignalResult
+from .patterns import keyword_matcher
 
 
 # Keyword categories with weights
@@ -60,23 +59,29 @@ KEYWORD_CATEGORIES = {
 
 
 def find_keywords(text: str, keywords: list[str]) -> list[dict[str, Any]]:
-    """Find keywords in text with context."""
+    """
+    Find keywords in text with context.
+
+    All keywords are matched in a single pass; results are ordered by
+    keyword (in list order), then position.
+    """
+    matcher = keyword_matcher(keywords)
+    hits: list[tuple[int, int, int]] = []  # (keyword index, start, end)
+
+    for match in matcher.pattern.finditer(text.lower()):
+        start = match.start()
+        for index in matcher.implied[match.group(1)]:
+            hits.append((index, start, start + len(keywords[index])))
+
     found = []
-    text_lower = text.lower()
-
-    for keyword in keywords:
-        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-        for match in re.finditer(pattern, text_lower):
-            # Extract surrounding context (50 chars each side)
-            start = max(0, match.start() - 50)
-            end = min(len(text), match.end() + 50)
-            context = text[start:end].strip()
-
-            found.append({
-                "keyword": keyword,
-                "position": match.start(),
-                "context": context,
-            })
+    for index, start, end in sorted(hits):
+        # Extract surrounding context (50 chars each side)
+        context = text[max(0, start - 50):min(len(text), end + 50)].strip()
+        found.append({
+            "keyword": keywords[index],
+            "position": start,
+            "context": context,
+        })
 
     return found
 
@@ -107,6 +112,9 @@ class KeywordDetector(BaseDetector):
                 else:
                     self.categories[category] = {"keywords": keywords, "weight": 1.0}
 
+    def parameters(self) -> dict[str, Any]:
+        return {"categories": self.categories}
+
     def detect(self, context: AnalysisContext) -> SignalResult:
         all_found: list[dict] = []
         category_scores: dict[str, float] = {}
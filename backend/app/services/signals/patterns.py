@@ -0,0 +1,91 @@
+"""
+Shared registry of compiled regular expressions for the detectors.
+
+Detectors declare their patterns at module level through
+`compile_pattern`, so each is compiled exactly once per process instead
+of going through `re`'s small internal cache on every call. Keyword
+lists are compiled into a single alternation (`keyword_matcher`), which
+scans the text once instead of once per keyword.
+
+`warmup()` compiles everything up front; the app calls it at startup so
+the first analysis does not pay compile cost.
+"""
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+
+_REGISTRY: dict[tuple[str, int], re.Pattern[str]] = {}
+
+
+def compile_pattern(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    """Compiled pattern for (pattern, flags), compiled on first use only."""
+    key = (pattern, flags)
+    compiled = _REGISTRY.get(key)
+    if compiled is None:
+        compiled = _REGISTRY[key] = re.compile(pattern, flags)
+    return compiled
+
+
+def registry_size() -> int:
+    return len(_REGISTRY)
+
+
+@dataclass(frozen=True)
+class KeywordMatcher:
+    """
+    One-pass matcher for a keyword list.
+
+    `pattern` finds every position where some keyword starts (zero-width
+    lookahead, longest keyword first). `implied` maps each matched
+    keyword to the indexes of all list entries matching at that position,
+    which also covers keywords that are whole-word prefixes of a longer
+    one ("shell" inside "shell company").
+    """
+
+    pattern: re.Pattern[str]
+    implied: dict[str, tuple[int, ...]]
+
+
+@lru_cache(maxsize=256)
+def _keyword_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    lowered = [k.lower() for k in keywords]
+    unique = sorted({k for k in lowered if k}, key=lambda k: (-len(k), k))
+    if unique:
+        alternation = "|".join(re.escape(k) for k in unique)
+        pattern = compile_pattern(rf"(?=\b({alternation})\b)")
+    else:
+        pattern = compile_pattern(r"(?!)")
+
+    implied = {
+        matched: tuple(index for index, keyword in enumerate(lowered) if keyword and _matches_at(matched, keyword))
+        for matched in unique
+    }
+    return KeywordMatcher(pattern=pattern, implied=implied)
+
+
+def _matches_at(matched: str, keyword: str) -> bool:
+    """Whether `keyword` also matches (with word boundaries) where `matched` did."""
+    if matched == keyword:
+        return True
+    # A shorter keyword matches too if it is a prefix followed by a word boundary
+    return matched.startswith(keyword) and _is_word_char(keyword[-1]) != _is_word_char(matched[len(keyword)])
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def keyword_matcher(keywords: Sequence[str]) -> KeywordMatcher:
+    return _keyword_matcher(tuple(keywords))
+
+
+def warmup() -> int:
+    """Compiles all detector patterns and default keyword matchers; returns the registry size."""
+    from . import bid_rigging, benford, round_numbers, split_invoice, urgency, velocity  # noqa: F401
+    from .keywords import KEYWORD_CATEGORIES
+
+    for config in KEYWORD_CATEGORIES.values():
+        keyword_matcher(config["keywords"])
+    return registry_size()
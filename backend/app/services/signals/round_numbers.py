@@ -6,39 +6,25 @@ numbers (e.g., $50,000 exactly) rather than precise amounts that
 would result from actual transactions.
 """
 
-import re
 from collections import Counter
+from typing import Any
 
+from .amounts import AmountIndex, parsing_parameters
 from .base import AnalysisContext, BaseDetector, SignalResult
 
 
+def monetary_amounts(index: AmountIndex) -> list[float]:
+    """Positive money amounts of an index, each token counted once."""
+    return [amount for amount in index.money_values() if amount > 0]
+
+
 def extract_monetary_amounts(text: str) -> list[float]:
     """
     Extract monetary amounts from text.
 
-    Handles formats like: $1,234.56, 1234.56, $1234, etc.
+    Handles formats like: $1,234.56, 1,234.56 USD, Total: 1234, etc.
     """
-    # Pattern for monetary amounts
-    patterns = [
-        r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',  # $1,234.56
-        r'\$\s*(\d+(?:\.\d{2})?)',  # $1234.56
-        r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:USD|dollars?)',  # 1,234.56 USD
-        r'(?:USD|amount|total|sum|payment|invoice)[:\s]+\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-    ]
-
-    amounts = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            try:
-                clean = match.replace(",", "")
-                amount = float(clean)
-                if amount > 0:
-                    amounts.append(amount)
-            except ValueError:
-                continue
-
-    return amounts
+    return monetary_amounts(AmountIndex.from_text(text))
 
 
 def is_round_number(amount: float, threshold: float = 100) -> tuple[bool, str]:
@@ -94,9 +80,12 @@ class RoundNumberDetector(BaseDetector):
         super().__init__(weight)
         self.min_amounts = min_amounts
 
+    def parameters(self) -> dict[str, Any]:
+        return {"min_amounts": self.min_amounts, **parsing_parameters(rates=False)}
+
     def detect(self, context: AnalysisContext) -> SignalResult:
         # Extract amounts from text
-        amounts = extract_monetary_amounts(context.text)
+        amounts = monetary_amounts(context.amount_index)
 
         # Also include pre-extracted amounts
         amounts.extend(context.amounts)
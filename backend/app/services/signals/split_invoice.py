@@ -6,71 +6,82 @@ to avoid approval thresholds. Common corruption tactic to bypass
 controls requiring higher-level authorization.
 """
 
-import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 
+from .amounts import AmountIndex, parsing_parameters
 from .base import AnalysisContext, BaseDetector, SignalResult
+from .currency import get_rate_table
+
+# Currency amounts (in the base currency) outside this range are not treated as standalone invoices
+INVOICE_RANGE = (100.0, 1_000_000.0)
+
+# Approval limits are round figures in the document's own currency (₹1 lakh, not
+# its dollar equivalent), so amounts in these currencies are compared as written
+CURRENCY_THRESHOLDS = {
+    "EUR": [5_000.0, 10_000.0, 25_000.0, 50_000.0, 100_000.0],
+    "GBP": [5_000.0, 10_000.0, 25_000.0, 50_000.0, 100_000.0],
+    "INR": [50_000.0, 100_000.0, 500_000.0, 1_000_000.0, 2_500_000.0],
+    "JPY": [500_000.0, 1_000_000.0, 2_500_000.0, 5_000_000.0, 10_000_000.0],
+}
 
 
 @dataclass
 class InvoiceCandidate:
     """Represents a potential invoice extracted from text."""
 
-    amount: float
+    amount: float  # in the base currency
+    currency: str | None = None  # as marked in the text
+    original_amount: float | None = None  # as written, in `currency`
     date: str | None = None
     vendor: str | None = None
     invoice_number: str | None = None
     raw_text: str = ""
 
 
-def extract_invoice_candidates(text: str) -> list[InvoiceCandidate]:
+def invoice_candidates(index: AmountIndex) -> list[InvoiceCandidate]:
     """
-    Extract potential invoice information from text.
+    Invoice amounts from an amount index, one candidate per token.
 
-    Looks for invoice numbers, amounts, dates, and vendor references.
+    A money amount qualifies when it is labelled as an invoice
+    ("Invoice #12345 - $1,234.56", "INV-001: 1500.00") or carries a
+    currency and falls in INVOICE_RANGE. Amounts are in the base
+    currency, matching the approval thresholds. An invoice number
+    directly before the amount is attached to the candidate.
     """
+    low, high = INVOICE_RANGE
     candidates = []
+    invoice_number = None
 
-    # Pattern for invoice lines
-    # Matches patterns like: "Invoice #12345 - $1,234.56" or "INV-001: 1500.00"
-    invoice_patterns = [
-        r'(?:invoice|inv|bill)[#:\s-]*(\d+)[^\d]*\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-        r'(?:invoice|inv|bill)[^\$]*\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-        r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)[^\d]*(?:invoice|inv|bill)',
-    ]
-
-    for pattern in invoice_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            groups = match.groups()
-            amount_str = groups[-1] if groups else None
-            if amount_str:
-                try:
-                    amount = float(amount_str.replace(",", ""))
-                    candidates.append(InvoiceCandidate(
-                        amount=amount,
-                        raw_text=match.group(0),
-                    ))
-                except ValueError:
-                    continue
-
-    # Also extract standalone amounts if they look like invoice amounts
-    amount_pattern = r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-    for match in re.finditer(amount_pattern, text):
-        try:
-            amount = float(match.group(1).replace(",", ""))
-            if 100 <= amount <= 1000000:  # Reasonable invoice range
-                candidates.append(InvoiceCandidate(
-                    amount=amount,
-                    raw_text=match.group(0),
-                ))
-        except ValueError:
+    for i, amount in enumerate(index):
+        if amount.kind == "id" and amount.label == "invoice":
+            invoice_number = index.raw(i)
             continue
+        if not amount.is_money:
+            continue
+        if amount.label == "invoice" or (amount.currency and low <= amount.normalized <= high):
+            candidates.append(InvoiceCandidate(
+                amount=amount.normalized,
+                currency=amount.currency,
+                original_amount=amount.value,
+                invoice_number=invoice_number if amount.label == "invoice" else None,
+                raw_text=index.raw(i),
+            ))
+        invoice_number = None
 
     return candidates
 
 
+def extract_invoice_candidates(text: str) -> list[InvoiceCandidate]:
+    """
+    Extract potential invoice information from text.
+
+    Looks for invoice numbers and amounts; see `invoice_candidates`.
+    """
+    return invoice_candidates(AmountIndex.from_text(text))
+
+
 def detect_split_pattern(amounts: list[float], thresholds: list[float]) -> dict[str, Any]:
     """
     Detect if amounts cluster just below approval thresholds.
@@ -117,6 +128,8 @@ class SplitInvoiceDetector(BaseDetector):
 
     Looks for multiple amounts clustered just below common approval
     thresholds, suggesting intentional splitting to avoid controls.
+    `thresholds` are in the base currency; amounts in a currency with
+    its own `currency_thresholds` are checked against those instead.
     """
 
     name = "split_invoice"
@@ -127,8 +140,10 @@ class SplitInvoiceDetector(BaseDetector):
         self,
         weight: float | None = None,
         thresholds: list[float] | None = None,
+        currency_thresholds: dict[str, list[float]] | None = None,
     ):
         super().__init__(weight)
+        self.currency_thresholds = CURRENCY_THRESHOLDS if currency_thresholds is None else currency_thresholds
         self.thresholds = thresholds or [
             5000.0,
             10000.0,
@@ -137,27 +152,45 @@ class SplitInvoiceDetector(BaseDetector):
             100000.0,
         ]
 
-    def detect(self, context: AnalysisContext) -> SignalResult:
-        # Extract invoice candidates
-        candidates = extract_invoice_candidates(context.text)
-        amounts = [c.amount for c in candidates]
-
-        # Add pre-extracted amounts
-        amounts.extend(context.amounts)
+    def parameters(self) -> dict[str, Any]:
+        # Converted amounts are compared with the thresholds, so rates and parsing count too
+        return {
+            "thresholds": self.thresholds,
+            "currency_thresholds": self.currency_thresholds,
+            **parsing_parameters(),
+        }
+
+    def amounts_by_currency(self, context: AnalysisContext) -> dict[str, list[float]]:
+        """Deduplicated amounts per currency they are compared in (base unless it has own thresholds)."""
+        rates = get_rate_table()
+        groups: dict[str, set[float]] = {rates.base: set(context.amounts)}
+        for candidate in invoice_candidates(context.amount_index):
+            currency = rates.currency(candidate.currency)
+            if currency != rates.base and currency in self.currency_thresholds:
+                groups.setdefault(currency, set()).add(candidate.original_amount)
+            else:
+                groups[rates.base].add(candidate.amount)
+        return {currency: sorted(amounts) for currency, amounts in groups.items() if amounts}
 
-        # Deduplicate
-        amounts = list(set(amounts))
+    def detect(self, context: AnalysisContext) -> SignalResult:
+        groups = self.amounts_by_currency(context)
+        amounts_found = sum(len(amounts) for amounts in groups.values())
 
-        if len(amounts) < 2:
+        if amounts_found < 2:
             return self._make_result(
                 score=0,
-                indicators={"amounts_found": len(amounts)},
+                indicators={"amounts_found": amounts_found},
                 explanation="Insufficient data for split invoice analysis.",
                 confidence=0.3,
             )
 
-        # Detect splitting patterns
-        split_results = detect_split_pattern(amounts, self.thresholds)
+        # Detect splitting patterns, per currency
+        split_results = {"clusters_below_threshold": [], "suspicious_splits": [], "total_suspicious": 0}
+        for currency, amounts in groups.items():
+            found = detect_split_pattern(amounts, self.currency_thresholds.get(currency, self.thresholds))
+            for key in ("clusters_below_threshold", "suspicious_splits"):
+                split_results[key] += [{**entry, "currency": currency} for entry in found[key]]
+            split_results["total_suspicious"] += found["total_suspicious"]
 
         score = 0.0
         confidence = 0.6
@@ -180,8 +213,8 @@ class SplitInvoiceDetector(BaseDetector):
             split_details = []
             for split in split_results["suspicious_splits"][:3]:
                 split_details.append(
-                    f"${split['threshold']:,.0f} threshold: {len(split['split_amounts'])} invoices "
-                    f"totaling ${split['combined_total']:,.2f}"
+                    f"{split['currency']} {split['threshold']:,.0f} threshold: {len(split['split_amounts'])} invoices "
+                    f"totaling {split['currency']} {split['combined_total']:,.2f}"
                 )
 
             explanation = (
@@ -196,8 +229,10 @@ class SplitInvoiceDetector(BaseDetector):
         return self._make_result(
             score=score,
             indicators={
-                "amounts_analyzed": len(amounts),
-                "thresholds_checked": self.thresholds,
+                "amounts_analyzed": amounts_found,
+                "thresholds_checked": {
+                    currency: self.currency_thresholds.get(currency, self.thresholds) for currency in groups
+                },
                 "clusters_below_threshold": split_results["clusters_below_threshold"],
                 "suspicious_splits": split_results["suspicious_splits"],
                 "total_suspicious_amounts": suspicious_count,
@@ -8,6 +8,7 @@ be a red flag for fraud attempts (e.g., "approve immediately",
 
 import re
 from .base import AnalysisContext, BaseDetector, SignalResult
+from .patterns import compile_pattern
 
 
 URGENCY_PATTERNS = [
@@ -37,6 +38,11 @@ URGENCY_PATTERNS = [
     (r'\b(do\s+not\s+(?:question|delay|wait))\b', 1.7),
 ]
 
+# (compiled, source, weight); the source string is reported in indicators
+COMPILED_URGENCY_PATTERNS = [
+    (compile_pattern(pattern, re.IGNORECASE), pattern, weight) for pattern, weight in URGENCY_PATTERNS
+]
+
 
 class UrgencyDetector(BaseDetector):
     """
@@ -56,8 +62,8 @@ class UrgencyDetector(BaseDetector):
         matches = []
         total_weight = 0.0
 
-        for pattern, weight in URGENCY_PATTERNS:
-            for match in re.finditer(pattern, text_lower, re.IGNORECASE):
+        for compiled, pattern, weight in COMPILED_URGENCY_PATTERNS:
+            for match in compiled.finditer(text_lower):
                 matches.append({
                     "pattern": pattern,
                     "matched_text": match.group(0),
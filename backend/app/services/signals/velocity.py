@@ -13,16 +13,12 @@ from datetime import datetime
 from typing import Any
 
 from .base import AnalysisContext, BaseDetector, SignalResult
+from .patterns import compile_pattern
 
-
-def extract_dates(text: str) -> list[dict[str, Any]]:
-    """
-    Extract dates from text in various formats.
-    """
-    dates = []
-
-    # Common date patterns
-    patterns = [
+# Common date patterns
+DATE_PATTERNS = [
+    (compile_pattern(pattern, re.IGNORECASE), fmt)
+    for pattern, fmt in (
         # MM/DD/YYYY or MM-DD-YYYY
         (r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b', 'MDY'),
         # YYYY-MM-DD
@@ -31,15 +27,23 @@ def extract_dates(text: str) -> list[dict[str, Any]]:
         (r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+(\d{1,2}),?\s+(\d{4})\b', 'MnDY'),
         # DD Month YYYY
         (r'\b(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+(\d{4})\b', 'DMnY'),
-    ]
+    )
+]
+
+
+def extract_dates(text: str) -> list[dict[str, Any]]:
+    """
+    Extract dates from text in various formats.
+    """
+    dates = []
 
     month_map = {
         'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
         'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
     }
 
-    for pattern, fmt in patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
+    for pattern, fmt in DATE_PATTERNS:
+        for match in pattern.finditer(text):
             try:
                 groups = match.groups()
                 if fmt == 'MDY':
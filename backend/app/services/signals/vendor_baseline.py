@@ -0,0 +1,113 @@
+"""
+Vendor baseline detector.
+
+Compares amounts attributed to a vendor in the current document
+against that vendor's own history from the cross-case vendor index.
+An amount far outside a vendor's usual range (by z-score) can indicate
+inflated pricing or a misattributed payment. The case being scored
+(context.metadata["case_id"]) is left out of the baseline, so a case
+re-analysed or re-scored is not compared with its own bids.
+"""
+
+from typing import Any
+
+from app.services.vendor_index import VendorIndex, vendor_index
+
+from .amounts import parsing_parameters
+from .base import AnalysisContext, BaseDetector, SignalResult
+from .bid_rigging import extract_bids
+
+
+class VendorBaselineDetector(BaseDetector):
+    """
+    Flags amounts that are outliers against a vendor's own baseline.
+
+    Vendors need at least min_history prior observations before their
+    baseline is trusted; new vendors never trigger this detector.
+    """
+
+    name = "vendor_baseline"
+    default_weight = 1.1
+    description = "Per-vendor historical amount outlier detection"
+    version = "2"
+
+    def __init__(
+        self,
+        weight: float | None = None,
+        index: VendorIndex | None = None,
+        z_threshold: float = 3.0,
+        min_history: int = 5,
+    ):
+        super().__init__(weight)
+        self.index = index if index is not None else vendor_index
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+
+    def parameters(self) -> dict[str, Any]:
+        return {"z_threshold": self.z_threshold, "min_history": self.min_history, **parsing_parameters()}
+
+    def detect(self, context: AnalysisContext) -> SignalResult:
+        observations: list[tuple[str | None, str | None, float]] = [
+            (None, bid["vendor"], bid["amount"])
+            for bid in extract_bids(context.text, context.amount_index)
+            if bid.get("vendor")
+        ]
+        for entity in context.entities:
+            if entity.get("amount") is not None:
+                observations.append((entity.get("vendor_id"), entity.get("name"), float(entity["amount"])))
+
+        outliers = []
+        vendors_with_history = set()
+        case_id = context.metadata.get("case_id")
+
+        for vendor_id, name, amount in observations:
+            stats = self.index.get(vendor_id, name)
+            baseline = self.index.baseline(vendor_id, name, exclude_case=case_id)
+            if stats is None or baseline is None or baseline.count < self.min_history:
+                continue
+            vendors_with_history.add(stats.vendor_id)
+            z = baseline.zscore(amount)
+            if z is not None and abs(z) >= self.z_threshold:
+                outliers.append({
+                    "vendor": stats.name,
+                    "amount": amount,
+                    "z_score": round(z, 2),
+                    "baseline_mean": round(baseline.mean, 2),
+                    "baseline_stddev": round(baseline.stddev, 2),
+                    "history_size": baseline.count,
+                })
+
+        if not vendors_with_history:
+            return self._make_result(
+                score=0,
+                indicators={"vendor_amounts_found": len(observations)},
+                explanation="No vendors with sufficient history for baseline comparison.",
+                confidence=0.3,
+            )
+
+        if not outliers:
+            return self._make_result(
+                score=0,
+                indicators={"vendors_compared": len(vendors_with_history)},
+                explanation="Vendor amounts are consistent with their historical baselines.",
+                confidence=0.7,
+            )
+
+        score = min(len(outliers) * 15.0, 40.0)
+        confidence = min(0.6 + 0.1 * len(vendors_with_history), 0.9)
+        worst = max(outliers, key=lambda o: abs(o["z_score"]))
+        explanation = (
+            f"{len(outliers)} amount(s) deviate from the vendor's own history; "
+            f"largest: {worst['vendor']} at {worst['amount']:,.2f} "
+            f"(z={worst['z_score']}, baseline mean {worst['baseline_mean']:,.2f})."
+        )
+
+        return self._make_result(
+            score=score,
+            indicators={
+                "vendors_compared": len(vendors_with_history),
+                "outliers": outliers[:10],
+            },
+            explanation=explanation,
+            confidence=confidence,
+        )
@@ -1,30 +1,106 @@
-import shutil
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.domain.errors import UploadTooLarge
+from app.services.object_storage import ObjectStorage, get_object_storage
 
-UPLOAD_DIR = Path("data/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
 
+_SUFFIX_PATTERN = re.compile(r"^\.[a-z0-9]{1,10}$")
 
-def save_upload(upload_file: UploadFile) -> str:
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """Result of persisting an upload to content-addressed storage."""
+
+    key: str
+    backend: str
+    sha256: str
+    size: int
+    filename: str
+    deduplicated: bool = False
+
+
+def safe_filename(filename: str | None) -> str:
+    """Client-supplied names are display-only; strip any directory parts."""
+    name = Path((filename or "").replace("\\", "/")).name
+    return name or "upload"
+
+
+def content_key(sha256: str, suffix: str) -> str:
+    """Sharded key for a blob: ab/cd/abcd....ext"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{suffix}"
+
+
+def _safe_suffix(filename: str) -> str:
+    # The suffix drives extractor selection, so keep it but only if it is plain
+    suffix = Path(filename).suffix.lower()
+    return suffix if _SUFFIX_PATTERN.match(suffix) else ""
+
+
+async def save_upload(
+    upload_file: UploadFile,
+    *,
+    max_bytes: int | None = None,
+    backend: ObjectStorage | None = None,
+) -> StoredUpload:
     """
-    Saves the uploaded file to disk and returns the relative path.
+    Streams the upload into object storage and returns its key.
+
+    The SHA-256 and size are computed while writing to a staging file;
+    the upload is rejected as soon as it passes max_bytes. The staged
+    file is then handed to the storage backend under a sharded
+    content-addressed key, so identical uploads are stored once. Blocking
+    I/O runs in the threadpool to keep the event loop free.
     """
+    limit = max_bytes if max_bytes is not None else settings.max_upload_bytes
+    store = backend or get_object_storage()
+    filename = safe_filename(upload_file.filename)
+
     try:
-        file_path = UPLOAD_DIR / upload_file.filename
-        # Avoid overwriting existing files with same name? For MVP, maybe overwrite or append timestamp.
-        # Let's append timestamp to be safe.
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        safe_filename = f"{timestamp}_{upload_file.filename}"
-        file_path = UPLOAD_DIR / safe_filename
-        
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-            
-        return str(file_path)
+        if upload_file.size is not None and upload_file.size > limit:
+            raise UploadTooLarge(f"Upload exceeds the {limit} byte limit")
+
+        fd, tmp_name = tempfile.mkstemp(dir=store.staging_dir)
+        tmp_path = Path(tmp_name)
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                while chunk := await upload_file.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > limit:
+                        raise UploadTooLarge(f"Upload exceeds the {limit} byte limit")
+                    digest.update(chunk)
+                    await run_in_threadpool(buffer.write, chunk)
+
+            sha256 = digest.hexdigest()
+            key = content_key(sha256, _safe_suffix(filename))
+            deduplicated = await run_in_threadpool(store.exists, key)
+            if deduplicated:
+                tmp_path.unlink()
+            else:
+                await run_in_threadpool(store.store_file, key, tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return StoredUpload(
+            key=key,
+            backend=store.name,
+            sha256=sha256,
+            size=size,
+            filename=filename,
+            deduplicated=deduplicated,
+        )
     finally:
-        upload_file.file.close()
+        await upload_file.close()
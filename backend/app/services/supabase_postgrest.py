@@ -1,46 +1,77 @@
 from __future__ import annotations
 
+from time import perf_counter
 from typing import Any
 
 import httpx
 
 from app.core.config import settings
+from app.core.metrics import postgrest_request_seconds
+from app.utils.timing import span
 
 
 class SupabasePostgrest:
-    def __init__(self, *, access_token: str):
+    def __init__(self, *, access_token: str, transport: httpx.AsyncBaseTransport | None = None):
         if not settings.supabase_url or not settings.supabase_anon_key:
             raise RuntimeError("Supabase is not configured (SUPABASE_URL / SUPABASE_ANON_KEY missing)")
 
+        self.access_token = access_token
         self._base_url = settings.supabase_url.rstrip("/") + "/rest/v1"
         self._headers = {
             "apikey": settings.supabase_anon_key,
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
+        # e.g. httpx.ASGITransport to talk to an in-process app.cli.fake_postgrest
+        self._transport = transport
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: dict[str, str],
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+    ) -> Any:
+        start = perf_counter()
+        status_code = "error"
+        try:
+            with span(f"postgrest.{method.lower()}"):
+                async with httpx.AsyncClient(timeout=15.0, transport=self._transport) as client:
+                    response = await client.request(
+                        method, self._base_url + path, headers=headers, params=params, json=json
+                    )
+                status_code = str(response.status_code)
+                response.raise_for_status()
+                if not response.content:
+                    return None
+                return response.json()
+        finally:
+            postgrest_request_seconds.observe(perf_counter() - start, method, status_code)
 
     async def get(self, path: str, *, params: dict[str, Any] | None = None) -> Any:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(self._base_url + path, headers=self._headers, params=params)
-            response.raise_for_status()
-            if not response.content:
-                return None
-            return response.json()
-
-    async def post(self, path: str, *, json: Any) -> Any:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            headers = {**self._headers, "Prefer": "return=representation"}
-            response = await client.post(self._base_url + path, headers=headers, json=json)
-            response.raise_for_status()
-            if not response.content:
-                return None
-            return response.json()
+        return await self._send("GET", path, headers=self._headers, params=params)
+
+    async def post(
+        self,
+        path: str,
+        *,
+        json: Any,
+        params: dict[str, Any] | None = None,
+        prefer: str = "return=representation",
+    ) -> Any:
+        headers = {**self._headers, "Prefer": prefer}
+        return await self._send("POST", path, headers=headers, params=params, json=json)
 
     async def patch(self, path: str, *, params: dict[str, Any] | None = None, json: Any) -> Any:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            headers = {**self._headers, "Prefer": "return=representation"}
-            response = await client.patch(self._base_url + path, headers=headers, params=params, json=json)
-            response.raise_for_status()
-            if not response.content:
-                return None
-            return response.json()
+        headers = {**self._headers, "Prefer": "return=representation"}
+        return await self._send("PATCH", path, headers=headers, params=params, json=json)
+
+    async def delete(self, path: str, *, params: dict[str, Any]) -> Any:
+        headers = {**self._headers, "Prefer": "return=minimal"}
+        return await self._send("DELETE", path, headers=headers, params=params)
+
+    async def rpc(self, function: str, params: dict[str, Any] | None = None) -> Any:
+        """Calls a SQL function exposed by PostgREST (POST /rpc/<function>)."""
+        return await self._send("POST", f"/rpc/{function}", headers=self._headers, json=params or {})
@@ -1,5 +1,23 @@
+import codecs
+import io
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.domain.errors import AnalysisCancelled, AnalysisDeadlineExceeded
+from app.services.job_events import report_progress
+from app.services.object_storage import ObjectStorage
+from app.utils.cancellation import check_cancelled
+from app.utils.logging import logger
+from app.utils.timing import span
+
+IMAGE_SUFFIXES = [".png", ".jpg", ".jpeg", ".tiff", ".bmp"]
+
+# Bump when extraction output changes so cached sidecars are not reused
+EXTRACTOR_VERSION = "1"
+
 
 def extract_text(file_path: str | Path) -> str:
     """
@@ -14,7 +32,7 @@ def extract_text(file_path: str | Path) -> str:
 
     if suffix == ".pdf":
         text = _extract_from_pdf(path)
-    elif suffix in [".png", ".jpg", ".jpeg", ".tiff", ".bmp"]:
+    elif suffix in IMAGE_SUFFIXES:
         text = _extract_from_image(path)
     else:
         # Fallback for CSV or txt
@@ -26,47 +44,154 @@ def extract_text(file_path: str | Path) -> str:
     return text.strip()
 
 
-def _extract_from_pdf(pdf_path: Path) -> str:
+def extract_text_from_storage(store: ObjectStorage, key: str) -> str:
+    """
+    Extracts text from an object in storage without holding it in memory.
+
+    Local objects are opened in place. Remote text/CSV objects are decoded
+    chunk by chunk as they stream in; remote PDFs and images, which the
+    parsers need random access to, are streamed to a temporary file in
+    the store's staging directory and parsed from there.
+
+    Blocking: call it from a worker thread, not on the event loop.
+    """
+    local = store.local_path(key)
+    if local is not None:
+        return extract_text(local)
+
+    if not store.exists(key):
+        return ""
+
+    suffix = Path(key).suffix.lower()
+    if suffix == ".pdf" or suffix in IMAGE_SUFFIXES:
+        with _staged_copy(store, key) as path:
+            return extract_text(path)
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    parts = [decoder.decode(chunk) for chunk in store.iter_chunks(key)]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def extract_text_from_bytes(data: bytes, suffix: str) -> str:
+    """Extracts text from an in-memory document, picking the parser by `suffix`."""
+    suffix = suffix.lower()
+    if suffix == ".pdf":
+        return _extract_from_pdf(data).strip()
+    if suffix in IMAGE_SUFFIXES:
+        return _extract_from_image(io.BytesIO(data)).strip()
+    return data.decode("utf-8", errors="ignore")
+
+
+def extracted_text_key(key: str) -> str:
+    """Storage key of the cached extraction of `key`."""
+    return f"{key}.text-v{EXTRACTOR_VERSION}.txt"
+
+
+def cached_text_from_storage(store: ObjectStorage, key: str) -> str:
+    """
+    `extract_text_from_storage`, cached in a sidecar object next to `key`.
+
+    Upload keys are content-addressed, so a sidecar can never go stale
+    for its object; re-analysis and re-scoring skip PDF/OCR parsing.
+    Failing to write the sidecar only costs the cache, not the result.
+    """
+    sidecar = extracted_text_key(key)
+    if store.exists(sidecar):
+        return store.read_bytes(sidecar).decode("utf-8")
+
+    text = extract_text_from_storage(store, key)
+    if text:
+        try:
+            _store_text(store, sidecar, text)
+        except Exception as e:
+            logger.warning("extraction.cache_failed", key=key, error=str(e))
+    return text
+
+
+@contextmanager
+def _staged_copy(store: ObjectStorage, key: str) -> Iterator[Path]:
+    """The object streamed to a temporary file (same suffix), removed afterwards."""
+    fd, tmp_name = tempfile.mkstemp(dir=store.staging_dir, suffix=Path(key).suffix.lower())
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in store.iter_chunks(key):
+                check_cancelled()
+                handle.write(chunk)
+        yield tmp_path
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _store_text(store: ObjectStorage, key: str, text: str) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=store.staging_dir)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        store.store_file(key, tmp_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _extract_from_pdf(pdf: Path | bytes) -> str:
     text_content = []
     try:
         import pymupdf  # fitz
-        with pymupdf.open(pdf_path) as doc:
-            for page in doc:
-                text_content.append(page.get_text())
-        
+        with span("extract.pdf"):
+            document = pymupdf.open(pdf) if isinstance(pdf, Path) else pymupdf.open(stream=pdf, filetype="pdf")
+            with document as doc:
+                for page in doc:
+                    check_cancelled()
+                    text_content.append(page.get_text())
+
         # If text is empty, it might be a scanned PDF -> use OCR (not implemented fully for PDF here to save complexity, assuming native PDF)
         # But SRS said Tesseract. Let's add basic OCR invocation if empty.
         raw_text = "\n".join(text_content)
         if len(raw_text.strip()) < 50:
             # Try converting first page to image and OCR
             try:
-                from pdf2image import convert_from_path
+                from pdf2image import convert_from_bytes, convert_from_path
                 import pytesseract
-                
+
                 # Convert only the first few pages to avoid massive processing time for MVP
-                images = convert_from_path(str(pdf_path), first_page=1, last_page=3)
-                ocr_text = ""
-                for img in images:
-                    ocr_text += pytesseract.image_to_string(img)
-                
+                with span("extract.ocr"):
+                    if isinstance(pdf, Path):
+                        images = convert_from_path(str(pdf), first_page=1, last_page=3)
+                    else:
+                        images = convert_from_bytes(pdf, first_page=1, last_page=3)
+                    ocr_text = ""
+                    for page, img in enumerate(images, start=1):
+                        check_cancelled()
+                        report_progress("ocr", page=page, pages=len(images))
+                        ocr_text += pytesseract.image_to_string(img)
+
                 if len(ocr_text.strip()) > len(raw_text.strip()):
                     return ocr_text
             except ImportError:
                 print("pdf2image or pytesseract not installed/configured.")
+            except (AnalysisCancelled, AnalysisDeadlineExceeded):
+                raise
             except Exception as e:
                 print(f"OCR fallback failed: {e}")
-            
+
         return raw_text
+    except (AnalysisCancelled, AnalysisDeadlineExceeded):
+        raise
     except Exception as e:
         print(f"Error extracting PDF text: {e}")
         return ""
 
 
-def _extract_from_image(img_path: Path) -> str:
+def _extract_from_image(img: Path | io.BytesIO) -> str:
+    check_cancelled()
     try:
         import pytesseract
         from PIL import Image
-        return pytesseract.image_to_string(Image.open(img_path))
+        with span("extract.ocr"):
+            report_progress("ocr", page=1, pages=1)
+            return pytesseract.image_to_string(Image.open(img))
     except Exception as e:
         print(f"Error extracting image text: {e}")
         return ""
@@ -0,0 +1,461 @@
+"""
+Cross-case vendor profile index.
+
+Maintains running aggregates per vendor (count, sum, Welford mean and
+variance, first/last seen) that are updated incrementally as cases are
+analyzed and awards or payments are ingested. Lookups are a single dict
+access, so detectors can compare an amount against a vendor's own
+history without rescanning past cases.
+
+Observations are kept per source: a case ("case:<id>"), an award
+("award:<id>") or a payment ("payment:<id>"). Ingesting a source again
+replaces what it contributed before, so re-analysing or re-scoring a
+case does not count its bids twice, and `baseline` can leave a case's
+own bids out while that case is being scored. Vendors are keyed by
+vendor ID; names registered from the vendor master (data/vendors.csv)
+resolve to their ID, other names to their normalized form.
+
+`save` merges into the snapshot on disk under a file lock (newest
+version of each source wins) rather than overwriting it, so API workers
+sharing one VENDOR_INDEX_PATH add to each other's observations.
+"""
+
+import json
+import math
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any
+from uuid import uuid4
+
+from app.schemas.entities import VendorProfile
+from app.services.entity_resolution import normalize_name
+from app.utils.logging import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, saves are still atomic
+    fcntl = None
+
+
+@dataclass
+class RunningStats:
+    """Welford running mean/variance over a stream of amounts."""
+
+    count: int = 0
+    total: float = 0.0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        """Undoes `add(value)` for a value previously added."""
+        if self.count <= 1:
+            self.count, self.total, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+            return
+        mean = (self.mean * self.count - value) / (self.count - 1)
+        self.m2 = max(self.m2 - (value - self.mean) * (value - mean), 0.0)
+        self.count -= 1
+        self.total -= value
+        self.mean = mean
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 until two observations exist)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, value: float) -> float | None:
+        stddev = self.stddev
+        if self.count < 2 or stddev == 0:
+            return None
+        return (value - self.mean) / stddev
+
+
+@dataclass(frozen=True)
+class Observation:
+    """One amount attributed to a vendor by a source."""
+
+    amount: float
+    kind: str
+    vendor_id: str | None = None
+    name: str | None = None
+    seen_at: str | None = None
+    case_id: str | None = None
+    related: tuple[str, ...] = ()
+
+
+@dataclass
+class _Source:
+    observations: list[Observation]
+    updated_at: float  # time.time() of the ingest, to merge snapshots
+
+
+@dataclass
+class VendorStats:
+    """Aggregates for a single vendor."""
+
+    vendor_id: str
+    name: str
+    amounts: RunningStats = field(default_factory=RunningStats)
+    by_kind: dict[str, RunningStats] = field(default_factory=dict)
+    first_seen: str | None = None
+    last_seen: str | None = None
+    aliases: set[str] = field(default_factory=set)
+    related_entities: set[str] = field(default_factory=set)
+    cases_involved: set[str] = field(default_factory=set)
+
+    def add(
+        self,
+        amount: float,
+        *,
+        kind: str,
+        seen_at: str | None = None,
+        case_id: str | None = None,
+        related: Iterable[str] = (),
+    ) -> None:
+        self.amounts.add(amount)
+        self.by_kind.setdefault(kind, RunningStats()).add(amount)
+        if seen_at:
+            # ISO dates compare correctly as strings
+            if self.first_seen is None or seen_at < self.first_seen:
+                self.first_seen = seen_at
+            if self.last_seen is None or seen_at > self.last_seen:
+                self.last_seen = seen_at
+        if case_id:
+            self.cases_involved.add(case_id)
+        self.related_entities.update(r for r in related if r)
+
+    def baseline(self, kind: str | None = None) -> RunningStats:
+        if kind is None:
+            return self.amounts
+        return self.by_kind.get(kind, RunningStats())
+
+    def to_profile(self) -> VendorProfile:
+        return VendorProfile(
+            vendor_id=self.vendor_id,
+            name=self.name,
+            aliases=sorted(self.aliases),
+            total_transactions=self.amounts.count,
+            total_amount=round(self.amounts.total, 2),
+            avg_transaction_size=round(self.amounts.mean, 2),
+            first_transaction=self.first_seen,
+            last_transaction=self.last_seen,
+            related_entities=sorted(self.related_entities),
+            cases_involved=sorted(self.cases_involved),
+        )
+
+
+def vendor_key(vendor_id: str | None, name: str | None = None) -> str:
+    """Index key ignoring registered names: explicit vendor IDs win, otherwise the normalized name."""
+    if vendor_id:
+        return vendor_id.strip()
+    return normalize_name(name or "")
+
+
+def case_source(case_id: str) -> str:
+    return f"case:{case_id}"
+
+
+class VendorIndex:
+    """Thread-safe, incrementally updated map of vendor key -> VendorStats."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._vendors: dict[str, VendorStats] = {}
+        self._sources: dict[str, _Source] = {}
+        # Which vendors each source contributed to, and back
+        self._source_keys: dict[str, set[str]] = {}
+        self._vendor_sources: dict[str, set[str]] = {}
+        # Vendor master: normalized name -> vendor ID, and vendor ID -> display name
+        self._names: dict[str, str] = {}
+        self._vendor_names: dict[str, str] = {}
+        # award_id -> vendor ID, so payments can be attributed
+        self._award_vendors: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._vendors)
+
+    def key(self, vendor_id: str | None, name: str | None = None) -> str:
+        """Index key: explicit vendor IDs win, then the ID registered for the name, then the normalized name."""
+        key = vendor_key(vendor_id, name)
+        return key if vendor_id else self._names.get(key, key)
+
+    def get(self, vendor_id: str | None, name: str | None = None) -> VendorStats | None:
+        return self._vendors.get(self.key(vendor_id, name))
+
+    def baseline(
+        self,
+        vendor_id: str | None,
+        name: str | None = None,
+        *,
+        kind: str | None = None,
+        exclude_case: str | None = None,
+    ) -> RunningStats | None:
+        """A vendor's amount stats (of one `kind`, or all), leaving out case `exclude_case`'s observations."""
+        with self._lock:
+            key = self.key(vendor_id, name)
+            stats = self._vendors.get(key)
+            if stats is None:
+                return None
+            baseline = replace(stats.baseline(kind))
+            source = self._sources.get(case_source(exclude_case)) if exclude_case else None
+            for observation in source.observations if source else ():
+                if (kind is None or observation.kind == kind) and self._observation_key(observation) == key:
+                    baseline.remove(observation.amount)
+            return baseline
+
+    def register_vendor(self, vendor_id: str, name: str) -> None:
+        """Makes `name` (and its variants) resolve to `vendor_id`."""
+        vendor_id, normalized = vendor_id.strip(), normalize_name(name)
+        if not vendor_id or not normalized:
+            return
+        with self._lock:
+            self._register(vendor_id, name)
+            self._register_name(normalized, vendor_id)
+
+    def _register(self, vendor_id: str, name: str) -> None:
+        if vendor_id not in self._vendor_names:
+            self._vendor_names[vendor_id] = name
+            self._rebuild(vendor_id)
+
+    def _register_name(self, normalized: str, vendor_id: str) -> None:
+        previous = self._names.get(normalized, normalized)
+        if previous == vendor_id:
+            return
+        self._names[normalized] = vendor_id
+        # Observations recorded under the name so far now belong to the vendor ID
+        for source in list(self._vendor_sources.get(previous, ())):
+            self._apply(source, self._sources[source])
+
+    def record(
+        self,
+        amount: float,
+        *,
+        vendor_id: str | None = None,
+        name: str | None = None,
+        kind: str = "transaction",
+        seen_at: str | None = None,
+        case_id: str | None = None,
+        related: Iterable[str] = (),
+    ) -> VendorStats | None:
+        """Records one observation from an anonymous source (it is never replaced)."""
+        observation = Observation(amount, kind, vendor_id, name, seen_at, case_id, tuple(related))
+        if not self.ingest(f"record:{uuid4().hex}", [observation]):
+            return None
+        return self.get(vendor_id, name)
+
+    def ingest(self, source: str, observations: Iterable[Observation], *, updated_at: float | None = None) -> int:
+        """Replaces everything `source` contributed with `observations`; returns how many were kept."""
+        kept = [o for o in observations if o.amount > 0 and vendor_key(o.vendor_id, o.name)]
+        with self._lock:
+            self._apply(source, _Source(kept, updated_at if updated_at is not None else time()))
+        return len(kept)
+
+    def ingest_award(self, row: Mapping[str, Any]) -> VendorStats | None:
+        """Ingest a row shaped like data/awards.csv."""
+        vendor_id = str(row.get("winning_vendor") or "").strip()
+        award_id = str(row.get("award_id") or "")
+        if award_id and vendor_id:
+            self._award_vendors[award_id] = vendor_id
+        observation = Observation(
+            _to_amount(row.get("award_amount")),
+            "award",
+            vendor_id=vendor_id,
+            seen_at=row.get("award_date") or None,
+            related=(str(row.get("approved_by") or ""), str(row.get("tender_id") or "")),
+        )
+        if not self.ingest(f"award:{award_id or uuid4().hex}", [observation]):
+            return None
+        return self.get(vendor_id)
+
+    def ingest_payment(self, row: Mapping[str, Any]) -> VendorStats | None:
+        """Ingest a row shaped like data/payments.csv (award must be known)."""
+        vendor_id = self._award_vendors.get(str(row.get("award_id") or ""))
+        if not vendor_id:
+            return None
+        observation = Observation(
+            _to_amount(row.get("amount")),
+            "payment",
+            vendor_id=vendor_id,
+            seen_at=row.get("paid_date") or None,
+        )
+        if not self.ingest(f"payment:{row.get('payment_id') or uuid4().hex}", [observation]):
+            return None
+        return self.get(vendor_id)
+
+    def ingest_case(
+        self,
+        case_id: str,
+        bids: Iterable[Mapping[str, Any]],
+        *,
+        seen_at: str | None = None,
+    ) -> int:
+        """Ingest vendor/amount pairs extracted from an analyzed case, replacing its earlier ones."""
+        observations = [
+            Observation(_to_amount(bid.get("amount")), "bid", name=str(bid["vendor"]), seen_at=seen_at, case_id=case_id)
+            for bid in bids
+            if bid.get("vendor")
+        ]
+        return self.ingest(case_source(case_id), observations)
+
+    def registered_vendors(self) -> dict[str, str]:
+        """The vendor master: vendor ID -> display name."""
+        with self._lock:
+            return dict(self._vendor_names)
+
+    def profiles(self) -> list[VendorProfile]:
+        return [stats.to_profile() for stats in self._vendors.values()]
+
+    def _observation_key(self, observation: Observation) -> str:
+        return self.key(observation.vendor_id, observation.name)
+
+    def _apply(self, source: str, new: _Source) -> None:
+        """Swaps `source`'s observations for `new`'s (lock held)."""
+        stale = self._source_keys.pop(source, set())
+        self._sources.pop(source, None)
+        for key in stale:
+            self._vendor_sources[key].discard(source)
+
+        if new.observations:
+            keys = {self._observation_key(o) for o in new.observations}
+            self._sources[source] = new
+            self._source_keys[source] = keys
+            for key in keys:
+                self._vendor_sources.setdefault(key, set()).add(source)
+
+        # Running stats cannot drop an alias or a date, so vendors that lost observations are rebuilt
+        for key in stale:
+            self._rebuild(key)
+        for observation in new.observations:
+            key = self._observation_key(observation)
+            if key not in stale:
+                self._add(key, observation)
+
+    def _rebuild(self, key: str) -> None:
+        self._vendors.pop(key, None)
+        sources = self._vendor_sources.get(key)
+        if not sources:
+            self._vendor_sources.pop(key, None)
+            return
+        for source in sorted(sources):
+            for observation in self._sources[source].observations:
+                if self._observation_key(observation) == key:
+                    self._add(key, observation)
+
+    def _add(self, key: str, observation: Observation) -> None:
+        stats = self._vendors.get(key)
+        if stats is None:
+            stats = VendorStats(vendor_id=key, name=self._vendor_names.get(key) or observation.name or key)
+            self._vendors[key] = stats
+        if observation.name and observation.name != stats.name:
+            stats.aliases.add(observation.name)
+        stats.add(
+            observation.amount,
+            kind=observation.kind,
+            seen_at=observation.seen_at,
+            case_id=observation.case_id,
+            related=observation.related,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "sources": {
+                    source: {
+                        "updated_at": entry.updated_at,
+                        "observations": [asdict(o) for o in entry.observations],
+                    }
+                    for source, entry in self._sources.items()
+                },
+                "vendors": dict(self._vendor_names),
+                "names": dict(self._names),
+                "award_vendors": dict(self._award_vendors),
+            }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "VendorIndex":
+        index = cls()
+        index.merge(data)
+        return index
+
+    def merge(self, data: Mapping[str, Any]) -> None:
+        """Adds a snapshot's vendors and sources, keeping whichever version of a source is newer."""
+        if "sources" not in data:
+            # Aggregate-only snapshots (before per-source observations) cannot be merged
+            logger.warning("vendor_index.snapshot_ignored", reason="no per-source observations")
+            return
+        with self._lock:
+            for vendor_id, name in (data.get("vendors") or {}).items():
+                self._register(vendor_id, name)
+            for normalized, vendor_id in (data.get("names") or {}).items():
+                self._register_name(normalized, vendor_id)
+            for award_id, vendor_id in (data.get("award_vendors") or {}).items():
+                self._award_vendors.setdefault(award_id, vendor_id)
+            for source, raw in data["sources"].items():
+                current = self._sources.get(source)
+                if current is not None and current.updated_at >= raw["updated_at"]:
+                    continue
+                observations = [Observation(**{**o, "related": tuple(o["related"])}) for o in raw["observations"]]
+                self._apply(source, _Source(observations, raw["updated_at"]))
+
+    def save(self, path: str | Path) -> None:
+        """Merge into the snapshot at `path` and write it back atomically (temp file, then rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _locked(path):
+            if path.exists():
+                try:
+                    self.merge(json.loads(path.read_text()))
+                except ValueError:
+                    logger.warning("vendor_index.snapshot_unreadable", path=str(path))
+            tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.to_dict()))
+            os.replace(tmp, path)
+
+    def load(self, path: str | Path) -> None:
+        """Replace this index's contents with a saved snapshot, if present."""
+        path = Path(path)
+        if not path.exists():
+            return
+        with _locked(path):
+            loaded = self.from_dict(json.loads(path.read_text()))
+        with self._lock:
+            self.__dict__.update({k: v for k, v in loaded.__dict__.items() if k != "_lock"})
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Holds an exclusive lock on `path` across processes (a sidecar .lock file)."""
+    with open(path.with_suffix(path.suffix + ".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _to_amount(value: Any) -> float:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Process-wide index shared by the analysis pipeline and detectors
+vendor_index = VendorIndex()
@@ -0,0 +1,127 @@
+"""
+Cooperative cancellation and deadlines for analysis jobs.
+
+    token = CancelToken()
+    token.set_timeout(600)
+    with bind_token(token):
+        ...
+            check_cancelled()                 # at each safe point
+            text = await cancellable(call())  # around long awaits
+
+A token is cancelled explicitly (`cancel`) or expires at its deadline.
+The worker binds it to the current context (like `track_job`) and the
+pipeline checks it at safe points: each extracted page, each detector,
+before saving. `check_cancelled` raises AnalysisCancelled or
+AnalysisDeadlineExceeded; `cancellable` additionally interrupts the
+awaited call the moment the token is cancelled or expires. Outside a
+bound token both are no-ops, so shared code (rescoring, batch scoring)
+is unaffected.
+
+Blocking stages (extraction, OCR, detectors) go through `run_in_thread`
+so the event loop stays free to accept a cancel while they run; the
+thread sees the same token and stops at its next checkpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import TypeVar
+
+from app.domain.errors import AnalysisCancelled, AnalysisDeadlineExceeded
+
+T = TypeVar("T")
+
+
+class CancelToken:
+    """Cancel flag and optional deadline for one job. Cancel it from the event loop thread."""
+
+    def __init__(self) -> None:
+        self.reason: str | None = None
+        self.deadline: float | None = None  # time.monotonic()
+        self._event: asyncio.Event | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        if self.reason is None:
+            self.reason = reason
+            if self._event is not None:
+                self._event.set()
+
+    def set_timeout(self, seconds: float | None) -> None:
+        """Sets the deadline `seconds` from now (None or 0: no deadline)."""
+        self.deadline = monotonic() + seconds if seconds else None
+
+    def remaining(self) -> float | None:
+        return None if self.deadline is None else max(0.0, self.deadline - monotonic())
+
+    def check(self) -> None:
+        if self.reason is not None:
+            raise AnalysisCancelled(self.reason)
+        if self.deadline is not None and monotonic() >= self.deadline:
+            raise AnalysisDeadlineExceeded("Analysis deadline exceeded")
+
+    async def wait(self) -> None:
+        """Returns once the token is cancelled (not when it expires)."""
+        if self._event is None:
+            self._event = asyncio.Event()
+            if self.reason is not None:
+                self._event.set()
+        await self._event.wait()
+
+
+_current: ContextVar[CancelToken | None] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def bind_token(token: CancelToken) -> Iterator[CancelToken]:
+    """Makes `token` the one checked in this context (including awaited coroutines)."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check_cancelled() -> None:
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+async def cancellable(awaitable: Awaitable[T]) -> T:
+    """Awaits `awaitable`, abandoning it as soon as the bound token is cancelled or expires."""
+    token = _current.get()
+    if token is None:
+        return await awaitable
+    token.check()
+
+    task = asyncio.ensure_future(awaitable)
+    waiter = asyncio.ensure_future(token.wait())
+    try:
+        done, _ = await asyncio.wait({task, waiter}, timeout=token.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        if task in done:
+            return task.result()
+        token.check()
+        # The wait timed out a hair before the deadline by the monotonic clock
+        raise AnalysisDeadlineExceeded("Analysis deadline exceeded")
+    finally:
+        waiter.cancel()
+        if not task.done():
+            task.cancel()
+
+
+async def run_in_thread(fn: Callable[..., T], /, *args: object) -> T:
+    """
+    Runs blocking `fn` in a worker thread, abandoning it like `cancellable`.
+
+    asyncio.to_thread runs it in a copy of the current context, so the
+    bound token, job id (progress events) and timings carry over.
+    """
+    return await cancellable(asyncio.to_thread(fn, *args))
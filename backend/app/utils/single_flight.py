@@ -0,0 +1,47 @@
+"""
+Single-flight: concurrent calls for the same key share one execution.
+
+    flights = SingleFlight()
+    result = await flights.do(case_id, lambda: queue(case_id))
+
+The first caller starts the work; callers arriving while it is running
+await the same result (or exception) instead of starting it again. The
+work is shielded from caller cancellation, so a client disconnecting
+does not abort it for the others. Only deduplicates within this
+process; cross-process races need a check in the database as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether work for `key` is in flight."""
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieved here, so a failure every caller stopped waiting for is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
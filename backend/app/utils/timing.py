@@ -0,0 +1,99 @@
+"""
+Lightweight spans for per-stage timing.
+
+    with collect_timings() as timings:
+        with span("extract_text"):
+            ...
+    timings.to_dict()
+
+A span records its duration into the stage histogram and, when a
+collector is active in the current context, into that collector as well.
+With TIMING_ENABLED=false `span` returns a shared no-op object, so
+instrumented code pays for one attribute lookup and nothing else.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Iterator
+
+from app.core.config import settings
+from app.core.metrics import stage_duration_seconds
+
+
+class Timings:
+    """Accumulated durations for one unit of work, keyed by stage name."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self) -> None:
+        # stage -> [total seconds, calls]
+        self.stages: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            name: {"ms": round(total * 1000.0, 2), "calls": int(calls)}
+            for name, (total, calls) in self.stages.items()
+        }
+
+
+_current: ContextVar[Timings | None] = ContextVar("timings", default=None)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        elapsed = perf_counter() - self.start
+        stage_duration_seconds.observe(elapsed, self.name)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(self.name, elapsed)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str) -> _Span | _NoopSpan:
+    """Times the enclosed block as stage `name`."""
+    if not settings.timing_enabled:
+        return _NOOP
+    return _Span(name)
+
+
+@contextmanager
+def collect_timings(timings: Timings | None = None) -> Iterator[Timings]:
+    """Collects spans opened in this context (including awaited coroutines)."""
+    timings = timings if timings is not None else Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
@@ -0,0 +1,8 @@
+"""
+Reproducible detector benchmarks.
+
+Run from the backend directory:
+
+    python -m benchmarks --docs 200 --chars 20000 --output bench.json
+    python -m benchmarks --output new.json --compare bench.json
+"""
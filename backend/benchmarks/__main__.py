@@ -0,0 +1,65 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .corpus import LOCALES, generate_corpus
+from .harness import build_report, compare, run_benchmarks
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark signal detectors.")
+    parser.add_argument("--docs", type=int, default=100, help="documents in the synthetic corpus")
+    parser.add_argument("--chars", type=int, default=20_000, help="approximate characters per document")
+    parser.add_argument("--anomaly-rate", type=float, default=0.3, help="probability of planting each anomaly")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--locale", choices=LOCALES, default="us", help="how amounts are written")
+    parser.add_argument("--repeat", type=int, default=1, help="timed passes over the corpus")
+    parser.add_argument("--only", nargs="*", help="detector names to run (and/or 'engine')")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", type=Path, help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", type=Path, help="baseline report; exit 1 on latency regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed fractional p95 increase")
+    args = parser.parse_args(argv)
+
+    corpus_params = {
+        "chars": args.chars,
+        "anomaly_rate": args.anomaly_rate,
+        "seed": args.seed,
+        "locale": args.locale,
+        "repeat": args.repeat,
+    }
+    documents = generate_corpus(
+        args.docs, target_chars=args.chars, anomaly_rate=args.anomaly_rate, seed=args.seed, locale=args.locale
+    )
+    results = run_benchmarks(documents, repeat=args.repeat, only=args.only, memory=not args.no_memory)
+    report = build_report(documents, results, corpus_params)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n")
+    else:
+        print(payload)
+
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:>16}  p50 {latency['p50']:9.3f} ms  p95 {latency['p95']:9.3f} ms  "
+            f"p99 {latency['p99']:9.3f} ms  {result['docs_per_second']:>9} docs/s",
+            file=sys.stderr,
+        )
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, tolerance=args.tolerance)
+        for item in regressions:
+            print(
+                f"REGRESSION {item['target']}: {item['metric']} {item['baseline_ms']} -> "
+                f"{item['current_ms']} ms (+{item['change']:.0%})",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Synthetic procurement corpus for benchmarks.
+
+Documents mimic the sample data in ``data/*.csv`` (tenders, bids,
+awards, payments) rendered as text the way an uploaded tender file or
+ledger export reads. Generation is seeded, so the same arguments always
+produce the same corpus.
+
+Anomalies are planted per document and recorded alongside it:
+
+- ``bid_rigging``: losing bids clustered within a narrow band
+- ``split_invoice``: several invoices just below an approval threshold
+- ``benford``: ledger amounts with uniformly distributed leading digits
+- ``keywords`` / ``urgency``: red-flag phrasing in the narrative
+
+Amounts are written in one of LOCALES: US dollars ("$1,234.56"), Indian
+rupees with lakh/crore grouping ("₹12,34,567.00") or euros with a
+decimal comma ("€1.234,56"); "mixed" picks one per document. Figures
+are sized for their currency (a rupee estimate is ~83x the dollar one)
+and split invoices sit below that currency's approval limits.
+"""
+
+from __future__ import annotations
+
+import csv
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+ANOMALIES = ("bid_rigging", "split_invoice", "benford", "keywords", "urgency")
+LOCALES = ("us", "in", "eu", "mixed")
+
+_FALLBACK_VENDORS = ["Alpha Infra Pvt Ltd", "Beta Constructions", "Gamma Works LLP", "Delta Engineering"]
+_FALLBACK_DEPARTMENTS = ["Public Works", "Urban Development"]
+_FALLBACK_PROJECTS = ["Rural Road Repair", "Urban Drainage Upgrade", "Smart Street Lighting"]
+_FALLBACK_OFFICERS = ["Rajesh Kulkarni", "Anita Deshmukh"]
+
+_FILLER = [
+    "The committee reviewed the technical submissions against the published evaluation criteria.",
+    "All bidders were informed of the site inspection schedule in advance.",
+    "Work orders will be issued in phases subject to satisfactory progress reports.",
+    "The estimated cost includes materials, labour and contingency provisions.",
+    "Quality assurance checks are to be performed by the department engineer.",
+    "Payment milestones are linked to verified completion certificates.",
+    "The tender notice was published on the state procurement portal.",
+    "Minutes of the pre-bid meeting were circulated to all participants.",
+]
+_KEYWORD_LINES = [
+    "A side agreement with the vendor covers an undisclosed facilitation payment.",
+    "The consultant is a family member of the approving officer; the payment was made in cash only.",
+    "Records show an off-book kickback routed through an offshore intermediary.",
+]
+_URGENCY_LINES = [
+    "This is urgent: the director wants the award approved immediately, skip the review.",
+    "Approve today or we lose the contract; do not delay the payment.",
+]
+
+
+def _read_column(filename: str, column: str, fallback: list[str]) -> list[str]:
+    path = DATA_DIR / filename
+    try:
+        with path.open(newline="") as handle:
+            values = sorted({row[column] for row in csv.DictReader(handle) if row.get(column)})
+    except (OSError, KeyError):
+        return fallback
+    return values or fallback
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    vendors: list[str]
+    departments: list[str]
+    projects: list[str]
+    officers: list[str]
+
+    @classmethod
+    def load(cls) -> "Vocabulary":
+        projects = _read_column("tenders.csv", "project_name", _FALLBACK_PROJECTS)
+        return cls(
+            vendors=_read_column("vendors.csv", "vendor_name", _FALLBACK_VENDORS),
+            departments=_read_column("tenders.csv", "department", _FALLBACK_DEPARTMENTS),
+            # Strip phase suffixes so generated names vary independently
+            projects=sorted({p.split(" Phase")[0] for p in projects}),
+            officers=_read_column("officers.csv", "officer_name", _FALLBACK_OFFICERS),
+        )
+
+
+@dataclass
+class SyntheticDocument:
+    doc_id: str
+    text: str
+    planted: list[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.text)
+
+
+def _natural_amount(rng: random.Random, low_exp: float = 3.0, high_exp: float = 7.0) -> float:
+    # Log-uniform amounts follow Benford's law
+    return round(10 ** rng.uniform(low_exp, high_exp), 2)
+
+
+def _fabricated_amount(rng: random.Random) -> float:
+    # Uniform leading digit: what made-up figures tend to look like
+    return float(rng.randint(1, 9) * 10 ** rng.randint(3, 6) + rng.randint(0, 999))
+
+
+def _indian_grouping(integer: int) -> str:
+    digits = str(integer)
+    head, groups = digits[:-3], [digits[-3:]]
+    while len(head) > 2:
+        head, groups = head[:-2], [head[-2:]] + groups
+    return ",".join(([head] if head else []) + groups)
+
+
+def _number(amount: float, locale: str) -> str:
+    if locale == "in":
+        return f"{_indian_grouping(int(amount))}.{round(amount * 100) % 100:02d}"
+    formatted = f"{amount:,.2f}"
+    if locale == "eu":
+        return formatted.replace(",", "_").replace(".", ",").replace("_", ".")
+    return formatted
+
+
+# Local currency units per US dollar
+_UNITS_PER_USD = {"us": 1.0, "in": 83.0, "eu": 0.92}
+# Approval limits split invoices are planted below, in local units
+_SPLIT_THRESHOLDS = {
+    "us": [10_000, 25_000, 50_000],
+    "in": [100_000, 500_000, 1_000_000],
+    "eu": [10_000, 25_000, 50_000],
+}
+
+
+def _local(usd: float, locale: str) -> float:
+    return round(usd * _UNITS_PER_USD[locale], 2)
+
+
+def _money(amount: float, locale: str = "us") -> str:
+    symbol = {"us": "$", "in": "₹", "eu": "€"}[locale]
+    return symbol + _number(amount, locale)
+
+
+def _tender_section(
+    rng: random.Random, vocab: Vocabulary, index: int, rigged: bool, locale: str = "us"
+) -> list[str]:
+    estimate = round(rng.uniform(2_000_000, 12_000_000), -3)
+    issued = date(2024, 1, 1) + timedelta(days=rng.randint(0, 330))
+    lines = [
+        f"Tender T{index:04d} - {rng.choice(vocab.projects)} ({rng.choice(vocab.departments)})",
+        f"Estimated cost: {_money(_local(estimate, locale), locale)}. Issued {issued.isoformat()}, closing "
+        f"{(issued + timedelta(days=rng.randint(10, 30))).isoformat()}.",
+    ]
+    vendors = rng.sample(vocab.vendors, k=min(len(vocab.vendors), rng.randint(3, 5)))
+    if rigged:
+        # Winner well above a tight cluster of cover bids
+        winner = estimate * rng.uniform(0.97, 1.02)
+        cluster = estimate * rng.uniform(1.08, 1.12)
+        amounts = [winner] + [cluster * rng.uniform(0.995, 1.005) for _ in vendors[1:]]
+    else:
+        amounts = [estimate * rng.uniform(0.85, 1.25) for _ in vendors]
+    for vendor, amount in zip(vendors, amounts):
+        lines.append(f"Bid from {vendor}: {_money(_local(amount, locale), locale)}")
+    lines.append(f"Award approved by {rng.choice(vocab.officers)}.")
+    return lines
+
+
+def _invoice_section(rng: random.Random, vocab: Vocabulary, split: bool, locale: str = "us") -> list[str]:
+    lines = [f"Payments to {rng.choice(vocab.vendors)}:"]
+    if split:
+        threshold = rng.choice(_SPLIT_THRESHOLDS[locale])
+        amounts = [round(threshold * rng.uniform(0.86, 0.98), 2) for _ in range(rng.randint(3, 5))]
+    else:
+        amounts = [_local(_natural_amount(rng, 2.5, 5.5), locale) for _ in range(rng.randint(2, 4))]
+    for amount in amounts:
+        lines.append(f"Invoice #{rng.randint(10000, 99999)} - {_money(amount, locale)}")
+    return lines
+
+
+def _ledger_section(rng: random.Random, rows: int, fabricated: bool, locale: str = "us") -> list[str]:
+    lines = ["Ledger extract:"]
+    start = date(2024, 1, 1)
+    for i in range(rows):
+        amount = _fabricated_amount(rng) if fabricated else _natural_amount(rng)
+        day = start + timedelta(days=rng.randint(0, 364))
+        plain = f"{amount:.2f}"
+        lines.append(f"{day.isoformat()} | P{i:05d} | {plain.replace('.', ',') if locale == 'eu' else plain}")
+    return lines
+
+
+def generate_document(
+    rng: random.Random,
+    vocab: Vocabulary,
+    doc_id: str,
+    *,
+    target_chars: int,
+    planted: list[str],
+    locale: str = "us",
+) -> SyntheticDocument:
+    """One document of roughly `target_chars` with the given anomalies planted."""
+    lines: list[str] = []
+    tender_index = 0
+    lines += _tender_section(rng, vocab, tender_index, "bid_rigging" in planted, locale)
+    lines += _invoice_section(rng, vocab, "split_invoice" in planted, locale)
+    lines += _ledger_section(rng, 60, "benford" in planted, locale)
+    if "keywords" in planted:
+        lines.append(rng.choice(_KEYWORD_LINES))
+    if "urgency" in planted:
+        lines.append(rng.choice(_URGENCY_LINES))
+
+    size = sum(len(line) + 1 for line in lines)
+    while size < target_chars:
+        # Pad with narrative and clean (unplanted) sections
+        choice = rng.random()
+        if choice < 0.7:
+            extra = [" ".join(rng.choices(_FILLER, k=rng.randint(2, 5)))]
+        elif choice < 0.85:
+            tender_index += 1
+            extra = _tender_section(rng, vocab, tender_index, False, locale)
+        else:
+            extra = _ledger_section(rng, 20, "benford" in planted, locale)
+        lines += extra
+        size += sum(len(line) + 1 for line in extra)
+
+    return SyntheticDocument(doc_id=doc_id, text="\n".join(lines), planted=list(planted))
+
+
+def generate_corpus(
+    count: int,
+    *,
+    target_chars: int = 20_000,
+    anomaly_rate: float = 0.3,
+    seed: int = 0,
+    locale: str = "us",
+) -> list[SyntheticDocument]:
+    """
+    `count` documents; each anomaly is planted independently with
+    probability `anomaly_rate`.
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"Unknown locale {locale!r}; expected one of {LOCALES}")
+    rng = random.Random(seed)
+    vocab = Vocabulary.load()
+    documents = []
+    for i in range(count):
+        planted = [name for name in ANOMALIES if rng.random() < anomaly_rate]
+        doc_locale = rng.choice(LOCALES[:-1]) if locale == "mixed" else locale
+        documents.append(
+            generate_document(
+                rng, vocab, f"doc-{i:05d}", target_chars=target_chars, planted=planted, locale=doc_locale
+            )
+        )
+    return documents
@@ -0,0 +1,212 @@
+"""
+Benchmark harness for the signal detectors.
+
+Each detector (and SignalEngine.analyze end to end, plus the shared
+amount tokenizer on its own) is run over the same synthetic corpus. For
+every target we record latency percentiles, throughput, peak traced
+memory, and how often planted anomalies are caught, then emit one JSON
+document that can be diffed against a baseline from another commit.
+"""
+
+from __future__ import annotations
+
+import gc
+import math
+import platform
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from app.services.signals import SignalEngine
+from app.services.signals.amounts import AmountIndex
+from app.services.signals.base import AnalysisContext, BaseDetector
+
+from .corpus import ANOMALIES, SyntheticDocument
+
+SCHEMA_VERSION = 1
+ENGINE = "engine"
+AMOUNTS = "amounts"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _time_run(fn: Callable[[str], Any], documents: list[SyntheticDocument], repeat: int) -> tuple[list[float], float]:
+    latencies = []
+    started = perf_counter()
+    for _ in range(repeat):
+        for doc in documents:
+            t0 = perf_counter()
+            fn(doc.text)
+            latencies.append(perf_counter() - t0)
+    return latencies, perf_counter() - started
+
+
+def _peak_memory(fn: Callable[[str], Any], documents: list[SyntheticDocument]) -> int:
+    # Separate pass: tracing slows execution, so it never overlaps timing
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for doc in documents:
+            fn(doc.text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak - baseline, 0)
+
+
+def _detection(
+    triggered: Callable[[str], bool], documents: list[SyntheticDocument], anomaly: str | None
+) -> dict[str, Any]:
+    if anomaly is None:
+        return {}
+    planted = [doc for doc in documents if anomaly in doc.planted]
+    clean = [doc for doc in documents if not doc.planted]
+    hits = sum(triggered(doc.text) for doc in planted)
+    false_positives = sum(triggered(doc.text) for doc in clean)
+    return {
+        "planted": len(planted),
+        "recall": round(hits / len(planted), 4) if planted else None,
+        "clean": len(clean),
+        "false_positive_rate": round(false_positives / len(clean), 4) if clean else None,
+    }
+
+
+def measure(
+    fn: Callable[[str], Any],
+    documents: list[SyntheticDocument],
+    *,
+    repeat: int = 1,
+    memory: bool = True,
+) -> dict[str, Any]:
+    fn(documents[0].text)  # warm caches and lazy imports
+    latencies, wall = _time_run(fn, documents, repeat)
+    latencies.sort()
+    chars = sum(doc.size for doc in documents) * repeat
+    result = {
+        "runs": len(latencies),
+        "wall_seconds": round(wall, 6),
+        "docs_per_second": round(len(latencies) / wall, 2) if wall else None,
+        "mb_per_second": round(chars / 1_000_000 / wall, 3) if wall else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 4),
+            "p50": round(percentile(latencies, 50) * 1000, 4),
+            "p95": round(percentile(latencies, 95) * 1000, 4),
+            "p99": round(percentile(latencies, 99) * 1000, 4),
+            "max": round(latencies[-1] * 1000, 4),
+        },
+    }
+    if memory:
+        result["peak_memory_bytes"] = _peak_memory(fn, documents)
+    return result
+
+
+def _detector_fn(detector: BaseDetector) -> Callable[[str], Any]:
+    return lambda text: detector.detect(AnalysisContext(text=text))
+
+
+def run_benchmarks(
+    documents: list[SyntheticDocument],
+    *,
+    repeat: int = 1,
+    only: list[str] | None = None,
+    memory: bool = True,
+) -> dict[str, dict[str, Any]]:
+    """
+    Results keyed by detector name, plus ``engine`` for the full ensemble
+    and ``amounts`` for the amount tokenizer alone.
+    """
+    engine = SignalEngine()
+    targets: list[tuple[str, Callable[[str], Any], Callable[[str], bool]]] = []
+    for detector in engine.detectors:
+        run = _detector_fn(detector)
+        targets.append((detector.name, run, lambda text, run=run: run(text).score > 0))
+    engine_run = lambda text: engine.analyze(AnalysisContext(text=text))  # noqa: E731
+    targets.append((ENGINE, engine_run, lambda text: engine_run(text).risk_score > 0))
+    targets.append((AMOUNTS, AmountIndex.from_text, lambda text: len(AmountIndex.from_text(text)) > 0))
+
+    results = {}
+    for name, run, triggered in targets:
+        if only and name not in only:
+            continue
+        result = measure(run, documents, repeat=repeat, memory=memory)
+        detection = _detection(triggered, documents, name if name in ANOMALIES else None)
+        if detection:
+            result["detection"] = detection
+        results[name] = result
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def build_report(
+    documents: list[SyntheticDocument],
+    results: dict[str, dict[str, Any]],
+    corpus_params: dict[str, Any],
+) -> dict[str, Any]:
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "corpus": {
+            **corpus_params,
+            "documents": len(documents),
+            "total_chars": sum(doc.size for doc in documents),
+            "planted": {a: sum(a in doc.planted for doc in documents) for a in ANOMALIES},
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    *,
+    metric: str = "p95",
+    tolerance: float = 0.10,
+) -> list[dict[str, Any]]:
+    """Targets whose latency `metric` grew by more than `tolerance` (fractional)."""
+    regressions = []
+    for name, result in current.get("results", {}).items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        old = before["latency_ms"][metric]
+        new = result["latency_ms"][metric]
+        if old > 0 and (new - old) / old > tolerance:
+            regressions.append({
+                "target": name,
+                "metric": metric,
+                "baseline_ms": old,
+                "current_ms": new,
+                "change": round((new - old) / old, 4),
+            })
+    return regressions
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.analytics_service import simulate_weights
+from app.services.signals import SignalEngine
+from app.services.signals.aggregation import BreakdownMatrix, aggregate_breakdown, risk_levels
+from app.services.signals.base import AnalysisContext
+from benchmarks.corpus import generate_corpus
+
+
+@pytest.fixture(scope="module")
+def breakdowns():
+    engine = SignalEngine()
+    documents = generate_corpus(12, target_chars=2000, anomaly_rate=0.5, seed=7)
+    return [engine.analyze(AnalysisContext(text=d.text)).signals["detector_breakdown"] for d in documents]
+
+
+def random_breakdowns(n, seed=0):
+    rng = random.Random(seed)
+    names = ["benford", "round_numbers", "split_invoice", "keywords", "urgency"]
+    return [
+        {
+            name: {
+                "score": rng.choice([0, 0, 10, 25.0, 30, 50, 100]),
+                "weight": 1.0,
+                "confidence": rng.choice([0, 0.3, 0.6, 0.7, 0.95, 1.0]),
+            }
+            for name in names
+            if rng.random() > 0.1
+        }
+        for _ in range(n)
+    ]
+
+
+def test_aggregate_breakdown_reproduces_the_engine():
+    engine = SignalEngine()
+    result = engine.analyze(AnalysisContext(text="URGENT: bribe paid.\nTotal: $5,000\nTotal: $6,000\nTotal: $7,000"))
+
+    again = aggregate_breakdown(result.signals["detector_breakdown"])
+
+    assert (again.risk_score, again.risk_level, again.top_factors) == (
+        result.risk_score, result.risk_level, result.top_factors
+    )
+
+
+@pytest.mark.parametrize("weights", [None, {"urgency": 3.0, "keywords": 0.2}, {"benford": 0.0, "round_numbers": 7.5}])
+def test_matrix_scores_match_scalar_aggregation(breakdowns, weights):
+    cases = breakdowns + random_breakdowns(300)
+    matrix = BreakdownMatrix.from_breakdowns(cases)
+
+    expected = [aggregate_breakdown(b, weights).risk_score for b in cases]
+
+    assert matrix.risk_scores(weights).tolist() == expected
+
+
+def test_risk_levels_match_classification_boundaries():
+    assert risk_levels(np.array([0, 24, 25, 49, 50, 74, 75, 100])).tolist() == [
+        "low", "low", "medium", "medium", "high", "high", "critical", "critical"
+    ]
+
+
+def test_simulate_weights_reports_level_changes():
+    breakdown = {
+        "urgency": {"score": 30, "weight": 1.0, "confidence": 1.0},
+        "keywords": {"score": 80, "weight": 1.0, "confidence": 1.0},
+    }
+    cases = [
+        {"case_id": "c1", "status": "analyzed", "signals": {"detector_breakdown": breakdown}},
+        {"case_id": "c2", "status": "uploaded", "signals": {}},
+    ]
+
+    result = simulate_weights(cases, {"keywords": 0.1})
+
+    assert result.cases_scored == 1
+    assert (result.avg_risk_score, result.simulated_avg_risk_score) == (55.0, 34.0)
+    assert result.risk_distribution.high == 1 and result.simulated_risk_distribution.medium == 1
+    assert [(c.case_id, c.risk_level, c.simulated_level) for c in result.changed_cases] == [("c1", "high", "medium")]
@@ -0,0 +1,151 @@
+import pytest
+
+from app.core.config import settings
+from app.services.signals import amounts, split_invoice
+from app.services.signals.amounts import AmountIndex, detect_decimal_mark, parse_number
+from app.services.signals.base import AnalysisContext
+from app.services.signals.currency import RateTable
+from app.services.signals.benford import extract_leading_digits
+from app.services.signals.round_numbers import RoundNumberDetector, extract_monetary_amounts
+from app.services.signals.split_invoice import SplitInvoiceDetector, extract_invoice_candidates
+
+
+def test_index_records_each_token_once_with_provenance():
+    text = "Invoice #12345 - $1,234.00 paid 2024-01-19\nTotal: 5,000 USD\nBid from Alpha: $900"
+
+    index = AmountIndex.from_text(text)
+    by_raw = {index.raw(i): amount for i, amount in enumerate(index)}
+
+    assert by_raw["12345"].kind == "id"
+    assert by_raw["1,234.00"] == by_raw["1,234.00"]._replace(value=1234.0, currency="USD", label="invoice", kind="money")
+    assert by_raw["2024-01-19"].kind == "date"
+    assert (by_raw["5,000"].label, by_raw["5,000"].currency) == ("total", "USD")
+    assert by_raw["900"].label == "bid"
+    assert text[by_raw["900"].start:by_raw["900"].end] == "900"
+
+
+def test_overlapping_formats_are_not_double_counted():
+    # "$5,000" used to match two of the round_numbers patterns
+    text = "Payment: $5,000\nTotal $5,000 USD\n$1234"
+
+    assert extract_monetary_amounts(text) == [5000.0, 5000.0, 1234.0]
+
+
+def test_invoice_candidates_attach_invoice_numbers():
+    candidates = extract_invoice_candidates("Invoice #778 - $4,900.00\nMisc $50\nINV-9: 4800")
+
+    assert [(c.amount, c.invoice_number) for c in candidates] == [(4900.0, "778"), (4800.0, "9")]
+
+
+def test_benford_skips_dates_and_identifiers():
+    text = "Invoice #98765 dated 2023-11-30: $4,210.55 and 1,870"
+
+    assert extract_leading_digits(text) == [4, 1]
+
+
+def test_context_index_is_shared_between_detectors():
+    context = AnalysisContext(text="Total: $5,000\nTotal: $6,000\nTotal: $7,000")
+
+    first = context.amount_index
+    RoundNumberDetector().detect(context)
+
+    assert context.amount_index is first
+    assert len(first) == 3
+
+
+RATES = RateTable.from_usd_rates({"USD": 1.0, "INR": 0.012, "EUR": 1.1})
+
+
+def test_indian_grouping_and_lakh_crore_words():
+    text = "Bid: ₹49,85,000\nQuote Rs. 52,00,000\nEstimate 49.85 lakh\nCeiling INR 1.2 crore"
+
+    amounts = list(AmountIndex.from_text(text, rates=RATES, decimal="."))
+
+    assert [a.value for a in amounts] == [4_985_000.0, 5_200_000.0, 4_985_000.0, 12_000_000.0]
+    assert [a.currency for a in amounts] == ["INR", "INR", None, "INR"]
+    assert amounts[0].normalized == pytest.approx(59_820.0)
+    assert all(a.is_money for a in amounts)
+
+
+def test_decimal_comma_documents_are_detected():
+    text = "Rechnung 1.234,56 € vom 19.01.2024, Summe EUR 2.000 und 7,5"
+
+    assert detect_decimal_mark(text) == ","
+    amounts = list(AmountIndex.from_text(text, rates=RATES, decimal="auto"))
+
+    assert [(a.value, a.kind) for a in amounts] == [
+        (1234.56, "money"), (2024.0, "date"), (2000.0, "money"), (7.5, "number")
+    ]
+    assert amounts[0].normalized == pytest.approx(1358.016)
+
+
+@pytest.mark.parametrize(
+    ("raw", "decimal", "expected"),
+    [
+        ("1,234,567.89", ".", 1234567.89),
+        ("49,85,000", ".", 4985000.0),
+        ("1.234.567", ".", 1234567.0),
+        ("1.234", ".", 1.234),
+        ("1.234", ",", 1234.0),
+        ("1.234,5", ",", 1234.5),
+        ("1,234.5", ",", 1234.5),
+    ],
+)
+def test_parse_number(raw, decimal, expected):
+    assert parse_number(raw, decimal) == expected
+
+
+def test_runs_are_split_into_fields_dates_and_identifiers():
+    text = "B001,T001,V001,4985000,2024-01-19\nv1.2.3 120,2024"
+
+    index = AmountIndex.from_text(text, rates=RATES, decimal=".")
+
+    assert [(index.raw(i), a.kind) for i, a in enumerate(index)] == [
+        ("4985000", "number"), ("2024-01-19", "date"), ("120", "number"), ("2024", "number")
+    ]
+
+
+def test_rate_table_from_file(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text('{"usd": 83.0, "EUR": 90.0}')
+
+    rates = RateTable.from_file(path, base="INR", default_currency="INR")
+
+    assert rates.to_base(10, "USD") == 830.0
+    assert rates.to_base(10, None) == 10.0
+    assert rates.to_base(10, "GBP") == 10.0  # unknown currencies pass through
+
+
+def test_abbreviated_scales_need_a_currency_marker():
+    text = "Balance 12,500.00 Cr\nOpening 4,500 CR\nCeiling ₹1.2 cr\nGrant 3 mn USD"
+
+    amounts = list(AmountIndex.from_text(text, rates=RATES, decimal="."))
+
+    assert [a.value for a in amounts] == [12_500.0, 4_500.0, 12_000_000.0, 3_000_000.0]
+
+
+def test_split_invoice_compares_rupees_with_rupee_limits(monkeypatch):
+    monkeypatch.setattr(split_invoice, "get_rate_table", lambda: RATES)
+    detector = SplitInvoiceDetector()
+    # Just below a ₹1 lakh limit; converted (~$1,150) they are nowhere near a dollar limit
+    rupees = AnalysisContext(text="Invoice #1 - ₹96,000.00\nInvoice #2 - ₹94,500.00\nInvoice #3 - ₹97,250.00")
+    # $9,600 is ₹8 lakh, which is not close to a rupee limit
+    dollars = AnalysisContext(text="Invoice #1 - $9,600.00\nInvoice #2 - $9,450.00")
+
+    result = detector.detect(rupees)
+    assert result.score > 0
+    assert result.indicators["suspicious_splits"][0]["currency"] == "INR"
+    assert result.indicators["suspicious_splits"][0]["threshold"] == 100_000.0
+    assert detector.detect(dollars).indicators["suspicious_splits"][0]["currency"] == "USD"
+
+
+def test_split_invoice_fingerprint_follows_rates_and_decimal_mark(monkeypatch):
+    detector = SplitInvoiceDetector()
+    before = detector.fingerprint()
+
+    monkeypatch.setattr(settings, "amount_decimal_mark", ",")
+    after_mark = detector.fingerprint()
+    monkeypatch.setattr(split_invoice, "get_rate_table", lambda: RATES)
+    monkeypatch.setattr(amounts, "get_rate_table", lambda: RATES)
+
+    assert len({before, after_mark, detector.fingerprint()}) == 3
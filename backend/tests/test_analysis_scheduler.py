@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_case_service, require_user
+from app.core.supabase_auth import CurrentUser
+from app.domain.errors import AnalysisQueueFull
+from app.main import app
+from app.services.analysis_scheduler import AnalysisScheduler
+
+
+class Recorder:
+    """Jobs that log when they start and finish when released."""
+
+    def __init__(self):
+        self.started = []
+        self.gate = asyncio.Event()
+
+    def job(self, name):
+        async def run():
+            self.started.append(name)
+            await self.gate.wait()
+            return name
+
+        return run
+
+
+def submit(scheduler, recorder, owner, name, priority="interactive"):
+    return scheduler.reserve(owner, priority).submit(name, recorder.job(name))
+
+
+async def drain(recorder, futures):
+    recorder.gate.set()
+    await asyncio.gather(*futures)
+
+
+def make_scheduler(**overrides):
+    options = dict(max_concurrency=1, max_per_owner=10, max_queue_depth=100, max_queued_per_owner=100, owner_weights={})
+    return AnalysisScheduler(**{**options, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_interactive_jobs_overtake_queued_bulk_and_rescore():
+    scheduler, recorder = make_scheduler(), Recorder()
+    futures = [
+        submit(scheduler, recorder, "a", "running"),
+        submit(scheduler, recorder, "a", "bulk", "bulk"),
+        submit(scheduler, recorder, "a", "rescore", "rescore"),
+        submit(scheduler, recorder, "b", "interactive"),
+    ]
+
+    await drain(recorder, futures)
+
+    assert recorder.started == ["running", "interactive", "rescore", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_owners_take_weighted_turns():
+    scheduler, recorder = make_scheduler(owner_weights={"a": 2}), Recorder()
+    futures = [submit(scheduler, recorder, "a", f"a{i}", "bulk") for i in range(1, 7)]
+    futures += [submit(scheduler, recorder, "b", f"b{i}", "bulk") for i in range(1, 3)]
+
+    await drain(recorder, futures)
+
+    # a1 started at once; then a gets two jobs per turn to b's one
+    assert recorder.started == ["a1", "a2", "a3", "b1", "a4", "a5", "b2", "a6"]
+
+
+@pytest.mark.asyncio
+async def test_owner_at_its_cap_is_skipped():
+    scheduler, recorder = make_scheduler(max_concurrency=3, max_per_owner=1), Recorder()
+    futures = [submit(scheduler, recorder, "a", f"a{i}") for i in range(1, 4)]
+    futures.append(submit(scheduler, recorder, "b", "b1"))
+    await asyncio.sleep(0)
+
+    assert recorder.started == ["a1", "b1"]
+    assert scheduler.running == 2 and scheduler.depth == 2
+    await drain(recorder, futures)
+    assert scheduler.running == 0 and scheduler.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_limits_reject_and_released_slots_are_reused():
+    scheduler = make_scheduler(max_queue_depth=3, max_queued_per_owner=2)
+    first = scheduler.reserve("a")
+    scheduler.reserve("a")
+
+    with pytest.raises(AnalysisQueueFull):
+        scheduler.reserve("a")
+    scheduler.reserve("b")
+    with pytest.raises(AnalysisQueueFull):
+        scheduler.reserve("c")
+
+    first.release()
+    scheduler.reserve("c")
+    assert scheduler.depth == 3
+
+
+@pytest.mark.asyncio
+async def test_positions_follow_turn_order():
+    scheduler, recorder = make_scheduler(), Recorder()
+    futures = [submit(scheduler, recorder, "a", name) for name in ("a0", "a1", "a2", "a3")]
+    futures += [submit(scheduler, recorder, "b", "b1"), submit(scheduler, recorder, "b", "b2", "bulk")]
+
+    assert scheduler.position("a0") is None  # running
+    assert [scheduler.position(k) for k in ("a1", "b1", "a2", "a3", "b2")] == [1, 2, 3, 4, 5]
+    await drain(recorder, futures)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_the_result_or_raises():
+    scheduler = make_scheduler()
+
+    async def boom():
+        raise ValueError("boom")
+
+    async def ok():
+        return 42
+
+    assert await scheduler.run("a", "rescore", "ok", ok) == 42
+    with pytest.raises(ValueError):
+        await scheduler.run("a", "rescore", "boom", boom)
+    assert scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_cancels_its_future_and_frees_the_slot():
+    scheduler = make_scheduler()
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    waiter = asyncio.ensure_future(scheduler.run("a", "rescore", "hang", hang))
+    await started.wait()
+    [task] = scheduler._tasks
+    task.cancel()  # e.g. the loop shutting down
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+    assert scheduler.running == 0
+    assert not scheduler._tasks
+
+
+class FullService:
+    async def queue_analysis(self, case_id, **kwargs):
+        raise AnalysisQueueFull("Analysis queue is full")
+
+
+def test_full_queue_is_429_with_retry_after():
+    app.dependency_overrides[require_user] = lambda: CurrentUser(id="u1", email=None, role=None, raw_claims={})
+    app.dependency_overrides[get_case_service] = FullService
+    try:
+        with TestClient(app) as client:
+            response = client.post("/cases/c1/analyze?priority=bulk")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_join_the_queued_job_and_reuse_running_keys():
+    scheduler, recorder = make_scheduler(), Recorder()
+    busy = submit(scheduler, recorder, "a", "busy")
+    first = submit(scheduler, recorder, "a", "rescore:c1", "rescore")
+    second = submit(scheduler, recorder, "a", "rescore:c1", "rescore")
+
+    assert second is first and scheduler.depth == 1
+    await drain(recorder, [busy, first])
+    assert recorder.started == ["busy", "rescore:c1"]
+
+    # Once it runs, the same key queues a new job
+    recorder.gate.clear()
+    running = submit(scheduler, recorder, "a", "rescore:c1", "rescore")
+    await asyncio.sleep(0)
+    queued = submit(scheduler, recorder, "a", "rescore:c1", "rescore")
+    assert queued is not running
+    await drain(recorder, [running, queued])
+    assert scheduler.running == 0 and scheduler.depth == 0
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.repositories.case_repo import CaseRepository
+from app.services.analytics_service import aggregate_cases, compute_analytics_summary
+from app.services.case_service import CaseService
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def case(case_id, status, score, hours_ago, **detectors):
+    return {
+        "case_id": case_id,
+        "status": status,
+        "risk_score": score,
+        "created_at": (NOW - timedelta(hours=hours_ago)).isoformat(),
+        "signals": {"detector_breakdown": {
+            name: {"score": value, "weight": 1.0, "confidence": 1.0} for name, value in detectors.items()
+        }},
+    }
+
+
+CASES = [
+    case("c1", "analyzed", 80, 1, keywords=90.0, urgency=40.0, benford=0),
+    case("c2", "analyzed", 60, 30, keywords=50.0, benford=0),
+    case("c3", "analyzed", 10, 24 * 10, urgency=20.0, benford=0),
+    case("c4", "uploaded", None, 2),
+    case("c5", "failed", None, 24 * 40),
+]
+
+
+def test_aggregates_match_the_sql_function_contract():
+    aggregates = aggregate_cases(CASES, NOW)
+
+    assert aggregates["risk_distribution"] == {"critical": 1, "high": 1, "low": 1}
+    assert aggregates["status_distribution"] == {"analyzed": 3, "uploaded": 1, "failed": 1}
+    assert aggregates["days"] == [
+        {"offset": 20, "count": 1, "analyzed": 1, "risk_sum": 10, "high_risk": 0},
+        {"offset": 28, "count": 1, "analyzed": 1, "risk_sum": 60, "high_risk": 1},
+        {"offset": 29, "count": 2, "analyzed": 1, "risk_sum": 80, "high_risk": 1},
+    ]
+    assert [(d["name"], d["triggered_count"], d["case_ids"]) for d in aggregates["detectors"]] == [
+        ("keywords", 2, ["c1", "c2"]), ("urgency", 2, ["c1", "c3"]), ("benford", 0, []),
+    ]
+    assert aggregates["recent_high_risk_cases"] == ["c1", "c2"]
+
+
+def test_summary_trends_and_cohorts():
+    summary = compute_analytics_summary(CASES, NOW)
+
+    assert (summary.total_cases, summary.analyzed_cases, summary.avg_risk_score) == (5, 3, 50.0)
+    assert [(p.count, p.avg_risk_score, p.high_risk_count) for p in summary.trends_7d][-2:] == [(1, 60.0, 1), (2, 80.0, 1)]
+    assert sum(p.count for p in summary.trends_7d) == 3
+    assert len(summary.trends_30d) == 10 and sum(p.count for p in summary.trends_30d) == 4
+    assert summary.trends_30d[6].avg_risk_score == 10.0
+    assert [s.signal_type for s in summary.top_signals] == ["keywords", "urgency"]
+    assert [(c.cohort_name, c.top_signals) for c in summary.cohorts] == [
+        ("low_risk", ["urgency"]), ("high_risk", ["keywords"]), ("critical_risk", ["keywords", "urgency"])
+    ]
+    assert summary.pending_review_count == 1
+
+
+class FakeClient:
+    def __init__(self, rpc_result=None, rpc_status=200):
+        self.rpc_result = rpc_result
+        self.rpc_status = rpc_status
+        self.calls = []
+
+    async def rpc(self, function, params=None):
+        self.calls.append(("rpc", function, params))
+        if self.rpc_status != 200:
+            request = httpx.Request("POST", f"http://db/rest/v1/rpc/{function}")
+            raise httpx.HTTPStatusError("error", request=request, response=httpx.Response(self.rpc_status, request=request))
+        return self.rpc_result
+
+    async def get(self, path, *, params=None):
+        self.calls.append(("get", path, params))
+        return [
+            {**{k: v for k, v in c.items() if k != "signals"}, "case_detector_scores": [
+                {"detector": name, **entry} for name, entry in c["signals"]["detector_breakdown"].items()
+            ]}
+            for c in CASES
+        ]
+
+
+@pytest.mark.asyncio
+async def test_service_uses_rpc_aggregates_when_deployed():
+    expected = aggregate_cases(CASES, NOW)
+    client = FakeClient(rpc_result=expected)
+
+    aggregates = await CaseService(CaseRepository(client)).analytics_aggregates(NOW)  # type: ignore[arg-type]
+
+    assert aggregates == expected
+    assert client.calls == [("rpc", "analytics_summary", {"p_now": NOW.isoformat()})]
+
+
+@pytest.mark.asyncio
+async def test_service_falls_back_to_python_when_function_is_missing():
+    client = FakeClient(rpc_status=404)
+
+    aggregates = await CaseService(CaseRepository(client)).analytics_aggregates(NOW)  # type: ignore[arg-type]
+
+    assert [c[0] for c in client.calls] == ["rpc", "get"]
+    assert aggregates["risk_distribution"] == {"critical": 1, "high": 1, "low": 1}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await CaseService(CaseRepository(FakeClient(rpc_status=500))).analytics_aggregates(NOW)  # type: ignore[arg-type]
@@ -0,0 +1,96 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from app.cli import batch_score
+from app.cli.batch_score import NdjsonSink, iter_documents, run_batch
+
+DOCS = {
+    "a.txt": "URGENT: approve immediately.\nTotal: $5,000\nTotal: $6,000\nTotal: $7,000",
+    "nested/b.csv": "vendor,amount\nAlpha,4900\nBeta,4950",
+    "nested/deeper/c.txt": "Minutes of the routine monthly staff meeting.",
+    "empty.txt": "",
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "docs"
+    for name, text in DOCS.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    (root / "notes.docx").write_text("unsupported")
+    return root
+
+
+def read_records(path):
+    return {r["source"]: r for r in map(json.loads, path.read_text().splitlines())}
+
+
+def test_directory_is_scored_inline_to_ndjson(corpus, tmp_path):
+    output = tmp_path / "out.ndjson"
+
+    assert batch_score.main([str(corpus), "--output", str(output), "--workers", "0", "--quiet"]) == 0
+
+    records = read_records(output)
+    assert set(records) == set(DOCS)
+    assert records["a.txt"]["risk_score"] > 0
+    assert records["a.txt"]["detectors"]["urgency"]["score"] > 0
+    assert records["empty.txt"]["error"] == "no text extracted"
+
+
+def test_resume_skips_recorded_documents_and_drops_a_torn_line(corpus, tmp_path):
+    output = tmp_path / "out.ndjson"
+    first = json.dumps({"source": "a.txt", "error": None, "risk_score": 1}) + "\n"
+    output.write_text(first + '{"source": "nested/b.csv", "err')
+
+    batch_score.main([str(corpus), "--output", str(output), "--workers", "0", "--resume", "--quiet"])
+
+    lines = output.read_text().splitlines()
+    sources = [json.loads(line)["source"] for line in lines]
+    assert sorted(sources) == sorted(DOCS)
+    assert read_records(output)["a.txt"]["risk_score"] == 1  # kept, not re-scored
+
+
+def test_zip_members_are_scored_in_a_process_pool(tmp_path):
+    archive = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, text in DOCS.items():
+            zf.writestr(name, text)
+    sink = NdjsonSink(tmp_path / "out.ndjson")
+    sink.open(resume=False)
+
+    stats = run_batch(iter_documents(archive), sink, workers=2, chunk_size=1)
+    sink.close()
+
+    assert (stats.scored, stats.errors) == (4, 1)
+    assert set(read_records(tmp_path / "out.ndjson")) == set(DOCS)
+
+
+def test_tar_members_are_read_by_the_parent(tmp_path):
+    archive = tmp_path / "docs.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        for name, text in DOCS.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+    documents = list(iter_documents(archive))
+
+    assert [d.source for d in documents] == list(DOCS)
+    assert documents[0].data == DOCS["a.txt"].encode()
+
+
+def test_parquet_parts_support_resume(corpus, tmp_path):
+    pytest.importorskip("pyarrow")
+    output = tmp_path / "parts"
+
+    batch_score.main([str(corpus), "--output", str(output), "--format", "parquet", "--workers", "0", "--chunk-size", "2", "--quiet"])
+    batch_score.main([str(corpus), "--output", str(output), "--format", "parquet", "--workers", "0", "--resume", "--quiet"])
+
+    assert len(list(output.glob("part-*.parquet"))) == 2
@@ -0,0 +1,43 @@
+from app.services.signals.amounts import AmountIndex
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import build_report, compare, percentile, run_benchmarks
+
+
+def test_corpus_is_deterministic_and_plants_anomalies():
+    first = generate_corpus(5, target_chars=3000, anomaly_rate=1.0, seed=3)
+    second = generate_corpus(5, target_chars=3000, anomaly_rate=1.0, seed=3)
+
+    assert [d.text for d in first] == [d.text for d in second]
+    assert all(d.size >= 3000 for d in first)
+    assert all(set(d.planted) == {"bid_rigging", "split_invoice", "benford", "keywords", "urgency"} for d in first)
+
+
+def test_run_benchmarks_reports_latency_and_detection():
+    documents = generate_corpus(4, target_chars=2000, anomaly_rate=0.5, seed=1)
+
+    results = run_benchmarks(documents, only=["split_invoice", "engine"], memory=False)
+    report = build_report(documents, results, {"seed": 1})
+
+    assert set(report["results"]) == {"split_invoice", "engine"}
+    latency = results["engine"]["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert "detection" in results["split_invoice"]
+    assert report["corpus"]["documents"] == 4
+
+
+def test_percentile_and_compare():
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+    baseline = {"results": {"engine": {"latency_ms": {"p95": 10.0}}}}
+    current = {"results": {"engine": {"latency_ms": {"p95": 12.0}}}}
+
+    assert compare(baseline, current, tolerance=0.1)[0]["target"] == "engine"
+    assert compare(baseline, current, tolerance=0.5) == []
+
+
+def test_corpus_locales_write_amounts_the_tokenizer_reads():
+    for locale, currency in (("in", "INR"), ("eu", "EUR")):
+        (doc,) = generate_corpus(1, target_chars=1000, seed=2, locale=locale)
+        currencies = {a.currency for a in AmountIndex.from_text(doc.text, decimal="auto") if a.is_money}
+        assert currency in currencies
@@ -0,0 +1,110 @@
+import random
+import time
+
+from app.services.signals.amounts import AmountIndex
+from app.services.signals.bid_rigging import LABEL_WINDOW, detect_bid_patterns, extract_bids
+from app.services.signals.currency import RateTable
+
+
+def test_extracts_common_bid_layouts_once_each():
+    text = "\n".join([
+        "Bid from Alpha Infra Pvt Ltd: $4,985,000.00",
+        "Beta Constructions: $5,200,000",
+        "Gamma Works quote: 5,150,000",
+        "Vendor 4: 5100000",
+        "Vendor Delta: $12,500",
+        "Proposal: $9,999.50",
+    ])
+
+    bids = extract_bids(text)
+
+    assert [(b["vendor"], b["amount"]) for b in bids] == [
+        ("Alpha Infra Pvt Ltd", 4985000.0),
+        ("Beta Constructions", 5200000.0),
+        ("Gamma Works", 5150000.0),
+        ("4", 5100000.0),
+        ("Delta", 12500.0),
+        (None, 9999.5),
+    ]
+    assert len({b["span"] for b in bids}) == len(bids)
+
+
+def test_extracts_rupee_bids_in_lakh_grouping():
+    text = "Bid from Alpha Infra: ₹49,85,000\nBid from Beta Works: Rs. 12,40,000\nVendor 3: $5,000"
+    rates = RateTable(base="USD", rates={"USD": 1.0, "INR": 0.01})
+
+    bids = extract_bids(text, AmountIndex.from_text(text, rates=rates))
+
+    assert [(b["vendor"], b["currency"], b["value"], b["amount"]) for b in bids] == [
+        ("Alpha Infra", "INR", 4985000.0, 49850.0),
+        ("Beta Works", "INR", 1240000.0, 12400.0),
+        ("3", "USD", 5000.0, 5000.0),
+    ]
+    assert bids[1]["raw"] == "Bid from Beta Works: Rs. 12,40,000"
+    # Roundness is judged on the amounts as written
+    assert "excessive_round_bids" in detect_bid_patterns(bids)["patterns_found"]
+
+
+def test_extracts_decimal_comma_euro_bids():
+    text = "Alpha Infra bid: 1.234,56 EUR\nBeta Works bid: € 1.250,00"
+    rates = RateTable(base="USD", rates={"USD": 1.0, "EUR": 2.0})
+
+    bids = extract_bids(text, AmountIndex.from_text(text, rates=rates, decimal=","))
+
+    assert [(b["vendor"], b["currency"], b["value"], b["amount"]) for b in bids] == [
+        ("Alpha Infra", "EUR", 1234.56, 2469.12),
+        ("Beta Works", "EUR", 1250.0, 2500.0),
+    ]
+
+
+def test_ignores_unlabelled_numbers_and_other_lines():
+    text = "2024-01-19 | P00012 | 12345.67\nInvoice #12345 - $1,234.00\nTotal 4000\nACCT-9981"
+
+    assert extract_bids(text) == []
+
+
+def test_labels_do_not_cross_lines_or_exceed_window():
+    assert extract_bids("Bid from Alpha\n5,000") == []
+    far = "Bid from " + "x" * (LABEL_WINDOW + 10) + ": 5,000"
+    assert extract_bids(far) == []
+
+
+def _timed(text: str, index: AmountIndex | None = None) -> float:
+    started = time.perf_counter()
+    extract_bids(text, index)
+    return time.perf_counter() - started
+
+
+def test_pathological_inputs_run_in_linear_time():
+    # Inputs that made the old regexes backtrack quadratically or worse
+    units = [
+        "alpha beta ",
+        "bid ",
+        "a & b : ",
+        "vendor ",
+        "bid from alpha 1",
+        "x: $1,000 ",
+        "1," * 5,
+    ]
+    for unit in units:
+        small = _timed(unit * 5_000)
+        large = _timed(unit * 40_000)
+        # 8x the input; allow generous noise but nothing superlinear
+        assert large < max(small * 24, 0.05), unit
+        # The label scan itself, over the index detectors share
+        text = unit * 40_000
+        assert _timed(text, AmountIndex.from_text(text)) < 2.0, unit
+
+
+def test_fuzzed_inputs_never_fail_and_spans_are_unique():
+    rng = random.Random(1234)
+    alphabet = ["bid", "quote", "vendor", "from", " ", "  ", ":", "#", "$", "&", "\n", "1", "999", ",", ",000", ".", ".50", "Alpha"]
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 400)))
+        bids = extract_bids(text)
+        spans = [b["span"] for b in bids]
+        assert len(spans) == len(set(spans))
+        for bid in bids:
+            start, end = bid["span"]
+            assert text[start:end].strip() == bid["raw"]
+            assert bid["amount"] >= 0
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from time import perf_counter
+
+import httpx
+import pytest
+
+from app.application.cases.analyze_case import AnalyzeCase
+from app.cli.fake_postgrest import create_app, mint_token
+from app.core.config import settings
+from app.domain.errors import AnalysisCancelled, AnalysisDeadlineExceeded, AnalysisJobFinished
+from app.repositories.case_repo import CaseRepository
+from app.services import case_service, text_extraction
+from app.services.analysis_scheduler import AnalysisScheduler
+from app.services.case_service import CaseService
+from app.services.job_events import report_progress
+from app.services.signals.base import AnalysisContext
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway
+from app.services.signals.engine import SignalEngine
+from app.services.supabase_postgrest import SupabasePostgrest
+from app.utils.cancellation import CancelToken, bind_token, cancellable, check_cancelled
+
+
+@pytest.mark.asyncio
+async def test_cancellable_stops_at_cancel_or_deadline():
+    assert await cancellable(asyncio.sleep(0, "unbound")) == "unbound"
+
+    token = CancelToken()
+    with bind_token(token):
+        asyncio.get_running_loop().call_later(0.01, token.cancel, "stop")
+        with pytest.raises(AnalysisCancelled, match="stop"):
+            await cancellable(asyncio.sleep(10))
+
+    token = CancelToken()
+    token.set_timeout(0.01)
+    with bind_token(token):
+        with pytest.raises(AnalysisDeadlineExceeded):
+            await cancellable(asyncio.sleep(10))
+        with pytest.raises(AnalysisDeadlineExceeded):
+            check_cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_job_spares_others_sharing_its_llm_call():
+    gateway = LLMGateway(FakeLLMProvider(latency=0.05))
+    cancelled, other = CancelToken(), CancelToken()
+
+    async def job(token):
+        with bind_token(token):
+            return await cancellable(gateway.generate("same prompt"))
+
+    first, second = asyncio.ensure_future(job(cancelled)), asyncio.ensure_future(job(other))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+
+    with pytest.raises(AnalysisCancelled):
+        await first
+    assert (await second).startswith("Fake analysis")
+
+
+def test_signal_engine_checks_between_detectors():
+    engine = SignalEngine()
+    context = AnalysisContext(text="Invoice total 1000")
+    token = CancelToken()
+    token.cancel()
+
+    assert len(engine.run(context)) == len(engine.detectors)
+    with bind_token(token), pytest.raises(AnalysisCancelled):
+        engine.run(context)
+
+
+class Job:
+    """A scheduler job that runs until released or its token is cancelled."""
+
+    def __init__(self):
+        self.token = CancelToken()
+        self.started = False
+
+    async def __call__(self):
+        self.started = True
+        await self.token.wait()
+        return "stopped"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancels_queued_and_running_jobs():
+    scheduler = AnalysisScheduler(max_concurrency=1, max_per_owner=1, max_queue_depth=10, max_queued_per_owner=10)
+    running, queued, next_up = Job(), Job(), Job()
+    scheduler.reserve("a").submit("running", running, running.token)
+    dropped = scheduler.reserve("a").submit("queued", queued, queued.token)
+    scheduler.reserve("b").submit("next", next_up, next_up.token)
+    await asyncio.sleep(0)
+
+    assert scheduler.cancel("queued") is dropped and dropped.cancelled()
+    assert scheduler.depth == 1 and scheduler.position("next") == 1
+
+    stopped = scheduler.cancel("running", "superseded")
+    # The slot is free before the cancelled job has wound down
+    assert running.token.reason == "superseded" and scheduler.running == 1 and scheduler.depth == 0
+    assert await stopped == "stopped"
+    await asyncio.sleep(0)
+    assert next_up.started and not queued.started
+    assert scheduler.cancel("missing") is None
+    next_up.token.cancel()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A CaseService over an in-memory PostgREST, scheduling on a private one-slot scheduler."""
+    monkeypatch.setattr(settings, "supabase_url", "http://fake-postgrest")
+    monkeypatch.setattr(settings, "supabase_anon_key", "anon")
+    monkeypatch.setattr(case_service, "analysis_scheduler", AnalysisScheduler(max_concurrency=1))
+    fake = create_app()
+    client = SupabasePostgrest(access_token=mint_token("user-1"), transport=httpx.ASGITransport(app=fake))
+    return CaseService(CaseRepository(client))
+
+
+async def slow_analysis(self, case_id):
+    check_cancelled()
+    await cancellable(asyncio.sleep(10))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_jobs_are_recorded_and_the_case_restored(service, monkeypatch):
+    monkeypatch.setattr(AnalyzeCase, "execute", slow_analysis)
+    for case_id, status in (("c1", "failed"), ("c2", "uploaded")):
+        await service.repository.create({"case_id": case_id, "status": status, "signals": {}})
+    running = (await service.queue_analysis("c1")).signals["analysis_job_id"]
+    queued = (await service.queue_analysis("c2")).signals["analysis_job_id"]
+    await asyncio.sleep(0.05)
+
+    dropped = await service.cancel_analysis_job(queued)
+    stopping = await service.cancel_analysis_job(running)
+
+    assert (dropped.status, dropped.error) == ("cancelled", "Cancelled by user")
+    # The running job's worker records the outcome once it has stopped
+    assert stopping.status == "running"
+    await asyncio.sleep(0.01)
+    stopped = await service.get_analysis_job(running)
+    assert (stopped.status, stopped.error) == ("cancelled", "Cancelled by user")
+    assert [(await service.repository.get(c))["status"] for c in ("c1", "c2")] == ["failed", "uploaded"]
+    with pytest.raises(AnalysisJobFinished):
+        await service.cancel_analysis_job(running)
+
+
+@pytest.mark.asyncio
+async def test_deadline_fails_the_job(service, monkeypatch):
+    monkeypatch.setattr(AnalyzeCase, "execute", slow_analysis)
+    monkeypatch.setattr(settings, "analysis_deadline_seconds", 0.01)
+    await service.repository.create({"case_id": "c1", "status": "uploaded", "signals": {}})
+    job_id = (await service.queue_analysis("c1")).signals["analysis_job_id"]
+    await asyncio.sleep(0.1)
+
+    job = await service.get_analysis_job(job_id)
+    assert (job.status, job.error) == ("failed", "Analysis deadline exceeded")
+    assert (await service.repository.get("c1"))["status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_an_interrupted_job_is_recorded_as_cancelled(service, monkeypatch):
+    async def interrupted(self, case_id):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(AnalyzeCase, "execute", interrupted)
+    await service.repository.create({"case_id": "c1", "status": "uploaded", "signals": {}})
+    job_id = (await service.queue_analysis("c1")).signals["analysis_job_id"]
+    await asyncio.sleep(0.05)
+
+    job = await service.get_analysis_job(job_id)
+    assert (job.status, job.error) == ("cancelled", "Analysis interrupted")
+    assert (await service.repository.get("c1"))["status"] == "uploaded"
+
+
+def slow_extraction(pages):
+    def extract_text(path):
+        for page in range(1, 201):
+            check_cancelled()
+            report_progress("ocr", page=page, pages=200)
+            pages.append(page)
+            time.sleep(0.01)  # blocking, like OCR
+        return "Invoice total 1000"
+
+    return extract_text
+
+
+@pytest.mark.asyncio
+async def test_cancel_reaches_a_slow_extraction(service, monkeypatch):
+    pages = []
+    monkeypatch.setattr(text_extraction, "extract_text", slow_extraction(pages))
+    await service.repository.create({"case_id": "c1", "status": "uploaded", "signals": {"original_file": "scan.pdf"}})
+    job_id = (await service.queue_analysis("c1")).signals["analysis_job_id"]
+    await asyncio.sleep(0.05)
+
+    # The event loop is free while pages are extracted, so the cancel is served at once
+    started = perf_counter()
+    await service.cancel_analysis_job(job_id)
+    assert perf_counter() - started < 0.5
+    await asyncio.sleep(0.05)
+
+    job = await service.get_analysis_job(job_id)
+    assert (job.status, job.error) == ("cancelled", "Cancelled by user")
+    assert 0 < len(pages) < 200
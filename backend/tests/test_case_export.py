@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_case_service, require_user
+from app.domain.errors import InvalidExportRequest
+from app.main import app
+from app.repositories.case_repo import CaseRepository
+from app.services.case_export import ExportSpec, export_cases
+from app.services.case_service import CaseService
+
+
+class PagedClient:
+    """Serves `rows` with PostgREST keyset semantics (order=id.asc, id=gt.N, limit)."""
+
+    def __init__(self, count):
+        self.rows = [
+            {
+                "id": i,
+                "case_id": f"c{i}",
+                "status": "analyzed",
+                "risk_score": i % 100,
+                "created_at": "2026-10-19T00:00:00+00:00",
+                "case_detector_scores": [
+                    {"detector": "benford", "score": float(i), "confidence": 0.5},
+                    {"detector": "urgency", "score": 0.0, "confidence": 0.9},
+                ],
+            }
+            for i in range(1, count + 1)
+        ]
+        self.calls = []
+
+    async def get(self, path, *, params=None):
+        self.calls.append(dict(params))
+        after = int(params["id"].removeprefix("gt.")) if "id" in params else 0
+        return [row for row in self.rows if row["id"] > after][: int(params["limit"])]
+
+
+async def collect(client, spec, page_size):
+    return [chunk async for chunk in export_cases(CaseRepository(client), spec, page_size=page_size)]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_pages_by_keyset():
+    client = PagedClient(5)
+    spec = ExportSpec.parse("ndjson", detectors="benford", status="analyzed")
+
+    chunks = await collect(client, spec, page_size=2)
+
+    assert [c.get("id") for c in client.calls] == [None, "gt.2", "gt.4"]
+    assert client.calls[0]["case_detector_scores.detector"] == "in.(benford)"
+    assert client.calls[0]["status"] == "eq.analyzed"
+    records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [r["case_id"] for r in records] == ["c1", "c2", "c3", "c4", "c5"]
+    assert records[0]["detectors"]["benford"] == {"score": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_one_column_per_detector_field():
+    spec = ExportSpec.parse("csv", detectors="benford,urgency", fields="score,confidence")
+
+    chunks = await collect(PagedClient(3), spec, page_size=10)
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == [
+        "case_id", "status", "risk_score", "created_at",
+        "benford_score", "benford_confidence", "urgency_score", "urgency_confidence",
+    ]
+    assert rows[1] == ["c1", "analyzed", "1", "2026-10-19T00:00:00+00:00", "1.0", "0.5", "0.0", "0.9"]
+    assert len(rows) == 4
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"format": "xml"}, {"detectors": "benford,nope"}, {"fields": "indicators"}],
+)
+def test_invalid_export_requests(kwargs):
+    with pytest.raises(InvalidExportRequest):
+        ExportSpec.parse(**kwargs)
+
+
+def test_export_route_streams_and_is_not_shadowed_by_case_id():
+    client = PagedClient(3)
+    app.dependency_overrides[require_user] = lambda: None
+    app.dependency_overrides[get_case_service] = lambda: CaseService(CaseRepository(client))
+    try:
+        with TestClient(app) as http:
+            response = http.get("/cases/export", params={"format": "csv", "detectors": "benford"})
+            bad = http.get("/cases/export", params={"format": "xml"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0] == "case_id,status,risk_score,created_at,benford_score"
+    assert bad.status_code == 400
@@ -1,7 +1,16 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
 import pytest
 
-from app.domain.errors import AnalysisJobNotFound
+from app.cli.fake_postgrest import create_app, mint_token
+from app.core.config import settings
+from app.domain.errors import AnalysisJobNotFound, CaseMissingFile
+from app.repositories.case_repo import CaseRepository
 from app.services.case_service import CaseService
+from app.services.supabase_postgrest import SupabasePostgrest
+from app.utils.single_flight import SingleFlight
 
 
 class FakeJobRepo:
@@ -41,3 +50,139 @@ async def test_get_analysis_job_returns_job():
 
     assert result.job_id == "j1"
     assert result.status == "queued"
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    """A CaseService factory over one in-memory PostgREST; analyses are queued but not run."""
+    monkeypatch.setattr(settings, "supabase_url", "http://fake-postgrest")
+    monkeypatch.setattr(settings, "supabase_anon_key", "anon")
+    monkeypatch.setattr(CaseService, "_run_analysis", lambda self, case_id, job_id, **kwargs: asyncio.sleep(0))
+    fake = create_app()
+    token = mint_token("user-1")
+
+    def service() -> CaseService:
+        client = SupabasePostgrest(access_token=token, transport=httpx.ASGITransport(app=fake))
+        return CaseService(CaseRepository(client))
+
+    service.store = fake.state.store
+    return service
+
+
+async def add_case(service, status="uploaded", **signals):
+    await service().repository.create({"case_id": "c1", "status": status, "signals": signals})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyze_requests_share_one_job(stand_in):
+    await add_case(stand_in)
+
+    results = await asyncio.gather(*(stand_in().queue_analysis("c1") for _ in range(5)))
+
+    assert len(stand_in.store.tables["analysis_jobs"]) == 1
+    assert len({r.signals["analysis_job_id"] for r in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_status_transition_is_compare_and_set_across_processes(stand_in):
+    await add_case(stand_in)
+
+    # Bypass the in-process single flight, as two API workers would
+    results = await asyncio.gather(*(stand_in()._queue_analysis("c1", None, None, "interactive") for _ in range(3)))
+
+    assert len(stand_in.store.tables["analysis_jobs"]) == 1
+    assert {r.status for r in results} == {"processing"}
+    assert len({r.signals["analysis_job_id"] for r in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_processing_case_attaches_unless_stale(stand_in):
+    fresh = datetime.now(timezone.utc).isoformat()
+    await add_case(stand_in, "processing", analysis_job_id="j-old", analysis_queued_at=fresh)
+
+    attached = await stand_in().queue_analysis("c1")
+    assert attached.signals["analysis_job_id"] == "j-old"
+    assert stand_in.store.tables["analysis_jobs"] == []
+
+    stale = (datetime.now(timezone.utc) - timedelta(seconds=settings.analysis_stale_seconds + 1)).isoformat()
+    stand_in.store.tables["cases"][0]["signals"]["analysis_queued_at"] = stale
+    taken_over = await stand_in().queue_analysis("c1")
+    assert taken_over.signals["analysis_job_id"] != "j-old"
+    assert len(stand_in.store.tables["analysis_jobs"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_is_not_queued_twice(stand_in):
+    await add_case(stand_in)
+
+    first = await stand_in().queue_analysis("c1", idempotency_key="k1")
+    stand_in.store.tables["cases"][0]["status"] = "analyzed"  # the job finished
+    replayed = await stand_in().queue_analysis("c1", idempotency_key="k1")
+    rerun = await stand_in().queue_analysis("c1", idempotency_key="k2")
+
+    assert replayed.status == "analyzed"
+    assert replayed.signals["analysis_job_id"] == first.signals["analysis_job_id"]
+    assert rerun.signals["analysis_job_id"] != first.signals["analysis_job_id"]
+    assert len(stand_in.store.tables["analysis_jobs"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_case_is_restored_when_its_job_row_cannot_be_created(stand_in, monkeypatch):
+    await add_case(stand_in, "failed", analysis_job_id="j-old")
+    service = stand_in()
+
+    async def unavailable(job):
+        raise httpx.ConnectError("database unavailable")
+
+    monkeypatch.setattr(service.job_repo, "create", unavailable)
+    with pytest.raises(httpx.ConnectError):
+        await service.queue_analysis("c1")
+
+    case = stand_in.store.tables["cases"][0]
+    assert (case["status"], case["signals"]) == ("failed", {"analysis_job_id": "j-old"})
+    retried = await stand_in().queue_analysis("c1")
+    assert retried.status == "processing"
+
+
+@pytest.mark.asyncio
+async def test_rescore_backlog_runs_in_batches(stand_in, monkeypatch):
+    service = stand_in()
+    for case_id, status in [("a", "analyzed"), ("b", "uploaded"), ("c", "analyzed"), ("d", "analyzed"), ("e", "analyzed")]:
+        await service.repository.create({"case_id": case_id, "status": status, "signals": {}})
+    rescored = []
+
+    async def rescore_case(self, case_id, *, owner=None):
+        if case_id == "c":
+            raise CaseMissingFile("No file associated with this case")
+        rescored.append((case_id, owner))
+
+    monkeypatch.setattr(CaseService, "rescore_case", rescore_case)
+
+    first = await service.rescore_backlog(owner="user-1", limit=2)
+    second = await service.rescore_backlog(owner="user-1", limit=2, after=first.next_after)
+
+    assert (first.rescored, first.failed) == (1, {"c": "No file associated with this case"})
+    assert (second.rescored, second.next_after) == (2, None)
+    assert rescored == [("a", "user-1"), ("d", "user-1"), ("e", "user-1")]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_results_and_survives_caller_cancellation():
+    flights = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flights.do("k", work))
+    second = asyncio.ensure_future(flights.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    assert calls == 1 and len(flights) == 0
@@ -0,0 +1,107 @@
+import httpx
+import pytest
+
+from app.application.cases.analyze_case import save_detector_scores
+from app.repositories.case_repo import CaseRepository
+from app.repositories.detector_score_repo import DetectorScoreRepository
+from app.services.analytics_service import compute_analytics_summary
+from app.services.case_service import CaseService
+
+
+class FakeClient:
+    def __init__(self, rows=None, *, rpc_deployed=False):
+        self.rows = rows or []
+        self.calls = []
+        self.rpc_deployed = rpc_deployed
+
+    async def post(self, path, *, params=None, json=None, prefer=None):
+        self.calls.append(("post", path, params, json, prefer))
+
+    async def delete(self, path, *, params):
+        self.calls.append(("delete", path, params))
+
+    async def rpc(self, function, params=None):
+        if not self.rpc_deployed:
+            request = httpx.Request("POST", f"http://fake/rpc/{function}")
+            raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+        self.calls.append(("rpc", function, params))
+        return len(params["p_rows"])
+
+    async def get(self, path, *, params=None):
+        self.calls.append(("get", path, params))
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_upsert_breakdown_writes_narrow_rows_without_indicators():
+    client = FakeClient()
+    breakdown = {
+        "benford": {"score": 0, "weight": 1.2, "confidence": 0.5, "indicators": {"n": 3}, "version": "1:abc"},
+        "urgency": {"score": 23.0, "weight": 0.9, "confidence": 0.7, "indicators": {"sample_matches": ["..."]}},
+    }
+
+    written = await DetectorScoreRepository(client).upsert_breakdown("c1", breakdown)  # type: ignore[arg-type]
+
+    _, path, params, rows, prefer = client.calls[0]
+    assert written == 2
+    assert (path, params, prefer) == (
+        "/case_detector_scores", {"on_conflict": "case_id,detector"}, "resolution=merge-duplicates,return=minimal"
+    )
+    assert [{k: v for k, v in row.items() if k != "updated_at"} for row in rows] == [
+        {"case_id": "c1", "detector": "benford", "score": 0.0, "weight": 1.2, "confidence": 0.5, "version": "1:abc"},
+        {"case_id": "c1", "detector": "urgency", "score": 23.0, "weight": 0.9, "confidence": 0.7, "version": None},
+    ]
+    # Rows of detectors no longer in the breakdown go
+    assert client.calls[1] == (
+        "delete", "/case_detector_scores", {"case_id": "eq.c1", "detector": "not.in.(benford,urgency)"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_breakdown_replaces_rows_in_one_call_when_the_function_is_deployed():
+    client = FakeClient(rpc_deployed=True)
+
+    written = await DetectorScoreRepository(client).upsert_breakdown("c1", {"urgency": {"score": 1.0}})  # type: ignore[arg-type]
+
+    assert written == 1
+    assert [call[:2] for call in client.calls] == [("rpc", "replace_case_detector_scores")]
+    assert client.calls[0][2]["p_case_id"] == "c1"
+
+
+@pytest.mark.asyncio
+async def test_failed_score_writes_do_not_fail_the_analysis():
+    class Unavailable:
+        async def upsert_breakdown(self, case_id, breakdown):
+            raise httpx.ConnectError("database unavailable")
+
+    await save_detector_scores(Unavailable(), "c1", {"urgency": {"score": 1.0}})  # type: ignore[arg-type]
+    await save_detector_scores(None, "c1", {})
+
+
+@pytest.mark.asyncio
+async def test_analytics_cases_are_built_from_score_rows():
+    client = FakeClient([
+        {
+            "case_id": "c1",
+            "status": "analyzed",
+            "risk_score": 55,
+            "created_at": "2026-10-18T10:00:00+00:00",
+            "case_detector_scores": [
+                {"detector": "keywords", "score": 80.0, "weight": 1.0, "confidence": 1.0, "version": "1:x"},
+                {"detector": "urgency", "score": 0.0, "weight": 0.9, "confidence": 0.5, "version": "1:y"},
+            ],
+        },
+        {"case_id": "c2", "status": "uploaded", "risk_score": None, "created_at": "2026-10-18T11:00:00+00:00",
+         "case_detector_scores": []},
+    ])
+    service = CaseService(CaseRepository(client))  # type: ignore[arg-type]
+
+    cases = await service.list_case_scores()
+
+    select = client.calls[0][2]["select"]
+    assert "signals" not in select and "case_detector_scores(" in select
+    assert [c["case_id"] for c in cases] == ["c2", "c1"]  # newest first
+    assert cases[1]["signals"]["detector_breakdown"]["keywords"]["score"] == 80.0
+    summary = compute_analytics_summary(cases)
+    assert summary.analyzed_cases == 1
+    assert [s.name for s in summary.detector_stats if s.triggered_count] == ["keywords"]
@@ -0,0 +1,153 @@
+import httpx
+import pytest
+
+from app.api.deps import get_case_service, require_user
+from app.cli.fake_postgrest import create_app, mint_token
+from app.core.config import settings
+from app.core.supabase_auth import CurrentUser
+from app.main import app
+from app.repositories.case_repo import CaseRepository
+from app.repositories.entity_match_repo import EntityMatchRepository
+from app.services.entity_resolution import (
+    EntityResolver,
+    VendorRecord,
+    normalize_name,
+    read_vendor_records,
+    soundex,
+)
+from app.services import case_service
+from app.services.case_service import CaseService
+from app.services.supabase_postgrest import SupabasePostgrest
+from app.services.vendor_index import VendorIndex
+
+
+def test_normalize_name_folds_abbreviations_and_suffixes():
+    assert normalize_name("Alpha Infra Pvt Ltd") == "alpha infrastructure"
+    assert normalize_name("Alpha Infrastructure Private Limited") == "alpha infrastructure"
+    assert normalize_name("M/s Gamma Works LLP") == "gamma works"
+
+
+def test_soundex_matches_spelling_variants():
+    assert soundex("Robert") == "R163"
+    assert soundex("Rupert") == "R163"
+    assert soundex("alpha") == soundex("alfa")
+
+
+def test_resolver_matches_variants_only():
+    records = [
+        VendorRecord("V001", "Alpha Infra Pvt Ltd"),
+        VendorRecord("V002", "Beta Constructions"),
+        VendorRecord("V010", "Alpha Infrastructure Private Limited"),
+        VendorRecord("V004", "Delta Engineering"),
+        VendorRecord("V011", "Beta Construction"),
+    ]
+
+    matches = EntityResolver(threshold=90).resolve(records)
+    pairs = {(m.entity_a_id, m.entity_b_id) for m in matches}
+
+    assert pairs == {("V001", "V010"), ("V002", "V011")}
+    alpha = next(m for m in matches if m.entity_a_id == "V001")
+    assert alpha.match_score == 1.0
+    assert "normalized_names_equal" in alpha.match_reasons
+
+
+def test_oversized_blocks_are_windowed():
+    names = [f"alpha vendor {i:04d}" for i in range(50)]
+    resolver = EntityResolver(max_block_size=10)
+
+    windows = list(resolver._windows(list(range(50)), names))
+
+    assert all(len(w) <= 10 for w in windows)
+    assert sorted({i for w in windows for i in w}) == list(range(50))
+
+
+def test_read_vendor_records(tmp_path):
+    path = tmp_path / "vendors.csv"
+    path.write_text("vendor_id,vendor_name,city\nV001,Alpha Infra Pvt Ltd,Mumbai\n")
+
+    assert read_vendor_records(path) == [VendorRecord("V001", "Alpha Infra Pvt Ltd")]
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    async def post(self, path: str, *, json, params=None, prefer=None):
+        self.calls.append((path, json, params, prefer))
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_batches_rows():
+    records = [VendorRecord(f"V{i}", "Alpha Infra") for i in range(4)]
+    matches = EntityResolver().resolve(records)
+    client = FakeClient()
+    repo = EntityMatchRepository(client, batch_size=4)  # type: ignore[arg-type]
+
+    count = await repo.upsert_many(matches)
+
+    assert count == 6
+    assert [len(call[1]) for call in client.calls] == [4, 2]
+    assert client.calls[0][2] == {"on_conflict": "owner_id,entity_a_id,entity_b_id"}
+    assert client.calls[0][3] == "resolution=merge-duplicates,return=minimal"
+    # Review fields are never sent, so a re-run cannot reset a decision
+    assert not {"status", "resolved_by", "resolved_at"} & set(client.calls[0][1][0])
+
+
+def test_pairs_are_ordered_by_vendor_id_and_reported_once():
+    records = [
+        VendorRecord("V010", "Alpha Infrastructure Private Limited"),
+        VendorRecord("V001", "Alpha Infra Pvt Ltd"),
+        VendorRecord("V001", "Alpha Infra Ltd"),
+    ]
+
+    matches = EntityResolver(threshold=90).resolve(records)
+
+    assert [(m.entity_a_id, m.entity_b_id) for m in matches] == [("V001", "V010")]
+
+
+@pytest.mark.asyncio
+async def test_upserted_pairs_are_unique_per_owner(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_url", "http://fake-postgrest")
+    monkeypatch.setattr(settings, "supabase_anon_key", "anon")
+    fake = create_app()
+    matches = EntityResolver().resolve([VendorRecord("V002", "Beta Constructions"), VendorRecord("V001", "Beta Construction")])
+
+    for owner in ("user-1", "user-1", "user-2"):
+        client = SupabasePostgrest(access_token=mint_token(owner), transport=httpx.ASGITransport(app=fake))
+        await EntityMatchRepository(client).upsert_many(matches)
+
+    rows = fake.state.store.tables["entity_resolution_matches"]
+    assert sorted((r["owner_id"], r["entity_a_id"], r["entity_b_id"]) for r in rows) == [
+        ("user-1", "V001", "V002"),
+        ("user-2", "V001", "V002"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_vendor_match_route_resolves_the_vendor_master_and_keeps_reviews(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_url", "http://fake-postgrest")
+    monkeypatch.setattr(settings, "supabase_anon_key", "anon")
+    monkeypatch.setattr(settings, "rate_limit_max_requests", 0)
+    index = VendorIndex()
+    for vendor_id, name in (("V001", "Beta Construction"), ("V002", "Beta Constructions"), ("V003", "Gamma Works")):
+        index.register_vendor(vendor_id, name)
+    monkeypatch.setattr(case_service, "vendor_index", index)
+    fake = create_app()
+    postgrest = SupabasePostgrest(access_token=mint_token("user-1"), transport=httpx.ASGITransport(app=fake))
+    app.dependency_overrides[require_user] = lambda: CurrentUser(id="user-1", email=None, role=None, raw_claims={})
+    app.dependency_overrides[get_case_service] = lambda: CaseService(CaseRepository(postgrest))
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            first = await client.post("/analytics/vendor-matches")
+            [row] = fake.state.store.tables["entity_resolution_matches"]
+            row.update(status="confirmed", resolved_by="reviewer")
+            again = await client.post("/analytics/vendor-matches")
+            confirmed = await client.get("/analytics/vendor-matches", params={"status": "confirmed"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.json() == again.json() == {"vendors": 3, "matches": 1}
+    [match] = confirmed.json()
+    assert (match["entity_a_id"], match["entity_b_id"], match["status"]) == ("V001", "V002", "confirmed")
+    assert match["resolved_by"] == "reviewer"
+    assert len(fake.state.store.tables["entity_resolution_matches"]) == 1
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timezone
+from time import perf_counter
+
+import httpx
+import pytest
+
+from app.api.deps import get_case_service, require_user
+from app.cli.fake_postgrest import FakeStore, LatencyProfile, create_app, matches, mint_token, parse_select
+from app.cli.load_test import percentile, run_load
+from app.core.config import settings
+from app.core.supabase_auth import CurrentUser
+from app.main import app
+from app.repositories.analytics_repo import AnalyticsRepository
+from app.repositories.case_repo import CaseRepository
+from app.repositories.detector_score_repo import DetectorScoreRepository
+from app.services.case_service import CaseService
+from app.services.object_storage import get_object_storage
+from app.services.supabase_postgrest import SupabasePostgrest
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_url", "http://fake-postgrest")
+    monkeypatch.setattr(settings, "supabase_anon_key", "anon")
+
+
+def client_for(fake, subject="user-1"):
+    return SupabasePostgrest(access_token=mint_token(subject), transport=httpx.ASGITransport(app=fake))
+
+
+def test_filter_expressions():
+    assert matches(3, "gt.2") and not matches(3, "lte.2")
+    assert matches("benford", "in.(benford,urgency)")
+    assert matches(None, "is.null") and matches("x", "not.is.null")
+    assert not matches(None, "eq.x")
+    assert parse_select("id,case_detector_scores(detector,score)") == (
+        ["id"],
+        {"case_detector_scores": ["detector", "score"]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_repositories_round_trip(supabase):
+    fake = create_app()
+    repo = CaseRepository(client_for(fake))
+
+    created = await repo.create({"case_id": "c1", "status": "uploaded", "signals": {}})
+    await repo.create({"case_id": "c2", "status": "uploaded", "signals": {}})
+    updated = await repo.update("c1", {"status": "analyzed", "risk_score": 40})
+    scores = DetectorScoreRepository(repo.client)
+    await scores.upsert_breakdown("c1", {"benford": {"score": 10.0, "weight": 1.0, "confidence": 0.5}})
+    await scores.upsert_breakdown("c1", {"benford": {"score": 20.0, "weight": 1.0, "confidence": 0.5}})
+
+    assert created["id"] == 1 and created["created_at"]
+    assert updated["risk_score"] == 40
+    assert (await repo.get("c1"))["status"] == "analyzed"
+    pages = [
+        page
+        async for page in repo.iter_pages(
+            select="id,case_id,case_detector_scores(detector,score)",
+            page_size=1,
+            filters={"case_detector_scores.detector": "in.(benford)"},
+        )
+    ]
+    assert [[row["case_id"] for row in page] for page in pages] == [["c1"], ["c2"]]
+    assert pages[0][0]["case_detector_scores"] == [{"detector": "benford", "score": 20.0}]
+    # No SQL functions are deployed, so analytics falls back to Python aggregation
+    assert await AnalyticsRepository(repo.client).summary(datetime.now(timezone.utc)) is None
+
+
+@pytest.mark.asyncio
+async def test_analytics_reads_page_past_the_row_cap(supabase, monkeypatch):
+    monkeypatch.setattr(settings, "postgrest_max_rows", 2)
+    fake = create_app(max_rows=2)
+    repo = CaseRepository(client_for(fake))
+    for i in range(5):
+        await repo.create({"case_id": f"c{i}", "status": "analyzed", "risk_score": 10 * i, "signals": {}})
+
+    service = CaseService(repo)
+    scores = await service.list_case_scores()
+    aggregates = await service.analytics_aggregates(datetime.now(timezone.utc))
+
+    assert len(await repo.client.get("/cases", params={"select": "id"})) == 2  # one request is cut short
+    assert sorted(row["case_id"] for row in scores) == ["c0", "c1", "c2", "c3", "c4"]
+    assert aggregates["total_cases"] == 5 and aggregates["max_risk_score"] == 40
+
+
+@pytest.mark.asyncio
+async def test_rows_are_scoped_to_the_token_subject(supabase):
+    fake = create_app()
+    await CaseRepository(client_for(fake, "alice")).create({"case_id": "c1", "status": "uploaded"})
+
+    assert await CaseRepository(client_for(fake, "bob")).get("c1") is None
+    assert await CaseRepository(client_for(fake, "alice")).get("c1") is not None
+
+
+@pytest.mark.asyncio
+async def test_latency_and_errors_are_injected(supabase):
+    slow = CaseRepository(client_for(create_app(latency=LatencyProfile(base_ms=30))))
+    started = perf_counter()
+    await slow.get("missing")
+    assert perf_counter() - started >= 0.03
+
+    flaky = CaseRepository(client_for(create_app(latency=LatencyProfile(error_rate=1.0))))
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        await flaky.get("missing")
+    assert excinfo.value.response.status_code == 503
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert [percentile(values, p) for p in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert percentile([], 99) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_load_harness_drives_the_api_against_the_stand_in(supabase, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "rate_limit_max_requests", 0)
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    monkeypatch.setattr(settings, "storage_local_root", str(tmp_path))
+    get_object_storage.cache_clear()
+    store = FakeStore()
+    fake = create_app(store, LatencyProfile(base_ms=1))
+    app.dependency_overrides[require_user] = lambda: CurrentUser(id="user-1", email=None, role=None, raw_claims={})
+    app.dependency_overrides[get_case_service] = lambda: CaseService(CaseRepository(client_for(fake)))
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            report = await run_load(client, rps=60, duration=1.0, seed=7)
+            await asyncio.sleep(0.2)  # let queued analyses finish
+    finally:
+        app.dependency_overrides.clear()
+        get_object_storage.cache_clear()
+
+    summary = report.to_dict()
+    total = summary["endpoints"][-1]
+    assert total["endpoint"] == "all" and total["requests"] == 60
+    assert total["errors"] == 0
+    assert {row["endpoint"] for row in summary["endpoints"]} >= {"POST /cases/upload", "GET /analytics/summary"}
+    assert store.tables["cases"] and store.tables["analysis_jobs"]
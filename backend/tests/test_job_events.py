@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_case_service, require_user
+from app.application.cases.analyze_case import load_case_text
+from app.main import app
+from app.services import text_extraction
+from app.services.case_service import CaseService
+from app.services.job_events import JobEventBus, job_event_stream, job_events, report_progress, track_job
+from app.utils.cancellation import run_in_thread
+
+
+def parse_sse(chunks):
+    events = []
+    for block in "".join(chunks).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_states_and_progress_in_order():
+    bus = JobEventBus(buffer=8)
+    with bus.subscribe("j1") as first, bus.subscribe("j1") as second:
+        bus.publish_state("j1", "running")
+        bus.publish_progress("j1", "ocr", page=1, pages=2)
+
+        for subscription in (first, second):
+            events = [await subscription.next(1), await subscription.next(1)]
+            assert [(e.type, e.data.get("status") or e.data["stage"]) for e in events] == [
+                ("state", "running"),
+                ("progress", "ocr"),
+            ]
+        assert await first.next(0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_progress_before_states():
+    bus = JobEventBus(buffer=3)
+    with bus.subscribe("j1") as subscription:
+        bus.publish_state("j1", "running")
+        for page in range(1, 6):
+            bus.publish_progress("j1", "ocr", page=page, pages=5)
+        bus.publish_state("j1", "completed")
+
+        events = [await subscription.next(1) for _ in range(3)]
+
+    assert subscription.dropped == 4
+    assert [e.data.get("status") or e.data["page"] for e in events] == ["running", 5, "completed"]
+
+
+@pytest.mark.asyncio
+async def test_publishing_from_a_worker_thread():
+    bus = JobEventBus()
+    with bus.subscribe("j1") as subscription:
+        thread = threading.Thread(target=bus.publish_progress, args=("j1", "ocr"), kwargs={"page": 1, "pages": 1})
+        thread.start()
+        thread.join()
+
+        event = await subscription.next(1)
+
+    assert event.data["stage"] == "ocr"
+
+
+@pytest.mark.asyncio
+async def test_ocr_progress_streams_while_extraction_runs(monkeypatch):
+    release = threading.Event()
+
+    def extract_text(path):
+        for page in (1, 2, 3):
+            report_progress("ocr", page=page, pages=3)
+        release.wait(5)  # still extracting
+        return "Invoice total 1000"
+
+    monkeypatch.setattr(text_extraction, "extract_text", extract_text)
+    job_events.reset()
+    with job_events.subscribe("j1") as subscription, track_job("j1"):
+        extraction = asyncio.ensure_future(run_in_thread(load_case_text, {"original_file": "scan.pdf"}))
+        events = [(await subscription.next(1)).data for _ in range(4)]
+
+        assert [e.get("page", e["stage"]) for e in events] == ["extracting", 1, 2, 3]
+        assert not extraction.done()
+        release.set()
+        assert await extraction == "Invoice total 1000"
+    job_events.reset()
+
+
+def test_report_progress_only_inside_a_tracked_job():
+    job_events.reset()
+    report_progress("extracting")
+    with track_job("j1"):
+        report_progress("extracting")
+
+    assert [e.data["stage"] for e in job_events.snapshot("j1")] == ["extracting"]
+    job_events.reset()
+
+
+@pytest.mark.asyncio
+async def test_stream_picks_up_mid_run_and_ends_on_the_terminal_state():
+    bus = JobEventBus()
+    bus.publish_state("j1", "running", case_id="c1")
+    bus.publish_progress("j1", "detectors")
+
+    async def refresh():
+        raise AssertionError("jobs published in this process are not re-read")
+
+    async def worker():
+        await asyncio.sleep(0.01)
+        bus.publish_progress("j1", "saving")
+        bus.publish_state("j1", "completed", case_id="c1")
+
+    stream = job_event_stream({"job_id": "j1", "status": "queued"}, refresh=refresh, bus=bus, keepalive=1)
+    chunks, _ = await asyncio.gather(collect(stream), worker())
+
+    assert [(kind, data.get("status") or data.get("stage")) for kind, data in parse_sse(chunks)] == [
+        ("state", "running"),
+        ("progress", "detectors"),
+        ("progress", "saving"),
+        ("state", "completed"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_of_a_job_in_another_process_polls_at_keepalive():
+    bus = JobEventBus()
+    rows = iter([{"job_id": "j1", "status": "running"}, {"job_id": "j1", "status": "failed", "error": "boom"}])
+
+    async def refresh():
+        return next(rows)
+
+    chunks = await collect(
+        job_event_stream({"job_id": "j1", "status": "queued"}, refresh=refresh, bus=bus, keepalive=0.01)
+    )
+
+    assert [data["status"] for _, data in parse_sse(chunks)] == ["queued", "running", "failed"]
+    assert not bus.seen("j1") and bus.snapshot("j1") == []
+
+
+class FakeJobRepo:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    async def get(self, job_id):
+        return self.jobs.get(job_id)
+
+
+def test_events_route_streams_a_finished_job_and_404s_unknown_ones():
+    service = CaseService(repository=None)  # type: ignore[arg-type]
+    service._job_repo = FakeJobRepo({"j1": {"job_id": "j1", "case_id": "c1", "status": "completed"}})  # type: ignore[assignment]
+    app.dependency_overrides[require_user] = lambda: None
+    app.dependency_overrides[get_case_service] = lambda: service
+    try:
+        with TestClient(app) as client:
+            response = client.get("/cases/jobs/j1/events")
+            missing = client.get("/cases/jobs/nope/events")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse([response.text]) == [("state", {"job_id": "j1", "case_id": "c1", "status": "completed"})]
+    assert missing.status_code == 404
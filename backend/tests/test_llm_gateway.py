@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from tenacity import wait_fixed
+
+from app.services import llm_gateway
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway, TransientLLMError
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_hit_cache():
+    provider = FakeLLMProvider()
+    gateway = LLMGateway(provider)
+
+    first = await gateway.generate("prompt")
+    second = await gateway.generate("prompt")
+
+    assert first == second
+    assert provider.calls == 1
+    assert (gateway.cache_hits, gateway.cache_misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_prompts_share_one_call():
+    provider = FakeLLMProvider(latency=0.01)
+    gateway = LLMGateway(provider)
+
+    results = await asyncio.gather(*(gateway.generate("same") for _ in range(5)))
+
+    assert len(set(results)) == 1
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    provider = FakeLLMProvider(latency=0.01)
+    gateway = LLMGateway(provider, max_concurrency=2)
+
+    await asyncio.gather(*(gateway.generate(f"prompt {i}") for i in range(8)))
+
+    assert provider.calls == 8
+    assert provider.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    provider = FakeLLMProvider(fail_times=2)
+    gateway = LLMGateway(provider, max_attempts=3, backoff_max_seconds=0.01)
+
+    result = await gateway.generate("retry me")
+
+    assert result.startswith("Fake analysis")
+    assert provider.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_raise_and_are_not_cached():
+    provider = FakeLLMProvider(fail_times=5)
+    gateway = LLMGateway(provider, max_attempts=2, backoff_max_seconds=0.01)
+
+    with pytest.raises(TransientLLMError):
+        await gateway.generate("flaky")
+
+    assert gateway.cache_key("flaky") not in gateway._cache
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    gateway = LLMGateway(FakeLLMProvider(), cache_size=2)
+
+    for prompt in ("a", "b", "a", "c"):
+        await gateway.generate(prompt)
+
+    assert set(gateway._cache) == {gateway.cache_key("a"), gateway.cache_key("c")}
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_does_not_fail_the_others():
+    provider = FakeLLMProvider(latency=0.02)
+    gateway = LLMGateway(provider)
+    leader = asyncio.ensure_future(gateway.generate("shared"))
+    follower = asyncio.ensure_future(gateway.generate("shared"))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+
+    assert (await follower).startswith("Fake analysis")
+    assert leader.cancelled() and provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_hold_a_concurrency_slot(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "wait_random_exponential", lambda **_: wait_fixed(0.2))
+    provider = FakeLLMProvider(fail_times=1)
+    gateway = LLMGateway(provider, max_concurrency=1)
+    retrying = asyncio.ensure_future(gateway.generate("flaky"))
+    await asyncio.sleep(0.01)  # first attempt failed; now backing off
+
+    await asyncio.wait_for(gateway.generate("other"), 0.05)
+    await retrying
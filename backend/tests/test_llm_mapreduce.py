@@ -0,0 +1,107 @@
+import pytest
+
+from app.core.config import settings
+from app.services import llm_gemini
+from app.services.llm_gateway import FakeLLMProvider, LLMGateway
+
+
+class KeywordProvider(FakeLLMProvider):
+    """Reports findings only for sections that mention a kickback."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts: list[str] = []
+
+    async def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if "Findings:" in prompt:
+            return "Merged summary."
+        if "kickback" in prompt.split("Section Text:")[-1]:
+            return "- Kickback mentioned."
+        return llm_gemini.NO_FINDINGS
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_chunk_chars", 200)
+    monkeypatch.setattr(settings, "llm_chunk_overlap", 20)
+    monkeypatch.setattr(settings, "llm_max_chunks", 3)
+
+
+def use_provider(monkeypatch, provider):
+    monkeypatch.setattr(llm_gemini, "get_llm_gateway", lambda: LLMGateway(provider))
+
+
+def test_chunk_text_overlaps_and_covers_text():
+    text = " ".join(f"word{i}" for i in range(500))
+
+    chunks = llm_gemini.chunk_text(text, size=300, overlap=50)
+
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start < previous.end
+        assert previous.end - current.start == 50
+    assert all(len(c.text) <= 300 for c in chunks)
+
+
+def test_select_chunks_prefers_signal_dense_chunks():
+    chunks = [llm_gemini.TextChunk(index=i, start=0, end=0, text="", priority=p) for i, p in enumerate([0, 1, 0, 5, 3])]
+
+    selected = llm_gemini.select_chunks(chunks, budget=3)
+
+    assert [c.index for c in selected] == [0, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_long_document_is_mapped_then_reduced(small_chunks, monkeypatch):
+    provider = KeywordProvider()
+    use_provider(monkeypatch, provider)
+    filler = "Routine maintenance schedule for the depot. " * 5
+    text = filler * 3 + "Payment arranged as a kickback to the officer. " + filler * 3 + "Another kickback was urgently approved. " + filler
+
+    result = await llm_gemini.analyze_document(text)
+
+    assert result.startswith("Merged summary.")
+    assert "Reviewed 3 of" in result
+    map_prompts = [p for p in provider.prompts if "Section Text:" in p]
+    assert len(map_prompts) == 3
+    assert sum("kickback" in p for p in map_prompts) == 2
+
+
+class FlakyProvider(KeywordProvider):
+    """Fails the review of any section mentioning the depot."""
+
+    async def generate(self, prompt: str) -> str:
+        if "depot" in prompt.split("Section Text:")[-1]:
+            self.prompts.append(prompt)
+            raise TimeoutError("section timed out")
+        return await super().generate(prompt)
+
+
+@pytest.mark.asyncio
+async def test_failed_sections_are_skipped_and_reported(small_chunks, monkeypatch):
+    provider = FlakyProvider()
+    use_provider(monkeypatch, provider)
+    filler = "Routine filing of the quarterly records. " * 5
+    text = "Payment arranged as a kickback. " + filler + "Routine maintenance of the depot. " + filler * 2 + "Another kickback was approved. "
+
+    result = await llm_gemini.analyze_document(text)
+
+    assert result.startswith("Merged summary.")
+    assert "Reviewed 2 of" in result
+    assert "could not be analyzed" in result
+    [reduce_prompt] = [p for p in provider.prompts if "Findings:" in p]
+    assert reduce_prompt.count("Kickback mentioned.") == 2
+
+
+@pytest.mark.asyncio
+async def test_short_document_uses_single_prompt(small_chunks, monkeypatch):
+    provider = KeywordProvider()
+    use_provider(monkeypatch, provider)
+
+    await llm_gemini.analyze_document("Short memo.")
+
+    assert len(provider.prompts) == 1
+    assert "Document Text:" in provider.prompts[0]
@@ -0,0 +1,162 @@
+import pytest
+
+from app.application.cases import analyze_case
+from app.application.cases.analyze_case import AnalyzeCase
+from app.services.llm_triage import DeferredLLMQueue, TriagePolicy
+from app.services.signals.engine import AggregatedRiskResult
+from app.services.vendor_index import VendorIndex
+
+
+def make_result(score: int, triggered: int) -> AggregatedRiskResult:
+    return AggregatedRiskResult(
+        risk_score=score,
+        risk_level="low",
+        confidence=0.5,
+        explanation="",
+        top_factors=[],
+        detector_results=[],
+        signals={"detectors_triggered": triggered},
+    )
+
+
+class FakeCaseRepo:
+    def __init__(self, data):
+        self._data = data
+        self.updates = []
+
+    async def get(self, case_id):
+        return self._data.get(case_id)
+
+    async def update(self, case_id, obj_in):
+        self.updates.append(obj_in)
+        self._data[case_id] = {**self._data[case_id], **obj_in}
+        return self._data[case_id]
+
+    async def transition(self, case_id, obj_in, *, from_status, where):
+        case = self._data[case_id]
+        signals = case["signals"]
+        for key, expected in where.items():
+            value = signals.get(key.removeprefix("signals->>"))
+            if value != (None if expected == "is.null" else expected.removeprefix("eq.")):
+                return None
+        if case.get("status") not in from_status:
+            return None
+        return await self.update(case_id, obj_in)
+
+
+@pytest.mark.parametrize(
+    ("score", "triggered", "action"),
+    [(0, 0, "skip"), (40, 1, "run"), (10, 2, "run"), (10, 1, "defer")],
+)
+def test_policy_decisions(score, triggered, action):
+    decision = TriagePolicy().decide(make_result(score, triggered))
+
+    assert decision.action == action
+    assert decision.to_signal()["policy"]["run_min_score"] == 25
+
+
+def test_policy_disabled_always_runs_and_defer_can_be_turned_off():
+    assert TriagePolicy(enabled=False).decide(make_result(0, 0)).action == "run"
+    assert TriagePolicy(defer_enabled=False).decide(make_result(10, 1)).action == "skip"
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def fake_analyze(text):
+        calls.append(text)
+        return "LLM says fine."
+
+    monkeypatch.setattr(analyze_case.llm_gemini, "analyze_document", fake_analyze)
+    monkeypatch.setattr(analyze_case, "vendor_index", VendorIndex())
+    return calls
+
+
+def make_repo(tmp_path, text):
+    path = tmp_path / "doc.txt"
+    path.write_text(text)
+    return FakeCaseRepo({"c1": {"case_id": "c1", "signals": {"original_file": str(path)}}})
+
+
+async def test_analyze_skips_llm_when_nothing_triggers(tmp_path, llm_calls):
+    repo = make_repo(tmp_path, "Minutes of the routine monthly staff meeting.")
+
+    case = await AnalyzeCase(repo, policy=TriagePolicy()).execute("c1")
+
+    assert llm_calls == []
+    assert case["signals"]["llm_triage"]["action"] == "skip"
+    assert "skipped by triage policy" in case["explanation"]
+
+
+async def test_analyze_defers_borderline_case_to_queue(tmp_path, llm_calls, monkeypatch):
+    repo = make_repo(tmp_path, "Minutes of the routine monthly staff meeting.")
+    queue = DeferredLLMQueue()
+    monkeypatch.setattr(analyze_case.risk_scoring, "compute_risk_result", lambda text, case_id=None: make_result(10, 1))
+
+    case = await AnalyzeCase(repo, policy=TriagePolicy(), deferred_queue=queue).execute("c1")
+
+    assert case["signals"]["llm_triage"]["action"] == "defer"
+    assert llm_calls == []
+
+    await queue.join()
+
+    assert len(llm_calls) == 1
+    final = await repo.get("c1")
+    assert "LLM says fine." in final["explanation"]
+    assert "deferred_completed_at" in final["signals"]["llm_triage"]
+
+
+@pytest.fixture
+def deferred_case(tmp_path, llm_calls, monkeypatch):
+    monkeypatch.setattr(analyze_case.risk_scoring, "compute_risk_result", lambda text, case_id=None: make_result(10, 1))
+    return make_repo(tmp_path, "Minutes of the routine monthly staff meeting.")
+
+
+async def test_deferred_analysis_never_overwrites_a_newer_one(deferred_case, llm_calls):
+    queue = DeferredLLMQueue()
+    await AnalyzeCase(deferred_case, policy=TriagePolicy(), deferred_queue=queue).execute("c1")
+    newer = {**deferred_case._data["c1"]["signals"], "analysis_completed_at": "2030-01-01T00:00:00+00:00"}
+    deferred_case._data["c1"] = {**deferred_case._data["c1"], "signals": newer, "explanation": "re-analysed"}
+
+    await queue.join()
+
+    assert llm_calls == []
+    assert deferred_case._data["c1"]["explanation"] == "re-analysed"
+
+
+async def test_deferred_analysis_is_dropped_when_rescored_meanwhile(deferred_case, monkeypatch):
+    queue = DeferredLLMQueue()
+    await AnalyzeCase(deferred_case, policy=TriagePolicy(), deferred_queue=queue).execute("c1")
+
+    async def rescored_during_llm(text):
+        signals = {**deferred_case._data["c1"]["signals"], "rescored_at": "2030-01-01T00:00:00+00:00"}
+        deferred_case._data["c1"] = {**deferred_case._data["c1"], "signals": signals, "explanation": "rescored"}
+        return "LLM says fine."
+
+    monkeypatch.setattr(analyze_case, "_run_llm", rescored_during_llm)
+    original = deferred_case.get
+
+    async def get_before_rescore(case_id):
+        case = await original(case_id)
+        return {**case, "signals": {k: v for k, v in case["signals"].items() if k != "rescored_at"}}
+
+    monkeypatch.setattr(deferred_case, "get", get_before_rescore)
+    await queue.join()
+
+    assert deferred_case._data["c1"]["explanation"] == "rescored"
+
+
+async def test_deferred_analysis_lost_in_a_restart_is_resumed(deferred_case, llm_calls):
+    await AnalyzeCase(deferred_case, policy=TriagePolicy(), deferred_queue=DeferredLLMQueue()).execute("c1")
+    # The process restarts before the queue runs: a fresh queue knows nothing of the case
+    restarted = AnalyzeCase(deferred_case, policy=TriagePolicy(), deferred_queue=(queue := DeferredLLMQueue()))
+    case = await deferred_case.get("c1")
+
+    assert restarted.resume_deferred(case) and restarted.resume_deferred(case)
+    assert len(queue) == 1
+    await queue.join()
+
+    final = await deferred_case.get("c1")
+    assert "LLM says fine." in final["explanation"]
+    assert not restarted.resume_deferred(final)
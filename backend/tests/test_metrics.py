@@ -0,0 +1,91 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.rate_limit import RateLimiter
+from app.main import create_app
+
+
+def test_render_histogram_is_cumulative_with_sum_and_count():
+    histogram = metrics.Histogram("test_render_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0))
+    try:
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5.0, "a")
+
+        text = metrics.render(directory=None)
+    finally:
+        metrics.REGISTRY.pop(histogram.name)
+
+    assert "# TYPE test_render_seconds histogram" in text
+    assert 'test_render_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_render_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_render_seconds_sum{stage="a"} 5.55' in text
+    assert 'test_render_seconds_count{stage="a"} 3' in text
+
+
+def test_collect_sums_snapshots_of_other_workers(tmp_path):
+    counter = metrics.Counter("test_merge_total", "Test counter.", ("status",))
+    try:
+        counter.inc("completed", amount=2)
+        metrics.write_snapshot(tmp_path)
+        # Another worker's file with the same series plus one of its own
+        other = {"test_merge_total": {"series": [[["completed"], [3.0]], [["failed"], [1.0]]]}}
+        (tmp_path / "worker-999999-a1b2c3.json").write_text(json.dumps(other))
+        (tmp_path / "worker-broken.json").write_text("{not json")
+
+        counter.inc("completed")
+        merged = metrics.collect(tmp_path)["test_merge_total"]["series"]
+    finally:
+        metrics.REGISTRY.pop(counter.name)
+
+    # Live value (3) replaces this worker's stale file (2), plus the other worker's 3
+    assert merged[("completed",)] == [6.0]
+    assert merged[("failed",)] == [1.0]
+
+
+def test_collect_drops_gauges_of_exited_workers(tmp_path):
+    counter = metrics.Counter("test_dead_total", "Test counter.")
+    gauge = metrics.Gauge("test_dead_in_flight", "Test gauge.")
+    try:
+        gauge.inc()
+        other = {"test_dead_total": {"series": [[[], [4.0]]]}, "test_dead_in_flight": {"series": [[[], [2.0]]]}}
+        (tmp_path / "worker-999999-a1b2c3.json").write_text(json.dumps(other))  # no such process
+        (tmp_path / f"worker-{os.getppid()}-a1b2c3.json").write_text(json.dumps(other))  # a live one
+        # An exited worker whose PID this process now has
+        (tmp_path / f"worker-{os.getpid()}-d4e5f6.json").write_text(json.dumps(other))
+
+        metrics.write_snapshot(tmp_path)
+        merged = metrics.collect(tmp_path)
+    finally:
+        metrics.REGISTRY.pop(counter.name)
+        metrics.REGISTRY.pop(gauge.name)
+
+    assert len(list(tmp_path.glob(f"worker-{os.getpid()}-*.json"))) == 2  # its file was not taken over
+    assert merged["test_dead_total"]["series"][()] == [12.0]
+    assert merged["test_dead_in_flight"]["series"][()] == [3.0]
+
+
+def test_rate_limit_rejections_are_counted():
+    metrics.rate_limit_rejections_total.reset()
+    limiter = RateLimiter(max_requests=1, window_seconds=60)
+    limiter.check("ip")
+    try:
+        limiter.check("ip")
+    except Exception:
+        pass
+
+    assert metrics.rate_limit_rejections_total.samples() == {(): [1.0]}
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    client = TestClient(create_app())
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE fraudex_analysis_jobs_total counter" in response.text
+    assert "# TYPE fraudex_postgrest_request_seconds histogram" in response.text
@@ -0,0 +1,181 @@
+import asyncio
+import re
+import time
+
+import httpx
+import pytest
+
+from app.application.cases import analyze_case
+from app.services.object_storage import LocalDiskStorage, ObjectNotFound, S3Storage
+from app.services import text_extraction
+from app.services.text_extraction import extract_text_from_storage
+from app.utils.cancellation import run_in_thread
+
+
+class FakeS3:
+    """In-memory stand-in for a MinIO-style S3 endpoint (path-style)."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        auth = request.headers.get("authorization", "")
+        if not re.match(r"AWS4-HMAC-SHA256 Credential=minio/\d{8}/us-east-1/s3/aws4_request, SignedHeaders=[a-z0-9;-]+, Signature=[0-9a-f]{64}$", auth):
+            return httpx.Response(403)
+        if "transfer-encoding" in request.headers:
+            return httpx.Response(501)
+
+        path = request.url.path
+        if request.method == "PUT":
+            self.objects[path] = request.read()
+            return httpx.Response(200)
+        if path not in self.objects:
+            return httpx.Response(404)
+        body = self.objects[path]
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-length": str(len(body))})
+        if request.method == "DELETE":
+            del self.objects[path]
+            return httpx.Response(204)
+
+        range_header = request.headers.get("range")
+        if range_header:
+            start, _, end = range_header.removeprefix("bytes=").partition("-")
+            stop = int(end) + 1 if end else len(body)
+            return httpx.Response(206, content=body[int(start):stop])
+        return httpx.Response(200, content=body)
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def s3(fake_s3):
+    return S3Storage(
+        endpoint_url="http://minio.local:9000",
+        bucket="uploads",
+        access_key_id="minio",
+        secret_access_key="minio-secret",
+        transport=httpx.MockTransport(fake_s3),
+    )
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path, s3):
+    return LocalDiskStorage(tmp_path / "objects") if request.param == "local" else s3
+
+
+def stage(tmp_path, data: bytes):
+    path = tmp_path / "staged"
+    path.write_bytes(data)
+    return path
+
+
+def test_store_and_stream_round_trip(store, tmp_path):
+    data = bytes(range(256)) * 50
+    staged = stage(tmp_path, data)
+
+    store.store_file("ab/cd/blob.bin", staged)
+
+    assert not staged.exists()
+    assert store.exists("ab/cd/blob.bin")
+    assert store.size("ab/cd/blob.bin") == len(data)
+    assert b"".join(store.iter_chunks("ab/cd/blob.bin", chunk_size=1000)) == data
+
+
+def test_ranged_reads(store, tmp_path):
+    data = b"0123456789abcdef"
+    store.store_file("k.txt", stage(tmp_path, data))
+
+    assert store.read_range("k.txt", 4, 6) == b"456789"
+    assert b"".join(store.iter_chunks("k.txt", start=10)) == b"abcdef"
+    assert store.read_range("k.txt", 3, 0) == b""
+
+
+def test_missing_and_delete(store, tmp_path):
+    store.store_file("gone.txt", stage(tmp_path, b"x"))
+    store.delete("gone.txt")
+
+    assert not store.exists("gone.txt")
+    with pytest.raises(ObjectNotFound):
+        store.size("gone.txt")
+    with pytest.raises(ObjectNotFound):
+        list(store.iter_chunks("gone.txt"))
+
+
+def test_local_rejects_keys_outside_root(tmp_path):
+    store = LocalDiskStorage(tmp_path)
+
+    with pytest.raises(ValueError):
+        store.exists("../outside.txt")
+
+
+def test_s3_puts_with_content_length(s3, fake_s3, tmp_path):
+    s3.store_file("a/b.csv", stage(tmp_path, b"hello"))
+
+    put = fake_s3.requests[-1]
+    assert put.url.path == "/uploads/a/b.csv"
+    assert put.headers["content-length"] == "5"
+    assert put.headers["x-amz-content-sha256"] == "UNSIGNED-PAYLOAD"
+
+
+def test_extract_text_streams_from_s3(s3, tmp_path):
+    text = "vendor,amount\nAlpha ₹,49,85,000\n" * 100
+    s3.store_file("x/y.csv", stage(tmp_path, text.encode()))
+
+    assert extract_text_from_storage(s3, "x/y.csv") == text
+    assert extract_text_from_storage(s3, "x/missing.csv") == ""
+
+
+def test_extract_text_stages_remote_pdfs_on_disk(s3, tmp_path, monkeypatch):
+    s3.store_file("x/doc.pdf", stage(tmp_path, b"%PDF-1.7 " + b"x" * 100_000))
+    parsed = []
+
+    def parse(pdf):
+        parsed.append((pdf, pdf.suffix, pdf.stat().st_size))
+        return " Invoice total 5,000 "
+
+    monkeypatch.setattr(text_extraction, "_extract_from_pdf", parse)
+    monkeypatch.setattr(s3, "read_bytes", lambda key: pytest.fail("read into memory"))
+
+    assert extract_text_from_storage(s3, "x/doc.pdf") == "Invoice total 5,000"
+    [(staged, suffix, size)] = parsed
+    assert (suffix, size) == (".pdf", 100_009)
+    assert not staged.exists()
+
+
+def test_event_loop_stays_responsive_during_a_slow_download(fake_s3, tmp_path, monkeypatch):
+    def slow(request):
+        if request.method == "GET":
+            time.sleep(0.3)
+        return fake_s3(request)
+
+    s3 = S3Storage(
+        endpoint_url="http://minio.local:9000",
+        bucket="uploads",
+        access_key_id="minio",
+        secret_access_key="minio-secret",
+        transport=httpx.MockTransport(slow),
+    )
+    s3.store_file("x/doc.pdf", stage(tmp_path, b"%PDF-1.7 " + b"x" * 1000))
+    monkeypatch.setattr(analyze_case, "get_object_storage", lambda: s3)
+    monkeypatch.setattr(text_extraction, "_extract_from_pdf", lambda pdf: "Invoice total 5,000")
+
+    async def run():
+        ticks = 0
+        load = asyncio.ensure_future(
+            run_in_thread(analyze_case.load_case_text, {"original_file": "x/doc.pdf", "storage_backend": "s3"})
+        )
+        while not load.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return load.result(), ticks
+
+    text, ticks = asyncio.run(run())
+
+    assert text == "Invoice total 5,000"
+    assert ticks >= 10
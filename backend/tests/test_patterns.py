@@ -0,0 +1,40 @@
+import re
+
+from app.services.signals import patterns
+from app.services.signals.keywords import KEYWORD_CATEGORIES, find_keywords
+
+
+def find_keywords_per_keyword(text, keywords):
+    """The previous implementation: one regex scan per keyword."""
+    found = []
+    text_lower = text.lower()
+    for keyword in keywords:
+        for match in re.finditer(r"\b" + re.escape(keyword.lower()) + r"\b", text_lower):
+            start, end = max(0, match.start() - 50), min(len(text), match.end() + 50)
+            found.append({"keyword": keyword, "position": match.start(), "context": text[start:end].strip()})
+    return found
+
+
+def test_find_keywords_matches_per_keyword_scan():
+    text = (
+        "The Shell company paid a KICKBACK via a shell. An off-book gift, another gift, "
+        "and a gift-card; the shell company's proxy was a front company. giftshop, bribes."
+    )
+    keywords = ["shell", "shell company", "gift", "kickback", "off-book", "proxy", "front company", "company"]
+
+    assert find_keywords(text, keywords) == find_keywords_per_keyword(text, keywords)
+    for config in KEYWORD_CATEGORIES.values():
+        assert find_keywords(text, config["keywords"]) == find_keywords_per_keyword(text, config["keywords"])
+
+
+def test_find_keywords_handles_empty_and_duplicate_keywords():
+    assert find_keywords("anything", []) == []
+    found = find_keywords("a bribe here", ["bribe", "Bribe"])
+    assert [f["keyword"] for f in found] == ["bribe", "Bribe"]
+
+
+def test_compile_pattern_reuses_compiled_objects_and_warmup_fills_registry():
+    assert patterns.compile_pattern(r"\d+") is patterns.compile_pattern(r"\d+")
+    assert patterns.compile_pattern(r"x", re.I) is not patterns.compile_pattern(r"x")
+
+    assert patterns.warmup() >= len(KEYWORD_CATEGORIES)
@@ -0,0 +1,174 @@
+import pytest
+
+from app.application.cases import analyze_case
+from app.application.cases.analyze_case import AnalyzeCase
+from app.application.cases.rescore_case import RescoreCase
+from app.domain.errors import CaseNotAnalyzed
+from app.services import explainability, moderation, text_extraction
+from app.services.llm_triage import TriagePolicy
+from app.services.object_storage import LocalDiskStorage
+from app.services.signals import SignalEngine
+from app.services.signals.base import AnalysisContext
+from app.services.signals.round_numbers import RoundNumberDetector
+from app.services.signals.urgency import UrgencyDetector
+from app.services.vendor_index import VendorIndex
+
+TEXT = "URGENT: approve immediately.\nTotal: $5,000\nTotal: $6,000\nTotal: $7,000\nPayment: $9,000"
+
+
+def breakdown_for(engine, text=TEXT):
+    return engine.analyze(AnalysisContext(text=text)).signals["detector_breakdown"]
+
+
+def test_rescore_reuses_current_results_without_loading_text():
+    engine = SignalEngine([RoundNumberDetector(), UrgencyDetector()])
+    before = engine.analyze(AnalysisContext(text=TEXT))
+
+    def load_context():
+        raise AssertionError("nothing is stale")
+
+    after, rerun = engine.rescore(before.signals["detector_breakdown"], load_context)
+
+    assert rerun == []
+    assert after.risk_score == before.risk_score
+    assert after.signals["detector_breakdown"] == before.signals["detector_breakdown"]
+
+
+def test_rescore_reruns_only_changed_detectors_and_applies_new_weights():
+    stored = breakdown_for(SignalEngine([RoundNumberDetector(), UrgencyDetector()]))
+    contexts = []
+
+    def load_context():
+        contexts.append(TEXT)
+        return AnalysisContext(text=TEXT)
+
+    tuned = SignalEngine([RoundNumberDetector(min_amounts=10), UrgencyDetector(weight=3.0)])
+    result, rerun = tuned.rescore(stored, load_context)
+
+    assert rerun == ["round_numbers"]
+    assert len(contexts) == 1
+    breakdown = result.signals["detector_breakdown"]
+    assert breakdown["round_numbers"]["score"] == 0  # below the new min_amounts
+    assert breakdown["urgency"]["weight"] == 3.0
+    assert breakdown["urgency"]["indicators"] == stored["urgency"]["indicators"]
+
+
+def test_entries_without_a_version_are_recomputed():
+    engine = SignalEngine([UrgencyDetector()])
+    stored = breakdown_for(engine)
+    del stored["urgency"]["version"]
+
+    _, rerun = engine.rescore(stored, lambda: AnalysisContext(text=TEXT))
+
+    assert rerun == ["urgency"]
+
+
+def test_extracted_text_is_cached_next_to_the_object(tmp_path, monkeypatch):
+    store = LocalDiskStorage(tmp_path)
+    staged = tmp_path / "staged"
+    staged.write_text("Invoice total $5,000")
+    store.store_file("ab/cd/abcd.txt", staged)
+
+    assert text_extraction.cached_text_from_storage(store, "ab/cd/abcd.txt") == "Invoice total $5,000"
+    assert store.exists(text_extraction.extracted_text_key("ab/cd/abcd.txt"))
+
+    monkeypatch.setattr(text_extraction, "extract_text_from_storage", lambda *_: pytest.fail("not cached"))
+    assert text_extraction.cached_text_from_storage(store, "ab/cd/abcd.txt") == "Invoice total $5,000"
+
+
+class FakeCaseRepo:
+    def __init__(self, data):
+        self._data = data
+
+    async def get(self, case_id):
+        return self._data.get(case_id)
+
+    async def update(self, case_id, obj_in):
+        self._data[case_id] = {**self._data[case_id], **obj_in}
+        return self._data[case_id]
+
+    async def transition(self, case_id, obj_in, *, from_status, where):
+        case = self._data[case_id]
+        for key, expected in where.items():
+            value = case["signals"].get(key.removeprefix("signals->>"))
+            if value != (None if expected == "is.null" else expected.removeprefix("eq.")):
+                return None
+        if case.get("status") not in from_status:
+            return None
+        return await self.update(case_id, obj_in)
+
+
+async def test_rescore_case_keeps_llm_analysis_and_records_rerun_detectors(tmp_path, monkeypatch):
+    llm_calls = []
+
+    async def fake_analyze(text):
+        llm_calls.append(text)
+        return "LLM says review the totals."
+
+    monkeypatch.setattr(analyze_case.llm_gemini, "analyze_document", fake_analyze)
+    monkeypatch.setattr(analyze_case, "vendor_index", VendorIndex())
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT)
+    repo = FakeCaseRepo({"c1": {"case_id": "c1", "signals": {"original_file": str(path)}}})
+
+    with pytest.raises(CaseNotAnalyzed):
+        await RescoreCase(repo).execute("c1")
+
+    await AnalyzeCase(repo, policy=TriagePolicy(enabled=False)).execute("c1")
+    engine = SignalEngine()
+    engine.detectors[1] = RoundNumberDetector(weight=1.0, min_amounts=10)
+    case = await RescoreCase(repo, engine=engine).execute("c1")
+
+    assert len(llm_calls) == 1
+    assert case["signals"]["rescored_detectors"] == ["round_numbers"]
+    assert case["signals"]["detector_breakdown"]["round_numbers"]["score"] == 0
+    assert "LLM says review the totals." in case["explanation"]
+
+
+async def test_rescore_keeps_the_llm_section_of_legacy_cases_and_passes_the_case_id(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT)
+    engine = SignalEngine([UrgencyDetector()])
+    breakdown = breakdown_for(engine)
+    legacy = explainability.format_explanation({"risk_level": "low"}, "LLM flagged the totals.")
+    repo = FakeCaseRepo({"c1": {
+        "case_id": "c1",
+        "status": "analyzed",
+        "signals": {"original_file": str(path), "detector_breakdown": breakdown},
+        "explanation": moderation.sanitize_output(legacy),
+    }})
+    seen = []
+
+    class Spy(UrgencyDetector):
+        version = "2"  # changed, so it re-runs
+
+        def detect(self, context):
+            seen.append(context.metadata)
+            return super().detect(context)
+
+    case = await RescoreCase(repo, engine=SignalEngine([Spy()])).execute("c1")
+
+    assert seen == [{"case_id": "c1"}]
+    assert case["signals"]["llm_analysis"] == "LLM flagged the totals."
+    assert case["explanation"].count(moderation.DISCLAIMER.strip()) == 1
+
+
+async def test_rescore_does_not_overwrite_an_analysis_that_finished_meanwhile(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT)
+    engine = SignalEngine([UrgencyDetector()])
+    signals = {"original_file": str(path), "detector_breakdown": breakdown_for(engine), "analysis_completed_at": "t1"}
+    repo = FakeCaseRepo({"c1": {"case_id": "c1", "status": "analyzed", "risk_score": 1, "signals": signals}})
+
+    class Reanalysed(UrgencyDetector):
+        version = "2"
+
+        def detect(self, context):
+            # A fresh analysis lands while the rescore is running
+            repo._data["c1"] = {**repo._data["c1"], "risk_score": 2, "signals": {**signals, "analysis_completed_at": "t2"}}
+            return super().detect(context)
+
+    case = await RescoreCase(repo, engine=SignalEngine([Reanalysed()])).execute("c1")
+
+    assert case["risk_score"] == 2
+    assert "rescored_at" not in case["signals"]
@@ -0,0 +1,67 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.domain.errors import UploadTooLarge
+from app.services import storage
+from app.services.object_storage import LocalDiskStorage
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    return tmp_path
+
+
+@pytest.fixture
+def backend(upload_dir):
+    return LocalDiskStorage(upload_dir)
+
+
+def make_upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_save_upload_is_content_addressed(upload_dir, backend):
+    data = b"bid_id,amount\nB001,4985000\n" * 1000
+    sha = hashlib.sha256(data).hexdigest()
+
+    stored = await storage.save_upload(make_upload(data, "bids.csv"), backend=backend)
+
+    assert stored.sha256 == sha
+    assert stored.size == len(data)
+    assert stored.key == f"{sha[:2]}/{sha[2:4]}/{sha}.csv"
+    assert stored.backend == "local"
+    assert (upload_dir / sha[:2] / sha[2:4] / f"{sha}.csv").read_bytes() == data
+    assert not stored.deduplicated
+
+
+@pytest.mark.asyncio
+async def test_save_upload_deduplicates(upload_dir, backend):
+    first = await storage.save_upload(make_upload(b"same", "a.txt"), backend=backend)
+    second = await storage.save_upload(make_upload(b"same", "b.txt"), backend=backend)
+
+    assert second.key == first.key
+    assert second.deduplicated
+    assert list((upload_dir / ".tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_oversized_and_cleans_up(upload_dir, backend, monkeypatch):
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 4)
+
+    with pytest.raises(UploadTooLarge):
+        await storage.save_upload(make_upload(b"x" * 64, "big.pdf"), max_bytes=10, backend=backend)
+
+    assert list((upload_dir / ".tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_upload_ignores_client_directories(backend):
+    stored = await storage.save_upload(make_upload(b"data", "../../etc/passwd.sh;rm"), backend=backend)
+
+    assert stored.filename == "passwd.sh;rm"
+    assert backend.exists(stored.key)
+    assert not stored.key.endswith(";rm")
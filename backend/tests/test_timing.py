@@ -0,0 +1,50 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.metrics import stage_duration_seconds
+from app.services.risk_scoring import compute_risk_result
+from app.utils.timing import collect_timings, span
+
+
+def test_spans_accumulate_per_stage_and_feed_histogram():
+    stage_duration_seconds.reset()
+
+    with collect_timings() as timings:
+        for _ in range(3):
+            with span("stage.a"):
+                pass
+
+    assert timings.to_dict()["stage.a"]["calls"] == 3
+    assert stage_duration_seconds.samples()[("stage.a",)][-1] == 3
+
+
+def test_detector_spans_are_recorded():
+    with collect_timings() as timings:
+        compute_risk_result("Payment of 50,000 approved urgently.")
+
+    assert "detector.benford" in timings.to_dict()
+    assert "detector.keywords" in timings.to_dict()
+
+
+async def test_collector_follows_awaited_coroutines_only_in_its_context():
+    async def work(name):
+        with span(name):
+            await asyncio.sleep(0)
+
+    with collect_timings() as timings:
+        await work("inside")
+    await work("outside")
+
+    assert list(timings.to_dict()) == ["inside"]
+
+
+def test_disabled_timing_is_a_noop(monkeypatch):
+    monkeypatch.setattr(settings, "timing_enabled", False)
+    stage_duration_seconds.reset()
+
+    with collect_timings() as timings:
+        with span("stage.b"):
+            pass
+
+    assert timings.to_dict() == {}
+    assert stage_duration_seconds.samples() == {}
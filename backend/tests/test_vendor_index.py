@@ -0,0 +1,149 @@
+import statistics
+
+from app.cli import ingest_vendors
+from app.services.signals.base import AnalysisContext
+from app.services.signals.vendor_baseline import VendorBaselineDetector
+from app.services.vendor_index import RunningStats, VendorIndex
+
+
+def test_running_stats_matches_statistics_module():
+    values = [4985000.0, 4795000.0, 9800000.0, 5085000.0]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 4
+    assert stats.total == sum(values)
+    assert abs(stats.mean - statistics.mean(values)) < 1e-6
+    assert abs(stats.variance - statistics.variance(values)) < 1e-3
+
+
+def test_awards_and_payments_update_profile():
+    index = VendorIndex()
+    index.ingest_award({
+        "award_id": "A001",
+        "tender_id": "T001",
+        "winning_vendor": "V001",
+        "approved_by": "O101",
+        "award_amount": "4985000",
+        "award_date": "2024-01-22",
+    })
+    index.ingest_payment({"payment_id": "P001", "award_id": "A001", "amount": "2500000", "paid_date": "2024-02-05"})
+    index.ingest_payment({"payment_id": "P999", "award_id": "unknown", "amount": "1", "paid_date": "2024-02-05"})
+
+    profile = index.get("V001").to_profile()
+
+    assert profile.total_transactions == 2
+    assert profile.total_amount == 7485000
+    assert profile.first_transaction == "2024-01-22"
+    assert profile.last_transaction == "2024-02-05"
+    assert profile.related_entities == ["O101", "T001"]
+
+
+def test_case_bids_key_by_normalized_name():
+    index = VendorIndex()
+    index.ingest_case("c1", [{"vendor": "Alpha Infra Pvt Ltd", "amount": 1000.0}])
+    index.ingest_case("c2", [{"vendor": "Alpha Infrastructure Private Limited", "amount": 3000.0}])
+
+    stats = index.get(None, "ALPHA INFRA LTD")
+
+    assert stats.amounts.count == 2
+    assert stats.cases_involved == {"c1", "c2"}
+    assert stats.aliases == {"Alpha Infrastructure Private Limited"}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = VendorIndex()
+    index.record(100.0, vendor_id="V1", seen_at="2024-01-01")
+    index.record(300.0, vendor_id="V1", seen_at="2024-02-01")
+    path = tmp_path / "index.json"
+    index.save(path)
+
+    restored = VendorIndex()
+    restored.load(path)
+
+    assert restored.get("V1").amounts == index.get("V1").amounts
+
+
+def test_baseline_detector_flags_outlier():
+    index = VendorIndex()
+    for amount in [10000, 10500, 9800, 10200, 9900, 10100]:
+        index.record(float(amount), name="Beta Constructions")
+    detector = VendorBaselineDetector(index=index)
+
+    result = detector.detect(AnalysisContext(text="", entities=[{"name": "Beta Constructions", "amount": 95000}]))
+    normal = detector.detect(AnalysisContext(text="", entities=[{"name": "Beta Constructions", "amount": 10050}]))
+
+    assert result.score > 0
+    assert result.indicators["outliers"][0]["history_size"] == 6
+    assert normal.score == 0
+
+
+def test_reingesting_a_case_replaces_its_bids():
+    index = VendorIndex()
+    index.ingest_case("c1", [{"vendor": "Alpha Infra", "amount": 1000.0}, {"vendor": "Beta Constructions", "amount": 50.0}])
+    index.ingest_case("c2", [{"vendor": "Alpha Infra", "amount": 3000.0}])
+    index.ingest_case("c1", [{"vendor": "Alpha Infra", "amount": 2000.0}])
+
+    alpha = index.get(None, "Alpha Infra")
+    assert (alpha.amounts.count, alpha.amounts.total) == (2, 5000.0)
+    assert index.get(None, "Beta Constructions") is None
+
+    baseline = index.baseline(None, "Alpha Infra", exclude_case="c1")
+    assert (baseline.count, baseline.mean, baseline.m2) == (1, 3000.0, 0.0)
+    assert alpha.amounts.count == 2
+
+
+def test_baseline_detector_leaves_out_the_case_being_scored():
+    index = VendorIndex()
+    for case, amount in enumerate([10000, 10500, 9800, 10200, 9900]):
+        index.ingest_case(f"h{case}", [{"vendor": "Beta Constructions", "amount": float(amount)}])
+    index.ingest_case("c1", [{"vendor": "Beta Constructions", "amount": 95000.0}])
+    detector = VendorBaselineDetector(index=index)
+    context = AnalysisContext(text="", entities=[{"name": "Beta Constructions", "amount": 95000}], metadata={"case_id": "c1"})
+
+    result = detector.detect(context)
+
+    assert result.indicators["outliers"][0]["history_size"] == 5
+
+
+def test_registered_names_share_the_vendor_id_profile():
+    index = VendorIndex()
+    index.ingest_case("c1", [{"vendor": "Alpha Infra Pvt Ltd", "amount": 1000.0}])
+    index.ingest_award({"award_id": "A001", "winning_vendor": "V001", "award_amount": "4000", "award_date": "2024-01-22"})
+    index.register_vendor("V001", "Alpha Infra Pvt Ltd")
+    index.ingest_case("c2", [{"vendor": "ALPHA INFRA LIMITED", "amount": 3000.0}])
+
+    stats = index.get(None, "Alpha Infrastructure Private Limited")
+
+    assert stats is index.get("V001")
+    assert (stats.name, stats.amounts.count, stats.cases_involved) == ("Alpha Infra Pvt Ltd", 3, {"c1", "c2"})
+    assert index.get(None, "unregistered vendor") is None
+
+
+def test_workers_saving_to_one_snapshot_merge(tmp_path):
+    path = tmp_path / "index.json"
+    first, second = VendorIndex(), VendorIndex()
+    first.ingest_case("c1", [{"vendor": "Alpha Infra", "amount": 1000.0}])
+    second.ingest_case("c2", [{"vendor": "Alpha Infra", "amount": 3000.0}])
+    second.ingest_case("c1", [{"vendor": "Alpha Infra", "amount": 2000.0}])  # re-analysed later
+    second.save(path)
+    first.save(path)
+
+    restored = VendorIndex()
+    restored.load(path)
+
+    assert restored.get(None, "Alpha Infra").amounts.total == 5000.0
+
+
+def test_ingest_vendors_cli_is_idempotent(tmp_path):
+    path = tmp_path / "index.json"
+    for _ in range(2):
+        assert ingest_vendors.main(["--index", str(path)]) == 0
+
+    index = VendorIndex()
+    index.load(path)
+    profile = index.get(None, "Alpha Infra Pvt Ltd").to_profile()
+
+    assert profile.vendor_id == "V001"
+    assert profile.total_transactions == 5